@@ -1,14 +1,72 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
 import os
 import logging
 import traceback
 
+from app.api.rate_limit import RATE_LIMIT_ENABLED, api_keys, rate_limiter, route_class
+from app.api.response_cache import RESPONSE_CACHE_ENABLED, response_cache
+from app.infrastructure.tracing import server_timing, tracer
+from app.shared.exceptions import RateLimitExceededError, ServiceOverloadedError
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-API_KEY = os.getenv("API_KEY", "dev-api-key-12345")
+def shed_response(request: Request, client_name: str, route: str, e) -> JSONResponse:
+    logger.warning(f"🚦 {e.status_code} {request.method} {request.url.path} ({client_name}, {route}): {e.detail}")
+    return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+
+def release_after_body(response, release):
+    """Keep a response's admission slot until its body has been sent
+
+    call_next returns as soon as the headers are out; streaming bodies (batch
+    lookups, exports) keep their database session until the last chunk. The
+    slot is released when the body iterator ends or is closed, or from the
+    response's background task, which also runs after a client disconnect.
+    """
+    released = False
+
+    def release_once():
+        nonlocal released
+        if not released:
+            released = True
+            release()
+
+    iterator = response.body_iterator
+
+    async def body():
+        try:
+            async for chunk in iterator:
+                yield chunk
+        finally:
+            release_once()
+
+    async def after_response(background=response.background):
+        try:
+            if background is not None:
+                await background()
+        finally:
+            release_once()
+
+    response.body_iterator = body()
+    response.background = BackgroundTask(after_response)
+    return response
+
+async def tracing_middleware(request: Request, call_next):
+    """Trace sampled API requests and report their phases in a Server-Timing header"""
+    trace = tracer.sample(request.headers.get("traceparent")) if request.url.path.startswith("/api/") else None
+    if trace is None:
+        return await call_next(request)
+
+    with tracer.activate(trace, f"{request.method} {request.url.path}", **{"http.method": request.method}) as root:
+        response = await call_next(request)
+        root.attributes["http.status_code"] = response.status_code
+    response.headers["Server-Timing"] = server_timing(trace)
+    response.headers["X-Trace-Id"] = trace.trace_id
+    tracer.submit(trace)
+    return response
 
 async def auth_middleware(request: Request, call_next):
     """Simple API key authentication middleware with enhanced logging"""
@@ -18,17 +76,19 @@ async def auth_middleware(request: Request, call_next):
         response = await call_next(request)
         return response
 
-    # Check API key in header
+    # Check API key in header (EventSource cannot set headers, so the change feed also accepts ?api_key=)
     api_key = request.headers.get("X-API-Key")
-    if not api_key or api_key != API_KEY:
+    if not api_key and request.url.path.endswith("/companies/changes"):
+        api_key = request.query_params.get("api_key")
+    client = api_keys.get(api_key) if api_key else None
+    if client is None:
         # Log 401 error with details
         logger.error(f"❌ 401 Unauthorized - API Key Authentication Failed")
         logger.error(f"   Request Path: {request.url.path}")
         logger.error(f"   Request Method: {request.method}")
         logger.error(f"   Client IP: {request.client.host if request.client else 'unknown'}")
         logger.error(f"   API Key Provided: {'Yes' if api_key else 'No'}")
-        logger.error(f"   API Key Valid: {api_key == API_KEY if api_key else 'N/A'}")
-        logger.error(f"   Expected API Key: {API_KEY[:8]}...{API_KEY[-4:]}")
+        logger.error(f"   Known API Keys: {', '.join(sorted(k.name for k in api_keys.values()))}")
         if api_key:
             logger.error(f"   Received API Key: {api_key[:8]}...{api_key[-4:]}")
         logger.error(f"   User-Agent: {request.headers.get('user-agent', 'unknown')}")
@@ -38,8 +98,40 @@ async def auth_middleware(request: Request, call_next):
             content={"detail": "Invalid or missing API key"}
         )
 
+    request.state.api_key = client.name
+
+    # Per-key quotas, then a bounded share of the database pool
+    route = route_class(request.method, request.url.path, request.query_params) if RATE_LIMIT_ENABLED else None
+    if route is not None:
+        try:
+            await rate_limiter.check(client, route)
+        except RateLimitExceededError as e:
+            return shed_response(request, client.name, route, e)
+
+    # Cached list responses need no database connection, so they skip admission control
+    pending, cached = await response_cache.lookup(request) if RESPONSE_CACHE_ENABLED else (None, None)
+    if cached is not None:
+        return cached
+
+    if route is not None:
+        try:
+            await rate_limiter.admission.acquire(client.name)
+        except (RateLimitExceededError, ServiceOverloadedError) as e:
+            return shed_response(request, client.name, route, e)
+
+    handed_off = False
     try:
         response = await call_next(request)
+        if pending is not None and response.status_code == 200:
+            # Reads the whole body, so the endpoint is done with its session
+            return await response_cache.store(request, pending, response)
+        # Let this process serve its own company writes right away, ahead of the change feed
+        if RESPONSE_CACHE_ENABLED and response.status_code < 400 and request.url.path.startswith("/api/v1/companies") \
+                and route_class(request.method, request.url.path, request.query_params) == "write":
+            response_cache.invalidate()
+        if route is not None:
+            response = release_after_body(response, lambda: rate_limiter.admission.release(client.name))
+            handed_off = True
         return response
     except Exception as e:
         # Log 500 error with full stack trace
@@ -56,4 +148,7 @@ async def auth_middleware(request: Request, call_next):
         return JSONResponse(
             status_code=500,
             content={"detail": "Internal server error", "error_type": type(e).__name__}
-        )
\ No newline at end of file
+        )
+    finally:
+        if route is not None and not handed_off:
+            rate_limiter.admission.release(client.name)
\ No newline at end of file
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.infrastructure.database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from app.shared.exceptions import RateLimitExceededError, ServiceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Shared bucket store for multi-process deployments (in-memory per process when unset)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+# Default quota per key and route class, as rate/burst in requests per second
+RATE_LIMITS = os.getenv("RATE_LIMITS", "search=10/20,list=20/40,write=2/5")
+
+# Requests allowed to hold (or wait for) a database connection at once; defaults to the pool size
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+ADMISSION_KEY_CONCURRENCY = int(os.getenv("ADMISSION_KEY_CONCURRENCY", str(max(1, ADMISSION_CONCURRENCY // 2))))
+ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "250"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", str(ADMISSION_CONCURRENCY * 4)))
+
+ROUTE_CLASSES = ("search", "list", "write")
+
+# Bucket state is dropped once this many buckets exist and the oldest have refilled
+MAX_MEMORY_BUCKETS = 10000
+
+
+@dataclass
+class Quota:
+    """Token bucket parameters: sustained requests per second and burst size"""
+    rate: float
+    burst: float
+
+
+@dataclass
+class ApiKey:
+    """A client's API key with its per route class quotas"""
+    name: str
+    key: str
+    quotas: Dict[str, Quota] = field(default_factory=dict)
+
+
+def parse_quotas(spec: str, separator: str = ",") -> Dict[str, Quota]:
+    """Parse `class=rate/burst` pairs, e.g. `search=10/20,list=20/40`"""
+    quotas = {}
+    for item in filter(None, (part.strip() for part in spec.split(separator))):
+        route_class, _, limits = item.partition("=")
+        rate, _, burst = limits.partition("/")
+        route_class = route_class.strip()
+        if route_class not in ROUTE_CLASSES:
+            raise ValueError(f"Unknown route class in rate limit '{item}'")
+        quotas[route_class] = Quota(rate=float(rate), burst=float(burst or rate))
+    return quotas
+
+
+def load_api_keys() -> Dict[str, ApiKey]:
+    """
+    Build the key registry from API_KEYS and API_KEY
+
+    API_KEYS is a comma separated list of `name:key` entries, each optionally
+    followed by `:class=rate/burst;class=rate/burst` overriding RATE_LIMITS for
+    that key. API_KEY stays valid as the `default` key when set, or when
+    API_KEYS is not configured at all.
+    """
+    defaults = parse_quotas(RATE_LIMITS)
+    keys = {}
+    for entry in filter(None, (part.strip() for part in os.getenv("API_KEYS", "").split(","))):
+        name, _, rest = entry.partition(":")
+        key, _, overrides = rest.partition(":")
+        if not name or not key:
+            raise ValueError(f"API_KEYS entries must look like name:key[:quotas], got '{entry}'")
+        keys[key] = ApiKey(name=name, key=key, quotas={**defaults, **parse_quotas(overrides, ";")})
+
+    if os.getenv("API_KEY") or not keys:
+        key = os.getenv("API_KEY", "dev-api-key-12345")
+        keys.setdefault(key, ApiKey(name="default", key=key, quotas=dict(defaults)))
+    return keys
+
+
+def route_class(method: str, path: str, query_params) -> Optional[str]:
+    """Quota class for a request, or None for routes that are not limited"""
+    # The change feed is one long-lived stream served from memory, not a database query
+    if path.endswith("/companies/changes"):
+        return None
+    if method in ("GET", "HEAD"):
+        if path.endswith("/search") or query_params.get("query"):
+            return "search"
+        return "list"
+    if method == "POST" and path.endswith("/companies/batch"):
+        return "list"
+    if method == "OPTIONS":
+        return None
+    return "write"
+
+
+def retry_seconds(seconds: float) -> int:
+    """Whole seconds for a Retry-After header, at least one"""
+    return max(1, math.ceil(seconds))
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process, refilled against `clock` (monotonic seconds)"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, bucket: str, quota: Quota) -> float:
+        """Take one token; return 0 when allowed, else seconds until a token is available"""
+        now = self.clock()
+        tokens, updated = self._buckets.get(bucket, (quota.burst, now))
+        tokens = min(quota.burst, tokens + (now - updated) * quota.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / quota.rate
+        self._buckets[bucket] = (tokens, now)
+        if len(self._buckets) > MAX_MEMORY_BUCKETS:
+            self._prune(now)
+        return wait
+
+    def _prune(self, now: float):
+        """Forget buckets idle long enough to have refilled completely"""
+        for bucket, (_, updated) in list(self._buckets.items()):
+            if now - updated > 60:
+                del self._buckets[bucket]
+
+    async def close(self):
+        self._buckets.clear()
+
+
+# Refill and take atomically on the Redis server clock, so every API process shares one bucket
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all API processes through Redis"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(TAKE_SCRIPT)
+
+    async def take(self, bucket: str, quota: Quota) -> float:
+        """Take one token; Redis errors let the request through rather than fail it"""
+        try:
+            wait = await self._take(keys=[f"rate_limit:{bucket}"], args=[quota.rate, quota.burst])
+            return float(wait)
+        except Exception as e:
+            logger.warning(f"⚠️ Rate limit store unavailable, allowing request: {e}")
+            return 0.0
+
+    async def close(self):
+        await self._redis.close()
+
+
+class AdmissionController:
+    """
+    Bound the requests competing for database connections
+
+    Requests beyond `capacity` wait for a slot; rather than queueing
+    indefinitely behind the pool, a request is shed with 503 when the queue
+    is already `max_queue` long or no slot frees up within `max_wait_ms`.
+    One key may hold at most `per_key` slots, further requests get 429.
+    """
+
+    def __init__(self, capacity: int, per_key: int, max_wait_ms: float, max_queue: int):
+        self.capacity = capacity
+        self.per_key = per_key
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.shed = 0
+        self._slots = asyncio.Semaphore(capacity)
+        self._in_flight: Dict[str, int] = {}
+
+    async def acquire(self, key_name: str):
+        if self._in_flight.get(key_name, 0) >= self.per_key:
+            self.shed += 1
+            raise RateLimitExceededError(detail="Too many concurrent requests for this API key")
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            raise ServiceOverloadedError(retry_after=retry_seconds(self.max_wait))
+
+        self._in_flight[key_name] = self._in_flight.get(key_name, 0) + 1
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._release_key(key_name)
+            self.shed += 1
+            raise ServiceOverloadedError(retry_after=retry_seconds(self.max_wait))
+        finally:
+            self.waiting -= 1
+
+    def release(self, key_name: str):
+        self._slots.release()
+        self._release_key(key_name)
+
+    def _release_key(self, key_name: str):
+        count = self._in_flight.get(key_name, 0) - 1
+        if count > 0:
+            self._in_flight[key_name] = count
+        else:
+            self._in_flight.pop(key_name, None)
+
+
+class RateLimiter:
+    """Per key and route class token buckets in front of admission control"""
+
+    def __init__(self, store=None, admission: Optional[AdmissionController] = None):
+        self.store = store or (RedisBucketStore(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBucketStore())
+        self.admission = admission or AdmissionController(
+            capacity=ADMISSION_CONCURRENCY,
+            per_key=ADMISSION_KEY_CONCURRENCY,
+            max_wait_ms=ADMISSION_MAX_WAIT_MS,
+            max_queue=ADMISSION_MAX_QUEUE
+        )
+
+    async def check(self, api_key: ApiKey, route: str):
+        """Take a token from the key's bucket for this route class, or raise 429"""
+        quota = api_key.quotas.get(route)
+        if quota is None:
+            return
+        wait = await self.store.take(f"{api_key.name}:{route}", quota)
+        if wait > 0:
+            raise RateLimitExceededError(
+                detail=f"Rate limit exceeded for {route} requests ({quota.rate:g}/s, burst {quota.burst:g})",
+                retry_after=retry_seconds(wait)
+            )
+
+    async def close(self):
+        await self.store.close()
+
+
+api_keys = load_api_keys()
+rate_limiter = RateLimiter()
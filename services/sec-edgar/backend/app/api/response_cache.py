@@ -0,0 +1,227 @@
+"""
+Precompressed response bytes for the hottest company list requests
+
+The first page of GET /companies (optionally per sector, exchange or
+selection state) and GET /companies/selected dominate traffic. On a miss the
+route's JSON body is stored once in identity, gzip and (when the brotli
+package is installed) brotli encodings; hits are answered from memory with
+the encoding the client accepts, without a database session, ORM objects,
+response models or JSON encoding.
+
+Entries are valid for one version of sd_companies: the latest change event
+seq seen by the process's change feed listener, plus a local generation
+bumped by company writes handled in this process (so a client reads its own
+writes immediately). When the listener is not connected the cache is
+bypassed rather than risk serving stale lists. Least recently used entries
+are evicted to stay under RESPONSE_CACHE_MAX_BYTES.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.services.stock_discovery.change_feed import change_feed_hub
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Safety net for writes that bypass the change feed (e.g. bulk scripts)
+RESPONSE_CACHE_MAX_AGE_SECONDS = float(os.getenv("RESPONSE_CACHE_MAX_AGE_SECONDS", "300"))
+# Deeper pages are rarely hit twice and would only churn the cache
+RESPONSE_CACHE_MAX_PAGE = int(os.getenv("RESPONSE_CACHE_MAX_PAGE", "3"))
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+LIST_PATH = "/api/v1/companies/"
+SELECTED_PATH = "/api/v1/companies/selected"
+
+# Query parameters a cached list may vary on, with the values equivalent to leaving them out
+LIST_PARAMS = {"exchange": None, "sector": None, "is_selected": None, "sort": "ticker", "page": "1", "size": "50", "fields": None}
+SELECTED_PARAMS = {"fields": None}
+
+
+@dataclass
+class CachedResponse:
+    """One response body in every stored encoding"""
+    identity: bytes
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+    etag: str
+    stored_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.identity) + len(self.gzip or b"") + len(self.br or b"")
+
+
+def normalize_fields(value: str) -> str:
+    """fields= lists are answered in schema order, so their order does not matter"""
+    return ",".join(sorted({name.strip() for name in value.split(",") if name.strip()}))
+
+
+def cache_key(request: Request) -> Optional[Tuple]:
+    """Normalized (path, params) for a cacheable request, or None"""
+    if request.method != "GET":
+        return None
+    path = request.url.path
+    if path == LIST_PATH:
+        allowed = LIST_PARAMS
+    elif path == SELECTED_PATH:
+        allowed = SELECTED_PARAMS
+    else:
+        return None
+
+    params = []
+    for name in sorted(set(request.query_params.keys())):
+        values = request.query_params.getlist(name)
+        if name not in allowed or len(values) != 1:
+            return None
+        value = values[0].strip()
+        if name == "fields":
+            value = normalize_fields(value)
+        elif name == "is_selected":
+            value = value.lower()
+        if value != allowed[name]:
+            params.append((name, value))
+
+    page = dict(params).get("page", "1")
+    if not page.isdigit() or int(page) > RESPONSE_CACHE_MAX_PAGE:
+        return None
+    return path, tuple(params)
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings an Accept-Encoding header allows (ignoring those with q=0)"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if "*" in accepted:
+        accepted.update(("br", "gzip"))
+    return accepted
+
+
+class ResponseCache:
+    """LRU of precompressed response bodies under a byte budget"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, max_age: float = RESPONSE_CACHE_MAX_AGE_SECONDS, hub=change_feed_hub):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hub = hub
+        self.entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self.bytes = 0
+        self.generation = 0
+        self.version: Optional[Tuple[int, int]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def current_version(self) -> Optional[Tuple[int, int]]:
+        """Version of sd_companies the cache is valid for, or None while changes cannot be observed"""
+        if not self.hub.listening:
+            return None
+        return self.hub.last_seq, self.generation
+
+    async def lookup(self, request: Request) -> Tuple[Optional[Tuple], Optional[Response]]:
+        """
+        (pending, cached response) for a request
+
+        On a miss `pending` is the (key, version) to pass to store() with the
+        route's response; it is None when the request cannot be cached.
+        """
+        key = cache_key(request)
+        if key is None:
+            return None, None
+        # Listening starts on first use, like the change feed itself
+        await self.hub.start()
+        version = self.current_version()
+        if version is None:
+            return None, None
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry.stored_at > self.max_age:
+            self.misses += 1
+            return (key, version), None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return None, self.respond(request, entry, "HIT")
+
+    async def store(self, request: Request, pending: Tuple, response) -> Response:
+        """Buffer a fresh 200 response, cache it if the version is unchanged, and send it encoded"""
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = CachedResponse(
+            identity=body,
+            gzip=gzip.compress(body, GZIP_LEVEL, mtime=0) if len(body) >= MIN_COMPRESS_BYTES else None,
+            br=brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None and len(body) >= MIN_COMPRESS_BYTES else None,
+            etag=f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"',
+            stored_at=time.monotonic()
+        )
+
+        key, version = pending
+        # A write committed while the body was built makes it unsafe to keep
+        if version == self.current_version() == self.version and entry.size <= self.max_bytes // 4:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self.entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= evicted.size
+        return self.respond(request, entry, "MISS")
+
+    def respond(self, request: Request, entry: CachedResponse, status: str) -> Response:
+        headers = {"ETag": entry.etag, "Vary": "Accept-Encoding", "X-Cache": status}
+        if request.headers.get("if-none-match") == entry.etag:
+            return Response(status_code=304, headers=headers)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        body = entry.identity
+        if "br" in accepted and entry.br is not None:
+            body = entry.br
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted and entry.gzip is not None:
+            body = entry.gzip
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self):
+        """Drop every entry after a company write handled by this process"""
+        self.generation += 1
+        self.clear()
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
@@ -1,7 +1,26 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from datetime import date
+
+from app.infrastructure.database import get_db
+from app.infrastructure.external.edgar import EdgarClient
+from app.services.data_collection.collection_service import CollectionService
+from app.services.data_collection.frames_service import FrameConcept, FramesIngestionService
+from app.services.data_collection.report_calendar import ReportCalendarService
+from app.shared.models.data_collection import (
+    CollectionEnqueueResponse, CollectionJobStats, CollectionWorkerStats, FrameIngestResult,
+    ReportCalendarResponse, CalendarRefreshResponse
+)
 
 router = APIRouter()
 
+def get_collection_service(db: AsyncSession = Depends(get_db)) -> CollectionService:
+    return CollectionService(db)
+
+def get_calendar_service(db: AsyncSession = Depends(get_db)) -> ReportCalendarService:
+    return ReportCalendarService(db)
+
 @router.get("/")
 async def get_schedules():
     """Get collection schedules - TODO: Implement"""
@@ -10,4 +29,72 @@ async def get_schedules():
 @router.post("/")
 async def create_schedule():
     """Create collection schedule - TODO: Implement"""
-    return {"message": "Create schedule - Coming soon"}
\ No newline at end of file
+    return {"message": "Create schedule - Coming soon"}
+
+@router.post("/collect", response_model=CollectionEnqueueResponse)
+async def enqueue_collection(
+    priority: int = Query(0, description="Higher priority jobs are claimed first"),
+    collection_service: CollectionService = Depends(get_collection_service)
+):
+    """Queue collection jobs for all selected companies"""
+    return await collection_service.enqueue_selected_companies(priority)
+
+@router.post("/collect/due", response_model=CollectionEnqueueResponse)
+async def enqueue_due_collection(
+    days_ahead: int = Query(3, ge=0, le=90, description="Include reports expected up to this many days ahead"),
+    days_overdue: int = Query(14, ge=0, le=365, description="Include reports up to this many days overdue"),
+    recheck_hours: int = Query(12, ge=1, description="Skip companies collected within this many hours"),
+    collection_service: CollectionService = Depends(get_collection_service)
+):
+    """Queue collection for selected companies inside a report filing window"""
+    return await collection_service.enqueue_due_companies(days_ahead, days_overdue, recheck_hours)
+
+@router.get("/calendar", response_model=ReportCalendarResponse)
+async def get_report_calendar(
+    from_date: date = Query(None, alias="from", description="Start of the expected filing date range (default today)"),
+    to_date: date = Query(None, alias="to", description="End of the expected filing date range (default from + 30 days)"),
+    form_type: str = Query(None, description="Filter by form type, e.g. 10-K or 10-Q"),
+    include_filed: bool = Query(False, description="Include reports that have already been filed"),
+    selected_only: bool = Query(True, description="Only selected companies"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum entries"),
+    calendar_service: ReportCalendarService = Depends(get_calendar_service)
+):
+    """Get financial reports expected in a date range, soonest first"""
+    return await calendar_service.get_calendar(
+        from_date, to_date, form_type, include_filed, selected_only, limit
+    )
+
+@router.post("/calendar/refresh", response_model=CalendarRefreshResponse)
+async def refresh_report_calendar(
+    calendar_service: ReportCalendarService = Depends(get_calendar_service)
+):
+    """Rebuild the report calendar for all selected companies from filing history"""
+    return await calendar_service.refresh_selected()
+
+@router.get("/jobs/stats", response_model=CollectionJobStats)
+async def get_job_stats(
+    collection_service: CollectionService = Depends(get_collection_service)
+):
+    """Get collection queue depth by status"""
+    return await collection_service.get_job_stats()
+
+@router.get("/workers", response_model=List[CollectionWorkerStats])
+async def get_workers(
+    collection_service: CollectionService = Depends(get_collection_service)
+):
+    """Get per-worker collection throughput"""
+    return await collection_service.get_worker_stats()
+
+@router.post("/frames", response_model=FrameIngestResult)
+async def ingest_frame(
+    concept: str = Query(..., description="XBRL concept, e.g. Revenues"),
+    period: str = Query(..., pattern="^CY[0-9]{4}(Q[1-4])?I?$", description="Calendar frame, e.g. CY2024Q1, CY2024 or CY2024Q4I"),
+    unit: str = Query("USD", description="Unit of measure, e.g. USD or USD-per-shares"),
+    taxonomy: str = Query("us-gaap", description="XBRL taxonomy"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Refresh one concept for every company from a single EDGAR frames document"""
+    async with EdgarClient() as edgar:
+        return await FramesIngestionService(db).ingest_frame(
+            edgar, FrameConcept(taxonomy, concept, unit), period
+        )
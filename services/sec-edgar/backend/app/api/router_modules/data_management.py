@@ -1,7 +1,26 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from datetime import date
+from uuid import UUID
+
+from app.infrastructure.database import get_db
+from app.services.data_management.cold_storage import ColdStorageService
+from app.services.data_management.filing_text import FilingTextService
+from app.services.data_management.screener_import import ScreenerImportService
+from app.shared.models.data_management import FactRangeResponse, ColdStorageSummary, ImportJobResponse, FilingSearchResponse
 
 router = APIRouter()
 
+def get_cold_storage_service(db: AsyncSession = Depends(get_db)) -> ColdStorageService:
+    return ColdStorageService(db)
+
+def get_import_service(db: AsyncSession = Depends(get_db)) -> ScreenerImportService:
+    return ScreenerImportService(db)
+
+def get_filing_text_service(db: AsyncSession = Depends(get_db)) -> FilingTextService:
+    return FilingTextService(db)
+
 @router.get("/exports")
 async def get_exports():
     """Get data exports - TODO: Implement"""
@@ -10,4 +29,117 @@ async def get_exports():
 @router.post("/exports")
 async def create_export():
     """Create data export - TODO: Implement"""
-    return {"message": "Create export - Coming soon"}
\ No newline at end of file
+    return {"message": "Create export - Coming soon"}
+
+@router.get("/facts", response_model=FactRangeResponse)
+async def get_company_facts(
+    company_id: str = Query(..., description="Company ID"),
+    start: date = Query(None, description="Earliest period end (inclusive)"),
+    end: date = Query(None, description="Latest period end (inclusive)"),
+    concept: List[str] = Query(None, description="Concepts to include (repeatable)"),
+    cold_storage_service: ColdStorageService = Depends(get_cold_storage_service)
+):
+    """Get a company's financial facts over a period range, across Postgres and cold storage"""
+    try:
+        company_uuid = UUID(company_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid company ID format")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return await cold_storage_service.get_facts(company_uuid, start, end, concept)
+
+@router.get("/cold-storage", response_model=ColdStorageSummary)
+async def get_cold_storage_summary(
+    cold_storage_service: ColdStorageService = Depends(get_cold_storage_service)
+):
+    """Get the months, rows and row groups held in cold storage"""
+    return cold_storage_service.summary()
+
+@router.get("/filings/search", response_model=FilingSearchResponse)
+async def search_filings(
+    q: str = Query(..., min_length=1, max_length=200, description='Search terms; supports "quoted phrases", OR and -exclusions'),
+    company_id: List[str] = Query(None, description="Company IDs to search (repeatable)"),
+    ticker: List[str] = Query(None, description="Ticker symbols to search (repeatable)"),
+    form: List[str] = Query(None, description="Filing types, e.g. 10-K (repeatable)"),
+    start: date = Query(None, description="Earliest filing date (inclusive)"),
+    end: date = Query(None, description="Latest filing date (inclusive)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum hits"),
+    offset: int = Query(0, ge=0, le=1000, description="Hits to skip"),
+    filing_text_service: FilingTextService = Depends(get_filing_text_service)
+):
+    """Full-text search over indexed filing sections, best matches first, with highlighted snippets"""
+    try:
+        company_uuids = [UUID(value) for value in company_id or []]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid company ID format")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return await filing_text_service.search(
+        q,
+        company_ids=company_uuids,
+        tickers=ticker,
+        forms=form,
+        start=start,
+        end=end,
+        limit=limit,
+        offset=offset
+    )
+
+# The body is read as a stream by the handler, so document the upload by hand
+UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+            "text/csv": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+@router.post("/imports", response_model=ImportJobResponse, status_code=202, openapi_extra=UPLOAD_BODY)
+async def create_import(
+    request: Request,
+    exchange: str = Query("NASDAQ", max_length=50, description="Exchange of the listed companies"),
+    as_of: date = Query(None, description="Date the listing describes (default: the export timestamp in the file name, else today)"),
+    delist_missing: bool = Query(False, description="The file is the full listing: close the history of companies on the exchange that are missing from it"),
+    filename: str = Query(None, max_length=255, description="File name, for text/csv bodies"),
+    import_service: ScreenerImportService = Depends(get_import_service)
+):
+    """Import a NASDAQ screener CSV while it uploads, in batches, as a background job"""
+    return await import_service.start_import(
+        request.stream(),
+        request.headers.get("content-type", ""),
+        exchange=exchange,
+        as_of=as_of,
+        delist_missing=delist_missing,
+        filename=filename
+    )
+
+@router.get("/imports", response_model=List[ImportJobResponse])
+async def get_imports(
+    limit: int = Query(20, ge=1, le=100, description="Maximum jobs"),
+    import_service: ScreenerImportService = Depends(get_import_service)
+):
+    """Get recent import jobs, newest first"""
+    return await import_service.get_recent_jobs(limit)
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: str,
+    import_service: ScreenerImportService = Depends(get_import_service)
+):
+    """Get an import job's progress"""
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    job = await import_service.get_job(job_uuid)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
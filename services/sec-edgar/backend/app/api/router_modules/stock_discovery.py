@@ -1,27 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date
+from uuid import UUID
+import json
 
+from app.api.tracing import TracedRoute
 from app.infrastructure.database import get_db
+from app.services.stock_discovery.change_feed import change_feed_hub
 from app.services.stock_discovery.company_service import CompanyService
 from app.shared.models.stock_discovery import (
-    CompanyCreate, CompanyUpdate, CompanyResponse, CompanyListResponse,
-    CompanySelectionRequest, CompanySelectionResponse, CompanySearchParams
+    CompanyCreate, CompanyUpdate, CompanyResponse, CompanyDetailResponse, CompanyListResponse,
+    CompanySelectionRequest, CompanySelectionResponse, CompanySearchParams, CompanySort,
+    ScreenParams, ScreenGroupBy, ScreenResponse,
+    CompanyBatchRequest, CompanyBatchItem, CompanyBatchResponse
 )
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+
+# Batches larger than this are streamed instead of encoded in one piece
+BATCH_STREAM_THRESHOLD = 500
+BATCH_STREAM_CHUNK = 200
+
+FIELDS_DESCRIPTION = "Comma separated company fields to return, e.g. ticker_symbol,company_name (default: all)"
 
 def get_company_service(db: AsyncSession = Depends(get_db)) -> CompanyService:
     return CompanyService(db)
 
+def encode_value(value):
+    """JSON encoding for the column types a sparse fieldset can contain"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+def sparse_response(payload) -> Response:
+    """Encode a sparse fieldset payload directly from row dicts, skipping response models"""
+    return Response(json.dumps(payload, default=encode_value, separators=(",", ":")), media_type="application/json")
+
 @router.get("/", response_model=CompanyListResponse)
 async def get_companies(
     query: str = Query(None, description="Search query for ticker or company name"),
     exchange: str = Query(None, description="Filter by exchange"),
     sector: str = Query(None, description="Filter by sector"),
     is_selected: bool = Query(None, description="Filter by selection status"),
+    min_market_cap: float = Query(None, ge=0, description="Minimum market cap (inclusive)"),
+    max_market_cap: float = Query(None, ge=0, description="Maximum market cap (inclusive)"),
+    sort: CompanySort = Query(CompanySort.TICKER, description="Sort order: ticker, name or market_cap_desc"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(50, ge=1, le=100, description="Page size"),
+    as_of: date = Query(None, description="Resolve the universe as it was on this date (YYYY-MM-DD), including since-delisted companies"),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
     company_service: CompanyService = Depends(get_company_service)
 ):
     """Get list of companies with filtering and pagination"""
@@ -30,26 +61,59 @@ async def get_companies(
         exchange=exchange,
         sector=sector,
         is_selected=is_selected,
+        min_market_cap=min_market_cap,
+        max_market_cap=max_market_cap,
+        sort=sort,
         page=page,
-        size=size
+        size=size,
+        as_of=as_of,
+        fields=fields
     )
-    return await company_service.get_companies(params)
+    result = await company_service.get_companies(params)
+    return sparse_response(result) if fields is not None else result
 
 @router.get("/search", response_model=List[CompanyResponse])
 async def search_companies(
     q: str = Query(..., min_length=1, max_length=50, description="Search query"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
     company_service: CompanyService = Depends(get_company_service)
 ):
     """Search companies by ticker symbol or company name"""
-    return await company_service.search_companies(q, limit)
+    result = await company_service.search_companies(q, limit, fields)
+    return sparse_response(result) if fields is not None else result
 
 @router.get("/selected", response_model=List[CompanyResponse])
 async def get_selected_companies(
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
     company_service: CompanyService = Depends(get_company_service)
 ):
     """Get all companies selected for data collection"""
-    return await company_service.get_selected_companies()
+    result = await company_service.get_selected_companies(fields)
+    return sparse_response(result) if fields is not None else result
+
+@router.get("/screen", response_model=ScreenResponse)
+async def screen_companies(
+    exchange: List[str] = Query(None, description="Exchanges to include (repeatable)"),
+    sector: List[str] = Query(None, description="Sectors to include (repeatable)"),
+    min_market_cap: float = Query(None, ge=0, description="Minimum market cap (inclusive)"),
+    max_market_cap: float = Query(None, ge=0, description="Maximum market cap (inclusive)"),
+    is_selected: bool = Query(None, description="Filter by selection status"),
+    limit: int = Query(50, ge=0, le=1000, description="Number of largest companies to return"),
+    group_by: ScreenGroupBy = Query(None, description="Aggregate matches by sector or exchange"),
+    company_service: CompanyService = Depends(get_company_service)
+):
+    """Screen companies in memory by market cap bands, sectors, exchanges and selection"""
+    params = ScreenParams(
+        exchanges=exchange,
+        sectors=sector,
+        min_market_cap=min_market_cap,
+        max_market_cap=max_market_cap,
+        is_selected=is_selected,
+        limit=limit,
+        group_by=group_by
+    )
+    return await company_service.screen_companies(params)
 
 @router.get("/filters")
 async def get_available_filters(
@@ -58,16 +122,55 @@ async def get_available_filters(
     """Get available filter options (exchanges, sectors)"""
     return await company_service.get_available_filters()
 
-@router.get("/{company_id}", response_model=CompanyResponse)
+@router.get("/changes")
+async def stream_changes(
+    since: Optional[int] = Query(None, ge=0, description="Replay events after this sequence number"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Stream company changes as Server-Sent Events, resuming after Last-Event-ID or `since`"""
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        change_feed_hub.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def stream_batch_response(items: List[CompanyBatchItem]):
+    """Encode a batch response as JSON in chunks"""
+    found = sum(1 for item in items if item.found)
+    yield b'{"results":['
+    for start in range(0, len(items), BATCH_STREAM_CHUNK):
+        chunk = items[start:start + BATCH_STREAM_CHUNK]
+        prefix = b"," if start else b""
+        yield prefix + b",".join(item.model_dump_json().encode() for item in chunk)
+    yield f'],"found":{found},"missing":{len(items) - found}}}'.encode()
+
+@router.post("/batch", response_model=CompanyBatchResponse)
+async def get_companies_batch(
+    batch: CompanyBatchRequest,
+    company_service: CompanyService = Depends(get_company_service)
+):
+    """Resolve up to 5000 companies by ID or ticker in one query, in input order with explicit misses"""
+    items = await company_service.get_companies_batch(batch)
+
+    if len(items) > BATCH_STREAM_THRESHOLD:
+        return StreamingResponse(stream_batch_response(items), media_type="application/json")
+
+    found = sum(1 for item in items if item.found)
+    return CompanyBatchResponse(results=items, found=found, missing=len(items) - found)
+
+@router.get("/{company_id}", response_model=CompanyDetailResponse)
 async def get_company(
     company_id: str,
+    metrics_periods: int = Query(8, ge=0, le=40, description="Latest derived quarterly metric rows to include"),
     company_service: CompanyService = Depends(get_company_service)
 ):
     """Get company by ID"""
     try:
         from uuid import UUID
         company_uuid = UUID(company_id)
-        return await company_service.get_company(company_uuid)
+        return await company_service.get_company(company_uuid, metrics_periods)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid company ID format")
 
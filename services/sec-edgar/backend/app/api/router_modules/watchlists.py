@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from uuid import UUID
+
+from app.api.tracing import TracedRoute
+from app.infrastructure.database import get_db
+from app.services.stock_discovery.watchlist_service import WatchlistService
+from app.shared.models.stock_discovery import (
+    WatchlistCreate, WatchlistMembersRequest, WatchlistResponse,
+    WatchlistCompaniesParams, WatchlistCompaniesResponse
+)
+
+router = APIRouter(route_class=TracedRoute)
+
+def get_watchlist_service(request: Request, db: AsyncSession = Depends(get_db)) -> WatchlistService:
+    # Watchlists belong to the API key's client
+    return WatchlistService(db, owner=request.state.api_key)
+
+@router.get("/", response_model=List[WatchlistResponse])
+async def get_watchlists(
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """Get the calling client's watchlists"""
+    return await watchlist_service.get_watchlists()
+
+@router.post("/", response_model=WatchlistResponse)
+async def create_watchlist(
+    data: WatchlistCreate,
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """Create a watchlist, optionally with initial companies"""
+    return await watchlist_service.create_watchlist(data)
+
+@router.get("/{watchlist_id}/companies", response_model=WatchlistCompaniesResponse)
+async def get_watchlist_companies(
+    watchlist_id: UUID,
+    exchange: List[str] = Query(None, description="Exchanges to include (repeatable)"),
+    sector: List[str] = Query(None, description="Sectors to include (repeatable)"),
+    min_market_cap: float = Query(None, ge=0, description="Minimum market cap (inclusive)"),
+    max_market_cap: float = Query(None, ge=0, description="Maximum market cap (inclusive)"),
+    intersect: List[UUID] = Query(None, description="Only companies also on these watchlists (repeatable)"),
+    exclude: List[UUID] = Query(None, description="Leave out companies on these watchlists (repeatable)"),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """List a watchlist's companies in ticker order, filtered with bitmap operations, with counts per exchange and sector"""
+    params = WatchlistCompaniesParams(
+        exchanges=exchange,
+        sectors=sector,
+        min_market_cap=min_market_cap,
+        max_market_cap=max_market_cap,
+        intersect=intersect,
+        exclude=exclude,
+        page=page,
+        size=size
+    )
+    return await watchlist_service.get_watchlist_companies(watchlist_id, params)
+
+@router.patch("/{watchlist_id}", response_model=WatchlistResponse)
+async def update_watchlist_members(
+    watchlist_id: UUID,
+    request: WatchlistMembersRequest,
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """Add and remove companies"""
+    return await watchlist_service.update_members(watchlist_id, request)
+
+@router.delete("/{watchlist_id}")
+async def delete_watchlist(
+    watchlist_id: UUID,
+    watchlist_service: WatchlistService = Depends(get_watchlist_service)
+):
+    """Delete a watchlist"""
+    await watchlist_service.delete_watchlist(watchlist_id)
+    return {"deleted": str(watchlist_id)}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .router_modules import stock_discovery, data_collection, data_management
+from .router_modules import stock_discovery, watchlists, data_collection, data_management
 
 api_router = APIRouter()
 
@@ -10,6 +10,12 @@ api_router.include_router(
     tags=["Stock Discovery"]
 )
 
+api_router.include_router(
+    watchlists.router,
+    prefix="/watchlists",
+    tags=["Stock Discovery"]
+)
+
 api_router.include_router(
     data_collection.router,
     prefix="/schedules",
@@ -0,0 +1,56 @@
+import asyncio
+import functools
+
+from fastapi.routing import APIRoute
+
+from app.infrastructure.tracing import current_trace, span
+
+
+def traced_endpoint(endpoint):
+    """Record an async endpoint as a `router` span and note when it returned"""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        trace = current_trace()
+        if trace is None:
+            return await endpoint(*args, **kwargs)
+        with span(f"router.{endpoint.__name__}", "router"):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                trace.endpoint_returned_ns = trace.now_ns()
+    wrapper.traced = True
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """
+    Route that splits a sampled request into its FastAPI phases
+
+    The `route` span covers the whole handler: parameter parsing and
+    dependencies (get_db and the service), the endpoint (`router`), then
+    response validation and JSON encoding (`encode`, from the endpoint's
+    return to the finished response).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router copies routes with their (already wrapped) endpoints
+        if asyncio.iscoroutinefunction(endpoint) and not getattr(endpoint, "traced", False):
+            endpoint = traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            trace = current_trace()
+            if trace is None:
+                return await handler(request)
+            trace.endpoint_returned_ns = None
+            with span(f"route {self.path}", "route") as route_span:
+                response = await handler(request)
+                if route_span is not None and trace.endpoint_returned_ns:
+                    encoded = trace.start_span("encode", "encode", route_span, start_ns=trace.endpoint_returned_ns)
+                    if encoded is not None:
+                        encoded.end_ns = trace.now_ns()
+                return response
+        return traced_handler
@@ -0,0 +1,194 @@
+from sqlalchemy import Column, String, Boolean, DateTime, Date, Float, Integer, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.infrastructure.database import Base
+import uuid
+
+# Collection job lifecycle
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+class CollectionJob(Base):
+    __tablename__ = "dc_collection_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default=JOB_PENDING, server_default=JOB_PENDING)
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    lease_owner = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+    scheduled_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+    last_error = Column(String(500))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # At most one open job per company, so re-enqueueing is idempotent
+        Index(
+            "uq_dc_collection_jobs_open_company",
+            "company_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'leased')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<CollectionJob(company_id={self.company_id}, status={self.status})>"
+
+# Claims scan only open jobs, highest priority and longest-due first
+Index(
+    "ix_dc_collection_jobs_claimable",
+    CollectionJob.priority.desc(),
+    CollectionJob.scheduled_at,
+    postgresql_where=text("status IN ('pending', 'leased')"),
+)
+
+class CollectionWorker(Base):
+    __tablename__ = "dc_collection_workers"
+
+    worker_id = Column(String(100), primary_key=True)
+    hostname = Column(String(255))
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), server_default=func.now())
+    jobs_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    jobs_failed = Column(Integer, nullable=False, default=0, server_default="0")
+    requests_made = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<CollectionWorker(worker_id={self.worker_id}, completed={self.jobs_completed})>"
+
+class SECData(Base):
+    __tablename__ = "dc_sec_data"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    accession_number = Column(String(25), nullable=False, unique=True)
+    filing_type = Column(String(20), nullable=False)
+    filing_date = Column(Date, nullable=False)
+    report_date = Column(Date)
+    primary_document = Column(String(255))
+    collected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_dc_sec_data_company_filing_date", "company_id", "filing_date"),
+    )
+
+    def __repr__(self):
+        return f"<SECData(company_id={self.company_id}, form={self.filing_type}, filed={self.filing_date})>"
+
+class CompanyFilingStatus(Base):
+    __tablename__ = "dc_company_filing_status"
+
+    company_id = Column(UUID(as_uuid=True), primary_key=True)
+    cik = Column(String(10), nullable=False)
+    last_form = Column(String(20))
+    last_filing_date = Column(Date)
+    last_accession_number = Column(String(25))
+    last_annual_filing_date = Column(Date)
+    next_expected_form = Column(String(20))
+    next_expected_date = Column(Date)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_dc_company_filing_status_next_expected", "next_expected_date"),
+    )
+
+    def __repr__(self):
+        return f"<CompanyFilingStatus(company_id={self.company_id}, next={self.next_expected_form} {self.next_expected_date})>"
+
+class FeedCursor(Base):
+    __tablename__ = "dc_feed_cursors"
+
+    feed = Column(String(50), primary_key=True)
+    last_processed_date = Column(Date, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<FeedCursor(feed={self.feed}, last={self.last_processed_date})>"
+
+class FinancialFact(Base):
+    __tablename__ = "dc_financial_facts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    cik = Column(String(10), nullable=False)
+    taxonomy = Column(String(20), nullable=False)
+    concept = Column(String(255), nullable=False)
+    unit = Column(String(50), nullable=False)
+    # Calendar frame such as CY2024, CY2024Q1 or CY2024Q1I (instant)
+    period = Column(String(12), nullable=False)
+    period_start = Column(Date)
+    period_end = Column(Date, nullable=False)
+    value = Column(Float, nullable=False)
+    accession_number = Column(String(25))
+    source = Column(String(20), nullable=False, default="frames", server_default="frames")
+    collected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("company_id", "taxonomy", "concept", "unit", "period", name="uq_dc_financial_facts_frame"),
+        # Cross-sectional reads: one concept / period across all companies
+        Index("ix_dc_financial_facts_concept_period", "concept", "unit", "period"),
+        # Tiering scans: every fact of a period_end month
+        Index("ix_dc_financial_facts_period_end", "period_end"),
+    )
+
+    def __repr__(self):
+        return f"<FinancialFact(company_id={self.company_id}, {self.concept} {self.period}={self.value})>"
+
+class ReportCalendarEntry(Base):
+    __tablename__ = "dc_report_calendar"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    form_type = Column(String(20), nullable=False)
+    period_end = Column(Date, nullable=False)
+    expected_filing_date = Column(Date, nullable=False)
+    actual_filing_date = Column(Date)
+    accession_number = Column(String(25))
+    is_filed = Column(Boolean, nullable=False, default=False, server_default="false")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("company_id", "form_type", "period_end", name="uq_dc_report_calendar_period"),
+        # "Due soon" range scans only touch reports that have not been filed yet
+        Index(
+            "ix_dc_report_calendar_upcoming",
+            "expected_filing_date",
+            postgresql_where=text("NOT is_filed"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ReportCalendarEntry(company_id={self.company_id}, {self.form_type} {self.period_end} due {self.expected_filing_date})>"
+
+class DerivedMetrics(Base):
+    __tablename__ = "dc_derived_metrics"
+
+    # One row per company per calendar quarter (CY2024Q1), derived from dc_financial_facts
+    company_id = Column(UUID(as_uuid=True), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    period_end = Column(Date, nullable=False)
+    revenue = Column(Float)
+    revenue_ttm = Column(Float)
+    revenue_yoy = Column(Float)
+    gross_profit = Column(Float)
+    gross_margin = Column(Float)
+    operating_income = Column(Float)
+    operating_margin = Column(Float)
+    net_income = Column(Float)
+    net_income_ttm = Column(Float)
+    net_income_yoy = Column(Float)
+    net_margin = Column(Float)
+    eps_diluted = Column(Float)
+    eps_diluted_ttm = Column(Float)
+    assets = Column(Float)
+    stockholders_equity = Column(Float)
+    return_on_equity_ttm = Column(Float)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DerivedMetrics(company_id={self.company_id}, period={self.period})>"
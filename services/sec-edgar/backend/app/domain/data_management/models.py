@@ -0,0 +1,91 @@
+from sqlalchemy import Column, String, Date, DateTime, Integer, BigInteger, Text, Computed, Index, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.sql import func
+from app.infrastructure.database import Base
+import uuid
+
+# Import job lifecycle
+IMPORT_RECEIVING = "receiving"
+IMPORT_PROCESSING = "processing"
+IMPORT_COMPLETED = "completed"
+IMPORT_FAILED = "failed"
+
+class ImportJob(Base):
+    __tablename__ = "dm_import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    filename = Column(String(255))
+    status = Column(String(20), nullable=False, default=IMPORT_RECEIVING, server_default=IMPORT_RECEIVING)
+    exchange = Column(String(50), nullable=False)
+    as_of = Column(Date, nullable=False)
+    # Counters are written by the import's writer once per committed batch
+    bytes_received = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rows_parsed = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_skipped = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_written = Column(Integer, nullable=False, default=0, server_default="0")
+    companies_created = Column(Integer, nullable=False, default=0, server_default="0")
+    companies_updated = Column(Integer, nullable=False, default=0, server_default="0")
+    companies_delisted = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    finished_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, status={self.status}, rows_written={self.rows_written})>"
+
+
+# Text search configuration used for the filing section index and queries
+FILING_TS_CONFIG = "english"
+
+class FilingDocument(Base):
+    __tablename__ = "dm_filing_documents"
+
+    # One row per filing whose primary document has been extracted into dm_filing_sections
+    accession_number = Column(String(25), primary_key=True)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    filing_type = Column(String(20), nullable=False)
+    filing_date = Column(Date, nullable=False)
+    document = Column(String(255), nullable=False)
+    sections = Column(Integer, nullable=False, default=0, server_default="0")
+    characters = Column(BigInteger, nullable=False, default=0, server_default="0")
+    bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_dm_filing_documents_company_filing_date", "company_id", "filing_date"),
+    )
+
+    def __repr__(self):
+        return f"<FilingDocument(accession_number={self.accession_number}, sections={self.sections})>"
+
+class FilingSection(Base):
+    __tablename__ = "dm_filing_sections"
+
+    # Range-partitioned by filing_date, one partition per year (dm_filing_sections_YYYY),
+    # created on demand by FilingTextRepository.ensure_partitions
+    filing_date = Column(Date, nullable=False)
+    accession_number = Column(String(25), nullable=False)
+    section_no = Column(Integer, nullable=False)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    filing_type = Column(String(20), nullable=False)
+    heading = Column(String(255))
+    content = Column(Text, nullable=False)
+    # Headings weigh more than body text in ranking
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{FILING_TS_CONFIG}', coalesce(heading, '')), 'A') || "
+            f"setweight(to_tsvector('{FILING_TS_CONFIG}', content), 'B')",
+            persisted=True
+        )
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("filing_date", "accession_number", "section_no"),
+        Index("ix_dm_filing_sections_search", "search_vector", postgresql_using="gin"),
+        Index("ix_dm_filing_sections_company_filing_date", "company_id", "filing_date"),
+        {"postgresql_partition_by": "RANGE (filing_date)"},
+    )
+
+    def __repr__(self):
+        return f"<FilingSection(accession_number={self.accession_number}, section_no={self.section_no})>"
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Float, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column, String, Boolean, Date, DateTime, Float, Integer, BigInteger, LargeBinary, Index, Sequence, UniqueConstraint,
+    DDL, event, literal_column
+)
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ExcludeConstraint
 from sqlalchemy.sql import func
 from datetime import datetime
 from app.infrastructure.database import Base
 import uuid
 
+# Dense integer per company, the bit position of the company in watchlist and facet bitmaps
+COMPANY_ORDINALS = Sequence("sd_company_ordinal_seq", metadata=Base.metadata)
+
 class Company(Base):
     __tablename__ = "sd_companies"
 
@@ -14,14 +20,117 @@ class Company(Base):
     exchange = Column(String(50), nullable=False)
     sector = Column(String(100))
     market_cap = Column(Float)
+    cik = Column(String(10), index=True)
     is_selected = Column(Boolean, default=False, nullable=False, index=True)
     selection_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Only NULL inside an upsert, which assigns ordinals to the rows it actually inserted
+    ordinal = Column(Integer, server_default=COMPANY_ORDINALS.next_value(), unique=True, index=True)
 
     def __repr__(self):
         return f"<Company(ticker={self.ticker_symbol}, name={self.company_name})>"
 
+# Composite indexes matching the list sort orders, so screens such as
+# "largest Healthcare names" are index scans rather than sort-on-scan.
+# Every index ends in ticker_symbol to keep the ordering total (keyset-compatible).
+Index(
+    "ix_sd_companies_market_cap",
+    Company.market_cap.desc().nulls_last(),
+    Company.ticker_symbol,
+)
+Index(
+    "ix_sd_companies_sector_market_cap",
+    Company.sector,
+    Company.market_cap.desc().nulls_last(),
+    Company.ticker_symbol,
+)
+Index(
+    "ix_sd_companies_exchange_market_cap",
+    Company.exchange,
+    Company.market_cap.desc().nulls_last(),
+    Company.ticker_symbol,
+)
+Index(
+    "ix_sd_companies_company_name",
+    Company.company_name,
+    Company.ticker_symbol,
+)
+# Covers typeahead-style `fields=` listings (ticker, name, exchange in ticker order)
+# so they can be answered with an index-only scan
+Index(
+    "ix_sd_companies_ticker_cover",
+    Company.ticker_symbol,
+    postgresql_include=["company_name", "exchange"],
+)
+# Last change per row, so in-process caches catch up from a watermark with a range scan
+Index(
+    "ix_sd_companies_changed_at",
+    func.coalesce(Company.updated_at, Company.created_at),
+)
+
+class CompanyHistory(Base):
+    __tablename__ = "sd_company_history"
+
+    # One row per version of a company's attributes, valid over [valid_from, valid_to);
+    # the current version has valid_to NULL. recorded_at is when the version was written.
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    ticker_symbol = Column(String(10), nullable=False)
+    company_name = Column(String(255), nullable=False)
+    exchange = Column(String(50), nullable=False)
+    sector = Column(String(100))
+    market_cap = Column(Float)
+    cik = Column(String(10))
+    valid_from = Column(Date, nullable=False)
+    valid_to = Column(Date)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @classmethod
+    def validity(cls):
+        """daterange(valid_from, valid_to), unbounded above for the current version"""
+        return func.daterange(cls.valid_from, cls.valid_to, literal_column("'[)'"))
+
+    def __repr__(self):
+        return f"<CompanyHistory(ticker={self.ticker_symbol}, valid {self.valid_from} - {self.valid_to})>"
+
+# As-of lookups (`validity @> date`) scan this GiST index; the exclusion
+# constraint keeps a company's versions from overlapping (needs btree_gist).
+Index(
+    "ix_sd_company_history_validity",
+    CompanyHistory.validity(),
+    postgresql_using="gist",
+)
+# Sorted as-of listings walk the same orders as the sd_companies indexes and
+# check validity per row, so a page costs about (versions per company) x page size
+Index(
+    "ix_sd_company_history_ticker",
+    CompanyHistory.ticker_symbol,
+    CompanyHistory.company_id,
+)
+Index(
+    "ix_sd_company_history_market_cap",
+    CompanyHistory.market_cap.desc().nulls_last(),
+    CompanyHistory.ticker_symbol,
+    CompanyHistory.company_id,
+)
+Index(
+    "ix_sd_company_history_sector_market_cap",
+    CompanyHistory.sector,
+    CompanyHistory.market_cap.desc().nulls_last(),
+    CompanyHistory.ticker_symbol,
+    CompanyHistory.company_id,
+)
+event.listen(CompanyHistory.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+CompanyHistory.__table__.append_constraint(
+    ExcludeConstraint(
+        (CompanyHistory.company_id, "="),
+        (CompanyHistory.validity(), "&&"),
+        name="ex_sd_company_history_overlap",
+        using="gist",
+    )
+)
+
 class CompanySelection(Base):
     __tablename__ = "sd_company_selections"
 
@@ -32,4 +141,43 @@ class CompanySelection(Base):
     notes = Column(String(500))
 
     def __repr__(self):
-        return f"<CompanySelection(company_id={self.company_id}, selected={self.selected_flag})>"
\ No newline at end of file
+        return f"<CompanySelection(company_id={self.company_id}, selected={self.selected_flag})>"
+
+# Change feed event types
+CHANGE_CREATED = "created"
+CHANGE_UPDATED = "updated"
+CHANGE_SELECTED = "selected"
+CHANGE_DESELECTED = "deselected"
+
+class ChangeEvent(Base):
+    __tablename__ = "sd_change_events"
+
+    # Monotonic sequence: the SSE event id clients resume from
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    event_type = Column(String(20), nullable=False)
+    # Only the fields that changed, keeping events compact
+    changes = Column(JSONB, nullable=False, default=dict)
+    source = Column(String(20), nullable=False, default="api")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<ChangeEvent(seq={self.seq}, company_id={self.company_id}, type={self.event_type})>"
+
+class Watchlist(Base):
+    __tablename__ = "sd_watchlists"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # API key name of the client the list belongs to
+    owner = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False)
+    # Company ordinals as a Roaring bitmap in the portable serialization format
+    members = Column(LargeBinary, nullable=False)
+    member_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (UniqueConstraint("owner", "name", name="uq_sd_watchlists_owner_name"),)
+
+    def __repr__(self):
+        return f"<Watchlist(owner={self.owner}, name={self.name}, members={self.member_count})>"
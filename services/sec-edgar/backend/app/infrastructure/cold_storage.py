@@ -0,0 +1,277 @@
+"""
+Cold storage tier: per-month Parquet files with a row-group manifest
+
+Layout under COLD_STORAGE_PATH:
+
+    <dataset>/YYYY-MM.parquet   rows of one month, sorted by (entity, time)
+    <dataset>/manifest.json     every file with per-row-group min/max of the
+                                entity and time columns
+
+Sorting by entity before writing gives each row group a narrow entity
+range, so the manifest alone tells a reader which row groups can hold a
+company / time range; nothing else is opened. Files and the manifest are
+written to a temporary path, fsynced and atomically renamed into place.
+Readers open files memory-mapped and keep them open until they change on
+disk, so repeated reads of the same months come from the page cache.
+"""
+
+import bisect
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+COLD_STORAGE_PATH = os.getenv(
+    "COLD_STORAGE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "cold")
+)
+ROW_GROUP_SIZE = int(os.getenv("COLD_STORAGE_ROW_GROUP_SIZE", "2048"))
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass(frozen=True)
+class ColdDataset:
+    """A table tiered to cold storage"""
+    name: str
+    schema: pa.Schema
+    # Row groups are pruned on these two columns
+    entity_column: str
+    time_column: str
+    # Rows with equal keys are the same record; newer writes replace archived ones
+    key_columns: Tuple[str, ...]
+
+
+FINANCIAL_FACTS = ColdDataset(
+    name="financial_facts",
+    schema=pa.schema([
+        ("company_id", pa.string()),
+        ("cik", pa.string()),
+        ("taxonomy", pa.string()),
+        ("concept", pa.string()),
+        ("unit", pa.string()),
+        ("period", pa.string()),
+        ("period_start", pa.date32()),
+        ("period_end", pa.date32()),
+        ("value", pa.float64()),
+        ("accession_number", pa.string()),
+        ("source", pa.string()),
+        ("collected_at", pa.timestamp("us", tz="UTC")),
+    ]),
+    entity_column="company_id",
+    time_column="period_end",
+    key_columns=("company_id", "taxonomy", "concept", "unit", "period"),
+)
+
+
+def month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def month_range(key: str) -> Tuple[date, date]:
+    """First day of a month and first day of the next"""
+    year, month = int(key[:4]), int(key[5:7])
+    following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1), following
+
+
+def _stat(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _fsync_replace(tmp_path: str, path: str):
+    with open(tmp_path, "rb") as file:
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class ColdStore:
+    """Writer and memory-mapped, row-group-pruning reader for one dataset"""
+
+    def __init__(self, dataset: ColdDataset, root: str = COLD_STORAGE_PATH, row_group_size: int = ROW_GROUP_SIZE):
+        self.dataset = dataset
+        self.directory = os.path.join(root, dataset.name)
+        self.row_group_size = row_group_size
+        self._manifest: Optional[dict] = None
+        self._manifest_mtime: Optional[int] = None
+        # path -> (mtime, open ParquetFile)
+        self._files: Dict[str, Tuple[int, pq.ParquetFile]] = {}
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def manifest(self) -> dict:
+        """Current manifest, reloaded when another process rewrote it"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "dataset": self.dataset.name, "files": {}}
+        if self._manifest is None or mtime != self._manifest_mtime:
+            with open(self.manifest_path, "r") as file:
+                self._manifest = json.load(file)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _save_manifest(self, manifest: dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file, indent=1, sort_keys=True)
+        _fsync_replace(tmp_path, self.manifest_path)
+        self._manifest = None
+
+    def months(self) -> List[str]:
+        return sorted(self.manifest()["files"])
+
+    def _open(self, name: str) -> pq.ParquetFile:
+        path = os.path.join(self.directory, name)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._files.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, pq.ParquetFile(path, memory_map=True))
+            self._files[path] = cached
+        return cached[1]
+
+    def write_month(self, month: str, rows: pa.Table) -> dict:
+        """Merge rows into a month's file and return its manifest entry
+
+        Rows already archived for the month are kept unless `rows` has a
+        row with the same key, in which case the new row wins.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        table = rows.select(self.dataset.schema.names).cast(self.dataset.schema)
+        if month in self.manifest()["files"]:
+            table = pa.concat_tables([table, self.read_month(month)])
+            table = self._dedupe(table)
+        table = table.sort_by([(self.dataset.entity_column, "ascending"), (self.dataset.time_column, "ascending")])
+
+        name = f"{month}.parquet"
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, row_group_size=self.row_group_size, compression="zstd")
+        _fsync_replace(tmp_path, path)
+
+        entry = {"file": name, "rows": table.num_rows, "row_groups": self._row_group_stats(path)}
+        manifest = self.manifest()
+        manifest = {**manifest, "files": {**manifest["files"], month: entry}}
+        self._save_manifest(manifest)
+        return entry
+
+    def _dedupe(self, table: pa.Table) -> pa.Table:
+        """Keep the first row per key (new rows are concatenated first)"""
+        indexed = table.append_column("__row", pa.array(range(table.num_rows), pa.int64()))
+        first = indexed.group_by(list(self.dataset.key_columns)).aggregate([("__row", "min")])
+        return table.take(first["__row_min"])
+
+    def _row_group_stats(self, path: str) -> List[dict]:
+        metadata = pq.ParquetFile(path).metadata
+        names = self.dataset.schema.names
+        entity_index = names.index(self.dataset.entity_column)
+        time_index = names.index(self.dataset.time_column)
+        groups = []
+        for index in range(metadata.num_row_groups):
+            group = metadata.row_group(index)
+            entity = group.column(entity_index).statistics
+            time = group.column(time_index).statistics
+            groups.append({
+                "rows": group.num_rows,
+                "entity_min": _stat(entity.min), "entity_max": _stat(entity.max),
+                "time_min": _stat(time.min), "time_max": _stat(time.max),
+            })
+        return groups
+
+    def read_month(self, month: str) -> pa.Table:
+        entry = self.manifest()["files"][month]
+        return self._open(entry["file"]).read()
+
+    def plan(
+        self,
+        entity_ids: Optional[Sequence[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict[str, List[int]]:
+        """Row groups (per month) whose statistics overlap the entity set and [start, end]"""
+        entities = sorted(entity_ids) if entity_ids is not None else None
+        start_stat = _stat(start)
+        end_stat = _stat(end)
+        selected = {}
+        for month, entry in self.manifest()["files"].items():
+            first, following = month_range(month)
+            if (start is not None and following <= start) or (end is not None and first > end):
+                continue
+            groups = []
+            for index, group in enumerate(entry["row_groups"]):
+                if start_stat is not None and group["time_max"] < start_stat:
+                    continue
+                if end_stat is not None and group["time_min"] > end_stat:
+                    continue
+                if entities is not None:
+                    position = bisect.bisect_left(entities, group["entity_min"])
+                    if position == len(entities) or entities[position] > group["entity_max"]:
+                        continue
+                groups.append(index)
+            if groups:
+                selected[month] = groups
+        return selected
+
+    def read(
+        self,
+        entity_ids: Optional[Iterable[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        filters: Optional[Dict[str, Iterable]] = None,
+        columns: Optional[List[str]] = None
+    ) -> pa.Table:
+        """Rows for entities within [start, end] (inclusive), reading only overlapping row groups"""
+        entity_ids = list(entity_ids) if entity_ids is not None else None
+        columns = columns or self.dataset.schema.names
+        # Columns needed for the exact filter after row-group pruning
+        needed = list(dict.fromkeys(
+            columns + [self.dataset.entity_column, self.dataset.time_column] + list(filters or {})
+        ))
+
+        tables = []
+        for month, groups in sorted(self.plan(entity_ids, start, end).items()):
+            entry = self.manifest()["files"][month]
+            tables.append(self._open(entry["file"]).read_row_groups(groups, columns=needed))
+        if not tables:
+            return self.dataset.schema.empty_table().select(columns)
+
+        table = pa.concat_tables(tables)
+        mask = None
+        conditions = []
+        if entity_ids is not None:
+            conditions.append(pc.is_in(table[self.dataset.entity_column], value_set=pa.array(entity_ids, pa.string())))
+        if start is not None:
+            conditions.append(pc.greater_equal(table[self.dataset.time_column], pa.scalar(start, pa.date32())))
+        if end is not None:
+            conditions.append(pc.less_equal(table[self.dataset.time_column], pa.scalar(end, pa.date32())))
+        for column, values in (filters or {}).items():
+            conditions.append(pc.is_in(table[column], value_set=pa.array(list(values), table.schema.field(column).type)))
+        for condition in conditions:
+            mask = condition if mask is None else pc.and_(mask, condition)
+        if mask is not None:
+            table = table.filter(mask)
+        return table.select(columns)
+
+    def summary(self) -> dict:
+        """Files, rows and row groups held in cold storage"""
+        files = self.manifest()["files"]
+        return {
+            "dataset": self.dataset.name,
+            "months": sorted(files),
+            "rows": sum(entry["rows"] for entry in files.values()),
+            "row_groups": sum(len(entry["row_groups"]) for entry in files.values()),
+            "bytes": sum(
+                os.path.getsize(os.path.join(self.directory, entry["file"]))
+                for entry in files.values()
+                if os.path.exists(os.path.join(self.directory, entry["file"]))
+            ),
+        }
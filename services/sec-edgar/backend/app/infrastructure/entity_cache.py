@@ -0,0 +1,239 @@
+"""
+Read-through cache of companies looked up by ID or ticker
+
+CompanyRepository.get_by_id / get_by_ticker run on every company write path
+(existence pre-checks) and behind the detail view, for rows that rarely
+change. The cache keeps the committed column values of each company looked
+up, in an LRU of ENTITY_CACHE_MAX_ENTRIES keys valid for
+ENTITY_CACHE_TTL_SECONDS. Lookups that found nothing are remembered too, for
+ENTITY_CACHE_NEGATIVE_TTL_SECONDS. A hit is merged into the caller's session
+without a query, so callers get the same persistent Company a SELECT would
+have returned, and concurrent misses for one key share a single query.
+
+Entries are dropped when CompanyRepository commits a create, update or
+selection in this process, and in every other process when the change event
+arrives through the change feed (LISTEN on sd_company_changes). The cache is
+only consulted while that listener is connected, so scripts and workers that
+never start it read straight from the database.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.domain.stock_discovery.models import Company
+
+ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "true").lower() == "true"
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+# Safety net for writes that bypass the change feed (e.g. CIK backfills)
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "300"))
+# Misses are kept shorter: a ticker that is about to be created is usually looked up just before
+ENTITY_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+# Set on a shared lookup whose leader failed; waiters then query for themselves
+RETRY = object()
+
+
+@dataclass
+class CacheEntry:
+    """Column values of a company (by ID) or its ID (by ticker); None for a cached miss"""
+    value: Any
+    expires_at: float
+
+
+def company_values(company: Company) -> Dict[str, Any]:
+    return {attribute.key: getattr(company, attribute.key) for attribute in inspect(Company).column_attrs}
+
+
+class EntityCache:
+    """LRU+TTL cache of companies by ID and ticker, with negative entries and shared misses"""
+
+    def __init__(
+        self,
+        max_entries: int = ENTITY_CACHE_MAX_ENTRIES,
+        ttl: float = ENTITY_CACHE_TTL_SECONDS,
+        negative_ttl: float = ENTITY_CACHE_NEGATIVE_TTL_SECONDS,
+        enabled: bool = ENTITY_CACHE_ENABLED,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.hub = None
+        # ("id", UUID) -> company values, ("ticker", str) -> company ID
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        # Bumped by every invalidation; a load that raced one is not stored
+        self.generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def attach(self, hub):
+        """Invalidate from a change feed hub's events, and cache only while it is listening"""
+        self.hub = hub
+        hub.listeners.append(self.on_events)
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self.hub is not None and self.hub.listening
+
+    async def get_by_id(
+        self, session: AsyncSession, company_id: UUID, load: Callable[[], Awaitable[Optional[Company]]]
+    ) -> Optional[Company]:
+        if not self.active:
+            self.bypassed += 1
+            return await load()
+        key = ("id", company_id)
+        found, values = self._get(key)
+        if not found:
+            self.misses += 1
+            return await self._load(session, key, load)
+        self._count_hit(values)
+        return await self._materialize(session, values)
+
+    async def get_by_ticker(
+        self, session: AsyncSession, ticker_symbol: str, load: Callable[[], Awaitable[Optional[Company]]]
+    ) -> Optional[Company]:
+        if not self.active:
+            self.bypassed += 1
+            return await load()
+        key = ("ticker", ticker_symbol.upper())
+        found, company_id = self._get(key)
+        values = None
+        if found and company_id is not None:
+            # The company's own entry may have been evicted, or the company renamed, since
+            found, values = self._get(("id", company_id))
+            found = found and values is not None and values["ticker_symbol"] == key[1]
+        if not found:
+            self.misses += 1
+            return await self._load(session, key, load)
+        self._count_hit(values)
+        return await self._materialize(session, values)
+
+    def _get(self, key: Hashable):
+        """(found, value) for a fresh entry"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        if entry.expires_at <= self.clock():
+            del self.entries[key]
+            self.expirations += 1
+            return False, None
+        self.entries.move_to_end(key)
+        return True, entry.value
+
+    def _count_hit(self, values):
+        if values is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+
+    async def _load(self, session: AsyncSession, key: Hashable, load) -> Optional[Company]:
+        """Query once per key at a time; concurrent lookups wait for the first one's values"""
+        pending = self._loading.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            values = await asyncio.shield(pending)
+            if values is not RETRY:
+                return await self._materialize(session, values)
+            return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self.generation
+        shared = RETRY
+        try:
+            company = await load()
+            # Never share attributes this session changed but has not committed
+            if company is not None and session.is_modified(company):
+                return company
+            # A write committed while loading may have made the values stale
+            if generation == self.generation:
+                shared = company_values(company) if company is not None else None
+                self._store(key, shared)
+            return company
+        finally:
+            del self._loading[key]
+            future.set_result(shared)
+
+    def _store(self, key: Hashable, values: Optional[Dict[str, Any]]):
+        now = self.clock()
+        if values is None:
+            self._put(key, CacheEntry(None, now + self.negative_ttl))
+            return
+        entry = CacheEntry(values, now + self.ttl)
+        self._put(("id", values["id"]), entry)
+        self._put(("ticker", values["ticker_symbol"]), CacheEntry(values["id"], entry.expires_at))
+
+    def _put(self, key: Hashable, entry: CacheEntry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _materialize(self, session: AsyncSession, values: Optional[Dict[str, Any]]) -> Optional[Company]:
+        """A persistent Company in the caller's session, built from cached values without a query"""
+        if values is None:
+            return None
+        company = Company(**values)
+        make_transient_to_detached(company)
+        return await session.merge(company, load=False)
+
+    def invalidate(self, company_id: Optional[UUID] = None, tickers: Iterable[Optional[str]] = ()):
+        """Drop a company's entries (and cached misses for the tickers it now has)"""
+        self.generation += 1
+        keys = [("ticker", ticker.upper()) for ticker in tickers if ticker]
+        if company_id is not None:
+            keys.append(("id", company_id))
+            entry = self.entries.get(("id", company_id))
+            if entry is not None and entry.value is not None:
+                keys.append(("ticker", entry.value["ticker_symbol"]))
+        for key in keys:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def on_events(self, events: list):
+        """Change feed listener: drop every company a committed change event names"""
+        for event in events:
+            self.invalidate(event.company_id, [(event.changes or {}).get("ticker_symbol")])
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "active": self.active,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+entity_cache = EntityCache()
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.shared.exceptions import ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+# SEC endpoints (override to point at a stub server in development and benchmarks)
+SEC_DATA_BASE_URL = os.getenv("SEC_DATA_BASE_URL", "https://data.sec.gov")
+SEC_WWW_BASE_URL = os.getenv("SEC_WWW_BASE_URL", "https://www.sec.gov")
+SEC_API_BASE_URL = os.getenv("SEC_API_BASE_URL", "https://www.sec.gov/Archives/edgar")
+
+# SEC requires a descriptive User-Agent with contact details
+SEC_USER_AGENT = os.getenv("SEC_USER_AGENT", "us-stock-data-collection admin@example.com")
+
+# SEC fair-access limit is 10 requests/second across all of our processes
+EDGAR_MAX_RPS = float(os.getenv("EDGAR_MAX_RPS", "10"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def format_cik(cik) -> str:
+    """Zero-pad a CIK to the 10 digits EDGAR uses in URLs"""
+    return str(int(cik)).zfill(10)
+
+
+def filing_document_url(cik, accession_number: str, document: str, archives_base_url: str = SEC_API_BASE_URL) -> str:
+    """Archive URL of a document inside a filing"""
+    return f"{archives_base_url.rstrip('/')}/data/{int(cik)}/{accession_number.replace('-', '')}/{document}"
+
+
+class RateLimiter:
+    """Async token bucket; `rate` may be retuned while running"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class EdgarClient:
+    """Rate-limited client for the SEC EDGAR JSON and archive endpoints"""
+
+    def __init__(
+        self,
+        max_rps: float = EDGAR_MAX_RPS,
+        data_base_url: str = SEC_DATA_BASE_URL,
+        www_base_url: str = SEC_WWW_BASE_URL,
+        archives_base_url: str = SEC_API_BASE_URL,
+        max_retries: int = 4,
+        timeout: float = 30.0
+    ):
+        self.limiter = RateLimiter(max_rps)
+        self.data_base_url = data_base_url.rstrip("/")
+        self.www_base_url = www_base_url.rstrip("/")
+        self.archives_base_url = archives_base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.requests_made = 0
+        self._ticker_ciks: Optional[Dict[str, str]] = None
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": SEC_USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+            timeout=timeout,
+        )
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get(self, url: str) -> httpx.Response:
+        """GET with rate limiting and exponential backoff on throttling / server errors"""
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            self.requests_made += 1
+            try:
+                response = await self._client.get(url)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise ExternalAPIError(f"SEC request failed: {url}: {e}")
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.max_retries:
+                    raise ExternalAPIError(f"SEC request failed: {url}: HTTP {response.status_code}")
+
+            delay = 2 ** attempt * 0.5
+            logger.warning(f"⚠️  SEC request retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {url}")
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str) -> Optional[dict]:
+        """GET a JSON document, returning None for 404"""
+        response = await self.get(url)
+        if response.status_code == 404:
+            return None
+        if response.status_code >= 400:
+            raise ExternalAPIError(f"SEC request failed: {url}: HTTP {response.status_code}")
+        return response.json()
+
+    async def get_content(self, url: str) -> Optional[bytes]:
+        """GET a document's undecoded bytes, returning None for 404"""
+        response = await self.get(url)
+        if response.status_code == 404:
+            return None
+        if response.status_code >= 400:
+            raise ExternalAPIError(f"SEC request failed: {url}: HTTP {response.status_code}")
+        return response.content
+
+    async def get_ticker_ciks(self) -> Dict[str, str]:
+        """Map ticker symbols to zero-padded CIKs (fetched once per client)"""
+        if self._ticker_ciks is None:
+            document = await self.get_json(f"{self.www_base_url}/files/company_tickers.json") or {}
+            self._ticker_ciks = {
+                entry["ticker"].upper(): format_cik(entry["cik_str"])
+                for entry in document.values()
+            }
+        return self._ticker_ciks
+
+    async def get_submissions(self, cik: str) -> Optional[dict]:
+        """Filing history for a company"""
+        return await self.get_json(f"{self.data_base_url}/submissions/CIK{format_cik(cik)}.json")
+
+    async def get_submissions_content(self, cik: str) -> Optional[bytes]:
+        """Filing history for a company as raw JSON, for parsing off the event loop"""
+        return await self.get_content(f"{self.data_base_url}/submissions/CIK{format_cik(cik)}.json")
+
+    async def get_daily_index(self, day: date) -> Optional[str]:
+        """Daily form-type index for a day, or None if none was published (weekends, holidays, not yet)"""
+        quarter = (day.month - 1) // 3 + 1
+        url = f"{self.archives_base_url}/daily-index/{day.year}/QTR{quarter}/form.{day:%Y%m%d}.idx"
+        response = await self.get(url)
+        if response.status_code in (403, 404):
+            return None
+        if response.status_code >= 400:
+            raise ExternalAPIError(f"SEC request failed: {url}: HTTP {response.status_code}")
+        return response.text
+
+    async def iter_document(self, cik: str, accession_number: str, document: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """Stream a filing document's bytes as they arrive (nothing for 404); not retried mid-stream"""
+        url = filing_document_url(cik, accession_number, document, self.archives_base_url)
+        await self.limiter.acquire()
+        self.requests_made += 1
+        try:
+            async with self._client.stream("GET", url) as response:
+                if response.status_code == 404:
+                    return
+                if response.status_code >= 400:
+                    raise ExternalAPIError(f"SEC request failed: {url}: HTTP {response.status_code}")
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+        except httpx.TransportError as e:
+            raise ExternalAPIError(f"SEC request failed: {url}: {e}")
+
+    async def get_frame(self, taxonomy: str, concept: str, unit: str, period: str) -> Optional[dict]:
+        """One XBRL concept / unit / calendar period across all filers (frames API)"""
+        return await self.get_json(f"{self.data_base_url}/api/xbrl/frames/{taxonomy}/{concept}/{unit}/{period}.json")
@@ -0,0 +1,159 @@
+"""
+Streaming plain-text extraction for EDGAR filing documents
+
+10-K/10-Q primary documents are HTML or inline XBRL (HTML with ix:
+elements), often several megabytes. FilingTextExtractor is fed raw bytes as
+they download and returns finished sections as soon as they are complete,
+so only the section being built is held in memory:
+
+- markup is dropped; block elements (p, div, tr, li, br, headings) end a
+  paragraph and whitespace inside a paragraph is collapsed
+- script/style, the hidden ix:header block (XBRL contexts and hidden facts)
+  and display:none elements are skipped entirely
+- a paragraph that looks like a heading ("PART II", "Item 1A. Risk
+  Factors") starts a new section; sections are also closed once they reach
+  MAX_SECTION_CHARS, at a paragraph boundary
+
+Plain-text (.txt) submissions go through the same parser; text outside
+tags passes through unchanged.
+"""
+
+import codecs
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Long enough for ranking context, short enough for cheap snippets and tsvector limits
+MAX_SECTION_CHARS = 8000
+MAX_HEADING_CHARS = 255
+
+BLOCK_TAGS = {
+    "p", "div", "br", "tr", "li", "table", "h1", "h2", "h3", "h4", "h5", "h6",
+    "section", "article", "center", "title", "pre", "blockquote", "dt", "dd",
+}
+SKIPPED_TAGS = {"script", "style", "head", "ix:header"}
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "col", "area", "base", "wbr"}
+
+HEADING = re.compile(r"^(part\s+[ivx]+\b|item\s+\d{1,2}[a-c]?\b)", re.IGNORECASE)
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class FilingSectionText:
+    """One extracted section of a filing"""
+    section_no: int
+    heading: Optional[str]
+    content: str
+
+
+class FilingTextExtractor(HTMLParser):
+    """Incremental HTML/iXBRL to sectioned plain text converter"""
+
+    def __init__(self, max_section_chars: int = MAX_SECTION_CHARS, encoding: str = "utf-8"):
+        super().__init__(convert_charrefs=True)
+        self.max_section_chars = max_section_chars
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._skip_depth = 0
+        self._skip_stack: List[str] = []
+        self._text: List[str] = []
+        self._paragraphs: List[str] = []
+        self._section_chars = 0
+        self._heading: Optional[str] = None
+        self._section_no = 0
+        self._done: List[FilingSectionText] = []
+        self.bytes_read = 0
+        self.characters = 0
+
+    def feed_bytes(self, chunk: bytes) -> List[FilingSectionText]:
+        """Feed a chunk of the raw document and return the sections it completed"""
+        self.bytes_read += len(chunk)
+        self.feed(self._decoder.decode(chunk))
+        return self._take_done()
+
+    def finish(self) -> List[FilingSectionText]:
+        """Flush the parser and return the remaining sections"""
+        self.feed(self._decoder.decode(b"", final=True))
+        self.close()
+        self._end_paragraph()
+        self._end_section()
+        return self._take_done()
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag not in VOID_TAGS:
+                self._skip_stack.append(tag)
+            return
+        if tag in SKIPPED_TAGS or any(name == "style" and value and HIDDEN_STYLE.search(value) for name, value in attrs):
+            if tag not in VOID_TAGS:
+                self._skip_depth = 1
+                self._skip_stack = [tag]
+            return
+        if tag in BLOCK_TAGS:
+            self._end_paragraph()
+        elif tag in ("td", "th"):
+            self._text.append(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip_depth and tag in BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            # Unwind to the matching open tag, tolerating unclosed children
+            if tag in self._skip_stack:
+                while self._skip_stack and self._skip_stack.pop() != tag:
+                    pass
+                if not self._skip_stack:
+                    self._skip_depth = 0
+            return
+        if tag in BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._text.append(data)
+
+    def _end_paragraph(self):
+        if not self._text:
+            return
+        paragraph = WHITESPACE.sub(" ", "".join(self._text)).strip()
+        self._text = []
+        if not paragraph:
+            return
+
+        if len(paragraph) <= MAX_HEADING_CHARS and HEADING.match(paragraph):
+            self._end_section()
+            self._heading = paragraph
+            return
+
+        if self._section_chars and self._section_chars + len(paragraph) > self.max_section_chars:
+            self._end_section(continued=True)
+        # A single paragraph longer than a section is split on its own
+        while len(paragraph) > self.max_section_chars:
+            cut = paragraph.rfind(" ", 0, self.max_section_chars)
+            cut = cut if cut > 0 else self.max_section_chars
+            self._paragraphs.append(paragraph[:cut])
+            self._section_chars += cut
+            self._end_section(continued=True)
+            paragraph = paragraph[cut:].lstrip()
+        if paragraph:
+            self._paragraphs.append(paragraph)
+            self._section_chars += len(paragraph)
+
+    def _end_section(self, continued: bool = False):
+        """Close the current section; a continued section keeps its heading"""
+        if self._paragraphs:
+            content = "\n".join(self._paragraphs)
+            self._section_no += 1
+            self.characters += len(content)
+            self._done.append(FilingSectionText(self._section_no, self._heading, content))
+        self._paragraphs = []
+        self._section_chars = 0
+        if not continued:
+            self._heading = None
+
+    def _take_done(self) -> List[FilingSectionText]:
+        done, self._done = self._done, []
+        return done
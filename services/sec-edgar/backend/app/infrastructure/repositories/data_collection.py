@@ -0,0 +1,587 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Date, text, select, update, delete, exists, func, and_, or_, case, any_, bindparam, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from datetime import date, timedelta
+
+from app.domain.data_collection.models import (
+    CollectionJob, CollectionWorker, SECData, CompanyFilingStatus, FeedCursor, FinancialFact, ReportCalendarEntry, DerivedMetrics,
+    JOB_PENDING, JOB_LEASED, JOB_COMPLETED, JOB_FAILED
+)
+from app.domain.stock_discovery.models import Company
+
+OPEN_JOB_STATUSES = (JOB_PENDING, JOB_LEASED)
+
+# Column order of the filing row tuples written by the collection pipeline
+FILING_COLUMNS = ("id", "company_id", "accession_number", "filing_type", "filing_date", "report_date", "primary_document")
+
+class CollectionJobRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue_selected(self, priority: int = 0) -> int:
+        """Create a pending job for every selected company without an open job"""
+        return await self._enqueue(
+            select(func.gen_random_uuid(), Company.id, literal_column(str(int(priority))))
+            .where(Company.is_selected == True)
+        )
+
+    async def enqueue_companies(self, company_ids: List[UUID], priority: int = 0) -> int:
+        """Create pending jobs for specific companies without an open job"""
+        if not company_ids:
+            return 0
+        return await self._enqueue(
+            select(func.gen_random_uuid(), Company.id, literal_column(str(int(priority))))
+            .where(Company.id == any_(bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))))
+        )
+
+    async def enqueue_due(self, window_start: date, window_end: date, recheck_seconds: int, priority: int = 0) -> int:
+        """Create jobs for selected companies with an unfiled report expected inside the window
+
+        Companies collected within the last `recheck_seconds` are skipped, so
+        a company is re-checked at a steady cadence until its report lands.
+        """
+        report_due = exists().where(
+            ReportCalendarEntry.company_id == Company.id,
+            ReportCalendarEntry.is_filed == False,
+            ReportCalendarEntry.expected_filing_date.between(window_start, window_end)
+        )
+        recently_collected = exists().where(
+            CollectionJob.company_id == Company.id,
+            CollectionJob.status == JOB_COMPLETED,
+            CollectionJob.completed_at > func.now() - timedelta(seconds=recheck_seconds)
+        )
+        return await self._enqueue(
+            select(func.gen_random_uuid(), Company.id, literal_column(str(int(priority))))
+            .where(Company.is_selected == True, report_due, ~recently_collected)
+        )
+
+    async def _enqueue(self, source) -> int:
+        statement = (
+            insert(CollectionJob)
+            .from_select(["id", "company_id", "priority"], source)
+            .on_conflict_do_nothing(
+                index_elements=["company_id"],
+                index_where=CollectionJob.status.in_(OPEN_JOB_STATUSES)
+            )
+        )
+        result = await self.db.execute(statement)
+        await self.db.commit()
+        return result.rowcount
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[CollectionJob]:
+        """Lease up to `limit` due jobs, stealing leases that have expired
+
+        FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint jobs
+        without waiting on each other's row locks.
+        """
+        now = func.now()
+        claimable = (
+            select(CollectionJob.id)
+            .where(
+                CollectionJob.status.in_(OPEN_JOB_STATUSES),
+                or_(
+                    CollectionJob.status == JOB_PENDING,
+                    CollectionJob.lease_expires_at < now
+                ),
+                CollectionJob.scheduled_at <= now
+            )
+            .order_by(CollectionJob.priority.desc(), CollectionJob.scheduled_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await self.db.execute(
+            update(CollectionJob)
+            .where(CollectionJob.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=JOB_LEASED,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=CollectionJob.attempts + 1
+            )
+            .returning(CollectionJob)
+        )
+        jobs = result.scalars().all()
+        await self.db.commit()
+        return jobs
+
+    async def extend_leases(self, worker_id: str, job_ids: List[UUID], lease_seconds: int) -> List[UUID]:
+        """Extend leases still owned by this worker and return their ids"""
+        if not job_ids:
+            return []
+        result = await self.db.execute(
+            update(CollectionJob)
+            .where(
+                CollectionJob.id == any_(bindparam("job_ids", list(job_ids), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                CollectionJob.lease_owner == worker_id,
+                CollectionJob.status == JOB_LEASED
+            )
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+            .returning(CollectionJob.id)
+        )
+        owned = [row[0] for row in result]
+        await self.db.commit()
+        return owned
+
+    async def complete(self, job_id: UUID, worker_id: str) -> bool:
+        """Mark a job completed if this worker still holds its lease"""
+        result = await self.db.execute(
+            update(CollectionJob)
+            .where(
+                CollectionJob.id == job_id,
+                CollectionJob.lease_owner == worker_id,
+                CollectionJob.status == JOB_LEASED
+            )
+            .values(status=JOB_COMPLETED, completed_at=func.now(), lease_expires_at=None)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def fail(
+        self,
+        job_id: UUID,
+        worker_id: str,
+        error: str,
+        max_attempts: int,
+        retry_delay_seconds: int
+    ) -> bool:
+        """Release a failed job for retry with exponential backoff, or fail it permanently"""
+        exhausted = CollectionJob.attempts >= max_attempts
+        backoff = func.make_interval(0, 0, 0, 0, 0, 0, retry_delay_seconds * func.power(2, CollectionJob.attempts - 1))
+        result = await self.db.execute(
+            update(CollectionJob)
+            .where(
+                CollectionJob.id == job_id,
+                CollectionJob.lease_owner == worker_id,
+                CollectionJob.status == JOB_LEASED
+            )
+            .values(
+                status=case((exhausted, JOB_FAILED), else_=JOB_PENDING),
+                scheduled_at=case((exhausted, CollectionJob.scheduled_at), else_=func.now() + backoff),
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=error[:500]
+            )
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def get_status_counts(self) -> Dict[str, int]:
+        """Count jobs by status, plus open leases that have expired"""
+        result = await self.db.execute(
+            select(CollectionJob.status, func.count()).group_by(CollectionJob.status)
+        )
+        counts = {status: count for status, count in result}
+
+        expired = await self.db.execute(
+            select(func.count()).where(
+                CollectionJob.status == JOB_LEASED,
+                CollectionJob.lease_expires_at < func.now()
+            )
+        )
+        counts["expired_leases"] = expired.scalar()
+        return counts
+
+    async def register_worker(self, worker_id: str, hostname: str):
+        """Register (or restart) a worker and reset its counters"""
+        statement = insert(CollectionWorker).values(worker_id=worker_id, hostname=hostname)
+        statement = statement.on_conflict_do_update(
+            index_elements=["worker_id"],
+            set_={
+                "hostname": hostname,
+                "started_at": func.now(),
+                "heartbeat_at": func.now(),
+                "jobs_completed": 0,
+                "jobs_failed": 0,
+                "requests_made": 0,
+            }
+        )
+        await self.db.execute(statement)
+        await self.db.commit()
+
+    async def record_heartbeat(self, worker_id: str, completed: int, failed: int, requests: int):
+        """Add progress deltas to a worker's counters and refresh its heartbeat"""
+        await self.db.execute(
+            update(CollectionWorker)
+            .where(CollectionWorker.worker_id == worker_id)
+            .values(
+                heartbeat_at=func.now(),
+                jobs_completed=CollectionWorker.jobs_completed + completed,
+                jobs_failed=CollectionWorker.jobs_failed + failed,
+                requests_made=CollectionWorker.requests_made + requests
+            )
+        )
+        await self.db.commit()
+
+    async def count_active_workers(self, within_seconds: int) -> int:
+        """Count workers that sent a heartbeat recently"""
+        result = await self.db.execute(
+            select(func.count()).where(
+                CollectionWorker.heartbeat_at > func.now() - timedelta(seconds=within_seconds)
+            )
+        )
+        return result.scalar()
+
+    async def get_workers(self, active_within_seconds: int = 120) -> List[tuple]:
+        """Get all workers with a flag for recent heartbeats"""
+        result = await self.db.execute(
+            select(
+                CollectionWorker,
+                CollectionWorker.heartbeat_at > func.now() - timedelta(seconds=active_within_seconds)
+            ).order_by(CollectionWorker.worker_id)
+        )
+        return result.all()
+
+class SECDataRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upsert_filings(self, filings: List[dict]) -> int:
+        """Insert filings, skipping accession numbers already stored"""
+        if not filings:
+            return 0
+        statement = insert(SECData).values(filings).on_conflict_do_nothing(
+            index_elements=["accession_number"]
+        )
+        result = await self.db.execute(statement)
+        await self.db.commit()
+        return result.rowcount
+
+    async def insert_filing_rows(self, rows: List[tuple], batch_size: int = 4000) -> List[UUID]:
+        """Multi-row insert of FILING_COLUMNS tuples, skipping stored accession numbers (no commit)
+
+        Returns the company ID of every inserted row. 4000 rows x 7 columns
+        stays under the 32767 bind parameter limit of one statement.
+        """
+        inserted = []
+        for start in range(0, len(rows), batch_size):
+            statement = insert(SECData).values(
+                [dict(zip(FILING_COLUMNS, row)) for row in rows[start:start + batch_size]]
+            ).on_conflict_do_nothing(index_elements=["accession_number"]).returning(SECData.company_id)
+            inserted.extend((await self.db.execute(statement)).scalars().all())
+        return inserted
+
+    async def copy_filing_rows(self, rows: List[tuple]) -> List[UUID]:
+        """COPY FILING_COLUMNS tuples into a staging table, then insert the new ones (no commit)
+
+        COPY cannot skip conflicts itself, so rows land in a per-connection
+        temp table that is emptied on commit; call once per transaction.
+        Returns the company ID of every inserted row.
+        """
+        columns = ", ".join(FILING_COLUMNS)
+        await self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS dc_sec_data_stage "
+            "(LIKE dc_sec_data INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ))
+        connection = await (await self.db.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            "dc_sec_data_stage", records=rows, columns=FILING_COLUMNS
+        )
+        result = await self.db.execute(text(
+            f"INSERT INTO dc_sec_data ({columns}) SELECT {columns} FROM dc_sec_data_stage "
+            "ON CONFLICT (accession_number) DO NOTHING RETURNING company_id"
+        ))
+        return list(result.scalars().all())
+
+    async def get_latest_filing(self, company_id: UUID, filing_type: Optional[str] = None) -> Optional[SECData]:
+        """Get the most recent filing for a company"""
+        query = select(SECData).where(SECData.company_id == company_id)
+        if filing_type:
+            query = query.where(SECData.filing_type == filing_type)
+        result = await self.db.execute(query.order_by(SECData.filing_date.desc()).limit(1))
+        return result.scalar_one_or_none()
+
+class FilingStatusRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_company_ids(self, company_ids: List[UUID]) -> List[CompanyFilingStatus]:
+        """Get filing status rows for many companies"""
+        if not company_ids:
+            return []
+        result = await self.db.execute(
+            select(CompanyFilingStatus).where(
+                CompanyFilingStatus.company_id == any_(
+                    bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+                )
+            )
+        )
+        return result.scalars().all()
+
+    async def upsert_statuses(self, statuses: List[dict]) -> int:
+        """Insert or replace filing status rows keyed by company"""
+        if not statuses:
+            return 0
+        statement = insert(CompanyFilingStatus).values(statuses)
+        statement = statement.on_conflict_do_update(
+            index_elements=["company_id"],
+            set_={
+                **{column: statement.excluded[column] for column in statuses[0] if column != "company_id"},
+                "updated_at": func.now(),
+            }
+        )
+        result = await self.db.execute(statement)
+        await self.db.commit()
+        return result.rowcount
+
+class FeedCursorRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, feed: str) -> Optional[date]:
+        """Last day fully processed for a feed"""
+        result = await self.db.execute(
+            select(FeedCursor.last_processed_date).where(FeedCursor.feed == feed)
+        )
+        return result.scalar_one_or_none()
+
+    async def advance(self, feed: str, day: date):
+        """Move a feed cursor forward (never backwards)"""
+        statement = insert(FeedCursor).values(feed=feed, last_processed_date=day)
+        statement = statement.on_conflict_do_update(
+            index_elements=["feed"],
+            set_={"last_processed_date": func.greatest(FeedCursor.last_processed_date, day), "updated_at": func.now()}
+        )
+        await self.db.execute(statement)
+        await self.db.commit()
+
+    async def reset(self, feed: str, day: date):
+        """Set a feed cursor, allowing it to move backwards to replay days"""
+        statement = insert(FeedCursor).values(feed=feed, last_processed_date=day)
+        statement = statement.on_conflict_do_update(
+            index_elements=["feed"],
+            set_={"last_processed_date": day, "updated_at": func.now()}
+        )
+        await self.db.execute(statement)
+        await self.db.commit()
+
+class FinancialFactRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upsert_facts(self, facts: List[dict], batch_size: int = 2000) -> List[tuple]:
+        """Upsert facts in multi-row batches, returning (company_id, period) of rows inserted or changed"""
+        changed = []
+        for start in range(0, len(facts), batch_size):
+            statement = insert(FinancialFact).values(facts[start:start + batch_size])
+            excluded = statement.excluded
+            statement = statement.on_conflict_do_update(
+                constraint="uq_dc_financial_facts_frame",
+                set_={
+                    "value": excluded.value,
+                    "period_start": excluded.period_start,
+                    "period_end": excluded.period_end,
+                    "accession_number": excluded.accession_number,
+                    "source": excluded.source,
+                    "collected_at": func.now(),
+                },
+                # Leave unchanged facts alone (no dead tuples, and RETURNING only reports real changes)
+                where=or_(
+                    FinancialFact.value.is_distinct_from(excluded.value),
+                    FinancialFact.accession_number.is_distinct_from(excluded.accession_number)
+                )
+            ).returning(FinancialFact.company_id, FinancialFact.period)
+            result = await self.db.execute(statement)
+            changed.extend(result.all())
+        await self.db.commit()
+        return changed
+
+    async def get_company_facts(self, company_ids: List[UUID], concepts: Iterable[str]) -> List[tuple]:
+        """Get (company_id, concept, unit, period, value) for many companies"""
+        if not company_ids:
+            return []
+        result = await self.db.execute(
+            select(
+                FinancialFact.company_id,
+                FinancialFact.concept,
+                FinancialFact.unit,
+                FinancialFact.period,
+                FinancialFact.value
+            ).where(
+                FinancialFact.company_id == any_(bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                FinancialFact.concept.in_(list(concepts))
+            )
+        )
+        return result.all()
+
+    async def get_company_ids(self) -> List[UUID]:
+        """Companies with at least one stored fact"""
+        result = await self.db.execute(select(FinancialFact.company_id).distinct())
+        return result.scalars().all()
+
+    async def get_frame(self, concept: str, unit: str, period: str, taxonomy: str = "us-gaap") -> List[FinancialFact]:
+        """Get one concept / unit / period across all companies"""
+        result = await self.db.execute(
+            select(FinancialFact).where(
+                FinancialFact.taxonomy == taxonomy,
+                FinancialFact.concept == concept,
+                FinancialFact.unit == unit,
+                FinancialFact.period == period
+            )
+        )
+        return result.scalars().all()
+
+    async def get_company_range(
+        self,
+        company_id: UUID,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        concepts: Optional[Iterable[str]] = None
+    ) -> List[FinancialFact]:
+        """Get one company's facts with period_end in [start, end]"""
+        query = select(FinancialFact).where(FinancialFact.company_id == company_id)
+        if start is not None:
+            query = query.where(FinancialFact.period_end >= start)
+        if end is not None:
+            query = query.where(FinancialFact.period_end <= end)
+        if concepts:
+            query = query.where(FinancialFact.concept.in_(list(concepts)))
+        result = await self.db.execute(query.order_by(FinancialFact.period_end, FinancialFact.concept))
+        return result.scalars().all()
+
+    async def get_months_before(self, cutoff: date) -> List[tuple]:
+        """Get (first day of month, row count) for every month with period_end before cutoff"""
+        month = func.date_trunc(literal_column("'month'"), FinancialFact.period_end).cast(Date)
+        result = await self.db.execute(
+            select(month, func.count())
+            .where(FinancialFact.period_end < cutoff)
+            .group_by(month)
+            .order_by(month)
+        )
+        return result.all()
+
+    async def lock_period_range(self, start: date, end: date) -> List[FinancialFact]:
+        """Get and row-lock facts with period_end in [start, end) until the transaction ends"""
+        result = await self.db.execute(
+            select(FinancialFact)
+            .where(FinancialFact.period_end >= start, FinancialFact.period_end < end)
+            .with_for_update()
+        )
+        return result.scalars().all()
+
+    async def delete_facts(self, fact_ids: List[UUID]) -> int:
+        """Delete facts by id without committing"""
+        if not fact_ids:
+            return 0
+        result = await self.db.execute(
+            delete(FinancialFact).where(
+                FinancialFact.id == any_(bindparam("fact_ids", list(fact_ids), type_=ARRAY(PG_UUID(as_uuid=True))))
+            )
+        )
+        return result.rowcount
+
+class ReportCalendarRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_periodic_filings(self, company_ids: List[UUID], forms: Iterable[str]) -> List[tuple]:
+        """Get (company_id, form, period end, filing date, accession) history, oldest period first"""
+        if not company_ids:
+            return []
+        result = await self.db.execute(
+            select(
+                SECData.company_id,
+                SECData.filing_type,
+                SECData.report_date,
+                SECData.filing_date,
+                SECData.accession_number
+            )
+            .where(
+                SECData.company_id == any_(bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                SECData.filing_type.in_(list(forms)),
+                SECData.report_date.is_not(None)
+            )
+            .order_by(SECData.company_id, SECData.report_date, SECData.filing_date)
+        )
+        return result.all()
+
+    async def replace_entries(self, company_ids: List[UUID], entries: List[dict], batch_size: int = 2000) -> int:
+        """Replace the projected (unfiled) calendar of these companies and upsert their entries"""
+        written = await self.write_entries(company_ids, entries, batch_size)
+        await self.db.commit()
+        return written
+
+    async def write_entries(self, company_ids: List[UUID], entries: List[dict], batch_size: int = 2000) -> int:
+        """Same as replace_entries (caller commits)"""
+        if not company_ids:
+            return 0
+        await self.db.execute(
+            delete(ReportCalendarEntry).where(
+                ReportCalendarEntry.company_id == any_(bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                ReportCalendarEntry.is_filed == False
+            )
+        )
+        for start in range(0, len(entries), batch_size):
+            statement = insert(ReportCalendarEntry).values(entries[start:start + batch_size])
+            excluded = statement.excluded
+            statement = statement.on_conflict_do_update(
+                constraint="uq_dc_report_calendar_period",
+                set_={
+                    "expected_filing_date": excluded.expected_filing_date,
+                    "actual_filing_date": excluded.actual_filing_date,
+                    "accession_number": excluded.accession_number,
+                    "is_filed": excluded.is_filed,
+                    "updated_at": func.now(),
+                }
+            )
+            await self.db.execute(statement)
+        return len(entries)
+
+    async def get_range(
+        self,
+        start: date,
+        end: date,
+        form_type: Optional[str] = None,
+        include_filed: bool = False,
+        selected_only: bool = True,
+        limit: int = 1000
+    ) -> List[tuple]:
+        """Get (entry, ticker, company name) rows expected between two dates, soonest first"""
+        filters = [ReportCalendarEntry.expected_filing_date.between(start, end)]
+        if not include_filed:
+            # Matches the partial index predicate, so this is an index range scan
+            filters.append(ReportCalendarEntry.is_filed == False)
+        if form_type:
+            filters.append(ReportCalendarEntry.form_type == form_type)
+        if selected_only:
+            filters.append(Company.is_selected == True)
+
+        result = await self.db.execute(
+            select(ReportCalendarEntry, Company.ticker_symbol, Company.company_name)
+            .join(Company, Company.id == ReportCalendarEntry.company_id)
+            .where(*filters)
+            .order_by(ReportCalendarEntry.expected_filing_date, Company.ticker_symbol)
+            .limit(limit)
+        )
+        return result.all()
+
+class DerivedMetricsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upsert_metrics(self, rows: List[dict], batch_size: int = 1000) -> int:
+        """Insert or replace derived metric rows keyed by (company_id, period)"""
+        for start in range(0, len(rows), batch_size):
+            statement = insert(DerivedMetrics).values(rows[start:start + batch_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=["company_id", "period"],
+                set_={
+                    **{column: statement.excluded[column] for column in rows[0] if column not in ("company_id", "period")},
+                    "computed_at": func.now(),
+                }
+            )
+            await self.db.execute(statement)
+        await self.db.commit()
+        return len(rows)
+
+    async def get_for_company(self, company_id: UUID, limit: int = 8) -> List[DerivedMetrics]:
+        """Most recent derived metric rows for a company, newest first"""
+        result = await self.db.execute(
+            select(DerivedMetrics)
+            .where(DerivedMetrics.company_id == company_id)
+            .order_by(DerivedMetrics.period.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
@@ -0,0 +1,193 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, func, and_, any_, bindparam, literal_column, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from typing import Iterable, List, Optional, Set
+from uuid import UUID
+from datetime import date
+
+from app.domain.data_collection.models import SECData
+from app.domain.data_management.models import (
+    ImportJob, FilingDocument, FilingSection, IMPORT_COMPLETED, IMPORT_FAILED, FILING_TS_CONFIG
+)
+from app.domain.stock_discovery.models import Company
+
+# Fragment settings for search snippets
+HEADLINE_OPTIONS = 'MaxFragments=2, MaxWords=30, MinWords=12, StartSel="<mark>", StopSel="</mark>", FragmentDelimiter=" … "'
+
+def filing_partition(year: int) -> str:
+    return f"{FilingSection.__tablename__}_{year}"
+
+class ImportJobRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, filename: Optional[str], exchange: str, as_of: date) -> ImportJob:
+        job = ImportJob(filename=filename, exchange=exchange, as_of=as_of)
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get(self, job_id: UUID) -> Optional[ImportJob]:
+        result = await self.db.execute(select(ImportJob).where(ImportJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def get_recent(self, limit: int = 20) -> List[ImportJob]:
+        """Latest import jobs, newest first"""
+        result = await self.db.execute(
+            select(ImportJob).order_by(ImportJob.started_at.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def record_progress(self, job_id: UUID, status: str, counters: dict, written: dict):
+        """Set parse counters and add written counters (caller commits with the batch they describe)"""
+        await self.db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                status=status,
+                **counters,
+                **{name: getattr(ImportJob, name) + value for name, value in written.items()}
+            )
+        )
+
+    async def finish(self, job_id: UUID, error: Optional[str] = None, delisted: int = 0):
+        """Mark a job completed, or failed with an error"""
+        await self.db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                status=IMPORT_FAILED if error else IMPORT_COMPLETED,
+                error=error[:2000] if error else None,
+                companies_delisted=delisted,
+                finished_at=func.now()
+            )
+        )
+        await self.db.commit()
+
+class FilingTextRepository:
+    # Years whose partition this process has already ensured
+    _partitions: Set[int] = set()
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_pending(self, forms: Iterable[str], limit: int = 100) -> List[tuple]:
+        """(SECData, cik) for selected companies' filings whose document has not been indexed, newest first"""
+        result = await self.db.execute(
+            select(SECData, Company.cik)
+            .join(Company, Company.id == SECData.company_id)
+            .outerjoin(FilingDocument, FilingDocument.accession_number == SECData.accession_number)
+            .where(
+                Company.is_selected == True,
+                Company.cik.isnot(None),
+                SECData.primary_document.isnot(None),
+                SECData.filing_type == any_(bindparam("forms", list(forms), type_=ARRAY(FilingSection.filing_type.type))),
+                FilingDocument.accession_number.is_(None)
+            )
+            .order_by(SECData.filing_date.desc())
+            .limit(limit)
+        )
+        return result.all()
+
+    async def ensure_partitions(self, years: Iterable[int]):
+        """Create (and commit) the yearly partitions of dm_filing_sections that do not exist yet"""
+        missing = sorted(set(years) - self._partitions)
+        for year in missing:
+            await self.db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {filing_partition(year)} PARTITION OF {FilingSection.__tablename__} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            ))
+        if missing:
+            await self.db.commit()
+            self._partitions.update(missing)
+
+    async def add_sections(self, sections: List[dict]):
+        """Insert extracted sections (caller commits with the document row)"""
+        if sections:
+            await self.db.execute(insert(FilingSection), sections)
+
+    async def add_document(self, document: dict):
+        """Record an indexed filing document and commit it with its sections"""
+        self.db.add(FilingDocument(**document))
+        await self.db.commit()
+
+    async def search(
+        self,
+        query: str,
+        company_ids: Optional[List[UUID]] = None,
+        forms: Optional[List[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[tuple]:
+        """Ranked matching sections with snippets
+
+        The GIN index finds the matching sections; ts_rank_cd then reads the
+        stored search_vector of every match (never the text), so broad terms
+        cost a heap fetch per matching section. ts_headline, which has to
+        re-parse the section text, only runs for the page that is returned.
+        The filing_date bounds let Postgres skip whole yearly partitions.
+        """
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{FILING_TS_CONFIG}'::regconfig"), bindparam("query", query))
+        rank = func.ts_rank_cd(FilingSection.search_vector, ts_query)
+
+        filters = [FilingSection.search_vector.op("@@")(ts_query)]
+        if company_ids:
+            filters.append(FilingSection.company_id == any_(
+                bindparam("company_ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+            ))
+        if forms:
+            filters.append(FilingSection.filing_type == any_(
+                bindparam("forms", list(forms), type_=ARRAY(FilingSection.filing_type.type))
+            ))
+        if start:
+            filters.append(FilingSection.filing_date >= start)
+        if end:
+            filters.append(FilingSection.filing_date <= end)
+
+        top = (
+            select(
+                FilingSection.filing_date,
+                FilingSection.accession_number,
+                FilingSection.section_no,
+                rank.label("rank")
+            )
+            .where(and_(*filters))
+            .order_by(rank.desc(), FilingSection.filing_date.desc(), FilingSection.accession_number, FilingSection.section_no)
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
+
+        result = await self.db.execute(
+            select(
+                FilingSection.company_id,
+                Company.ticker_symbol,
+                Company.cik,
+                FilingSection.accession_number,
+                FilingSection.filing_type,
+                FilingSection.filing_date,
+                FilingSection.section_no,
+                FilingSection.heading,
+                top.c.rank,
+                func.ts_headline(
+                    literal_column(f"'{FILING_TS_CONFIG}'::regconfig"),
+                    FilingSection.content,
+                    ts_query,
+                    HEADLINE_OPTIONS
+                ).label("snippet"),
+                FilingDocument.document
+            )
+            .select_from(top)
+            .join(FilingSection, and_(
+                FilingSection.filing_date == top.c.filing_date,
+                FilingSection.accession_number == top.c.accession_number,
+                FilingSection.section_no == top.c.section_no
+            ))
+            .outerjoin(Company, Company.id == FilingSection.company_id)
+            .outerjoin(FilingDocument, FilingDocument.accession_number == FilingSection.accession_number)
+            .order_by(top.c.rank.desc(), FilingSection.filing_date.desc(), FilingSection.accession_number, FilingSection.section_no)
+        )
+        return result.all()
@@ -1,37 +1,223 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, and_, or_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional, Tuple
+from sqlalchemy import select, insert, update, delete, func, and_, or_, any_, all_, bindparam, cast, literal_column, BigInteger, Date, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.orm import defer, selectinload
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 
-from app.domain.stock_discovery.models import Company, CompanySelection
+from app.domain.stock_discovery.models import (
+    Company, CompanyHistory, CompanySelection, ChangeEvent, Watchlist, COMPANY_ORDINALS,
+    CHANGE_CREATED, CHANGE_UPDATED, CHANGE_SELECTED, CHANGE_DESELECTED
+)
+from app.infrastructure.entity_cache import entity_cache
+from app.infrastructure.tracing import traced_methods
+from app.shared.models.stock_discovery import CompanySort
 
+# Sort orders for company listings. Each ends in the unique ticker_symbol so the
+# ordering is total (keyset-compatible) and matches a composite index.
+COMPANY_SORT_ORDERS = {
+    CompanySort.TICKER: (Company.ticker_symbol.asc(),),
+    CompanySort.NAME: (Company.company_name.asc(), Company.ticker_symbol.asc()),
+    CompanySort.MARKET_CAP_DESC: (Company.market_cap.desc().nulls_last(), Company.ticker_symbol.asc()),
+}
+
+# Same orders over historical versions; tickers can be reused over time, so company_id breaks ties
+HISTORY_SORT_ORDERS = {
+    CompanySort.TICKER: (CompanyHistory.ticker_symbol.asc(), CompanyHistory.company_id.asc()),
+    CompanySort.NAME: (CompanyHistory.company_name.asc(), CompanyHistory.ticker_symbol.asc(), CompanyHistory.company_id.asc()),
+    CompanySort.MARKET_CAP_DESC: (
+        CompanyHistory.market_cap.desc().nulls_last(), CompanyHistory.ticker_symbol.asc(), CompanyHistory.company_id.asc()
+    ),
+}
+
+# Attributes versioned in sd_company_history
+HISTORY_FIELDS = ("ticker_symbol", "company_name", "exchange", "sector", "market_cap", "cik")
+
+
+def company_columns(fields: Iterable[str], historical: bool = False) -> list:
+    """Columns for a sparse fieldset; versioned attributes come from sd_company_history when historical"""
+    return [
+        getattr(CompanyHistory if historical and name in HISTORY_FIELDS else Company, name).label(name)
+        for name in fields
+    ]
+
+def company_history_statements(
+    as_of: date,
+    listed_ids: Iterable[UUID],
+    delisted_ids: Iterable[UUID] = ()
+) -> list:
+    """Statements that bring sd_company_history up to date with sd_companies as of a date
+
+    Listed companies whose attributes changed get their open version closed
+    at `as_of` and a new version opened (a change on the version's first day
+    is corrected in place); delisted companies get their open version
+    closed. Set-based, so an import of thousands of rows costs four
+    statements. Works with sync and async sessions alike.
+    """
+    listed = bindparam("listed_ids", list(listed_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    delisted = bindparam("delisted_ids", list(delisted_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    is_open = CompanyHistory.valid_to.is_(None)
+    matches_company = and_(
+        CompanyHistory.company_id == Company.id,
+        Company.id == any_(listed),
+        is_open,
+    )
+    changed = or_(*[
+        getattr(CompanyHistory, field).is_distinct_from(getattr(Company, field))
+        for field in HISTORY_FIELDS
+    ])
+
+    correct = (
+        update(CompanyHistory)
+        .where(matches_company, CompanyHistory.valid_from == as_of, changed)
+        .values(**{field: getattr(Company, field) for field in HISTORY_FIELDS}, recorded_at=func.now())
+    )
+    close_changed = (
+        update(CompanyHistory)
+        .where(matches_company, CompanyHistory.valid_from < as_of, changed)
+        .values(valid_to=as_of)
+    )
+    close_delisted = (
+        update(CompanyHistory)
+        .where(CompanyHistory.company_id == any_(delisted), is_open)
+        .values(valid_to=as_of)
+    )
+    open_versions = insert(CompanyHistory).from_select(
+        ["company_id", *HISTORY_FIELDS, "valid_from"],
+        select(Company.id, *[getattr(Company, field) for field in HISTORY_FIELDS], cast(bindparam("as_of", as_of), Date))
+        .where(
+            Company.id == any_(listed),
+            ~select(CompanyHistory.id).where(CompanyHistory.company_id == Company.id, is_open).exists()
+        )
+    )
+    return [correct, close_changed, close_delisted, open_versions]
+
+# NOTIFY channel carrying the latest change event seq; listeners read events from sd_change_events
+CHANGE_CHANNEL = "sd_company_changes"
+
+# Transaction-level advisory lock serializing change event appends. Seqs are
+# drawn at INSERT time but become visible at COMMIT, so without it a later seq
+# could commit (and be dispatched past) before an earlier one.
+CHANGE_FEED_LOCK_KEY = 0x5D_C4A9_6E
+
+# Fields published in change events
+CHANGE_FIELDS = ("ticker_symbol", "company_name", "exchange", "sector", "market_cap", "cik", "is_selected", "selection_date")
+
+def change_payload(data: dict) -> dict:
+    """JSON-safe subset of company fields for a change event"""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in data.items()
+        if key in CHANGE_FIELDS
+    }
+
+class ChangeEventRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, events: List[dict]) -> Optional[int]:
+        """Append change events and notify listeners, returning the last seq
+
+        Runs inside the caller's transaction: the events and the NOTIFY only
+        become visible when the caller commits the change they describe. The
+        append lock is held until then, so seqs commit in order.
+        """
+        if not events:
+            return None
+        await self.db.execute(select(func.pg_advisory_xact_lock(CHANGE_FEED_LOCK_KEY)))
+        result = await self.db.execute(insert(ChangeEvent).values(events).returning(ChangeEvent.seq))
+        seq = max(result.scalars().all())
+        await self.db.execute(select(func.pg_notify(CHANGE_CHANNEL, str(seq))))
+        return seq
+
+    async def get_since(self, seq: int, limit: int = 1000) -> List[ChangeEvent]:
+        """Events after a sequence number, oldest first"""
+        result = await self.db.execute(
+            select(ChangeEvent)
+            .where(ChangeEvent.seq > seq)
+            .order_by(ChangeEvent.seq)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_latest_seq(self) -> int:
+        result = await self.db.execute(select(func.coalesce(func.max(ChangeEvent.seq), 0)))
+        return result.scalar_one()
+
+    async def get_oldest_seq(self) -> Optional[int]:
+        """Oldest retained event, or None when the log is empty"""
+        result = await self.db.execute(select(func.min(ChangeEvent.seq)))
+        return result.scalar_one()
+
+    async def prune(self, before: datetime) -> int:
+        """Delete events older than a timestamp (clients behind them get a reset)"""
+        result = await self.db.execute(delete(ChangeEvent).where(ChangeEvent.created_at < before))
+        await self.db.commit()
+        return result.rowcount
+
+@traced_methods("repository")
 class CompanyRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.change_events = ChangeEventRepository(db)
 
     async def create(self, company_data: dict) -> Company:
         """Create a new company"""
         company = Company(**company_data)
         self.db.add(company)
+        await self.db.flush()
+        await self.change_events.record([{
+            "company_id": company.id,
+            "event_type": CHANGE_CREATED,
+            "changes": change_payload(company_data),
+        }])
+        await self.record_history([company.id])
         await self.db.commit()
+        entity_cache.invalidate(company.id, [company.ticker_symbol])
         await self.db.refresh(company)
         return company
 
     async def get_by_id(self, company_id: UUID) -> Optional[Company]:
-        """Get company by ID"""
+        """Get company by ID (read through the entity cache)"""
+        async def load():
+            result = await self.db.execute(
+                select(Company).where(Company.id == company_id)
+            )
+            return result.scalar_one_or_none()
+        return await entity_cache.get_by_id(self.db, company_id, load)
+
+    async def get_by_ticker(self, ticker_symbol: str) -> Optional[Company]:
+        """Get company by ticker symbol (read through the entity cache)"""
+        async def load():
+            result = await self.db.execute(
+                select(Company).where(Company.ticker_symbol == ticker_symbol.upper())
+            )
+            return result.scalar_one_or_none()
+        return await entity_cache.get_by_ticker(self.db, ticker_symbol, load)
+
+    async def get_by_ids(self, company_ids: List[UUID]) -> List[Company]:
+        """Get many companies by ID in a single `id = ANY(:ids)` query"""
+        if not company_ids:
+            return []
         result = await self.db.execute(
-            select(Company).where(Company.id == company_id)
+            select(Company).where(
+                Company.id == any_(bindparam("ids", list(set(company_ids)), type_=ARRAY(PG_UUID(as_uuid=True))))
+            )
         )
-        return result.scalar_one_or_none()
+        return result.scalars().all()
 
-    async def get_by_ticker(self, ticker_symbol: str) -> Optional[Company]:
-        """Get company by ticker symbol"""
+    async def get_by_tickers(self, ticker_symbols: List[str]) -> List[Company]:
+        """Get many companies by ticker symbol in a single `ticker_symbol = ANY(:tickers)` query"""
+        if not ticker_symbols:
+            return []
+        tickers = list({ticker.upper() for ticker in ticker_symbols})
         result = await self.db.execute(
-            select(Company).where(Company.ticker_symbol == ticker_symbol.upper())
+            select(Company).where(
+                Company.ticker_symbol == any_(bindparam("tickers", tickers, type_=ARRAY(Company.ticker_symbol.type)))
+            )
         )
-        return result.scalar_one_or_none()
+        return result.scalars().all()
 
     async def get_all(
         self,
@@ -40,26 +226,18 @@ class CompanyRepository:
         query: Optional[str] = None,
         exchange: Optional[str] = None,
         sector: Optional[str] = None,
-        is_selected: Optional[bool] = None
-    ) -> Tuple[List[Company], int]:
-        """Get companies with filtering and pagination"""
-
-        # Build base query
-        filters = []
-
-        if query:
-            filters.append(
-                or_(
-                    Company.ticker_symbol.ilike(f"%{query}%"),
-                    Company.company_name.ilike(f"%{query}%")
-                )
-            )
+        is_selected: Optional[bool] = None,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        sort: CompanySort = CompanySort.TICKER,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[list, int]:
+        """Get companies with filtering and pagination
 
-        if exchange:
-            filters.append(Company.exchange == exchange)
-
-        if sector:
-            filters.append(Company.sector == sector)
+        With `fields`, only those columns are selected and rows are returned
+        as plain dicts instead of Company instances.
+        """
+        filters = self._listing_filters(Company, query, exchange, sector, min_market_cap, max_market_cap)
 
         if is_selected is not None:
             filters.append(Company.is_selected == is_selected)
@@ -73,27 +251,329 @@ class CompanyRepository:
         total = count_result.scalar()
 
         # Data query with pagination
-        data_query = select(Company)
+        data_query = select(*company_columns(fields)) if fields else select(Company)
         if filters:
             data_query = data_query.where(and_(*filters))
 
         data_query = data_query.offset((page - 1) * size).limit(size)
-        data_query = data_query.order_by(Company.ticker_symbol)
+        data_query = data_query.order_by(*COMPANY_SORT_ORDERS[sort])
 
         result = await self.db.execute(data_query)
+        if fields:
+            return [dict(row) for row in result.mappings()], total
         companies = result.scalars().all()
 
         return companies, total
 
-    async def get_selected_companies(self) -> List[Company]:
-        """Get all selected companies"""
+    async def get_all_as_of(
+        self,
+        as_of: date,
+        page: int = 1,
+        size: int = 50,
+        query: Optional[str] = None,
+        exchange: Optional[str] = None,
+        sector: Optional[str] = None,
+        is_selected: Optional[bool] = None,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None,
+        sort: CompanySort = CompanySort.TICKER,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[list, int]:
+        """Get the universe as it was on a date from versioned history
+
+        Filters and sorts apply to the attributes valid on `as_of` (including
+        delisted companies and old tickers); selection flags are current.
+        Returns (CompanyHistory, Company) pairs, or dicts of `fields` when given.
+        """
+        filters = self._listing_filters(CompanyHistory, query, exchange, sector, min_market_cap, max_market_cap)
+        filters.append(CompanyHistory.validity().op("@>")(cast(bindparam("as_of", as_of), Date)))
+
+        if is_selected is not None:
+            filters.append(Company.is_selected == is_selected)
+
+        count_query = (
+            select(func.count(CompanyHistory.id))
+            .select_from(CompanyHistory)
+            .join(Company, Company.id == CompanyHistory.company_id)
+            .where(and_(*filters))
+        )
+        total = (await self.db.execute(count_query)).scalar()
+
+        data_query = (
+            select(*(company_columns(fields, historical=True) if fields else (CompanyHistory, Company)))
+            .select_from(CompanyHistory)
+            .join(Company, Company.id == CompanyHistory.company_id)
+            .where(and_(*filters))
+            .order_by(*HISTORY_SORT_ORDERS[sort])
+            .offset((page - 1) * size)
+            .limit(size)
+        )
+        result = await self.db.execute(data_query)
+        if fields:
+            return [dict(row) for row in result.mappings()], total
+        return result.all(), total
+
+    @staticmethod
+    def _listing_filters(
+        model,
+        query: Optional[str],
+        exchange: Optional[str],
+        sector: Optional[str],
+        min_market_cap: Optional[float],
+        max_market_cap: Optional[float]
+    ) -> list:
+        """Attribute filters shared by the current and as-of listings"""
+        filters = []
+
+        if query:
+            filters.append(
+                or_(
+                    model.ticker_symbol.ilike(f"%{query}%"),
+                    model.company_name.ilike(f"%{query}%")
+                )
+            )
+
+        if exchange:
+            filters.append(model.exchange == exchange)
+
+        if sector:
+            filters.append(model.sector == sector)
+
+        if min_market_cap is not None:
+            filters.append(model.market_cap >= min_market_cap)
+
+        if max_market_cap is not None:
+            filters.append(model.market_cap <= max_market_cap)
+
+        return filters
+
+    async def record_history(self, company_ids: List[UUID], as_of: Optional[date] = None):
+        """Version the current attributes of companies in sd_company_history (caller commits)"""
+        for statement in company_history_statements(as_of or date.today(), company_ids):
+            await self.db.execute(statement)
+
+    async def upsert_batch(self, rows: List[dict], as_of: Optional[date] = None, source: str = "import") -> Tuple[int, int]:
+        """Upsert screener rows by ticker in one statement, returning (created, updated) (caller commits)
+
+        Existing companies keep their exchange, CIK and selection; only rows
+        whose name, sector or market cap actually changed are rewritten, and
+        only those get change events and new history versions.
+        """
+        if not rows:
+            return 0, 0
+        # A default nextval() would be drawn for every conflicting row too; see assign_ordinals
+        statement = pg_insert(Company).values([{**row, "ordinal": None} for row in rows])
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[Company.ticker_symbol],
+            set_={
+                "company_name": excluded.company_name,
+                "sector": excluded.sector,
+                "market_cap": excluded.market_cap,
+                "updated_at": func.now(),
+            },
+            where=or_(
+                Company.company_name.is_distinct_from(excluded.company_name),
+                Company.sector.is_distinct_from(excluded.sector),
+                Company.market_cap.is_distinct_from(excluded.market_cap)
+            )
+        ).returning(
+            Company.id, Company.ticker_symbol, Company.company_name, Company.exchange,
+            Company.sector, Company.market_cap,
+            # xmax is 0 only for freshly inserted tuples
+            literal_column("xmax = 0").label("inserted")
+        )
+        changed = (await self.db.execute(statement)).all()
+        if not changed:
+            return 0, 0
+
+        events = []
+        for row in changed:
+            data = row._asdict()
+            if not row.inserted:
+                data = {field: data[field] for field in ("company_name", "sector", "market_cap")}
+            events.append({
+                "company_id": row.id,
+                "event_type": CHANGE_CREATED if row.inserted else CHANGE_UPDATED,
+                "changes": change_payload(data),
+                "source": source,
+            })
+        await self.change_events.record(events)
+        await self.record_history([row.id for row in changed], as_of)
+        await self.assign_ordinals([row.id for row in changed if row.inserted])
+
+        created = sum(1 for row in changed if row.inserted)
+        return created, len(changed) - created
+
+    async def assign_ordinals(self, company_ids: List[UUID]):
+        """Number companies that were inserted without an ordinal (caller commits)
+
+        Leaves updated_at alone: the rows are new, and their created_at
+        already moves them past the in-process caches' watermarks.
+        """
+        if not company_ids:
+            return
+        await self.db.execute(
+            update(Company)
+            .where(
+                Company.id == any_(bindparam("ids", list(company_ids), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                Company.ordinal.is_(None)
+            )
+            .values(ordinal=COMPANY_ORDINALS.next_value(), updated_at=Company.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_ordinals(self, company_ids: List[UUID]) -> Dict[UUID, int]:
+        """Ordinals of existing companies by ID (unknown IDs are left out)"""
+        if not company_ids:
+            return {}
+        result = await self.db.execute(
+            select(Company.id, Company.ordinal).where(
+                Company.id == any_(bindparam("ids", list(set(company_ids)), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                Company.ordinal.is_not(None)
+            )
+        )
+        return dict(result.all())
+
+    async def get_page_by_ordinals(self, ordinals: List[int], page: int = 1, size: int = 50) -> List[Company]:
+        """One page, in ticker order, of the companies with the given ordinals"""
+        if not ordinals:
+            return []
         result = await self.db.execute(
             select(Company)
+            .where(Company.ordinal == any_(bindparam("ordinals", ordinals, type_=ARRAY(Integer))))
+            .order_by(Company.ticker_symbol)
+            .offset((page - 1) * size)
+            .limit(size)
+        )
+        return result.scalars().all()
+
+    async def get_facet_rows(self, changed_since: Optional[datetime] = None) -> List[tuple]:
+        """(ordinal, exchange, sector, market_cap, changed_at) for the watchlist facet index"""
+        changed_at = func.coalesce(Company.updated_at, Company.created_at)
+        query = select(Company.ordinal, Company.exchange, Company.sector, Company.market_cap, changed_at).where(
+            Company.ordinal.is_not(None)
+        )
+        if changed_since is not None:
+            query = query.where(changed_at > changed_since)
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def record_delisted(self, exchange: str, listed_tickers: Iterable[str], as_of: date) -> int:
+        """Close the history of companies on an exchange that are missing from a full listing (caller commits)"""
+        tickers = bindparam("tickers", list(listed_tickers), type_=ARRAY(Company.ticker_symbol.type))
+        result = await self.db.execute(
+            select(Company.id).where(Company.exchange == exchange, Company.ticker_symbol != all_(tickers))
+        )
+        delisted_ids = result.scalars().all()
+        if delisted_ids:
+            for statement in company_history_statements(as_of, [], delisted_ids):
+                await self.db.execute(statement)
+        return len(delisted_ids)
+
+    async def get_selected_companies(self, fields: Optional[List[str]] = None) -> list:
+        """Get all selected companies (as dicts of `fields` when given)"""
+        result = await self.db.execute(
+            (select(*company_columns(fields)) if fields else select(Company))
             .where(Company.is_selected == True)
             .order_by(Company.ticker_symbol)
         )
+        if fields:
+            return [dict(row) for row in result.mappings()]
         return result.scalars().all()
 
+    async def get_selected_ciks(self) -> List[tuple]:
+        """Get (id, ticker_symbol, cik) for all selected companies"""
+        result = await self.db.execute(
+            select(Company.id, Company.ticker_symbol, Company.cik)
+            .where(Company.is_selected == True)
+        )
+        return result.all()
+
+    async def get_cik_map(self) -> Dict[str, List[UUID]]:
+        """Map CIK -> company ids for every company with a known CIK (share classes share a CIK)"""
+        result = await self.db.execute(
+            select(Company.cik, Company.id).where(Company.cik.is_not(None))
+        )
+        cik_map: Dict[str, List[UUID]] = {}
+        for cik, company_id in result:
+            cik_map.setdefault(cik, []).append(company_id)
+        return cik_map
+
+    async def get_without_cik(self) -> List[tuple]:
+        """Get (id, ticker_symbol) for companies whose CIK is not resolved yet"""
+        result = await self.db.execute(
+            select(Company.id, Company.ticker_symbol).where(Company.cik.is_(None))
+        )
+        return result.all()
+
+    async def set_ciks(self, ciks: Dict[UUID, str]):
+        """Store resolved CIKs for many companies in one executemany"""
+        if not ciks:
+            return
+        await self.record_ciks(ciks)
+        await self.db.commit()
+        for company_id in ciks:
+            entity_cache.invalidate(company_id)
+
+    async def record_ciks(self, ciks: Dict[UUID, str]):
+        """Write resolved CIKs and their change events (caller commits, then invalidates the entity cache)"""
+        if not ciks:
+            return
+        now = datetime.utcnow()
+        await self.db.execute(
+            update(Company),
+            [{"id": company_id, "cik": cik, "updated_at": now} for company_id, cik in ciks.items()]
+        )
+        # Other workers drop their cached copies when the events reach their change feed
+        await self.change_events.record([
+            {
+                "company_id": company_id,
+                "event_type": CHANGE_UPDATED,
+                "changes": change_payload({"cik": cik}),
+                "source": "collection",
+            }
+            for company_id, cik in ciks.items()
+        ])
+
+    async def get_screening_rows(self, changed_since: Optional[datetime] = None) -> List[tuple]:
+        """Get the columns used by the screening engine, optionally only rows changed since a timestamp"""
+        # Matches the ix_sd_companies_changed_at expression index
+        changed_at = func.coalesce(Company.updated_at, Company.created_at)
+        query = select(
+            Company.id,
+            Company.ticker_symbol,
+            Company.company_name,
+            Company.exchange,
+            Company.sector,
+            Company.market_cap,
+            Company.is_selected,
+            changed_at
+        )
+
+        if changed_since is not None:
+            query = query.where(changed_at > changed_since)
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_universe_source(self) -> Tuple[dict, int]:
+        """Identify the database the screening universe is read from, plus its company count
+
+        The identity changes when the cluster is re-initialized, DATABASE_URL
+        points elsewhere or sd_companies is recreated, so a saved universe can
+        tell whether it still describes this table.
+        """
+        system_identifier = select(literal_column("system_identifier")).select_from(func.pg_control_system())
+        result = await self.db.execute(select(
+            system_identifier.scalar_subquery(),
+            func.current_database(),
+            literal_column(f"'{Company.__tablename__}'::regclass::oid", BigInteger),
+            select(func.count()).select_from(Company).scalar_subquery(),
+        ))
+        system_id, database, table_oid, companies = result.one()
+        return {"system_identifier": str(system_id), "database": database, "table_oid": table_oid}, companies
+
     async def update(self, company_id: UUID, update_data: dict) -> Optional[Company]:
         """Update company"""
         update_data["updated_at"] = datetime.utcnow()
@@ -104,9 +584,21 @@ class CompanyRepository:
             .values(**update_data)
             .returning(Company)
         )
+        company = result.scalar_one_or_none()
+        changes = change_payload(update_data)
+        if company is not None and changes:
+            await self.change_events.record([{
+                "company_id": company_id,
+                "event_type": CHANGE_UPDATED,
+                "changes": changes,
+            }])
+            if any(field in update_data for field in HISTORY_FIELDS):
+                await self.record_history([company_id])
 
         await self.db.commit()
-        return result.scalar_one_or_none()
+        if company is not None:
+            entity_cache.invalidate(company_id, [company.ticker_symbol])
+        return company
 
     async def select_company(self, company_id: UUID, selected: bool, notes: Optional[str] = None) -> Optional[Company]:
         """Select or deselect a company for tracking"""
@@ -124,9 +616,18 @@ class CompanyRepository:
             .values(**update_data)
             .returning(Company)
         )
+        company = result.scalar_one_or_none()
+        if company is not None:
+            await self.change_events.record([{
+                "company_id": company_id,
+                "event_type": CHANGE_SELECTED if selected else CHANGE_DESELECTED,
+                "changes": change_payload(update_data),
+            }])
 
         await self.db.commit()
-        return result.scalar_one_or_none()
+        if company is not None:
+            entity_cache.invalidate(company_id)
+        return company
 
     async def get_unique_exchanges(self) -> List[str]:
         """Get list of unique exchanges"""
@@ -143,4 +644,62 @@ class CompanyRepository:
             .distinct()
             .order_by(Company.sector)
         )
-        return [row[0] for row in result]
\ No newline at end of file
+        return [row[0] for row in result]
+
+@traced_methods("repository")
+class WatchlistRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_for_owner(self, owner: str) -> List[Watchlist]:
+        """A client's watchlists by name, without their member bitmaps"""
+        result = await self.db.execute(
+            select(Watchlist)
+            .options(defer(Watchlist.members))
+            .where(Watchlist.owner == owner)
+            .order_by(Watchlist.name)
+        )
+        return result.scalars().all()
+
+    async def get(self, owner: str, watchlist_id: UUID, for_update: bool = False) -> Optional[Watchlist]:
+        """Get one of a client's watchlists, optionally locked for a member update"""
+        query = select(Watchlist).where(Watchlist.id == watchlist_id, Watchlist.owner == owner)
+        if for_update:
+            query = query.with_for_update()
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_many(self, owner: str, watchlist_ids: List[UUID]) -> List[Watchlist]:
+        if not watchlist_ids:
+            return []
+        result = await self.db.execute(
+            select(Watchlist).where(
+                Watchlist.id == any_(bindparam("ids", list(set(watchlist_ids)), type_=ARRAY(PG_UUID(as_uuid=True)))),
+                Watchlist.owner == owner
+            )
+        )
+        return result.scalars().all()
+
+    async def get_by_name(self, owner: str, name: str) -> Optional[Watchlist]:
+        result = await self.db.execute(
+            select(Watchlist).options(defer(Watchlist.members)).where(Watchlist.owner == owner, Watchlist.name == name)
+        )
+        return result.scalar_one_or_none()
+
+    async def create(self, owner: str, name: str, members: bytes, member_count: int) -> Watchlist:
+        watchlist = Watchlist(owner=owner, name=name, members=members, member_count=member_count)
+        self.db.add(watchlist)
+        await self.db.commit()
+        await self.db.refresh(watchlist)
+        return watchlist
+
+    async def save_members(self, watchlist: Watchlist, members: bytes, member_count: int) -> Watchlist:
+        watchlist.members = members
+        watchlist.member_count = member_count
+        await self.db.commit()
+        await self.db.refresh(watchlist)
+        return watchlist
+
+    async def delete(self, watchlist: Watchlist):
+        await self.db.delete(watchlist)
+        await self.db.commit()
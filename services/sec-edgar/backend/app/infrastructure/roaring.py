@@ -0,0 +1,280 @@
+"""
+Compressed bitmaps of 32-bit integers in the Roaring layout, on NumPy
+
+Values are split by their high 16 bits into containers of low halves. A
+container holding at most 4096 values is a sorted uint16 array (2 bytes per
+value); a denser one is a 65536-bit bitmap of 1024 uint64 words (8 KiB).
+Set operations only visit the keys both sides share, so intersecting a
+50-company watchlist with a 5000-company sector costs about 50 lookups
+rather than a pass over the whole universe.
+
+serialize() writes the portable Roaring format without run containers
+(cookie 12346), the same bytes CRoaring / pyroaring and the Java library
+produce and read.
+"""
+
+import struct
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+# Containers with more values than this are stored as bitmaps
+ARRAY_MAX = 4096
+BITMAP_WORDS = 1024
+SERIAL_COOKIE_NO_RUNCONTAINER = 12346
+
+WORD_DTYPE = np.dtype("<u8")
+VALUE_DTYPE = np.dtype("<u2")
+
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def popcount(words: np.ndarray) -> int:
+    return np.count_nonzero(np.unpackbits(words.view(np.uint8)))
+
+
+def to_words(values: np.ndarray) -> np.ndarray:
+    """Bitmap container for a sorted array container"""
+    bits = np.zeros(1 << 16, dtype=bool)
+    bits[values] = True
+    return np.packbits(bits, bitorder="little").view(WORD_DTYPE)
+
+
+def to_values(words: np.ndarray) -> np.ndarray:
+    """Sorted array container for a bitmap container"""
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little")).astype(VALUE_DTYPE)
+
+
+def contains(words: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Membership mask of array container values in a bitmap container"""
+    return (words[values >> 6] & _BITS[values & 63]) != 0
+
+
+def membership(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Mask of the values of sorted array `a` found in sorted array `b` (binary search, cheaper than isin)"""
+    positions = np.searchsorted(b, a)
+    positions[positions == len(b)] = 0
+    return b[positions] == a
+
+
+def is_bitmap(container: np.ndarray) -> bool:
+    return container.dtype == WORD_DTYPE
+
+
+def cardinality(container: np.ndarray) -> int:
+    return popcount(container) if is_bitmap(container) else len(container)
+
+
+def normalized(container: np.ndarray) -> Optional[np.ndarray]:
+    """Pick the smaller representation for a container, or None when it is empty"""
+    if is_bitmap(container):
+        count = popcount(container)
+        if count > ARRAY_MAX:
+            return container
+        container = to_values(container)
+    elif len(container) > ARRAY_MAX:
+        return to_words(container)
+    return container if len(container) else None
+
+
+def container_and(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+    if is_bitmap(a) and is_bitmap(b):
+        return normalized(a & b)
+    if is_bitmap(a):
+        a, b = b, a
+    if is_bitmap(b):
+        return normalized(a[contains(b, a)])
+    if len(a) > len(b):
+        a, b = b, a
+    return normalized(a[membership(a, b)])
+
+
+def container_and_count(a: np.ndarray, b: np.ndarray) -> int:
+    if is_bitmap(a) and is_bitmap(b):
+        return popcount(a & b)
+    if is_bitmap(a):
+        a, b = b, a
+    if is_bitmap(b):
+        return int(np.count_nonzero(contains(b, a)))
+    if len(a) > len(b):
+        a, b = b, a
+    return int(np.count_nonzero(membership(a, b)))
+
+
+def container_or(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if not is_bitmap(a) and not is_bitmap(b) and len(a) + len(b) <= ARRAY_MAX:
+        return np.union1d(a, b).astype(VALUE_DTYPE)
+    words_a = a if is_bitmap(a) else to_words(a)
+    words_b = b if is_bitmap(b) else to_words(b)
+    if is_bitmap(a) or is_bitmap(b):
+        # A union is at least as large as a bitmap operand, so it stays a bitmap
+        return words_a | words_b
+    return normalized(words_a | words_b)
+
+
+def container_andnot(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+    if is_bitmap(a):
+        return normalized(a & ~(b if is_bitmap(b) else to_words(b)))
+    if is_bitmap(b):
+        return normalized(a[~contains(b, a)])
+    return normalized(a[~membership(a, b)])
+
+
+class RoaringBitmap:
+    """Set of unsigned 32-bit integers stored as Roaring containers keyed by the high 16 bits"""
+
+    def __init__(self, values: Union[Iterable[int], np.ndarray] = ()):
+        self.containers: Dict[int, np.ndarray] = {}
+        values = np.unique(np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.uint32))
+        if not len(values):
+            return
+        highs = values >> 16
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        for chunk in np.split(values, bounds):
+            self.containers[int(chunk[0] >> 16)] = normalized((chunk & 0xFFFF).astype(VALUE_DTYPE))
+
+    @classmethod
+    def _from_containers(cls, containers: Dict[int, np.ndarray]) -> "RoaringBitmap":
+        bitmap = cls.__new__(cls)
+        bitmap.containers = containers
+        return bitmap
+
+    def __len__(self) -> int:
+        return sum(cardinality(container) for container in self.containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def __contains__(self, value: int) -> bool:
+        container = self.containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if is_bitmap(container):
+            return bool((int(container[low >> 6]) >> (low & 63)) & 1)
+        index = np.searchsorted(container, low)
+        return bool(index < len(container) and container[index] == low)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RoaringBitmap) or self.containers.keys() != other.containers.keys():
+            return False
+        return all(
+            np.array_equal(container, other.containers[key]) for key, container in self.containers.items()
+        )
+
+    def __repr__(self) -> str:
+        return f"<RoaringBitmap({len(self)} values in {len(self.containers)} containers)>"
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        containers = {}
+        for key in self.containers.keys() & other.containers.keys():
+            container = container_and(self.containers[key], other.containers[key])
+            if container is not None:
+                containers[key] = container
+        return self._from_containers(containers)
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        containers = dict(self.containers)
+        for key, container in other.containers.items():
+            mine = containers.get(key)
+            containers[key] = container if mine is None else container_or(mine, container)
+        return self._from_containers(containers)
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        containers = {}
+        for key, container in self.containers.items():
+            theirs = other.containers.get(key)
+            if theirs is not None:
+                container = container_andnot(container, theirs)
+            if container is not None:
+                containers[key] = container
+        return self._from_containers(containers)
+
+    def intersection_len(self, other: "RoaringBitmap") -> int:
+        """len(self & other) without building the intersection"""
+        return sum(
+            container_and_count(self.containers[key], other.containers[key])
+            for key in self.containers.keys() & other.containers.keys()
+        )
+
+    @classmethod
+    def union(cls, bitmaps: Iterable["RoaringBitmap"]) -> "RoaringBitmap":
+        result = cls._from_containers({})
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    def add(self, value: int):
+        """Add one value in place"""
+        key, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(key)
+        if container is None:
+            self.containers[key] = np.array([low], dtype=VALUE_DTYPE)
+        elif is_bitmap(container):
+            # Containers may be shared with the operands of earlier set operations
+            container = container.copy()
+            container[low >> 6] |= np.uint64(1) << np.uint64(low & 63)
+            self.containers[key] = container
+        else:
+            index = np.searchsorted(container, low)
+            if index == len(container) or container[index] != low:
+                self.containers[key] = normalized(np.insert(container, index, low))
+
+    def discard(self, value: int):
+        """Remove one value in place if present"""
+        key, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(key)
+        if container is None:
+            return
+        if is_bitmap(container):
+            container = container.copy()
+            container[low >> 6] &= ~(np.uint64(1) << np.uint64(low & 63))
+        else:
+            index = np.searchsorted(container, low)
+            if index == len(container) or container[index] != low:
+                return
+            container = np.delete(container, index)
+        container = normalized(container)
+        if container is None:
+            del self.containers[key]
+        else:
+            self.containers[key] = container
+
+    def to_array(self) -> np.ndarray:
+        """Sorted uint32 values"""
+        if not self.containers:
+            return np.zeros(0, dtype=np.uint32)
+        return np.concatenate([
+            (np.uint32(key) << np.uint32(16)) | (to_values(container) if is_bitmap(container) else container).astype(np.uint32)
+            for key, container in sorted(self.containers.items())
+        ])
+
+    def serialize(self) -> bytes:
+        """Portable Roaring format without run containers"""
+        keys = sorted(self.containers)
+        counts = [cardinality(self.containers[key]) for key in keys]
+        header = struct.pack("<II", SERIAL_COOKIE_NO_RUNCONTAINER, len(keys))
+        header += b"".join(struct.pack("<HH", key, count - 1) for key, count in zip(keys, counts))
+        offset = len(header) + 4 * len(keys)
+        offsets = []
+        for count in counts:
+            offsets.append(offset)
+            offset += 2 * count if count <= ARRAY_MAX else 8 * BITMAP_WORDS
+        payload = b"".join(self.containers[key].tobytes() for key in keys)
+        return header + struct.pack(f"<{len(keys)}I", *offsets) + payload
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> "RoaringBitmap":
+        cookie, size = struct.unpack_from("<II", data)
+        if cookie != SERIAL_COOKIE_NO_RUNCONTAINER:
+            raise ValueError(f"Unsupported Roaring serialization cookie {cookie}")
+        descriptive = np.frombuffer(data, dtype=VALUE_DTYPE, count=2 * size, offset=8).reshape(-1, 2)
+        offsets = np.frombuffer(data, dtype=np.dtype("<u4"), count=size, offset=8 + 4 * size)
+        containers = {}
+        for (key, count_minus_one), offset in zip(descriptive.tolist(), offsets.tolist()):
+            count = count_minus_one + 1
+            if count <= ARRAY_MAX:
+                containers[key] = np.frombuffer(data, dtype=VALUE_DTYPE, count=count, offset=offset).copy()
+            else:
+                containers[key] = np.frombuffer(data, dtype=WORD_DTYPE, count=BITMAP_WORDS, offset=offset).copy()
+        return cls._from_containers(containers)
@@ -0,0 +1,435 @@
+"""
+Sampled request tracing
+
+A sampled request records a tree of timed spans: the API middleware opens
+the root span, TracedRoute adds the endpoint and its response encoding,
+@traced_methods classes add service and repository calls, and engine /
+session events add every SQL statement plus the connection checkout and
+BEGIN a session does before its first statement. Requests that are not
+sampled pay one contextvar lookup per instrumented call.
+
+Sampling is decided once per request at the edge (head-based): a
+TRACE_SAMPLE_RATE fraction of requests. A W3C `traceparent` header joins a
+sampled request to the caller's trace; its sampled flag only decides when
+TRACE_TRUST_TRACEPARENT is set, since any client can send one. Finished
+traces are exported off the request path as OTLP JSON spans: one per line
+to TRACE_EXPORT_PATH (rotated at TRACE_EXPORT_MAX_BYTES), and/or posted to
+an OTLP/HTTP collector at TRACE_OTLP_ENDPOINT. Tracing is off unless one of
+the two is configured.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+# Let an incoming traceparent's sampled flag decide (only for callers behind a trusted proxy)
+TRACE_TRUST_TRACEPARENT = os.getenv("TRACE_TRUST_TRACEPARENT", "false").lower() == "true"
+# JSON lines file of finished spans (unset disables)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+# The file is rotated to `<path>.1` once it would grow past this
+TRACE_EXPORT_MAX_BYTES = int(os.getenv("TRACE_EXPORT_MAX_BYTES", str(64 * 1024 * 1024)))
+# OTLP/HTTP JSON traces endpoint, e.g. http://localhost:4318/v1/traces
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "")
+
+SERVICE_NAME = "sec-edgar-api"
+# SQL text kept per statement span
+MAX_STATEMENT_CHARS = 500
+# A runaway request stops recording spans beyond this
+MAX_SPANS = 1000
+
+# Server-Timing phases in request order; each reports the time spent in its own spans, excluding children
+PHASES = {
+    "request": "middleware",
+    "route": "parameters and dependencies",
+    "router": "endpoint",
+    "service": "service",
+    "repository": "repository",
+    "db-connect": "connection checkout and BEGIN",
+    "sql": "SQL",
+    "encode": "response validation and encoding",
+}
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace"""
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    phase: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, object] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return max(0, self.end_ns - self.start_ns) / 1e6
+
+
+def new_id(nbytes: int) -> str:
+    return random.getrandbits(nbytes * 8).to_bytes(nbytes, "big").hex()
+
+
+class Trace:
+    """Spans of one sampled request, timestamped from a monotonic clock anchored to wall time"""
+
+    def __init__(self, trace_id: Optional[str] = None, remote_parent_id: Optional[str] = None):
+        self.trace_id = trace_id or new_id(16)
+        self.remote_parent_id = remote_parent_id
+        self.spans: List[Span] = []
+        # Set by TracedRoute when the endpoint returns, where response encoding starts
+        self.endpoint_returned_ns: Optional[int] = None
+        self._wall_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+
+    def now_ns(self) -> int:
+        return self._wall_ns + time.perf_counter_ns() - self._perf_ns
+
+    def start_span(self, name: str, phase: str, parent: Optional[Span], attributes: Optional[dict] = None,
+                   start_ns: Optional[int] = None) -> Optional[Span]:
+        if len(self.spans) >= MAX_SPANS:
+            return None
+        span = Span(
+            span_id=new_id(8),
+            parent_id=parent.span_id if parent else self.remote_parent_id,
+            name=name,
+            phase=phase,
+            start_ns=start_ns or self.now_ns(),
+            attributes=attributes or {}
+        )
+        self.spans.append(span)
+        return span
+
+
+# (trace, innermost open span) of the running request, None when it is not sampled
+_current: ContextVar[Optional[Tuple[Trace, Optional[Span]]]] = ContextVar("trace_current", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    current = _current.get()
+    return current[0] if current else None
+
+
+@contextmanager
+def span(name: str, phase: str, **attributes):
+    """Time a block as a child of the current span (a no-op when the request is not sampled)"""
+    current = _current.get()
+    opened = current[0].start_span(name, phase, current[1], attributes) if current else None
+    if opened is None:
+        yield None
+        return
+    trace = current[0]
+    token = _current.set((trace, opened))
+    try:
+        yield opened
+    except BaseException as e:
+        opened.error = type(e).__name__
+        raise
+    finally:
+        opened.end_ns = trace.now_ns()
+        _current.reset(token)
+
+
+def traced(phase: str, name: Optional[str] = None):
+    """Decorator recording a span around an async function"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return await fn(*args, **kwargs)
+            with span(span_name, phase):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def traced_methods(phase: str):
+    """Class decorator recording a span around every public async method"""
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+                setattr(cls, attr, traced(phase)(value))
+        return cls
+    return decorate
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def server_timing(trace: Trace) -> str:
+    """Server-Timing header value: the total plus self time per phase"""
+    if not trace.spans:
+        return ""
+    child_ms: Dict[str, float] = defaultdict(float)
+    for item in trace.spans:
+        if item.parent_id:
+            child_ms[item.parent_id] += item.duration_ms
+    self_ms: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for item in trace.spans:
+        self_ms[item.phase] += max(0.0, item.duration_ms - child_ms[item.span_id])
+        counts[item.phase] += 1
+
+    metrics = [f"total;dur={trace.spans[0].duration_ms:.2f}"]
+    for phase, description in PHASES.items():
+        if phase in self_ms:
+            if phase == "sql":
+                description = f"{counts[phase]} {'query' if counts[phase] == 1 else 'queries'}"
+            metrics.append(f'{phase};dur={self_ms[phase]:.2f};desc="{description}"')
+    return ", ".join(metrics)
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(trace: Trace, item: Span) -> dict:
+    """A span in OTLP/JSON form"""
+    record = {
+        "traceId": trace.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": KIND_SERVER if item.phase == "request" else KIND_CLIENT if item.phase == "sql" else KIND_INTERNAL,
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": [
+            {"key": key, "value": otlp_value(value)}
+            for key, value in {"app.phase": item.phase, **item.attributes}.items()
+            if value is not None
+        ],
+    }
+    if item.parent_id:
+        record["parentSpanId"] = item.parent_id
+    if item.error:
+        record["status"] = {"code": 2, "message": item.error}
+    return record
+
+
+class JsonLinesExporter:
+    """Appends OTLP/JSON spans to a local file, one span per line
+
+    Before a write would take the file past `max_bytes` it is renamed to
+    `<path>.1` (replacing the previous one), so at most twice that is kept.
+    """
+
+    def __init__(self, path: str, max_bytes: int = TRACE_EXPORT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    async def export(self, trace: Trace):
+        lines = "".join(json.dumps(otlp_span(trace, item), separators=(",", ":")) + "\n" for item in trace.spans)
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: str):
+        data = lines.encode("utf-8")
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(data) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "ab") as file:
+                file.write(data)
+
+    async def close(self):
+        pass
+
+
+class OtlpHttpExporter:
+    """Posts each trace to an OTLP/HTTP JSON collector"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def export(self, trace: Trace):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=5.0)
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [otlp_span(trace, item) for item in trace.spans]}],
+        }]}
+        try:
+            response = await self._client.post(self.endpoint, json=payload)
+            if response.status_code >= 400:
+                logger.warning(f"⚠️ Trace collector answered HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Trace export failed: {e}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+
+class Tracer:
+    """Samples requests, holds the active trace in a contextvar and exports finished traces"""
+
+    def __init__(
+        self,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        exporters: Optional[list] = None,
+        trust_traceparent: bool = TRACE_TRUST_TRACEPARENT
+    ):
+        self.sample_rate = sample_rate
+        self.trust_traceparent = trust_traceparent
+        self.exporters = exporters if exporters is not None else default_exporters()
+        self._pending = set()
+
+    def sample(self, traceparent: Optional[str] = None) -> Optional[Trace]:
+        """A new trace when this request is sampled, else None"""
+        if not self.exporters:
+            return None
+        remote = parse_traceparent(traceparent)
+        if remote is not None and self.trust_traceparent:
+            trace_id, parent_id, sampled = remote
+            return Trace(trace_id, parent_id) if sampled else None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            # Sampled here, but still part of the caller's trace
+            return Trace(*remote[:2]) if remote is not None else Trace()
+        return None
+
+    @contextmanager
+    def activate(self, trace: Trace, name: str, **attributes):
+        """Make `trace` current and open its root span"""
+        token = _current.set((trace, None))
+        try:
+            with span(name, "request", **attributes) as root:
+                yield root
+        finally:
+            _current.reset(token)
+
+    def submit(self, trace: Trace):
+        """Export a finished trace in the background"""
+        for exporter in self.exporters:
+            task = asyncio.create_task(exporter.export(trace))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        for exporter in self.exporters:
+            await exporter.close()
+
+
+def default_exporters() -> list:
+    exporters = []
+    if TRACE_EXPORT_PATH:
+        exporters.append(JsonLinesExporter(TRACE_EXPORT_PATH))
+    if TRACE_OTLP_ENDPOINT:
+        exporters.append(OtlpHttpExporter(TRACE_OTLP_ENDPOINT))
+    return exporters
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _current.get()
+    if current is None:
+        return
+    trace, parent = current
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    opened = trace.start_span(f"sql {verb}", "sql", parent, {
+        "db.system": "postgresql",
+        "db.statement": statement[:MAX_STATEMENT_CHARS],
+        "db.executemany": executemany,
+    })
+    if opened is not None:
+        context._trace_span = (trace, opened)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    traced_span = getattr(context, "_trace_span", None)
+    if traced_span is not None:
+        trace, opened = traced_span
+        opened.end_ns = trace.now_ns()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            opened.attributes["db.rows"] = cursor.rowcount
+        context._trace_span = None
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    traced_span = getattr(context, "_trace_span", None) if context is not None else None
+    if traced_span is not None:
+        trace, opened = traced_span
+        opened.end_ns = trace.now_ns()
+        opened.error = type(exception_context.original_exception).__name__
+        context._trace_span = None
+
+
+def _session_execute(orm_execute_state):
+    # The first statement of a session checks a connection out of the pool and begins a transaction
+    session = orm_execute_state.session
+    current = _current.get()
+    if current is None or session.in_transaction():
+        return
+    opened = current[0].start_span("db connect", "db-connect", current[1])
+    if opened is not None:
+        session.info["trace_connect"] = (current[0], opened)
+
+
+def _session_begin(session, transaction, connection):
+    traced_span = session.info.pop("trace_connect", None)
+    if traced_span is not None:
+        trace, opened = traced_span
+        opened.end_ns = trace.now_ns()
+
+
+def instrument_engine(engine):
+    """Record SQL statements and connection checkouts of sampled requests"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    if not event.contains(Session, "do_orm_execute", _session_execute):
+        event.listen(Session, "do_orm_execute", _session_execute)
+        event.listen(Session, "after_begin", _session_begin)
+
+
+tracer = Tracer()
@@ -0,0 +1,192 @@
+"""
+Binary, memory-mappable snapshot of the company universe
+
+Layout (little-endian):
+
+    header   8s magic | u64 generation | u64 rows | u64 metadata length
+    metadata JSON: format version, watermark, origin (optional, written
+             by the warm-start saver), category dictionaries and the
+             offset/dtype/count of every column
+    columns  64-byte aligned arrays:
+             ids            S16  (UUID bytes)
+             tickers        S10  (fixed-width ASCII)
+             name_offsets   i8   (rows + 1 offsets into name_blob)
+             name_blob      u1   (UTF-8 company names, concatenated)
+             exchange_codes i2
+             sector_codes   i2
+             market_cap     f8
+             is_selected    ?
+
+Snapshots are written to a temporary file and atomically renamed over the
+target path, so readers either see the previous generation or the new one.
+The watermark is the newest coalesce(updated_at, created_at) the snapshot
+reflects; a reader that needs current data catches up from there.
+Readers map the file read-only and wrap each column with np.frombuffer, so
+every worker shares the same page-cache pages (place the file on /dev/shm to
+keep it purely in memory).
+"""
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b"USUNIV01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sQQQ")
+ALIGNMENT = 64
+
+UNIVERSE_SNAPSHOT_PATH = os.getenv("UNIVERSE_SNAPSHOT_PATH")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+@dataclass
+class SnapshotColumns:
+    """Plain column arrays making up one snapshot"""
+    ids: np.ndarray
+    tickers: np.ndarray
+    name_offsets: np.ndarray
+    name_blob: np.ndarray
+    exchange_codes: np.ndarray
+    sector_codes: np.ndarray
+    market_cap: np.ndarray
+    is_selected: np.ndarray
+    exchanges: List[str]
+    sectors: List[str]
+
+    COLUMN_NAMES = (
+        "ids", "tickers", "name_offsets", "name_blob",
+        "exchange_codes", "sector_codes", "market_cap", "is_selected",
+    )
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+
+def encode_names(names) -> tuple:
+    """Pack names into (offsets, blob) arrays"""
+    encoded = [(name or "").encode("utf-8") for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def decode_names(offsets: np.ndarray, blob: np.ndarray) -> List[str]:
+    """Unpack names packed by encode_names"""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+
+def read_generation(path: str) -> int:
+    """Read the generation of an existing snapshot, or 0 if there is none"""
+    try:
+        with open(path, "rb") as file:
+            magic, generation, _, _ = HEADER.unpack(file.read(HEADER.size))
+    except (FileNotFoundError, struct.error):
+        return 0
+    return generation if magic == MAGIC else 0
+
+
+def write_snapshot(
+    path: str,
+    columns: SnapshotColumns,
+    generation: int,
+    watermark: Optional[datetime] = None,
+    origin: Optional[dict] = None
+) -> int:
+    """Write a snapshot atomically and return the number of bytes written"""
+    layout: Dict[str, dict] = {}
+    offset = 0
+    for name in SnapshotColumns.COLUMN_NAMES:
+        array = np.ascontiguousarray(getattr(columns, name))
+        offset = _align(offset)
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "count": int(len(array))}
+        offset += array.nbytes
+    data_size = offset
+
+    metadata = json.dumps({
+        "format_version": FORMAT_VERSION,
+        "watermark": watermark.isoformat() if watermark else None,
+        "origin": origin,
+        "exchanges": columns.exchanges,
+        "sectors": columns.sectors,
+        "columns": layout,
+    }).encode("utf-8")
+    data_start = _align(HEADER.size + len(metadata))
+
+    # Several processes may write the same path (e.g. warm-start files), so keep temp names unique
+    tmp_path = f"{path}.{os.getpid()}.{generation}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, generation, columns.rows, len(metadata)))
+        file.write(metadata)
+        for name in SnapshotColumns.COLUMN_NAMES:
+            array = np.ascontiguousarray(getattr(columns, name))
+            file.seek(data_start + layout[name]["offset"])
+            file.write(array.tobytes())
+        file.truncate(data_start + data_size)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, path)
+    return data_start + data_size
+
+
+class UniverseSnapshot:
+    """Read-only, zero-copy view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a universe snapshot")
+        magic, self.generation, self.rows, metadata_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a universe snapshot")
+
+        metadata = json.loads(self._mmap[HEADER.size:HEADER.size + metadata_length])
+        if metadata["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {metadata['format_version']}")
+
+        self.watermark = datetime.fromisoformat(metadata["watermark"]) if metadata["watermark"] else None
+        self.origin: dict = metadata.get("origin") or {}
+        data_start = _align(HEADER.size + metadata_length)
+
+        arrays = {
+            name: np.frombuffer(
+                self._mmap,
+                dtype=np.dtype(spec["dtype"]),
+                count=spec["count"],
+                offset=data_start + spec["offset"],
+            )
+            for name, spec in metadata["columns"].items()
+        }
+        self.columns = SnapshotColumns(
+            exchanges=metadata["exchanges"],
+            sectors=metadata["sectors"],
+            **arrays,
+        )
+
+    @staticmethod
+    def current_identity(path: str) -> Optional[tuple]:
+        """Identity of the file currently at `path` (changes on every publish)"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
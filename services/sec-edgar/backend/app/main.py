@@ -1,9 +1,16 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from app.api.middleware import auth_middleware
+from app.api.middleware import auth_middleware, tracing_middleware
+from app.api.rate_limit import rate_limiter
+from app.api.response_cache import response_cache
 from app.api.routers import api_router
-from app.infrastructure.database import init_db
+from app.infrastructure.database import AsyncSessionLocal, engine, init_db
+from app.infrastructure.entity_cache import entity_cache
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.infrastructure.tracing import instrument_engine, tracer
+from app.services.stock_discovery.change_feed import change_feed_hub
+from app.services.stock_discovery.screening_engine import screening_engine
 import uvicorn
 import logging
 import traceback
@@ -32,6 +39,13 @@ app.add_middleware(
 # Add authentication middleware
 app.middleware("http")(auth_middleware)
 
+# Sampled tracing wraps everything else, so a trace's total is the whole request
+app.middleware("http")(tracing_middleware)
+instrument_engine(engine)
+
+# Company lookups are cached while the change feed delivers invalidations from other processes
+entity_cache.attach(change_feed_hub)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -62,6 +76,19 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    # Start the screening universe from local disk, so the first screen only catches up
+    if screening_engine.warm_start_path and not screening_engine.snapshot_path:
+        async with AsyncSessionLocal() as session:
+            await screening_engine.warm_start(screening_engine.warm_start_path, CompanyRepository(session))
+    if entity_cache.enabled:
+        await change_feed_hub.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await change_feed_hub.stop()
+    await screening_engine.save_warm_start()
+    await rate_limiter.close()
+    await tracer.close()
 
 @app.get("/")
 async def root():
@@ -71,5 +98,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/caches")
+async def cache_stats():
+    """Hit rates, evictions and sizes of the in-process caches"""
+    return {"entity_cache": entity_cache.stats(), "response_cache": response_cache.stats()}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
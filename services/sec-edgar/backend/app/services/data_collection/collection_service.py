@@ -0,0 +1,141 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Tuple
+from uuid import UUID
+from datetime import date, timedelta
+
+from app.infrastructure.external.edgar import EdgarClient
+from app.infrastructure.repositories.data_collection import CollectionJobRepository, SECDataRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.data_collection.report_calendar import ReportCalendarService
+from app.shared.models.data_collection import (
+    CollectionEnqueueResponse, CollectionJobStats, CollectionWorkerStats
+)
+from app.shared.exceptions import CompanyNotFoundError, CIKNotFoundError
+
+def parse_recent_filings(company_id: UUID, submissions: dict) -> List[dict]:
+    """Flatten the column-oriented `filings.recent` block of a submissions document"""
+    recent = (submissions.get("filings") or {}).get("recent") or {}
+    accession_numbers = recent.get("accessionNumber") or []
+    forms = recent.get("form") or []
+    filing_dates = recent.get("filingDate") or []
+    report_dates = recent.get("reportDate") or []
+    documents = recent.get("primaryDocument") or []
+
+    filings = []
+    for i, accession_number in enumerate(accession_numbers):
+        if i >= len(forms) or i >= len(filing_dates) or not filing_dates[i]:
+            continue
+        report_date = report_dates[i] if i < len(report_dates) else None
+        document = documents[i] if i < len(documents) else None
+        filings.append({
+            "company_id": company_id,
+            "accession_number": accession_number,
+            "filing_type": forms[i][:20],
+            "filing_date": date.fromisoformat(filing_dates[i]),
+            "report_date": date.fromisoformat(report_date) if report_date else None,
+            "primary_document": document[:255] if document else None,
+        })
+    return filings
+
+async def resolve_ciks(
+    company_repo: CompanyRepository,
+    edgar: EdgarClient,
+    missing: List[Tuple[UUID, str]]
+) -> Dict[UUID, str]:
+    """Resolve and store CIKs for (company id, ticker) pairs from EDGAR's ticker map"""
+    if not missing:
+        return {}
+    ticker_ciks = await edgar.get_ticker_ciks()
+    resolved = {
+        company_id: ticker_ciks[ticker]
+        for company_id, ticker in missing
+        if ticker in ticker_ciks
+    }
+    await company_repo.set_ciks(resolved)
+    return resolved
+
+class CollectionService:
+    def __init__(self, db: AsyncSession):
+        self.job_repo = CollectionJobRepository(db)
+        self.sec_data_repo = SECDataRepository(db)
+        self.company_repo = CompanyRepository(db)
+        self.calendar_service = ReportCalendarService(db)
+
+    async def enqueue_selected_companies(self, priority: int = 0) -> CollectionEnqueueResponse:
+        """Queue a collection job for every selected company"""
+        enqueued = await self.job_repo.enqueue_selected(priority)
+        return CollectionEnqueueResponse(
+            enqueued=enqueued,
+            message=f"Enqueued {enqueued} selected companies for collection"
+        )
+
+    async def enqueue_due_companies(
+        self,
+        days_ahead: int = 3,
+        days_overdue: int = 14,
+        recheck_hours: int = 12,
+        priority: int = 5
+    ) -> CollectionEnqueueResponse:
+        """Queue collection only for selected companies inside a report filing window"""
+        today = date.today()
+        enqueued = await self.job_repo.enqueue_due(
+            today - timedelta(days=days_overdue),
+            today + timedelta(days=days_ahead),
+            recheck_hours * 3600,
+            priority
+        )
+        return CollectionEnqueueResponse(
+            enqueued=enqueued,
+            message=f"Enqueued {enqueued} companies with reports due between "
+                    f"{today - timedelta(days=days_overdue)} and {today + timedelta(days=days_ahead)}"
+        )
+
+    async def get_job_stats(self) -> CollectionJobStats:
+        """Get collection queue depth by status"""
+        counts = await self.job_repo.get_status_counts()
+        return CollectionJobStats(
+            pending=counts.get("pending", 0),
+            leased=counts.get("leased", 0),
+            completed=counts.get("completed", 0),
+            failed=counts.get("failed", 0),
+            expired_leases=counts.get("expired_leases", 0)
+        )
+
+    async def get_worker_stats(self) -> List[CollectionWorkerStats]:
+        """Get per-worker throughput"""
+        stats = []
+        for worker, is_active in await self.job_repo.get_workers():
+            elapsed = (worker.heartbeat_at - worker.started_at).total_seconds()
+            stats.append(CollectionWorkerStats(
+                worker_id=worker.worker_id,
+                hostname=worker.hostname,
+                started_at=worker.started_at,
+                heartbeat_at=worker.heartbeat_at,
+                jobs_completed=worker.jobs_completed,
+                jobs_failed=worker.jobs_failed,
+                requests_made=worker.requests_made,
+                jobs_per_second=worker.jobs_completed / elapsed if elapsed > 0 else 0.0,
+                is_active=bool(is_active)
+            ))
+        return stats
+
+    async def collect_company(self, company_id: UUID, edgar: EdgarClient) -> int:
+        """Fetch a company's filing index from EDGAR and store new filings"""
+        company = await self.company_repo.get_by_id(company_id)
+        if not company:
+            raise CompanyNotFoundError(f"Company with ID {company_id} not found")
+
+        cik = company.cik
+        if not cik:
+            cik = (await edgar.get_ticker_ciks()).get(company.ticker_symbol)
+            if not cik:
+                raise CIKNotFoundError(f"No CIK found for ticker {company.ticker_symbol}")
+            await self.company_repo.update(company_id, {"cik": cik})
+
+        submissions = await edgar.get_submissions(cik)
+        if submissions is None:
+            raise CIKNotFoundError(f"No EDGAR submissions found for CIK {cik}")
+
+        stored = await self.sec_data_repo.upsert_filings(parse_recent_filings(company_id, submissions))
+        await self.calendar_service.refresh([company_id])
+        return stored
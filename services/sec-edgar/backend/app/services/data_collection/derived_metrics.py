@@ -0,0 +1,224 @@
+import calendar
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.cold_storage import ColdStore
+from app.infrastructure.repositories.data_collection import DerivedMetricsRepository, FinancialFactRepository
+from app.services.data_management.cold_storage import cold_facts
+
+# Metric -> (unit, concepts in order of preference)
+DURATION_METRICS = {
+    "revenue": ("USD", ("Revenues", "RevenueFromContractWithCustomerExcludingAssessedTax")),
+    "gross_profit": ("USD", ("GrossProfit",)),
+    "operating_income": ("USD", ("OperatingIncomeLoss",)),
+    "net_income": ("USD", ("NetIncomeLoss",)),
+    "eps_diluted": ("USD-per-shares", ("EarningsPerShareDiluted",)),
+}
+INSTANT_METRICS = {
+    "assets": ("USD", ("Assets",)),
+    "stockholders_equity": ("USD", ("StockholdersEquity",)),
+}
+SOURCE_CONCEPTS = {
+    concept
+    for _, concepts in list(DURATION_METRICS.values()) + list(INSTANT_METRICS.values())
+    for concept in concepts
+}
+
+# A changed quarter feeds TTM sums for the next 3 quarters and YoY growth 4 quarters later
+DERIVATION_HORIZON = 4
+
+RECOMPUTE_BATCH = 500
+
+def parse_period(period: str) -> Optional[Tuple[str, int]]:
+    """Frame period -> (kind, index): quarters and instants index as year * 4 + quarter - 1, years as the year"""
+    if not period.startswith("CY") or len(period) < 6 or not period[2:6].isdigit():
+        return None
+    year = int(period[2:6])
+    rest = period[6:]
+    if rest == "":
+        return "annual", year
+    if len(rest) >= 2 and rest[0] == "Q" and rest[1] in "1234":
+        kind = "instant" if rest[2:] == "I" else "quarter"
+        return kind, year * 4 + int(rest[1]) - 1
+    return None
+
+def quarter_name(index: int) -> str:
+    return f"CY{index // 4}Q{index % 4 + 1}"
+
+def quarter_end(index: int) -> date:
+    year, month = index // 4, (index % 4 + 1) * 3
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+def affected_quarters(period: str) -> Set[int]:
+    """Quarters whose derived metrics can change when a fact for `period` changes"""
+    parsed = parse_period(period)
+    if parsed is None:
+        return set()
+    kind, index = parsed
+    if kind == "annual":
+        # Annual facts only fill in the fourth quarter
+        index = index * 4 + 3
+    return set(range(index, index + DERIVATION_HORIZON + 1))
+
+def derive_company_metrics(
+    company_id: UUID,
+    facts: Iterable[Tuple[str, str, str, float]],
+    quarters: Optional[Set[int]] = None
+) -> List[dict]:
+    """Derive quarterly metrics for one company from (concept, unit, period, value) facts
+
+    Frames are already aligned to calendar quarters, so fiscal periods meet
+    on one grid. Missing fourth quarters (companies report the fiscal year
+    instead of Q4) are derived as annual minus Q1..Q3. TTM sums, YoY growth
+    and margins are computed over the whole grid with array operations;
+    only `quarters` (all if None) are returned.
+    """
+    metrics = {**DURATION_METRICS, **INSTANT_METRICS}
+    # (metric, kind) -> index -> (preference rank, value)
+    values: Dict[Tuple[str, str], Dict[int, Tuple[int, float]]] = {}
+    for concept, unit, period, value in facts:
+        parsed = parse_period(period)
+        if parsed is None:
+            continue
+        kind, index = parsed
+        for metric, (metric_unit, concepts) in metrics.items():
+            if concept in concepts and unit == metric_unit:
+                if (kind == "instant") != (metric in INSTANT_METRICS):
+                    continue
+                slot = values.setdefault((metric, kind), {})
+                rank = concepts.index(concept)
+                if index not in slot or rank < slot[index][0]:
+                    slot[index] = (rank, value)
+
+    quarter_indexes = [
+        index if kind != "annual" else index * 4 + 3
+        for (_, kind), slot in values.items()
+        for index in slot
+    ]
+    if not quarter_indexes:
+        return []
+
+    # Grid of whole years so quarters reshape into a (years, 4) matrix
+    first_year = min(quarter_indexes) // 4
+    last_year = max(quarter_indexes) // 4
+    start = first_year * 4
+    size = (last_year - first_year + 1) * 4
+
+    def series(metric: str, kind: str) -> np.ndarray:
+        array = np.full(size, np.nan)
+        for index, (_, value) in values.get((metric, kind), {}).items():
+            array[index - start] = value
+        return array
+
+    def annual_series(metric: str) -> np.ndarray:
+        array = np.full(size // 4, np.nan)
+        for year, (_, value) in values.get((metric, "annual"), {}).items():
+            array[year - first_year] = value
+        return array
+
+    grid = {}
+    for metric in DURATION_METRICS:
+        quarterly = series(metric, "quarter")
+        by_year = quarterly.reshape(-1, 4)
+        annual = annual_series(metric)
+        fill_q4 = np.isnan(by_year[:, 3]) & ~np.isnan(annual) & ~np.isnan(by_year[:, :3]).any(axis=1)
+        by_year[fill_q4, 3] = annual[fill_q4] - by_year[fill_q4, :3].sum(axis=1)
+        grid[metric] = quarterly
+    for metric in INSTANT_METRICS:
+        grid[metric] = series(metric, "instant")
+
+    def ttm(array: np.ndarray) -> np.ndarray:
+        result = np.full(size, np.nan)
+        if size >= 4:
+            # NaN in any of the four quarters leaves the TTM value undefined
+            result[3:] = np.lib.stride_tricks.sliding_window_view(array, 4).sum(axis=1)
+        return result
+
+    def yoy(array: np.ndarray) -> np.ndarray:
+        result = np.full(size, np.nan)
+        previous = array[:-4]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[4:] = np.where(previous > 0, array[4:] / previous - 1, np.nan)
+        return result
+
+    def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denominator > 0, numerator / denominator, np.nan)
+
+    derived = {
+        **grid,
+        "revenue_ttm": ttm(grid["revenue"]),
+        "revenue_yoy": yoy(grid["revenue"]),
+        "gross_margin": ratio(grid["gross_profit"], grid["revenue"]),
+        "operating_margin": ratio(grid["operating_income"], grid["revenue"]),
+        "net_income_ttm": ttm(grid["net_income"]),
+        "net_income_yoy": yoy(grid["net_income"]),
+        "net_margin": ratio(grid["net_income"], grid["revenue"]),
+        "eps_diluted_ttm": ttm(grid["eps_diluted"]),
+    }
+    derived["return_on_equity_ttm"] = ratio(derived["net_income_ttm"], grid["stockholders_equity"])
+
+    present = np.zeros(size, dtype=bool)
+    for metric in grid:
+        present |= ~np.isnan(grid[metric])
+
+    rows = []
+    columns = list(derived)
+    matrix = np.vstack([derived[column] for column in columns])
+    for offset in np.flatnonzero(present):
+        index = start + int(offset)
+        if quarters is not None and index not in quarters:
+            continue
+        row = {"company_id": company_id, "period": quarter_name(index), "period_end": quarter_end(index)}
+        for column, value in zip(columns, matrix[:, offset]):
+            row[column] = None if np.isnan(value) else float(value)
+        rows.append(row)
+    return rows
+
+class DerivedMetricsService:
+    """Materializes TTM, growth and margin metrics when new facts land"""
+
+    def __init__(self, db: AsyncSession, cold_store: ColdStore = cold_facts):
+        self.fact_repo = FinancialFactRepository(db)
+        self.metrics_repo = DerivedMetricsRepository(db)
+        self.cold_store = cold_store
+
+    async def recompute(self, changes: Iterable[Tuple[UUID, str]]) -> int:
+        """Recompute only the companies and quarters affected by changed (company_id, period) facts"""
+        affected: Dict[UUID, Set[int]] = {}
+        for company_id, period in changes:
+            affected.setdefault(company_id, set()).update(affected_quarters(period))
+        return await self._recompute(affected)
+
+    async def recompute_companies(self, company_ids: List[UUID]) -> int:
+        """Recompute every quarter for the given companies"""
+        return await self._recompute({company_id: None for company_id in company_ids})
+
+    async def _recompute(self, affected: Dict[UUID, Optional[Set[int]]]) -> int:
+        company_ids = list(affected)
+        written = 0
+        for start in range(0, len(company_ids), RECOMPUTE_BATCH):
+            batch = company_ids[start:start + RECOMPUTE_BATCH]
+            facts: Dict[UUID, List[tuple]] = {company_id: [] for company_id in batch}
+            for company_id, concept, unit, period, value in await self.fact_repo.get_company_facts(batch, SOURCE_CONCEPTS):
+                facts[company_id].append((concept, unit, period, value))
+            # Older quarters may have been tiered out of Postgres; they still feed TTM and YoY.
+            # Hot facts come first so they win over archived copies of the same period.
+            cold = self.cold_store.read(
+                [str(company_id) for company_id in batch],
+                filters={"concept": SOURCE_CONCEPTS},
+                columns=["company_id", "concept", "unit", "period", "value"]
+            )
+            for row in cold.to_pylist():
+                facts[UUID(row["company_id"])].append((row["concept"], row["unit"], row["period"], row["value"]))
+
+            rows = []
+            for company_id in batch:
+                rows.extend(derive_company_metrics(company_id, facts[company_id], affected[company_id]))
+            if rows:
+                written += await self.metrics_repo.upsert_metrics(rows)
+        return written
@@ -0,0 +1,198 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.external.edgar import EdgarClient
+from app.infrastructure.repositories.data_collection import (
+    CollectionJobRepository, FeedCursorRepository, FilingStatusRepository
+)
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.data_collection.collection_service import resolve_ciks
+from app.shared.models.data_collection import FeedDayResult
+
+logger = logging.getLogger(__name__)
+
+DAILY_INDEX_FEED = "edgar-daily-index"
+
+# Forms that trigger a collection run for a watched company
+COLLECTED_FORMS = {"10-K", "10-K/A", "10-Q", "10-Q/A", "20-F", "20-F/A", "40-F", "40-F/A"}
+ANNUAL_FORMS = {"10-K", "10-K/A", "20-F", "20-F/A", "40-F", "40-F/A"}
+
+# Periodic reports land roughly a quarter apart; annual ones a year apart
+QUARTERLY_CADENCE = timedelta(days=91)
+ANNUAL_CADENCE = timedelta(days=365)
+
+# Feed jobs jump ahead of interval-scheduled ones
+FEED_JOB_PRIORITY = 10
+
+# Daily indexes for the last few days may simply not be published yet
+PUBLICATION_GRACE_DAYS = 2
+
+class IndexEntry(NamedTuple):
+    form_type: str
+    company_name: str
+    cik: int
+    date_filed: date
+    file_name: str
+
+    @property
+    def accession_number(self) -> str:
+        return self.file_name.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+
+def parse_form_index(lines: Iterable[str]) -> Iterator[IndexEntry]:
+    """Parse an EDGAR daily-index form.idx file
+
+    Rows are fixed-width, but long company names can overflow into the CIK
+    column, so the date and file name are taken from the right, the CIK from
+    the file path, and only the form / company split uses the header offset.
+    """
+    lines = iter(lines)
+    name_offset = None
+    for line in lines:
+        if line.startswith("Form Type"):
+            name_offset = line.index("Company Name")
+            break
+    if name_offset is None:
+        return
+
+    for line in lines:
+        parts = line.rstrip().rsplit(None, 2)
+        if len(parts) != 3 or len(parts[1]) != 8 or not parts[1].isdigit():
+            continue
+        head, date_filed, file_name = parts
+        path = file_name.split("/")
+        if len(path) < 4 or not path[2].isdigit():
+            continue
+        head = head.rstrip()
+        if head.endswith(path[2]):
+            head = head[:-len(path[2])]
+        yield IndexEntry(
+            form_type=head[:name_offset].strip(),
+            company_name=head[name_offset:].strip(),
+            cik=int(path[2]),
+            date_filed=date(int(date_filed[:4]), int(date_filed[4:6]), int(date_filed[6:])),
+            file_name=file_name,
+        )
+
+def expected_next_filing(form_type: str, filed: date, last_annual: Optional[date]) -> Tuple[str, date]:
+    """Estimate the next periodic report from the latest one
+
+    The next report is due a quarter after this one; it is the annual report
+    when that date falls near the anniversary of the last annual filing.
+    """
+    next_date = filed + QUARTERLY_CADENCE
+    if form_type in ANNUAL_FORMS:
+        return "10-Q", next_date
+    if last_annual is not None and abs((last_annual + ANNUAL_CADENCE - next_date).days) <= 45:
+        return "10-K", last_annual + ANNUAL_CADENCE
+    return "10-Q", next_date
+
+class FilingFeedService:
+    """Turns the EDGAR daily filing index into collection jobs for watched companies"""
+
+    def __init__(self, db: AsyncSession):
+        self.company_repo = CompanyRepository(db)
+        self.job_repo = CollectionJobRepository(db)
+        self.status_repo = FilingStatusRepository(db)
+        self.cursor_repo = FeedCursorRepository(db)
+
+    async def load_watchlist(self, edgar: Optional[EdgarClient] = None) -> Dict[int, List[UUID]]:
+        """Map CIK -> selected company ids (share classes share a CIK), resolving missing CIKs once"""
+        rows = await self.company_repo.get_selected_ciks()
+        watchlist: Dict[int, List[UUID]] = {}
+        for company_id, _, cik in rows:
+            if cik:
+                watchlist.setdefault(int(cik), []).append(company_id)
+
+        missing = [(company_id, ticker) for company_id, ticker, cik in rows if not cik]
+        if missing and edgar is not None:
+            resolved = await resolve_ciks(self.company_repo, edgar, missing)
+            for company_id, cik in resolved.items():
+                watchlist.setdefault(int(cik), []).append(company_id)
+            if len(resolved) < len(missing):
+                logger.warning(f"⚠️  {len(missing) - len(resolved)} selected companies have no CIK")
+
+        return watchlist
+
+    async def process_entries(
+        self,
+        day: date,
+        entries: Iterable[IndexEntry],
+        watchlist: Dict[int, List[UUID]]
+    ) -> FeedDayResult:
+        """Enqueue collection for watched companies that filed and update their expected dates"""
+        total = 0
+        filed: Dict[UUID, IndexEntry] = {}
+        for entry in entries:
+            total += 1
+            company_ids = watchlist.get(entry.cik)
+            if not company_ids or entry.form_type not in COLLECTED_FORMS:
+                continue
+            for company_id in company_ids:
+                # Keep the annual report if a company filed several forms the same day
+                current = filed.get(company_id)
+                if current is None or entry.form_type in ANNUAL_FORMS:
+                    filed[company_id] = entry
+
+        if not filed:
+            return FeedDayResult(day=day, published=True, entries=total)
+
+        enqueued = await self.job_repo.enqueue_companies(list(filed), FEED_JOB_PRIORITY)
+        await self.status_repo.upsert_statuses(await self._next_statuses(filed))
+        return FeedDayResult(day=day, published=True, entries=total, matched=len(filed), enqueued=enqueued)
+
+    async def _next_statuses(self, filed: Dict[UUID, IndexEntry]) -> List[dict]:
+        existing = {
+            status.company_id: status
+            for status in await self.status_repo.get_by_company_ids(list(filed))
+        }
+        statuses = []
+        for company_id, entry in filed.items():
+            previous = existing.get(company_id)
+            if previous is not None and previous.last_filing_date and previous.last_filing_date > entry.date_filed:
+                # Replaying an older index must not move the status backwards
+                continue
+            last_annual = previous.last_annual_filing_date if previous is not None else None
+            if entry.form_type in ANNUAL_FORMS:
+                last_annual = entry.date_filed
+            next_form, next_date = expected_next_filing(entry.form_type, entry.date_filed, last_annual)
+            statuses.append({
+                "company_id": company_id,
+                "cik": str(entry.cik).zfill(10),
+                "last_form": entry.form_type,
+                "last_filing_date": entry.date_filed,
+                "last_accession_number": entry.accession_number,
+                "last_annual_filing_date": last_annual,
+                "next_expected_form": next_form,
+                "next_expected_date": next_date,
+            })
+        return statuses
+
+    async def process_day(self, day: date, edgar: EdgarClient, watchlist: Dict[int, List[UUID]]) -> FeedDayResult:
+        """Fetch and process one day's form index"""
+        text = await edgar.get_daily_index(day)
+        if text is None:
+            return FeedDayResult(day=day, published=False)
+        return await self.process_entries(day, parse_form_index(text.splitlines()), watchlist)
+
+    async def catch_up(self, edgar: EdgarClient, until: Optional[date] = None) -> List[FeedDayResult]:
+        """Process every daily index since the feed cursor, one request per business day"""
+        until = until or date.today()
+        last = await self.cursor_repo.get(DAILY_INDEX_FEED) or until - timedelta(days=2)
+        watchlist = await self.load_watchlist(edgar)
+
+        results = []
+        day = last + timedelta(days=1)
+        while day <= until:
+            if day.weekday() < 5:
+                result = await self.process_day(day, edgar, watchlist)
+                if not result.published and (until - day).days <= PUBLICATION_GRACE_DAYS:
+                    # Not published yet; retry from here next time
+                    break
+                results.append(result)
+            await self.cursor_repo.advance(DAILY_INDEX_FEED, day)
+            day += timedelta(days=1)
+        return results
@@ -0,0 +1,160 @@
+import logging
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.external.edgar import EdgarClient, format_cik
+from app.infrastructure.repositories.data_collection import FinancialFactRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.data_collection.collection_service import resolve_ciks
+from app.services.data_collection.derived_metrics import DerivedMetricsService
+from app.shared.models.data_collection import FrameIngestResult
+
+logger = logging.getLogger(__name__)
+
+class FrameConcept(NamedTuple):
+    taxonomy: str
+    concept: str
+    unit: str
+    # Balance-sheet concepts are point-in-time (CY2024Q1I frames)
+    instant: bool = False
+
+# Universe-wide metrics refreshed by default: one request per concept per period
+DEFAULT_FRAME_CONCEPTS = [
+    FrameConcept("us-gaap", "Revenues", "USD"),
+    FrameConcept("us-gaap", "RevenueFromContractWithCustomerExcludingAssessedTax", "USD"),
+    FrameConcept("us-gaap", "GrossProfit", "USD"),
+    FrameConcept("us-gaap", "OperatingIncomeLoss", "USD"),
+    FrameConcept("us-gaap", "NetIncomeLoss", "USD"),
+    FrameConcept("us-gaap", "EarningsPerShareDiluted", "USD-per-shares"),
+    FrameConcept("us-gaap", "Assets", "USD", instant=True),
+    FrameConcept("us-gaap", "StockholdersEquity", "USD", instant=True),
+]
+
+def recent_quarters(count: int, today: Optional[date] = None) -> List[str]:
+    """The last `count` completed calendar quarters as frame periods, oldest first"""
+    today = today or date.today()
+    year, quarter = today.year, (today.month - 1) // 3 + 1
+    periods = []
+    for _ in range(count):
+        quarter -= 1
+        if quarter == 0:
+            year, quarter = year - 1, 4
+        periods.append(f"CY{year}Q{quarter}")
+    return list(reversed(periods))
+
+def frame_period(period: str, instant: bool) -> str:
+    """Frame name for a concept: instant concepts use the `I` suffix"""
+    if instant and not period.endswith("I"):
+        return f"{period}I"
+    return period
+
+def parse_frame(document: dict, cik_map: Dict[str, List[UUID]], source: str = "frames") -> List[dict]:
+    """Join a frames document to companies by CIK, producing fact rows"""
+    taxonomy = document["taxonomy"]
+    concept = document["tag"]
+    unit = document["uom"]
+    period = document["ccp"]
+
+    facts = []
+    for point in document.get("data", []):
+        company_ids = cik_map.get(format_cik(point["cik"]))
+        if not company_ids or point.get("val") is None or not point.get("end"):
+            continue
+        start = point.get("start")
+        for company_id in company_ids:
+            facts.append({
+                "company_id": company_id,
+                "cik": format_cik(point["cik"]),
+                "taxonomy": taxonomy,
+                "concept": concept,
+                "unit": unit,
+                "period": period,
+                "period_start": date.fromisoformat(start) if start else None,
+                "period_end": date.fromisoformat(point["end"]),
+                "value": float(point["val"]),
+                "accession_number": point.get("accn"),
+                "source": source,
+            })
+    return facts
+
+class FramesIngestionService:
+    """Loads one XBRL concept for every company per request via the EDGAR frames API"""
+
+    def __init__(self, db: AsyncSession):
+        self.company_repo = CompanyRepository(db)
+        self.fact_repo = FinancialFactRepository(db)
+        self.metrics_service = DerivedMetricsService(db)
+        self._cik_map: Optional[Dict[str, List[UUID]]] = None
+        # (company_id, period) facts changed since derived metrics were last recomputed
+        self.pending_changes: List[Tuple[UUID, str]] = []
+
+    async def load_cik_map(self, edgar: Optional[EdgarClient] = None) -> Dict[str, List[UUID]]:
+        """CIK -> company ids for the whole universe, resolving missing CIKs once"""
+        if self._cik_map is None:
+            if edgar is not None:
+                missing = await self.company_repo.get_without_cik()
+                resolved = await resolve_ciks(self.company_repo, edgar, missing)
+                if len(resolved) < len(missing):
+                    logger.info(f"ℹ️  {len(missing) - len(resolved)} companies have no CIK and are skipped")
+            self._cik_map = await self.company_repo.get_cik_map()
+        return self._cik_map
+
+    async def ingest_frame(
+        self,
+        edgar: EdgarClient,
+        concept: FrameConcept,
+        period: str,
+        derive: bool = True
+    ) -> FrameIngestResult:
+        """Fetch one concept / unit / period for all filers and upsert it into the fact store
+
+        With derive=False the changed facts are queued and derived metrics are
+        recomputed once by derive_pending, instead of after every frame.
+        """
+        cik_map = await self.load_cik_map(edgar)
+        frame = frame_period(period, concept.instant)
+        document = await edgar.get_frame(concept.taxonomy, concept.concept, concept.unit, frame)
+        if document is None:
+            return FrameIngestResult(
+                taxonomy=concept.taxonomy, concept=concept.concept, unit=concept.unit,
+                period=frame, filers=0, matched=0, upserted=0
+            )
+
+        facts = parse_frame(document, cik_map)
+        changed = await self.fact_repo.upsert_facts(facts)
+        self.pending_changes.extend(changed)
+        derived = await self.derive_pending() if derive else 0
+        return FrameIngestResult(
+            taxonomy=concept.taxonomy,
+            concept=concept.concept,
+            unit=concept.unit,
+            period=frame,
+            filers=len(document.get("data", [])),
+            matched=len(facts),
+            upserted=len(changed),
+            derived=derived
+        )
+
+    async def ingest(
+        self,
+        edgar: EdgarClient,
+        concepts: List[FrameConcept],
+        periods: List[str]
+    ) -> List[FrameIngestResult]:
+        """Refresh every concept for every period"""
+        results = []
+        for concept in concepts:
+            for period in periods:
+                results.append(await self.ingest_frame(edgar, concept, period, derive=False))
+        await self.derive_pending()
+        return results
+
+    async def derive_pending(self) -> int:
+        """Recompute derived metrics for the companies and quarters touched by queued fact changes"""
+        if not self.pending_changes:
+            return 0
+        changes, self.pending_changes = self.pending_changes, []
+        return await self.metrics_service.recompute(changes)
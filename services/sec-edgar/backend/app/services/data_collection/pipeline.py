@@ -0,0 +1,388 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.entity_cache import entity_cache
+from app.infrastructure.external.edgar import EdgarClient
+from app.infrastructure.repositories.data_collection import FILING_COLUMNS, SECDataRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.data_collection.collection_service import parse_recent_filings
+from app.services.data_collection.report_calendar import ReportCalendarService
+from app.shared.exceptions import CompanyNotFoundError, CIKNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Concurrent EDGAR fetches; the client's rate limiter still caps requests/second
+PIPELINE_FETCH_CONCURRENCY = int(os.getenv("PIPELINE_FETCH_CONCURRENCY", "8"))
+# Parser processes; 0 parses on the event loop
+PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Companies buffered between two stages before the upstream stage has to wait
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+# Filing rows per write transaction, and how long the writer waits to fill one
+PIPELINE_WRITE_BATCH_ROWS = int(os.getenv("PIPELINE_WRITE_BATCH_ROWS", "5000"))
+PIPELINE_WRITE_LINGER_MS = float(os.getenv("PIPELINE_WRITE_LINGER_MS", "50"))
+# Batches at least this large are loaded with COPY instead of multi-row INSERTs
+PIPELINE_COPY_MIN_ROWS = int(os.getenv("PIPELINE_COPY_MIN_ROWS", "2000"))
+
+STOP = object()
+
+
+def parse_submissions(company_id: UUID, content: bytes) -> List[tuple]:
+    """Decode a submissions document into filing rows without their id and company_id
+
+    Runs in a parser process, so the result is kept to plain tuples that
+    are cheap to pickle back.
+    """
+    return [
+        tuple(filing[column] for column in FILING_COLUMNS[2:])
+        for filing in parse_recent_filings(company_id, json.loads(content))
+    ]
+
+
+class CollectionWork:
+    """One company moving through the pipeline"""
+
+    __slots__ = ("company_id", "future", "cik", "new_cik", "content", "filings")
+
+    def __init__(self, company_id: UUID, future: asyncio.Future):
+        self.company_id = company_id
+        self.future = future
+        self.cik: Optional[str] = None
+        # Set when the CIK was resolved from the ticker map and still has to be stored
+        self.new_cik: Optional[str] = None
+        self.content: Optional[bytes] = None
+        self.filings: List[tuple] = []
+
+    def finish(self, stored: int):
+        if not self.future.done():
+            self.future.set_result(stored)
+
+    def fail(self, error: Exception):
+        if not self.future.done():
+            self.future.set_exception(error)
+
+
+class StageMetrics:
+    """Work and wait time of one stage
+
+    `starved` is time spent waiting for input (the stage is faster than
+    its upstream) and `stalled` is time spent waiting for room in the
+    downstream queue (backpressure from a slower stage).
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.rows = 0
+        self.errors = 0
+        self.batches = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.stalled = 0.0
+
+    def as_dict(self, elapsed: float) -> dict:
+        capacity = elapsed * self.workers
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "rows": self.rows,
+            "errors": self.errors,
+            "batches": self.batches,
+            "items_per_second": round(self.items / elapsed, 2) if elapsed > 0 else 0.0,
+            "busy_seconds": round(self.busy, 3),
+            "starved_seconds": round(self.starved, 3),
+            "stalled_seconds": round(self.stalled, 3),
+            "utilization": round(self.busy / capacity, 3) if capacity > 0 else 0.0,
+        }
+
+
+class StageQueue:
+    """Bounded queue between two stages that records its depth and charges waits to the stages"""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.max_depth = 0
+        self._depth_total = 0
+        self._samples = 0
+
+    async def put(self, item, metrics: StageMetrics):
+        started = time.perf_counter()
+        await self.queue.put(item)
+        metrics.stalled += time.perf_counter() - started
+        self._sample()
+
+    async def get(self, metrics: StageMetrics, timeout: Optional[float] = None):
+        """Next item; raises asyncio.TimeoutError if none arrives within `timeout`"""
+        started = time.perf_counter()
+        try:
+            if timeout is None:
+                return await self.queue.get()
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        finally:
+            metrics.starved += time.perf_counter() - started
+
+    def _sample(self):
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._samples += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "size": self.queue.maxsize,
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "mean_depth": round(self._depth_total / self._samples, 2) if self._samples else 0.0,
+        }
+
+
+class CollectionPipeline:
+    """Collects companies' filing indexes through fetch → parse → write stages
+
+    Fetch tasks download submissions documents concurrently, parser
+    processes decode them off the event loop, and a single writer stores
+    the filings of many companies per transaction (multi-row INSERTs, or
+    COPY for large batches) and refreshes their report calendars together.
+    Stages are connected by bounded queues, so a slow stage makes the ones
+    before it wait instead of buffering without limit; the wait times and
+    queue depths in stats() show which stage is the bottleneck.
+    """
+
+    def __init__(
+        self,
+        edgar: EdgarClient,
+        session_factory=AsyncSessionLocal,
+        fetch_concurrency: int = PIPELINE_FETCH_CONCURRENCY,
+        parse_workers: int = PIPELINE_PARSE_WORKERS,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        write_batch_rows: int = PIPELINE_WRITE_BATCH_ROWS,
+        write_linger_ms: float = PIPELINE_WRITE_LINGER_MS,
+        copy_min_rows: int = PIPELINE_COPY_MIN_ROWS
+    ):
+        self.edgar = edgar
+        self.session_factory = session_factory
+        self.fetch_concurrency = fetch_concurrency
+        self.parse_workers = parse_workers
+        self.write_batch_rows = write_batch_rows
+        self.write_linger = write_linger_ms / 1000
+        self.copy_min_rows = copy_min_rows
+
+        # Each queue is named after the stage that reads from it
+        self.queues = {
+            "fetch": StageQueue("fetch", queue_size),
+            "parse": StageQueue("parse", queue_size),
+            "write": StageQueue("write", queue_size),
+        }
+        self.metrics = {
+            "submit": StageMetrics("submit", 1),
+            "fetch": StageMetrics("fetch", fetch_concurrency),
+            "parse": StageMetrics("parse", max(1, parse_workers)),
+            "write": StageMetrics("write", 1),
+        }
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: Dict[str, List[asyncio.Task]] = {}
+        self._started: Optional[float] = None
+
+    async def start(self):
+        if self._tasks:
+            return
+        if self.parse_workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        self._started = time.perf_counter()
+        self._tasks = {
+            "fetch": [
+                asyncio.create_task(self._run_stage("fetch", "parse", self._fetch))
+                for _ in range(self.fetch_concurrency)
+            ],
+            "parse": [
+                asyncio.create_task(self._run_stage("parse", "write", self._parse))
+                for _ in range(max(1, self.parse_workers))
+            ],
+            "write": [asyncio.create_task(self._write_loop())],
+        }
+
+    async def close(self):
+        """Let queued companies finish, then stop the stages and the parser processes"""
+        try:
+            for stage in ("fetch", "parse", "write"):
+                tasks = self._tasks.get(stage, [])
+                for _ in tasks:
+                    await self.queues[stage].queue.put(STOP)
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for tasks in self._tasks.values():
+                for task in tasks:
+                    task.cancel()
+            self._tasks = {}
+            # Nothing will pick these up any more
+            for queue in self.queues.values():
+                while not queue.queue.empty():
+                    work = queue.queue.get_nowait()
+                    if work is not STOP:
+                        work.future.cancel()
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def collect(self, company_id: UUID) -> int:
+        """Run a company through the pipeline, returning the number of new filings stored"""
+        work = CollectionWork(company_id, asyncio.get_running_loop().create_future())
+        await self.queues["fetch"].put(work, self.metrics["submit"])
+        self.metrics["submit"].items += 1
+        return await work.future
+
+    async def _run_stage(self, name: str, downstream: str, handler):
+        metrics = self.metrics[name]
+        while True:
+            work = await self.queues[name].get(metrics)
+            if work is STOP:
+                return
+            started = time.perf_counter()
+            try:
+                await handler(work)
+            except asyncio.CancelledError:
+                work.future.cancel()
+                raise
+            except Exception as e:
+                metrics.errors += 1
+                work.fail(e)
+                continue
+            finally:
+                metrics.busy += time.perf_counter() - started
+            metrics.items += 1
+            await self.queues[downstream].put(work, metrics)
+
+    async def _fetch(self, work: CollectionWork):
+        async with self.session_factory() as session:
+            company = await CompanyRepository(session).get_by_id(work.company_id)
+        if not company:
+            raise CompanyNotFoundError(f"Company with ID {work.company_id} not found")
+
+        work.cik = company.cik
+        if not work.cik:
+            work.cik = (await self.edgar.get_ticker_ciks()).get(company.ticker_symbol)
+            if not work.cik:
+                raise CIKNotFoundError(f"No CIK found for ticker {company.ticker_symbol}")
+            work.new_cik = work.cik
+
+        work.content = await self.edgar.get_submissions_content(work.cik)
+        if work.content is None:
+            raise CIKNotFoundError(f"No EDGAR submissions found for CIK {work.cik}")
+
+    async def _parse(self, work: CollectionWork):
+        if self._pool is None:
+            work.filings = parse_submissions(work.company_id, work.content)
+        else:
+            work.filings = await asyncio.get_running_loop().run_in_executor(
+                self._pool, parse_submissions, work.company_id, work.content
+            )
+        work.content = None
+        self.metrics["parse"].rows += len(work.filings)
+
+    async def _write_loop(self):
+        """Gather parsed companies into batches of about write_batch_rows rows and store each batch"""
+        metrics = self.metrics["write"]
+        queue = self.queues["write"]
+        stopping = False
+        while not stopping:
+            work = await queue.get(metrics)
+            if work is STOP:
+                return
+            batch, rows = [work], len(work.filings)
+            deadline = time.perf_counter() + self.write_linger
+            while rows < self.write_batch_rows:
+                try:
+                    work = await queue.get(metrics, timeout=max(0.0, deadline - time.perf_counter()))
+                except asyncio.TimeoutError:
+                    break
+                if work is STOP:
+                    stopping = True
+                    break
+                batch.append(work)
+                rows += len(work.filings)
+
+            started = time.perf_counter()
+            try:
+                await self._write_batch(batch)
+            except asyncio.CancelledError:
+                for work in batch:
+                    work.future.cancel()
+                raise
+            finally:
+                metrics.busy += time.perf_counter() - started
+
+    async def _write_batch(self, batch: List[CollectionWork]):
+        metrics = self.metrics["write"]
+        rows = [
+            (uuid.uuid4(), work.company_id, *filing)
+            for work in batch
+            for filing in work.filings
+        ]
+        company_ids = list(dict.fromkeys(work.company_id for work in batch))
+        ciks = {work.company_id: work.new_cik for work in batch if work.new_cik}
+        try:
+            # One transaction per batch: CIKs, filings and calendars commit together or not at all
+            async with self.session_factory() as session:
+                sec_data_repo = SECDataRepository(session)
+                if len(rows) >= self.copy_min_rows:
+                    inserted = await sec_data_repo.copy_filing_rows(rows)
+                else:
+                    inserted = await sec_data_repo.insert_filing_rows(rows)
+                # The calendar is projected from the filings just written, inside the same transaction
+                await ReportCalendarService(session).refresh(company_ids, commit=False)
+                # Last, since its change events hold the feed's append lock until the commit
+                await CompanyRepository(session).record_ciks(ciks)
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"⚠️  Collection write of {len(batch)} companies failed: {e}")
+            metrics.errors += len(batch)
+            for work in batch:
+                work.fail(e)
+            return
+
+        for company_id in ciks:
+            entity_cache.invalidate(company_id)
+        stored = Counter(inserted)
+        for work in batch:
+            work.finish(stored.pop(work.company_id, 0))
+        metrics.items += len(batch)
+        metrics.rows += len(rows)
+        metrics.batches += 1
+
+    def stats(self) -> dict:
+        """Per-stage throughput and wait times, and queue depths"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {name: metrics.as_dict(elapsed) for name, metrics in self.metrics.items()},
+            "queues": {name: queue.as_dict() for name, queue in self.queues.items()},
+        }
+
+    def summary(self) -> str:
+        """One-line stage report for worker logs"""
+        stats = self.stats()
+        parts = []
+        for name in ("fetch", "parse", "write"):
+            stage, queue = stats["stages"][name], stats["queues"][name]
+            parts.append(
+                f"{name} {stage['items_per_second']:.1f}/s busy {stage['utilization']:.0%} "
+                f"stalled {stage['stalled_seconds']:.1f}s queue {queue['depth']}/{queue['size']}"
+            )
+        return " | ".join(parts)
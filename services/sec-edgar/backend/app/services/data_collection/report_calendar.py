@@ -0,0 +1,171 @@
+import calendar
+from datetime import date, timedelta
+from statistics import median
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.repositories.data_collection import ReportCalendarRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.shared.models.data_collection import (
+    CalendarRefreshResponse, ReportCalendarEntryResponse, ReportCalendarResponse
+)
+from app.shared.exceptions import ValidationError
+
+ANNUAL_FORMS = {"10-K", "20-F", "40-F"}
+QUARTERLY_FORMS = {"10-Q"}
+PERIODIC_FORMS = ANNUAL_FORMS | QUARTERLY_FORMS
+
+# Days from period end to filing when a company has no history (SEC deadlines: 60-90 / 40-45)
+DEFAULT_FILING_LAG = {"annual": 75, "quarterly": 40}
+
+# Filed reports kept on the calendar, and future reports projected
+HISTORY_DAYS = 730
+PROJECTED_REPORTS = 4
+
+REFRESH_BATCH = 500
+
+def add_months(day: date, months: int) -> date:
+    """Shift a period end by whole months, keeping month-end dates at month end"""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    last_day = calendar.monthrange(year, month + 1)[1]
+    return date(year, month + 1, last_day if day.day >= 28 else min(day.day, last_day))
+
+def months_between(later: date, earlier: date) -> int:
+    return (later.year - earlier.year) * 12 + later.month - earlier.month
+
+def filing_lags(filings: List[tuple]) -> Dict[str, int]:
+    """Median days from period end to filing, per report class"""
+    lags = {"annual": [], "quarterly": []}
+    for form, period_end, filed, _ in filings:
+        lags["annual" if form in ANNUAL_FORMS else "quarterly"].append((filed - period_end).days)
+    return {
+        kind: int(median(values)) if values else DEFAULT_FILING_LAG[kind]
+        for kind, values in lags.items()
+    }
+
+def project_calendar(company_id: UUID, filings: List[tuple], today: Optional[date] = None) -> List[dict]:
+    """Build calendar entries from (form, period end, filing date, accession) history
+
+    Recent filed reports are kept as filed entries; the next PROJECTED_REPORTS
+    reports are projected a quarter apart from the latest period end, with
+    the annual report on the anniversary of the last annual period and the
+    expected filing date offset by the company's own median filing lag.
+    """
+    if not filings:
+        return []
+    today = today or date.today()
+    filings = sorted(filings, key=lambda filing: (filing[1], filing[2]))
+    lags = filing_lags(filings)
+
+    entries = {}
+    for form, period_end, filed, accession_number in filings:
+        key = (form, period_end)
+        if period_end < today - timedelta(days=HISTORY_DAYS) or key in entries:
+            continue
+        kind = "annual" if form in ANNUAL_FORMS else "quarterly"
+        entries[key] = {
+            "company_id": company_id,
+            "form_type": form,
+            "period_end": period_end,
+            "expected_filing_date": period_end + timedelta(days=lags[kind]),
+            "actual_filing_date": filed,
+            "accession_number": accession_number,
+            "is_filed": True,
+        }
+
+    annual = [(period_end, form) for form, period_end, _, _ in filings if form in ANNUAL_FORMS]
+    files_quarterly = any(form in QUARTERLY_FORMS for form, _, _, _ in filings)
+    last_period_end = filings[-1][1]
+    step = 3 if files_quarterly or not annual else 12
+
+    period_end = last_period_end
+    for _ in range(PROJECTED_REPORTS):
+        period_end = add_months(period_end, step)
+        form = "10-Q"
+        if annual and months_between(period_end, annual[-1][0]) % 12 == 0:
+            form = annual[-1][1]
+        kind = "annual" if form in ANNUAL_FORMS else "quarterly"
+        entries.setdefault((form, period_end), {
+            "company_id": company_id,
+            "form_type": form,
+            "period_end": period_end,
+            "expected_filing_date": period_end + timedelta(days=lags[kind]),
+            "actual_filing_date": None,
+            "accession_number": None,
+            "is_filed": False,
+        })
+
+    return list(entries.values())
+
+class ReportCalendarService:
+    def __init__(self, db: AsyncSession):
+        self.calendar_repo = ReportCalendarRepository(db)
+        self.company_repo = CompanyRepository(db)
+
+    async def refresh(self, company_ids: List[UUID], commit: bool = True) -> CalendarRefreshResponse:
+        """Rebuild calendar entries for companies from their collected filing history
+
+        With commit=False the entries join the caller's transaction, e.g. the
+        one that wrote the filings they are projected from.
+        """
+        history: Dict[UUID, List[tuple]] = {company_id: [] for company_id in company_ids}
+        for company_id, form, period_end, filed, accession_number in await self.calendar_repo.get_periodic_filings(
+            company_ids, PERIODIC_FORMS
+        ):
+            history[company_id].append((form, period_end, filed, accession_number))
+
+        entries = []
+        for company_id, filings in history.items():
+            entries.extend(project_calendar(company_id, filings))
+        if commit:
+            await self.calendar_repo.replace_entries(company_ids, entries)
+        else:
+            await self.calendar_repo.write_entries(company_ids, entries)
+        return CalendarRefreshResponse(companies=len(company_ids), entries=len(entries))
+
+    async def refresh_selected(self) -> CalendarRefreshResponse:
+        """Rebuild the calendar for every selected company in batches"""
+        company_ids = [company_id for company_id, _, _ in await self.company_repo.get_selected_ciks()]
+        total = 0
+        for start in range(0, len(company_ids), REFRESH_BATCH):
+            result = await self.refresh(company_ids[start:start + REFRESH_BATCH])
+            total += result.entries
+        return CalendarRefreshResponse(companies=len(company_ids), entries=total)
+
+    async def get_calendar(
+        self,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        form_type: Optional[str] = None,
+        include_filed: bool = False,
+        selected_only: bool = True,
+        limit: int = 1000
+    ) -> ReportCalendarResponse:
+        """Get reports expected between two dates (default: the next 30 days)"""
+        today = date.today()
+        from_date = from_date or today
+        to_date = to_date or from_date + timedelta(days=30)
+        if from_date > to_date:
+            raise ValidationError("from must not be after to")
+
+        rows = await self.calendar_repo.get_range(
+            from_date, to_date, form_type, include_filed, selected_only, limit
+        )
+        entries = [
+            ReportCalendarEntryResponse(
+                company_id=entry.company_id,
+                ticker_symbol=ticker_symbol,
+                company_name=company_name,
+                form_type=entry.form_type,
+                period_end=entry.period_end,
+                expected_filing_date=entry.expected_filing_date,
+                actual_filing_date=entry.actual_filing_date,
+                is_filed=entry.is_filed,
+                days_until_due=(entry.expected_filing_date - today).days
+            )
+            for entry, ticker_symbol, company_name in rows
+        ]
+        return ReportCalendarResponse(from_date=from_date, to_date=to_date, entries=entries, total=len(entries))
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.external.edgar import EDGAR_MAX_RPS, EdgarClient
+from app.infrastructure.repositories.data_collection import CollectionJobRepository
+from app.services.data_collection.pipeline import CollectionPipeline
+
+logger = logging.getLogger(__name__)
+
+class CollectionRunner:
+    """Claims collection jobs from the shared queue and runs them concurrently
+
+    Each worker process holds leases on the jobs it is running and renews
+    them from a heartbeat loop. A worker that dies stops renewing, its
+    leases expire, and any other worker steals those jobs on its next claim.
+    The EDGAR request budget is split evenly across live workers. Claimed
+    jobs run through the worker's fetch → parse → write pipeline, so
+    concurrency should cover the pipeline's fetches plus its queues.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = 32,
+        lease_seconds: int = 60,
+        max_attempts: int = 5,
+        retry_delay_seconds: int = 30,
+        poll_interval: float = 2.0,
+        drain: bool = False,
+        edgar: Optional[EdgarClient] = None,
+        pipeline: Optional[CollectionPipeline] = None
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{id(self):x}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.poll_interval = poll_interval
+        self.drain = drain
+        self.edgar = edgar or EdgarClient()
+        self.pipeline = pipeline or CollectionPipeline(self.edgar)
+
+        self.in_flight: Dict[UUID, asyncio.Task] = {}
+        self.completed = 0
+        self.failed = 0
+        self._reported = (0, 0, 0)
+        self._started = time.monotonic()
+
+    async def run(self):
+        """Claim and run jobs until stopped (or until the queue is empty in drain mode)"""
+        async with AsyncSessionLocal() as session:
+            await CollectionJobRepository(session).register_worker(self.worker_id, socket.gethostname())
+        await self._retune_rate_limit()
+        await self.pipeline.start()
+
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while True:
+                free = self.concurrency - len(self.in_flight)
+                claimed = await self._claim(free) if free > 0 else 0
+
+                if not self.in_flight:
+                    if self.drain:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                if claimed == 0 or len(self.in_flight) >= self.concurrency:
+                    await asyncio.wait(
+                        self.in_flight.values(),
+                        timeout=self.poll_interval,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+        finally:
+            heartbeat.cancel()
+            for task in self.in_flight.values():
+                task.cancel()
+            await self._heartbeat()
+            await self.pipeline.close()
+            await self.edgar.close()
+
+        self._log_throughput()
+
+    async def _claim(self, limit: int) -> int:
+        async with AsyncSessionLocal() as session:
+            jobs = await CollectionJobRepository(session).claim(self.worker_id, limit, self.lease_seconds)
+        for job in jobs:
+            task = asyncio.create_task(self._run_job(job.id, job.company_id))
+            self.in_flight[job.id] = task
+            task.add_done_callback(lambda _, job_id=job.id: self.in_flight.pop(job_id, None))
+        return len(jobs)
+
+    async def _run_job(self, job_id: UUID, company_id: UUID):
+        try:
+            await self.pipeline.collect(company_id)
+            async with AsyncSessionLocal() as session:
+                await CollectionJobRepository(session).complete(job_id, self.worker_id)
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️  Collection failed for company {company_id}: {e}")
+            async with AsyncSessionLocal() as session:
+                await CollectionJobRepository(session).fail(
+                    job_id, self.worker_id, str(e), self.max_attempts, self.retry_delay_seconds
+                )
+            self.failed += 1
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._heartbeat()
+                await self._retune_rate_limit()
+                self._log_throughput()
+            except Exception as e:
+                logger.error(f"❌ Heartbeat failed for worker {self.worker_id}: {e}")
+
+    async def _heartbeat(self):
+        """Renew held leases, abandon lost ones, and report progress deltas"""
+        async with AsyncSessionLocal() as session:
+            repo = CollectionJobRepository(session)
+            held = list(self.in_flight)
+            owned = set(await repo.extend_leases(self.worker_id, held, self.lease_seconds))
+            for job_id in held:
+                if job_id not in owned and job_id in self.in_flight:
+                    # Lease expired and another worker took the job over
+                    logger.warning(f"⚠️  Lost lease on job {job_id}, abandoning it")
+                    self.in_flight[job_id].cancel()
+
+            totals = (self.completed, self.failed, self.edgar.requests_made)
+            deltas = [now - before for now, before in zip(totals, self._reported)]
+            await repo.record_heartbeat(self.worker_id, *deltas)
+            self._reported = totals
+
+    async def _retune_rate_limit(self):
+        """Share the EDGAR request budget evenly across live workers"""
+        async with AsyncSessionLocal() as session:
+            active = await CollectionJobRepository(session).count_active_workers(self.lease_seconds)
+        self.edgar.limiter.rate = EDGAR_MAX_RPS / max(1, active)
+
+    def _log_throughput(self):
+        elapsed = time.monotonic() - self._started
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"📊 Worker {self.worker_id}: {self.completed} completed, {self.failed} failed, "
+            f"{rate:.2f} jobs/s, {self.edgar.requests_made} requests "
+            f"(limit {self.edgar.limiter.rate:.2f} req/s)"
+        )
+        logger.info(f"📊 Worker {self.worker_id} pipeline: {self.pipeline.summary()}")
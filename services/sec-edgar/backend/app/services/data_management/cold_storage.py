@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import pyarrow as pa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.data_collection.models import FinancialFact
+from app.infrastructure.cold_storage import FINANCIAL_FACTS, ColdStore, month_key, month_range
+from app.infrastructure.repositories.data_collection import FinancialFactRepository
+from app.shared.models.data_management import FactRangeResponse, FactResponse, TierMonthResult
+
+logger = logging.getLogger(__name__)
+
+# Facts whose period ended more than this many days ago move to cold storage
+MIN_AGE_DAYS = int(os.getenv("COLD_STORAGE_MIN_AGE_DAYS", "1095"))
+
+# One store per process keeps memory-mapped files open between requests
+cold_facts = ColdStore(FINANCIAL_FACTS)
+
+def tier_cutoff(min_age_days: int, today: Optional[date] = None) -> date:
+    """First day of the month containing today - min_age_days; only whole months before it are tiered"""
+    day = (today or date.today()) - timedelta(days=min_age_days)
+    return date(day.year, day.month, 1)
+
+def facts_to_table(facts: List[FinancialFact]) -> pa.Table:
+    columns = FINANCIAL_FACTS.schema.names
+    values = {column: [getattr(fact, column) for fact in facts] for column in columns}
+    values["company_id"] = [str(company_id) for company_id in values["company_id"]]
+    return pa.table(values, schema=FINANCIAL_FACTS.schema)
+
+def fact_key(fact) -> Tuple[str, str, str, str]:
+    return (fact["taxonomy"], fact["concept"], fact["unit"], fact["period"])
+
+class ColdStorageService:
+    """Moves old financial facts to Parquet and serves ranges spanning both tiers"""
+
+    def __init__(self, db: AsyncSession, store: ColdStore = cold_facts):
+        self.db = db
+        self.fact_repo = FinancialFactRepository(db)
+        self.store = store
+
+    async def tier_facts(self, min_age_days: int = MIN_AGE_DAYS, dry_run: bool = False) -> List[TierMonthResult]:
+        """Archive every whole period_end month older than min_age_days, one transaction per month
+
+        A month's rows are locked, merged into its Parquet file (fsynced and
+        renamed into place) and only then deleted and committed. If the
+        process dies in between, the rows are still in Postgres and the next
+        run rewrites the same file, so a fact is never only half-moved.
+        """
+        months = await self.fact_repo.get_months_before(tier_cutoff(min_age_days))
+        results = []
+        for first, rows in months:
+            month = month_key(first)
+            if dry_run:
+                results.append(TierMonthResult(month=month, rows=rows))
+                continue
+
+            started = time.perf_counter()
+            try:
+                facts = await self.fact_repo.lock_period_range(*month_range(month))
+                entry = self.store.write_month(month, facts_to_table(facts))
+                await self.fact_repo.delete_facts([fact.id for fact in facts])
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                raise
+            results.append(TierMonthResult(
+                month=month,
+                rows=len(facts),
+                archived_rows=entry["rows"],
+                row_groups=len(entry["row_groups"]),
+                seconds=round(time.perf_counter() - started, 3)
+            ))
+            logger.info(f"🧊 Tiered {len(facts)} facts for {month} ({entry['rows']} rows archived)")
+        return results
+
+    async def get_facts(
+        self,
+        company_id: UUID,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        concepts: Optional[Iterable[str]] = None
+    ) -> FactRangeResponse:
+        """One company's facts in [start, end] from Postgres and cold storage; Postgres wins on conflicts"""
+        concepts = list(concepts) if concepts else None
+        hot = await self.fact_repo.get_company_range(company_id, start, end, concepts)
+
+        plan = self.store.plan([str(company_id)], start, end)
+        cold_rows = []
+        if plan:
+            table = await asyncio.to_thread(
+                self.store.read,
+                [str(company_id)], start, end, {"concept": concepts} if concepts else None
+            )
+            cold_rows = table.to_pylist()
+
+        facts: Dict[Tuple[str, str, str, str], FactResponse] = {}
+        for row in cold_rows:
+            facts[fact_key(row)] = FactResponse(**row, tier="cold")
+        for fact in hot:
+            response = FactResponse.from_orm(fact)
+            facts[fact_key(response.__dict__)] = response
+
+        return FactRangeResponse(
+            company_id=company_id,
+            start=start,
+            end=end,
+            facts=sorted(facts.values(), key=lambda fact: (fact.period_end, fact.concept, fact.period)),
+            hot_rows=len(hot),
+            cold_rows=len(cold_rows),
+            cold_row_groups=sum(len(groups) for groups in plan.values())
+        )
+
+    def summary(self) -> dict:
+        return self.store.summary()
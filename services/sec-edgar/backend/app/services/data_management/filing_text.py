@@ -0,0 +1,160 @@
+import logging
+from datetime import date
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.data_collection.models import SECData
+from app.infrastructure.external.edgar import EdgarClient, filing_document_url
+from app.infrastructure.filing_text import FilingSectionText, FilingTextExtractor
+from app.infrastructure.repositories.data_management import FilingTextRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.shared.exceptions import ValidationError
+from app.shared.models.data_management import FilingIndexResult, FilingSearchHit, FilingSearchResponse
+
+logger = logging.getLogger(__name__)
+
+# Forms whose primary document is worth indexing by default
+FILING_TEXT_FORMS = ("10-K", "10-K/A", "10-Q", "10-Q/A")
+
+# Sections inserted per executemany while a document streams in
+SECTION_BATCH_SIZE = 200
+
+MAX_QUERY_LENGTH = 200
+
+def section_rows(filing: SECData, sections: List[FilingSectionText]) -> List[dict]:
+    return [
+        {
+            "filing_date": filing.filing_date,
+            "accession_number": filing.accession_number,
+            "section_no": section.section_no,
+            "company_id": filing.company_id,
+            "filing_type": filing.filing_type,
+            "heading": section.heading,
+            "content": section.content,
+        }
+        for section in sections
+    ]
+
+class FilingTextService:
+    """Extracts filing documents into searchable sections and searches them"""
+
+    def __init__(self, db: AsyncSession, edgar: Optional[EdgarClient] = None):
+        self.db = db
+        self.edgar = edgar
+        self.repo = FilingTextRepository(db)
+        self.company_repo = CompanyRepository(db)
+
+    async def index_pending(self, limit: int = 100, forms: Iterable[str] = FILING_TEXT_FORMS) -> List[FilingIndexResult]:
+        """Index the newest not yet indexed filings of selected companies"""
+        pending = await self.repo.get_pending(forms, limit)
+        await self.repo.ensure_partitions({filing.filing_date.year for filing, _ in pending})
+        results = []
+        for filing, cik in pending:
+            results.append(await self.index_filing(filing, cik))
+        return results
+
+    async def index_filing(self, filing: SECData, cik: str) -> FilingIndexResult:
+        """
+        Stream one filing's primary document into dm_filing_sections
+
+        Sections are inserted as the extractor completes them, so memory stays
+        bounded by one batch whatever the document size. The sections and the
+        dm_filing_documents row commit together; a failed document is rolled
+        back and retried on the next run. A document SEC no longer serves
+        (404) is recorded with no sections so it is not fetched again.
+        """
+        extractor = FilingTextExtractor()
+        batch: List[dict] = []
+        sections = 0
+        try:
+            async for chunk in self.edgar.iter_document(cik, filing.accession_number, filing.primary_document):
+                batch.extend(section_rows(filing, extractor.feed_bytes(chunk)))
+                if len(batch) >= SECTION_BATCH_SIZE:
+                    await self.repo.add_sections(batch)
+                    sections += len(batch)
+                    batch = []
+            batch.extend(section_rows(filing, extractor.finish()))
+            await self.repo.add_sections(batch)
+            sections += len(batch)
+
+            await self.repo.add_document({
+                "accession_number": filing.accession_number,
+                "company_id": filing.company_id,
+                "filing_type": filing.filing_type,
+                "filing_date": filing.filing_date,
+                "document": filing.primary_document,
+                "sections": sections,
+                "characters": extractor.characters,
+                "bytes": extractor.bytes_read,
+            })
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"⚠️ Failed to index {filing.accession_number}: {e}")
+            return FilingIndexResult(
+                accession_number=filing.accession_number,
+                sections=0,
+                characters=0,
+                bytes=extractor.bytes_read,
+                error=str(e)
+            )
+
+        return FilingIndexResult(
+            accession_number=filing.accession_number,
+            sections=sections,
+            characters=extractor.characters,
+            bytes=extractor.bytes_read
+        )
+
+    async def search(
+        self,
+        query: str,
+        company_ids: Optional[List[UUID]] = None,
+        tickers: Optional[List[str]] = None,
+        forms: Optional[List[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> FilingSearchResponse:
+        """Ranked filing sections matching a web-search style query ("going concern" -substantial)"""
+        query = query.strip()
+        if not query:
+            raise ValidationError("q must not be blank")
+        if len(query) > MAX_QUERY_LENGTH:
+            raise ValidationError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+
+        company_ids = list(company_ids or [])
+        if tickers:
+            companies = await self.company_repo.get_by_tickers(tickers)
+            if not companies and not company_ids:
+                return FilingSearchResponse(query=query, hits=[], has_more=False)
+            company_ids.extend(company.id for company in companies)
+
+        # One extra row tells whether another page exists without a count(*)
+        rows = await self.repo.search(
+            query,
+            company_ids=company_ids,
+            forms=[form.upper() for form in forms] if forms else None,
+            start=start,
+            end=end,
+            limit=limit + 1,
+            offset=offset
+        )
+        hits = [
+            FilingSearchHit(
+                company_id=row.company_id,
+                ticker_symbol=row.ticker_symbol,
+                accession_number=row.accession_number,
+                filing_type=row.filing_type,
+                filing_date=row.filing_date,
+                section_no=row.section_no,
+                heading=row.heading,
+                rank=row.rank,
+                snippet=row.snippet,
+                url=filing_document_url(row.cik, row.accession_number, row.document) if row.cik and row.document else None
+            )
+            for row in rows[:limit]
+        ]
+        return FilingSearchResponse(query=query, hits=hits, has_more=len(rows) > limit)
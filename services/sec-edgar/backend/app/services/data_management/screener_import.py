@@ -0,0 +1,400 @@
+import asyncio
+import codecs
+import csv
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
+
+import multipart
+from multipart.multipart import parse_options_header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.data_management.models import ImportJob, IMPORT_PROCESSING, IMPORT_RECEIVING
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.repositories.data_management import ImportJobRepository
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.shared.exceptions import ValidationError
+from app.shared.models.data_management import ImportJobResponse
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert statement / commit
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Parsed batches allowed to wait for the writer; beyond this the upload is read more slowly
+IMPORT_QUEUE_BATCHES = 4
+# Form field holding the CSV in multipart uploads
+UPLOAD_FIELD = "file"
+
+US_COUNTRIES = {"United States", "USA", "US", "U.S.", "U.S.A.", "United States of America"}
+
+# Listings that are not common stock (warrants, rights, etc.)
+SKIP_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'.*Rights$', r'.*Warrants?$', r'.*Units$', r'.*Notes?$',
+        r'.*Bond$', r'.*Preferred$', r'.*Series \w+'
+    )
+]
+
+NAME_SUFFIXES = [
+    " Common Stock", " Class A Common Stock", " Class B Common Stock",
+    " Ordinary Shares", " American Depositary Shares", " Depositary Shares",
+    " Units", " Rights", " Warrants", " Class A Ordinary Shares",
+    " Class B Ordinary Shares", " Inc.", " Corporation", " Corp.",
+    " Limited", " Ltd.", " LLC", " PLC"
+]
+
+SECTOR_MAPPING = {
+    "Technology": "Technology",
+    "Industrials": "Industrials",
+    "Finance": "Financial Services",
+    "Health Care": "Healthcare",
+    "Consumer Discretionary": "Consumer Discretionary",
+    "Consumer Staples": "Consumer Staples",
+    "Real Estate": "Real Estate",
+    "Energy": "Energy",
+    "Utilities": "Utilities",
+    "Basic Materials": "Basic Materials",
+    "Communication Services": "Communication Services"
+}
+
+def parse_market_cap(market_cap_str: str) -> Optional[float]:
+    """Parse market cap string to float, handling various formats"""
+    if not market_cap_str or market_cap_str.strip() == '' or market_cap_str == '0.00':
+        return None
+    try:
+        return float(market_cap_str.replace(',', '').replace('$', '').strip())
+    except ValueError:
+        return None
+
+def clean_company_name(name: str) -> str:
+    """Clean company name by removing common suffixes"""
+    if not name:
+        return ""
+    cleaned_name = name.strip()
+    for suffix in NAME_SUFFIXES:
+        if cleaned_name.endswith(suffix):
+            cleaned_name = cleaned_name[:-len(suffix)].strip()
+    return cleaned_name
+
+def is_us_company(country: str) -> bool:
+    """Check if company is from United States"""
+    return bool(country) and country.strip() in US_COUNTRIES
+
+def clean_sector(sector: str) -> Optional[str]:
+    """Clean and standardize sector name"""
+    if not sector or sector.strip() == '':
+        return None
+    cleaned_sector = sector.strip()
+    return SECTOR_MAPPING.get(cleaned_sector, cleaned_sector)
+
+def screener_company(row: Dict[str, str], exchange: str = "NASDAQ") -> Optional[dict]:
+    """Map one screener CSV row to company fields, or None for non-US and non-stock listings"""
+    if not is_us_company(row.get('Country', '')):
+        return None
+    symbol = (row.get('Symbol') or '').strip()
+    name = clean_company_name(row.get('Name') or '')
+    if not symbol or not name or len(symbol) > 10:
+        return None
+    if any(pattern.match(name) for pattern in SKIP_PATTERNS):
+        return None
+    return {
+        'ticker_symbol': symbol,
+        'company_name': name[:255],
+        'exchange': exchange,
+        'sector': clean_sector(row.get('Sector') or ''),
+        'market_cap': parse_market_cap(row.get('Market Cap') or ''),
+    }
+
+def screener_date(file_name: Optional[str]) -> Optional[date]:
+    """Snapshot date from a screener export name (nasdaq_screener_<epoch ms>.csv)"""
+    match = re.search(r'(\d{13})', os.path.basename(file_name or ''))
+    if not match:
+        return None
+    return datetime.fromtimestamp(int(match.group(1)) / 1000, tz=timezone.utc).date()
+
+class IncrementalCsvReader:
+    """Turns CSV bytes arriving in arbitrary chunks into row dicts
+
+    Bytes are decoded incrementally (a UTF-8 sequence may straddle chunks)
+    and split into records only at line ends outside quotes, so memory is
+    bounded by the longest record rather than the upload.
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self.header: Optional[List[str]] = None
+        self.pending = ""
+        # Characters of `pending` already scanned, and the quotes among them:
+        # an odd count means a quoted field continues past the last line end
+        self.scanned = 0
+        self.quotes = 0
+
+    def feed(self, data: bytes, final: bool = False) -> List[Dict[str, str]]:
+        text = self.pending + self.decoder.decode(data, final)
+        records = []
+        start, position, quotes = 0, self.scanned, self.quotes
+        while True:
+            newline = text.find("\n", position)
+            if newline == -1:
+                break
+            quotes += text.count('"', position, newline)
+            position = newline + 1
+            if quotes % 2 == 0:
+                records.append(text[start:position])
+                start, quotes = position, 0
+        self.pending = text[start:]
+        self.scanned, self.quotes = position - start, quotes
+        if final and self.pending.strip():
+            records.append(self.pending)
+            self.pending, self.scanned, self.quotes = "", 0, 0
+        return self._rows(records)
+
+    def _rows(self, records: List[str]) -> List[Dict[str, str]]:
+        rows = []
+        for values in csv.reader(records):
+            if not values:
+                continue
+            if self.header is None:
+                self.header = [value.strip() for value in values]
+                continue
+            rows.append(dict(zip(self.header, values)))
+        return rows
+
+class MultipartCsvReader:
+    """Feeds the `file` part of a multipart/form-data body through an IncrementalCsvReader"""
+
+    def __init__(self, content_type: str):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValidationError("Missing multipart boundary")
+        self.csv = IncrementalCsvReader()
+        self.filename: Optional[str] = None
+        self.found = False
+        self.rows: List[Dict[str, str]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._in_file = False
+        self.parser = multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._in_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("latin-1") == UPLOAD_FIELD and not self.found:
+            self._in_file = True
+            self.found = True
+            filename = options.get(b"filename")
+            self.filename = filename.decode("utf-8", "replace") if filename else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.rows.extend(self.csv.feed(data[start:end]))
+
+    def _on_part_end(self):
+        if self._in_file:
+            self.rows.extend(self.csv.feed(b"", final=True))
+            self._in_file = False
+
+    def feed(self, data: bytes, final: bool = False) -> List[Dict[str, str]]:
+        if data:
+            self.parser.write(data)
+        if final:
+            self.parser.finalize()
+            if not self.found:
+                raise ValidationError(f"Multipart upload has no '{UPLOAD_FIELD}' field")
+        rows, self.rows = self.rows, []
+        return rows
+
+class RawCsvReader(IncrementalCsvReader):
+    """A text/csv request body"""
+    filename: Optional[str] = None
+    found = True
+
+def job_response(job: ImportJob) -> ImportJobResponse:
+    end = job.finished_at or datetime.now(timezone.utc)
+    elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+    return ImportJobResponse(
+        id=job.id,
+        filename=job.filename,
+        status=job.status,
+        exchange=job.exchange,
+        as_of=job.as_of,
+        bytes_received=job.bytes_received,
+        rows_parsed=job.rows_parsed,
+        rows_skipped=job.rows_skipped,
+        rows_written=job.rows_written,
+        companies_created=job.companies_created,
+        companies_updated=job.companies_updated,
+        companies_unchanged=job.rows_written - job.companies_created - job.companies_updated,
+        companies_delisted=job.companies_delisted,
+        error=job.error,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(job.rows_written / elapsed, 1) if elapsed > 0 else 0.0
+    )
+
+# Writer tasks outlive their request; keep references so they are not garbage collected
+_running_imports: Set[asyncio.Task] = set()
+
+class ScreenerImportService:
+    """Imports screener CSV uploads while they stream in
+
+    The request body is parsed chunk by chunk into rows, which are handed
+    to a writer task in batches through a small bounded queue: the upload
+    is only read as fast as batches are committed, so neither the body nor
+    the parsed rows are ever held in full. Each batch is one multi-row
+    upsert plus its change events, history versions and job progress, in
+    one transaction. The writer keeps running after the response, and
+    /data/imports/{id} reports its progress.
+    """
+
+    def __init__(self, db: AsyncSession, session_factory=AsyncSessionLocal):
+        self.db = db
+        self.job_repo = ImportJobRepository(db)
+        self.session_factory = session_factory
+
+    async def get_job(self, job_id: UUID) -> Optional[ImportJobResponse]:
+        job = await self.job_repo.get(job_id)
+        return job_response(job) if job else None
+
+    async def get_recent_jobs(self, limit: int) -> List[ImportJobResponse]:
+        return [job_response(job) for job in await self.job_repo.get_recent(limit)]
+
+    async def start_import(
+        self,
+        body: AsyncIterator[bytes],
+        content_type: str,
+        exchange: str = "NASDAQ",
+        as_of: Optional[date] = None,
+        delist_missing: bool = False,
+        filename: Optional[str] = None
+    ) -> ImportJobResponse:
+        """Stream an upload into the company table, returning the job once the body is consumed"""
+        if content_type.startswith("multipart/form-data"):
+            reader = MultipartCsvReader(content_type)
+        elif content_type.startswith(("text/csv", "application/csv", "text/plain")):
+            reader = RawCsvReader()
+        else:
+            raise ValidationError("Upload a CSV as multipart/form-data (field 'file') or text/csv")
+
+        counters = {"bytes_received": 0, "rows_parsed": 0, "rows_skipped": 0}
+        pending: Dict[str, dict] = {}
+        job = None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_QUEUE_BATCHES)
+
+        async def open_job():
+            # Deferred until the file part's headers are in, so its name can supply the snapshot date
+            name = filename or reader.filename
+            created = await self.job_repo.create(name, exchange, as_of or screener_date(name) or date.today())
+            writer = asyncio.create_task(self._write(created.id, queue, created.exchange, created.as_of, delist_missing))
+            _running_imports.add(writer)
+            writer.add_done_callback(_running_imports.discard)
+            return created
+
+        async def flush(status: str):
+            batch = list(pending.values())
+            pending.clear()
+            await queue.put((batch, dict(counters), status))
+
+        error = None
+        try:
+            async for chunk in body:
+                counters["bytes_received"] += len(chunk)
+                self._collect(reader.feed(chunk), exchange, counters, pending)
+                if job is None and reader.found:
+                    job = await open_job()
+                if job is not None and len(pending) >= IMPORT_BATCH_SIZE:
+                    await flush(IMPORT_RECEIVING)
+            self._collect(reader.feed(b"", final=True), exchange, counters, pending)
+            if job is None:
+                job = await open_job()
+            await flush(IMPORT_PROCESSING)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            # None ends the writer; an error message fails the job instead of completing it
+            if job is not None:
+                await queue.put(error)
+
+        await self.db.refresh(job)
+        return job_response(job)
+
+    @staticmethod
+    def _collect(rows: List[Dict[str, str]], exchange: str, counters: dict, pending: Dict[str, dict]):
+        for row in rows:
+            counters["rows_parsed"] += 1
+            company = screener_company(row, exchange)
+            if company is None:
+                counters["rows_skipped"] += 1
+                continue
+            # A ticker may only appear once per upsert statement; the last row wins
+            pending[company["ticker_symbol"]] = company
+
+    async def _write(self, job_id: UUID, queue: asyncio.Queue, exchange: str, as_of: date, delist_missing: bool):
+        """Commit queued batches until the reader signals the end of the upload"""
+        error = None
+        tickers: Set[str] = set()
+        async with self.session_factory() as session:
+            companies = CompanyRepository(session)
+            jobs = ImportJobRepository(session)
+            while True:
+                item = await queue.get()
+                if item is None or isinstance(item, str):
+                    error = error or item
+                    break
+                if error is not None:
+                    # Keep draining so the reader never blocks on a dead writer
+                    continue
+                batch, counters, status = item
+                try:
+                    created, updated = await companies.upsert_batch(batch, as_of)
+                    await jobs.record_progress(job_id, status, counters, {
+                        "rows_written": len(batch),
+                        "companies_created": created,
+                        "companies_updated": updated,
+                    })
+                    await session.commit()
+                    tickers.update(company["ticker_symbol"] for company in batch)
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"❌ Import {job_id} failed: {e}")
+                    error = str(e) or type(e).__name__
+
+            delisted = 0
+            try:
+                if error is None and delist_missing and tickers:
+                    delisted = await companies.record_delisted(exchange, tickers, as_of)
+                await jobs.finish(job_id, error, delisted)
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"❌ Import {job_id} failed: {e}")
+                await jobs.finish(job_id, str(e) or type(e).__name__)
+        logger.info(f"📥 Import {job_id} finished: {len(tickers)} companies, {delisted} delisted, error={error}")
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.domain.stock_discovery.models import ChangeEvent
+from app.infrastructure.database import DATABASE_URL, AsyncSessionLocal
+from app.infrastructure.repositories.stock_discovery import CHANGE_CHANNEL, ChangeEventRepository
+
+logger = logging.getLogger(__name__)
+
+# Comment frames keep idle connections (and proxies in between) from timing out
+HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+# Fallback poll in case a notification is missed while the listener reconnects
+POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "30"))
+# Events buffered per client; a client that falls further behind is disconnected and resumes from the table
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Resumes further behind than this get a reset event instead of a replay
+BACKFILL_LIMIT = 1000
+DISPATCH_BATCH = 1000
+# Browser reconnect delay sent to EventSource clients
+RETRY_MS = 3000
+# Events older than this are pruned; clients resuming from before it get a reset
+RETENTION_DAYS = int(os.getenv("CHANGE_FEED_RETENTION_DAYS", "7"))
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def format_event(event: ChangeEvent) -> str:
+    """Encode a change event as one SSE frame"""
+    data = {
+        "seq": event.seq,
+        "company_id": str(event.company_id),
+        "type": event.event_type,
+        "changes": event.changes,
+        "source": event.source,
+        "at": event.created_at.isoformat() if event.created_at else None,
+    }
+    return f"id: {event.seq}\nevent: {event.event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def format_reset(seq: int) -> str:
+    """Tell a client its resume point is gone and it should reload its lists"""
+    return f"id: {seq}\nevent: reset\ndata: {json.dumps({'seq': seq})}\n\n"
+
+
+class Subscription:
+    """Bounded per-client buffer of (seq, frame) items"""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, items: List[Tuple[int, str]]):
+        for item in items:
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+
+class ChangeFeedHub:
+    """Fans company change events out to SSE clients from one LISTEN connection per process
+
+    Writers append to sd_change_events and NOTIFY the latest seq in the same
+    transaction. The hub wakes on the notification, reads the new events
+    once, encodes each SSE frame once and pushes it to every subscriber
+    queue, so idle clients cost one queue and one parked coroutine each.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, database_url: str = DATABASE_URL):
+        self.session_factory = session_factory
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.subscribers: Set[Subscription] = set()
+        # In-process consumers (e.g. caches) called with each batch of new events
+        self.listeners: List[Callable[[List[ChangeEvent]], None]] = []
+        self.last_seq = 0
+        # True while notifications are being received, i.e. last_seq is current
+        self.listening = False
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._pruned_at = 0.0
+
+    @property
+    def client_count(self) -> int:
+        return len(self.subscribers)
+
+    async def start(self):
+        """Start listening on first use"""
+        if self._task is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._task is not None:
+                return
+            self._wake = asyncio.Event()
+            async with self.session_factory() as session:
+                self.last_seq = await ChangeEventRepository(session).get_latest_seq()
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            seq = int(payload)
+        except ValueError:
+            seq = None
+        if seq is None or seq > self.last_seq:
+            self._wake.set()
+
+    async def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(CHANGE_CHANNEL, self._on_notify)
+                logger.info(f"📡 Listening for company changes on {CHANGE_CHANNEL}")
+                # Pick up anything committed while we were not listening
+                await self.dispatch()
+                self.listening = True
+                while not connection.is_closed():
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    await self.dispatch()
+                    await self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️  Change feed listener failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+    async def dispatch(self):
+        """Read events after last_seq and hand them to every listener and subscriber"""
+        while True:
+            async with self.session_factory() as session:
+                events = await ChangeEventRepository(session).get_since(self.last_seq, DISPATCH_BATCH)
+            if not events:
+                return
+            for listener in self.listeners:
+                listener(events)
+            items = [(event.seq, format_event(event)) for event in events]
+            for subscription in list(self.subscribers):
+                subscription.push(items)
+            self.last_seq = events[-1].seq
+            if len(events) < DISPATCH_BATCH:
+                return
+
+    async def _prune(self):
+        if time.monotonic() - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+            return
+        self._pruned_at = time.monotonic()
+        async with self.session_factory() as session:
+            pruned = await ChangeEventRepository(session).prune(datetime.utcnow() - timedelta(days=RETENTION_DAYS))
+        if pruned:
+            logger.info(f"🧹 Pruned {pruned} change events older than {RETENTION_DAYS} days")
+
+    async def subscribe(self) -> Tuple[Subscription, int]:
+        """Register a client, returning its buffer and the seq it is current as of"""
+        await self.start()
+        subscription = Subscription()
+        self.subscribers.add(subscription)
+        return subscription, self.last_seq
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    async def stream(self, since: Optional[int] = None) -> AsyncIterator[str]:
+        """SSE frames for one client: replay after `since`, then live events
+
+        The client subscribes before replaying so nothing committed during the
+        replay is lost; live events at or below the replayed seq are skipped.
+        """
+        subscription, cursor = await self.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if since is not None and since < cursor:
+                async with self.session_factory() as session:
+                    repository = ChangeEventRepository(session)
+                    oldest = await repository.get_oldest_seq()
+                    events = await repository.get_since(since, BACKFILL_LIMIT + 1)
+                if len(events) > BACKFILL_LIMIT or (oldest is not None and oldest > since + 1):
+                    # Too far behind, or the events it missed were pruned
+                    yield format_reset(cursor)
+                else:
+                    for event in events:
+                        yield format_event(event)
+                    cursor = max([cursor] + [event.seq for event in events])
+            elif since is not None and since > cursor:
+                # Resume point from a different database (e.g. after a restore)
+                yield format_reset(cursor)
+
+            while True:
+                try:
+                    seq, frame = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if subscription.overflowed:
+                    # Slow client: drop it, it reconnects with Last-Event-ID and replays from the table
+                    return
+                if seq > cursor:
+                    cursor = seq
+                    yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+
+change_feed_hub = ChangeFeedHub()
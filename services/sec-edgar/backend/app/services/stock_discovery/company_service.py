@@ -1,18 +1,55 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 from uuid import UUID
 from datetime import datetime
 
+from app.infrastructure.repositories.data_collection import DerivedMetricsRepository
 from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.infrastructure.tracing import traced_methods
+from app.services.stock_discovery.facet_index import facet_index
+from app.services.stock_discovery.screening_engine import screening_engine
 from app.shared.models.stock_discovery import (
-    CompanyCreate, CompanyUpdate, CompanyResponse, CompanyListResponse,
-    CompanySelectionRequest, CompanySelectionResponse, CompanySearchParams
+    CompanyCreate, CompanyUpdate, CompanyResponse, CompanyDetailResponse, CompanyListResponse,
+    CompanySelectionRequest, CompanySelectionResponse, CompanySearchParams,
+    ScreenParams, ScreenResponse, CompanyBatchRequest, CompanyBatchItem, COMPANY_FIELDS
 )
-from app.shared.exceptions import CompanyNotFoundError, CompanyAlreadyExistsError
+from app.shared.models.data_collection import DerivedMetricsResponse
+from app.shared.exceptions import CompanyNotFoundError, CompanyAlreadyExistsError, ValidationError
+
+def historical_company(version, company) -> CompanyResponse:
+    """A company with the attributes of a historical version and its current selection state"""
+    return CompanyResponse(
+        id=company.id,
+        ticker_symbol=version.ticker_symbol,
+        company_name=version.company_name,
+        exchange=version.exchange,
+        sector=version.sector,
+        market_cap=version.market_cap,
+        cik=version.cik,
+        is_selected=company.is_selected,
+        selection_date=company.selection_date,
+        created_at=company.created_at,
+        updated_at=company.updated_at
+    )
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma separated `fields=` value against CompanyResponse, in schema order"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(COMPANY_FIELDS)
+    if unknown or not requested:
+        raise ValidationError(
+            f"Unknown fields: {', '.join(sorted(unknown)) or '(none given)'}; "
+            f"available: {', '.join(COMPANY_FIELDS)}"
+        )
+    return [name for name in COMPANY_FIELDS if name in requested]
 
+@traced_methods("service")
 class CompanyService:
     def __init__(self, db: AsyncSession):
         self.company_repo = CompanyRepository(db)
+        self.metrics_repo = DerivedMetricsRepository(db)
 
     async def create_company(self, company_data: CompanyCreate) -> CompanyResponse:
         """Create a new company"""
@@ -23,26 +60,82 @@ class CompanyService:
 
         # Create company
         company = await self.company_repo.create(company_data.dict())
+        screening_engine.apply(company)
+        facet_index.apply(company)
         return CompanyResponse.from_orm(company)
 
-    async def get_company(self, company_id: UUID) -> CompanyResponse:
-        """Get company by ID"""
+    async def get_company(self, company_id: UUID, metrics_periods: int = 8) -> CompanyDetailResponse:
+        """Get company by ID with its latest precomputed quarterly metrics"""
         company = await self.company_repo.get_by_id(company_id)
         if not company:
             raise CompanyNotFoundError(f"Company with ID {company_id} not found")
-        return CompanyResponse.from_orm(company)
-
-    async def get_companies(self, params: CompanySearchParams) -> CompanyListResponse:
-        """Get companies with filtering and pagination"""
-        companies, total = await self.company_repo.get_all(
+        detail = CompanyDetailResponse.from_orm(company)
+        if metrics_periods:
+            detail.metrics = [
+                DerivedMetricsResponse.from_orm(row)
+                for row in await self.metrics_repo.get_for_company(company_id, metrics_periods)
+            ]
+        return detail
+
+    async def get_companies_batch(self, request: CompanyBatchRequest) -> List[CompanyBatchItem]:
+        """Resolve many companies by ID or ticker, in input order with explicit misses"""
+        if request.ids is not None:
+            companies = await self.company_repo.get_by_ids(request.ids)
+            by_key = {company.id: company for company in companies}
+            keys = [(str(company_id), by_key.get(company_id)) for company_id in request.ids]
+        else:
+            companies = await self.company_repo.get_by_tickers(request.tickers)
+            by_key = {company.ticker_symbol: company for company in companies}
+            keys = [(ticker, by_key.get(ticker.upper())) for ticker in request.tickers]
+
+        return [
+            CompanyBatchItem(
+                key=key,
+                found=company is not None,
+                company=CompanyResponse.from_orm(company) if company is not None else None
+            )
+            for key, company in keys
+        ]
+
+    async def get_companies(self, params: CompanySearchParams) -> Union[CompanyListResponse, dict]:
+        """Get companies with filtering and pagination (a plain dict of rows when `fields` is set)"""
+        fields = parse_fields(params.fields)
+        if (params.min_market_cap is not None and params.max_market_cap is not None
+                and params.min_market_cap > params.max_market_cap):
+            raise ValidationError("min_market_cap must not be greater than max_market_cap")
+
+        filters = dict(
             page=params.page,
             size=params.size,
             query=params.query,
             exchange=params.exchange,
             sector=params.sector,
-            is_selected=params.is_selected
+            is_selected=params.is_selected,
+            min_market_cap=params.min_market_cap,
+            max_market_cap=params.max_market_cap,
+            sort=params.sort,
+            fields=fields
         )
 
+        if fields:
+            if params.as_of is not None:
+                rows, total = await self.company_repo.get_all_as_of(params.as_of, **filters)
+            else:
+                rows, total = await self.company_repo.get_all(**filters)
+            return dict(companies=rows, total=total, page=params.page, size=params.size, as_of=params.as_of)
+
+        if params.as_of is not None:
+            rows, total = await self.company_repo.get_all_as_of(params.as_of, **filters)
+            return CompanyListResponse(
+                companies=[historical_company(version, company) for version, company in rows],
+                total=total,
+                page=params.page,
+                size=params.size,
+                as_of=params.as_of
+            )
+
+        companies, total = await self.company_repo.get_all(**filters)
+
         return CompanyListResponse(
             companies=[CompanyResponse.from_orm(company) for company in companies],
             total=total,
@@ -50,18 +143,25 @@ class CompanyService:
             size=params.size
         )
 
-    async def search_companies(self, query: str, limit: int = 10) -> List[CompanyResponse]:
-        """Search companies by query"""
+    async def search_companies(self, query: str, limit: int = 10, fields: Optional[str] = None) -> list:
+        """Search companies by query (plain dicts when `fields` is set)"""
+        columns = parse_fields(fields)
         companies, _ = await self.company_repo.get_all(
             page=1,
             size=limit,
-            query=query
+            query=query,
+            fields=columns
         )
+        if columns:
+            return companies
         return [CompanyResponse.from_orm(company) for company in companies]
 
-    async def get_selected_companies(self) -> List[CompanyResponse]:
-        """Get all selected companies"""
-        companies = await self.company_repo.get_selected_companies()
+    async def get_selected_companies(self, fields: Optional[str] = None) -> list:
+        """Get all selected companies (plain dicts when `fields` is set)"""
+        columns = parse_fields(fields)
+        companies = await self.company_repo.get_selected_companies(columns)
+        if columns:
+            return companies
         return [CompanyResponse.from_orm(company) for company in companies]
 
     async def update_company(self, company_id: UUID, update_data: CompanyUpdate) -> CompanyResponse:
@@ -78,6 +178,8 @@ class CompanyService:
         if not company:
             raise CompanyNotFoundError(f"Company with ID {company_id} not found")
 
+        screening_engine.apply(company)
+        facet_index.apply(company)
         return CompanyResponse.from_orm(company)
 
     async def select_company(self, company_id: UUID, selection: CompanySelectionRequest) -> CompanySelectionResponse:
@@ -93,6 +195,7 @@ class CompanyService:
             selection.selected,
             selection.notes
         )
+        screening_engine.apply(updated_company)
 
         action = "selected" if selection.selected else "deselected"
         message = f"Company {company.ticker_symbol} successfully {action}"
@@ -104,6 +207,15 @@ class CompanyService:
             message=message
         )
 
+    async def screen_companies(self, params: ScreenParams) -> ScreenResponse:
+        """Screen the company universe in memory"""
+        if (params.min_market_cap is not None and params.max_market_cap is not None
+                and params.min_market_cap > params.max_market_cap):
+            raise ValidationError("min_market_cap must not be greater than max_market_cap")
+
+        await screening_engine.ensure_fresh(self.company_repo)
+        return screening_engine.screen(params)
+
     async def get_available_filters(self) -> dict:
         """Get available filter options"""
         exchanges = await self.company_repo.get_unique_exchanges()
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.infrastructure.roaring import RoaringBitmap
+from app.services.stock_discovery.screening_engine import WATERMARK_OVERLAP
+
+logger = logging.getLogger(__name__)
+
+
+class FacetIndex:
+    """Roaring bitmap indexes of company ordinals per exchange and sector
+
+    Watchlists are bitmaps of the same ordinals, so "my watchlist in
+    Technology on NASDAQ" is two bitmap intersections and the per-facet
+    counts of a result are intersection cardinalities. Market caps are
+    kept in an array indexed by ordinal, so a cap range is one vectorized
+    comparison over the ordinals that survived the bitmap filters.
+
+    Like the screening engine, the index is built from one full scan,
+    patched in place by this process's writes (apply) and caught up from
+    other writers by reading rows changed since the last watermark.
+    """
+
+    def __init__(self, refresh_interval: timedelta = timedelta(seconds=30)):
+        self.refresh_interval = refresh_interval
+        self.companies: Optional[RoaringBitmap] = None
+        self.exchanges: Dict[str, RoaringBitmap] = {}
+        self.sectors: Dict[str, RoaringBitmap] = {}
+        # Current facet values per ordinal, to move a company between bitmaps when they change
+        self.facets_by_ordinal: Dict[int, Tuple[str, Optional[str]]] = {}
+        self.market_cap = np.full(1024, np.nan, dtype=np.float64)
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.companies is not None
+
+    async def ensure_fresh(self, company_repo):
+        """Build the index on first use and catch up rows changed by other writers"""
+        if self._is_fresh(datetime.utcnow()):
+            return
+
+        async with self._lock:
+            now = datetime.utcnow()
+            if self._is_fresh(now):
+                return
+
+            if not self.is_loaded:
+                rows = await company_repo.get_facet_rows()
+                self.load(rows)
+                logger.info(f"📊 Watchlist facet index loaded: {len(self.companies)} companies, "
+                            f"{len(self.exchanges)} exchanges, {len(self.sectors)} sectors")
+            else:
+                since = self.watermark - WATERMARK_OVERLAP if self.watermark else None
+                rows = await company_repo.get_facet_rows(changed_since=since)
+                for row in rows:
+                    self.upsert(row)
+
+            for row in rows:
+                changed_at = row[4]
+                if changed_at is not None and (self.watermark is None or changed_at > self.watermark):
+                    self.watermark = changed_at
+            self.refreshed_at = now
+
+    def _is_fresh(self, now: datetime) -> bool:
+        return self.is_loaded and now - self.refreshed_at < self.refresh_interval
+
+    def _grow(self, ordinal: int):
+        if ordinal >= len(self.market_cap):
+            grown = np.full(max(ordinal + 1, len(self.market_cap) * 2), np.nan, dtype=np.float64)
+            grown[:len(self.market_cap)] = self.market_cap
+            self.market_cap = grown
+
+    def load(self, rows: Sequence[Sequence]):
+        """Build every bitmap from (ordinal, exchange, sector, market_cap, ...) rows at once"""
+        by_exchange, by_sector = defaultdict(list), defaultdict(list)
+        self.facets_by_ordinal = {}
+        self.market_cap = np.full(1024, np.nan, dtype=np.float64)
+        if rows:
+            self._grow(max(row[0] for row in rows))
+        for ordinal, exchange, sector, market_cap, *_ in rows:
+            by_exchange[exchange].append(ordinal)
+            if sector is not None:
+                by_sector[sector].append(ordinal)
+            self.facets_by_ordinal[ordinal] = (exchange, sector)
+            self.market_cap[ordinal] = np.nan if market_cap is None else market_cap
+        self.exchanges = {exchange: RoaringBitmap(ordinals) for exchange, ordinals in by_exchange.items()}
+        self.sectors = {sector: RoaringBitmap(ordinals) for sector, ordinals in by_sector.items()}
+        self.companies = RoaringBitmap(list(self.facets_by_ordinal))
+
+    def upsert(self, row: Sequence):
+        """Move one (ordinal, exchange, sector, market_cap) row to its current facet bitmaps"""
+        ordinal, exchange, sector, market_cap = row[:4]
+        previous = self.facets_by_ordinal.get(ordinal)
+        if previous != (exchange, sector):
+            if previous is not None:
+                self.exchanges[previous[0]].discard(ordinal)
+                if previous[1] is not None:
+                    self.sectors[previous[1]].discard(ordinal)
+            self.exchanges.setdefault(exchange, RoaringBitmap()).add(ordinal)
+            if sector is not None:
+                self.sectors.setdefault(sector, RoaringBitmap()).add(ordinal)
+            self.facets_by_ordinal[ordinal] = (exchange, sector)
+            self.companies.add(ordinal)
+        self._grow(ordinal)
+        self.market_cap[ordinal] = np.nan if market_cap is None else market_cap
+
+    def apply(self, company):
+        """Patch the index with a company written by this process"""
+        if not self.is_loaded or company is None or company.ordinal is None:
+            return
+        self.upsert((company.ordinal, company.exchange, company.sector, company.market_cap))
+
+    def filter(
+        self,
+        members: RoaringBitmap,
+        exchanges: Optional[List[str]] = None,
+        sectors: Optional[List[str]] = None,
+        min_market_cap: Optional[float] = None,
+        max_market_cap: Optional[float] = None
+    ) -> RoaringBitmap:
+        """Members on any of the exchanges, in any of the sectors and within the market cap range"""
+        result = members
+        # Intersect per facet and union the (small) results, rather than union the (large) facets first
+        if exchanges:
+            result = RoaringBitmap.union(result & self.exchanges[name] for name in set(exchanges) if name in self.exchanges)
+        if sectors:
+            result = RoaringBitmap.union(result & self.sectors[name] for name in set(sectors) if name in self.sectors)
+        if min_market_cap is None and max_market_cap is None:
+            return result
+
+        ordinals = result.to_array()
+        # Ordinals the index has not caught up with yet have no known market cap
+        caps = np.full(len(ordinals), np.nan)
+        known = ordinals < len(self.market_cap)
+        caps[known] = self.market_cap[ordinals[known]]
+        # NaN comparisons are False, so companies without a market cap drop out of ranges
+        keep = np.ones(len(ordinals), dtype=bool)
+        if min_market_cap is not None:
+            keep &= caps >= min_market_cap
+        if max_market_cap is not None:
+            keep &= caps <= max_market_cap
+        return RoaringBitmap(ordinals[keep])
+
+    def facet_counts(self, members: RoaringBitmap) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Members per exchange and per sector, leaving out empty facets"""
+        exchanges = {name: members.intersection_len(bitmap) for name, bitmap in self.exchanges.items()}
+        sectors = {name: members.intersection_len(bitmap) for name, bitmap in self.sectors.items()}
+        return (
+            {name: count for name, count in sorted(exchanges.items()) if count},
+            {name: count for name, count in sorted(sectors.items()) if count},
+        )
+
+
+# Process-wide index shared by all requests in this worker
+facet_index = FacetIndex()
@@ -0,0 +1,548 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.infrastructure.universe_snapshot import (
+    UNIVERSE_SNAPSHOT_PATH, SnapshotColumns, UniverseSnapshot, decode_names, encode_names,
+    read_generation, write_snapshot
+)
+from app.shared.models.stock_discovery import (
+    ScreenParams, ScreenGroupBy, ScreenGroup, ScreenedCompany, ScreenResponse
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows whose timestamps fall within this margin of the watermark are re-read on
+# catch-up, so transactions that committed out of timestamp order are not missed
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+MISSING_CODE = -1
+
+# Local snapshot a private engine starts from instead of a full scan (unset disables)
+UNIVERSE_WARM_START_PATH = os.getenv("UNIVERSE_WARM_START_PATH") or None
+# Minimum seconds between warm-start saves while the universe keeps changing
+UNIVERSE_WARM_START_SAVE_SECONDS = float(os.getenv("UNIVERSE_WARM_START_SAVE_SECONDS", "300"))
+# Warm-start files whose last full scan is older than this are discarded, so catch-up drift heals
+UNIVERSE_WARM_START_MAX_AGE_SECONDS = float(os.getenv("UNIVERSE_WARM_START_MAX_AGE_SECONDS", "86400"))
+
+
+class CategoryCodes:
+    """Dictionary encoding for a low-cardinality string column"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Get the code for a value, adding it as a new category if needed"""
+        if value is None:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Sequence[str]) -> np.ndarray:
+        """Get codes for known values (unknown values match nothing)"""
+        return np.array([self.codes[v] for v in values if v in self.codes], dtype=np.int16)
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code == MISSING_CODE else self.values[code]
+
+
+class CompanyUniverse:
+    """Columnar NumPy snapshot of sd_companies used for vectorized screening
+
+    Ids are stored as raw 16-byte UUIDs and tickers as fixed-width ASCII so the
+    arrays can be written out as-is by the snapshot publisher. Arrays are
+    over-allocated and grown geometrically so incremental inserts stay
+    amortized O(1); only the first `size` rows are live.
+    """
+
+    read_only = False
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype="V16")
+        self.tickers = np.zeros(capacity, dtype="S10")
+        self.names = np.empty(capacity, dtype=object)
+        self.exchange_codes = np.full(capacity, MISSING_CODE, dtype=np.int16)
+        self.sector_codes = np.full(capacity, MISSING_CODE, dtype=np.int16)
+        self.market_cap = np.full(capacity, np.nan, dtype=np.float64)
+        self.is_selected = np.zeros(capacity, dtype=bool)
+        self.exchanges = CategoryCodes()
+        self.sectors = CategoryCodes()
+        # Keyed by raw UUID bytes, which a warm start can take straight from the ids column
+        self.row_by_id: Dict[bytes, int] = {}
+        # Bumped on every change so publishers can skip unchanged generations
+        self.version = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ids)
+
+    def _grow(self, minimum: int):
+        capacity = max(minimum, self.capacity * 2)
+        for name, fill in (
+            ("ids", b""), ("tickers", b""), ("names", None),
+            ("exchange_codes", MISSING_CODE), ("sector_codes", MISSING_CODE),
+            ("market_cap", np.nan), ("is_selected", False),
+        ):
+            current = getattr(self, name)
+            grown = np.empty(capacity, dtype=current.dtype)
+            grown[:self.size] = current[:self.size]
+            if fill is not None:
+                grown[self.size:] = fill
+            setattr(self, name, grown)
+
+    def upsert(self, row: Sequence) -> bool:
+        """Insert or patch one (id, ticker, name, exchange, sector, market_cap, is_selected) row
+
+        Returns True when the row was new.
+        """
+        company_id, ticker, name, exchange, sector, market_cap, is_selected = row[:7]
+        index = self.row_by_id.get(company_id.bytes)
+        is_new = index is None
+        if not is_new and self._matches(index, ticker, name, exchange, sector, market_cap, is_selected):
+            return False
+        if is_new:
+            if self.size >= self.capacity:
+                self._grow(self.size + 1)
+            index = self.size
+            self.size += 1
+            self.row_by_id[company_id.bytes] = index
+            self.ids[index] = company_id.bytes
+
+        self.tickers[index] = ticker.encode("ascii", "replace")
+        self.names[index] = name
+        self.exchange_codes[index] = self.exchanges.encode(exchange)
+        self.sector_codes[index] = self.sectors.encode(sector)
+        self.market_cap[index] = np.nan if market_cap is None else market_cap
+        self.is_selected[index] = bool(is_selected)
+        self.version += 1
+        return is_new
+
+    def _matches(self, index, ticker, name, exchange, sector, market_cap, is_selected) -> bool:
+        current_cap = self.market_cap[index]
+        return (
+            self.names[index] == name
+            and self.tickers[index] == ticker.encode("ascii", "replace")
+            and self.exchange_codes[index] == self.exchanges.codes.get(exchange, MISSING_CODE)
+            and self.sector_codes[index] == self.sectors.codes.get(sector, MISSING_CODE)
+            and (np.isnan(current_cap) if market_cap is None else current_cap == market_cap)
+            and self.is_selected[index] == bool(is_selected)
+        )
+
+    @classmethod
+    def from_snapshot(cls, columns: SnapshotColumns) -> "CompanyUniverse":
+        """Writable copy of snapshot columns, so a warm start can keep patching it"""
+        n = columns.rows
+        universe = cls(capacity=max(1024, n + n // 8))
+        universe.size = n
+        universe.ids[:n] = columns.ids
+        universe.tickers[:n] = columns.tickers
+        universe.names[:n] = decode_names(columns.name_offsets, columns.name_blob)
+        universe.exchange_codes[:n] = columns.exchange_codes
+        universe.sector_codes[:n] = columns.sector_codes
+        universe.market_cap[:n] = columns.market_cap
+        universe.is_selected[:n] = columns.is_selected
+        universe.exchanges = CategoryCodes(columns.exchanges)
+        universe.sectors = CategoryCodes(columns.sectors)
+        universe.row_by_id = dict(zip(columns.ids.tolist(), range(n)))
+        return universe
+
+    def load(self, rows: Sequence[Sequence]):
+        """Bulk load rows into a fresh set of arrays"""
+        if len(rows) > self.capacity:
+            self._grow(len(rows))
+        for row in rows:
+            self.upsert(row)
+
+    def name_at(self, index: int) -> str:
+        return self.names[index]
+
+    def row(self, index: int) -> ScreenedCompany:
+        market_cap = self.market_cap[index]
+        return ScreenedCompany(
+            id=UUID(bytes=self.ids[index].tobytes()),
+            ticker_symbol=self.tickers[index].decode("ascii"),
+            company_name=self.name_at(index),
+            exchange=self.exchanges.decode(int(self.exchange_codes[index])),
+            sector=self.sectors.decode(int(self.sector_codes[index])),
+            market_cap=None if np.isnan(market_cap) else float(market_cap),
+            is_selected=bool(self.is_selected[index]),
+        )
+
+    def to_snapshot_columns(self) -> SnapshotColumns:
+        """Copy the live rows into plain arrays for the snapshot writer
+
+        Copies rather than views: upserts write into the live arrays in place
+        while the writer runs in a thread.
+        """
+        n = self.size
+        name_offsets, name_blob = encode_names(self.names[:n])
+        return SnapshotColumns(
+            ids=self.ids[:n].copy(),
+            tickers=self.tickers[:n].copy(),
+            name_offsets=name_offsets,
+            name_blob=name_blob,
+            exchange_codes=self.exchange_codes[:n].copy(),
+            sector_codes=self.sector_codes[:n].copy(),
+            market_cap=self.market_cap[:n].copy(),
+            is_selected=self.is_selected[:n].copy(),
+            exchanges=list(self.exchanges.values),
+            sectors=list(self.sectors.values),
+        )
+
+
+class MappedUniverse(CompanyUniverse):
+    """Read-only universe backed by a memory-mapped snapshot file
+
+    Column arrays point straight into the shared mapping, so no per-worker
+    copy of the universe is made. Names are sliced out of the name blob on
+    demand for the few rows a screen returns.
+    """
+
+    read_only = True
+
+    def __init__(self, snapshot: UniverseSnapshot):
+        columns = snapshot.columns
+        self.snapshot = snapshot
+        self.size = columns.rows
+        self.ids = columns.ids
+        self.tickers = columns.tickers
+        self.name_offsets = columns.name_offsets
+        self.name_blob = columns.name_blob
+        self.exchange_codes = columns.exchange_codes
+        self.sector_codes = columns.sector_codes
+        self.market_cap = columns.market_cap
+        self.is_selected = columns.is_selected
+        self.exchanges = CategoryCodes(columns.exchanges)
+        self.sectors = CategoryCodes(columns.sectors)
+        self.version = snapshot.generation
+
+    def upsert(self, row: Sequence) -> bool:
+        raise TypeError("Mapped universe snapshots are read-only")
+
+    def name_at(self, index: int) -> str:
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return self.name_blob[start:end].tobytes().decode("utf-8")
+
+
+class ScreeningEngine:
+    """In-memory multi-criteria screening over the company universe
+
+    The snapshot is built from one full scan, patched in place by this
+    process's writes (apply) and caught up from other writers (other workers,
+    the importer) by reading rows changed since the last watermark.
+
+    When `snapshot_path` is set the engine instead maps the shared snapshot
+    written by publish_universe.py, so all workers share one copy of the
+    arrays. A new generation is picked up by remapping and swapping the
+    universe reference; local writes then become visible on the publisher's
+    next cycle. If no snapshot has been published yet the engine falls back
+    to building a private snapshot from the database.
+
+    With `warm_start_path` a private snapshot is also saved to local disk
+    (after the first build, then at most every `save_interval` while it
+    changes, and on shutdown). A restarted worker loads that file and
+    catches up only the rows changed since its watermark. The file records
+    the database it was built from and when its last full scan ran; it is
+    refused for another database, once that scan is older than
+    `warm_start_max_age`, or when the caught-up universe and the table
+    disagree on the number of companies (catch-up cannot see deletions).
+    """
+
+    def __init__(
+        self,
+        refresh_interval: timedelta = timedelta(seconds=30),
+        snapshot_path: Optional[str] = None,
+        warm_start_path: Optional[str] = None,
+        save_interval: timedelta = timedelta(seconds=UNIVERSE_WARM_START_SAVE_SECONDS),
+        warm_start_max_age: timedelta = timedelta(seconds=UNIVERSE_WARM_START_MAX_AGE_SECONDS)
+    ):
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = snapshot_path
+        self.warm_start_path = warm_start_path
+        self.save_interval = save_interval
+        self.warm_start_max_age = warm_start_max_age
+        self.universe: Optional[CompanyUniverse] = None
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at: Optional[datetime] = None
+        self.saved_version: Optional[int] = None
+        self.saved_at: Optional[datetime] = None
+        # Database identity and time of the last full scan, saved with the warm-start file
+        self.source: Optional[dict] = None
+        self.built_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.universe is not None
+
+    def _map_published_snapshot(self) -> bool:
+        """Map the newest shared snapshot, returning False when none exists"""
+        identity = UniverseSnapshot.current_identity(self.snapshot_path)
+        if identity is None:
+            # Keep serving an already mapped generation if the file disappears
+            return isinstance(self.universe, MappedUniverse)
+
+        if isinstance(self.universe, MappedUniverse) and self.universe.snapshot.identity == identity:
+            return True
+
+        snapshot = UniverseSnapshot(self.snapshot_path)
+        # Rebinding the reference is the atomic swap; screens in flight keep the old mapping
+        self.universe = MappedUniverse(snapshot)
+        self.watermark = snapshot.watermark
+        self.refreshed_at = datetime.utcnow()
+        logger.info(f"📊 Mapped universe snapshot generation {snapshot.generation}: {snapshot.rows} companies")
+        return True
+
+    async def ensure_fresh(self, company_repo):
+        """Load the snapshot on first use and catch up stale snapshots"""
+        if self.snapshot_path and self._map_published_snapshot():
+            return
+
+        if isinstance(self.universe, MappedUniverse):
+            self.invalidate()
+
+        if self._is_fresh(datetime.utcnow()):
+            return
+
+        async with self._lock:
+            now = datetime.utcnow()
+            if self._is_fresh(now):
+                return
+
+            if not self.is_loaded and self.warm_start_path and await self.warm_start(self.warm_start_path, company_repo):
+                return
+
+            if not self.is_loaded:
+                rows = await company_repo.get_screening_rows()
+                universe = CompanyUniverse(capacity=max(1024, len(rows)))
+                universe.load(rows)
+                self.universe = universe
+                self.built_at = now
+                logger.info(f"📊 Screening snapshot loaded: {universe.size} companies")
+            else:
+                since = self.watermark - WATERMARK_OVERLAP if self.watermark else None
+                rows = await company_repo.get_screening_rows(changed_since=since)
+                for row in rows:
+                    self.universe.upsert(row)
+
+            self._advance_watermark(rows)
+            self.refreshed_at = now
+
+            if self.warm_start_path and (self.saved_at is None or now - self.saved_at >= self.save_interval):
+                await self.save_warm_start()
+
+    def _is_fresh(self, now: datetime) -> bool:
+        return self.is_loaded and self.refreshed_at is not None and now - self.refreshed_at < self.refresh_interval
+
+    def _advance_watermark(self, rows: Sequence[Sequence]):
+        for row in rows:
+            changed_at = row[7]
+            if changed_at is not None and (self.watermark is None or changed_at > self.watermark):
+                self.watermark = changed_at
+
+    async def warm_start(self, path: str, company_repo) -> bool:
+        """Load a private universe from a snapshot file and catch it up; False when there is none usable"""
+        if self.is_loaded:
+            return True
+        started = time.perf_counter()
+        self.source, companies = await company_repo.get_universe_source()
+        loaded = await asyncio.to_thread(read_warm_start, path)
+        if loaded is None:
+            return False
+        universe, watermark, origin = loaded
+
+        if origin.get("source") != self.source:
+            logger.info(f"📊 Ignoring screening warm-start snapshot {path}: it was saved from another database")
+            return False
+        built_at = datetime.fromisoformat(origin["built_at"]) if origin.get("built_at") else None
+        if built_at is None or datetime.utcnow() - built_at > self.warm_start_max_age:
+            logger.info(f"📊 Ignoring screening warm-start snapshot {path}: its last full scan ({built_at}) is too old")
+            return False
+
+        saved_version = universe.version
+        since = watermark - WATERMARK_OVERLAP if watermark else None
+        rows = await company_repo.get_screening_rows(changed_since=since)
+        for row in rows:
+            universe.upsert(row)
+        if universe.size != companies:
+            logger.info(f"📊 Ignoring screening warm-start snapshot {path}: {universe.size} companies after "
+                        f"catch-up but {companies} in the database")
+            return False
+
+        self.universe, self.watermark, self.built_at = universe, watermark, built_at
+        self._advance_watermark(rows)
+        self.refreshed_at = datetime.utcnow()
+        self.saved_version = saved_version
+        self.saved_at = self.refreshed_at
+        logger.info(f"📊 Screening snapshot warm-started from {path}: {universe.size} companies "
+                    f"as of {self.watermark} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return True
+
+    async def save_warm_start(self):
+        """Write the private universe to the warm-start file if it changed since the last save"""
+        universe = self.universe
+        if (not self.warm_start_path or universe is None or universe.read_only
+                or self.source is None or self.built_at is None or universe.version == self.saved_version):
+            return
+        # Copy the columns on the event loop so upserts during the write cannot tear them
+        columns, watermark, version = universe.to_snapshot_columns(), self.watermark, universe.version
+        origin = self.origin()
+        try:
+            await asyncio.to_thread(save_warm_start, self.warm_start_path, columns, watermark, origin)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save screening warm-start snapshot to {self.warm_start_path}: {e}")
+            return
+        self.saved_version = version
+        self.saved_at = datetime.utcnow()
+
+    def origin(self) -> Optional[dict]:
+        """Snapshot metadata a later warm start checks the file against"""
+        if self.source is None or self.built_at is None:
+            return None
+        return {"source": self.source, "built_at": self.built_at.isoformat()}
+
+    def apply(self, company):
+        """Patch the snapshot with a company written by this process"""
+        if not self.is_loaded or company is None or self.universe.read_only:
+            return
+        self.universe.upsert((
+            company.id, company.ticker_symbol, company.company_name, company.exchange,
+            company.sector, company.market_cap, company.is_selected,
+        ))
+
+    def invalidate(self):
+        """Drop the snapshot so the next screen reloads it"""
+        self.universe = None
+        self.watermark = None
+        self.refreshed_at = None
+        self.built_at = None
+
+    def mask(self, params: ScreenParams) -> np.ndarray:
+        """Evaluate all filters as a single boolean mask over live rows"""
+        universe = self.universe
+        n = universe.size
+        mask = np.ones(n, dtype=bool)
+
+        if params.exchanges:
+            mask &= np.isin(universe.exchange_codes[:n], universe.exchanges.lookup(params.exchanges))
+        if params.sectors:
+            mask &= np.isin(universe.sector_codes[:n], universe.sectors.lookup(params.sectors))
+
+        market_cap = universe.market_cap[:n]
+        # NaN comparisons are False, so companies without a market cap drop out of ranges
+        if params.min_market_cap is not None:
+            mask &= market_cap >= params.min_market_cap
+        if params.max_market_cap is not None:
+            mask &= market_cap <= params.max_market_cap
+
+        if params.is_selected is not None:
+            selected = universe.is_selected[:n]
+            mask &= selected if params.is_selected else ~selected
+
+        return mask
+
+    def top_k(self, matches: np.ndarray, k: int) -> np.ndarray:
+        """Row indices of the k largest market caps, ties broken by ticker"""
+        if k == 0 or len(matches) == 0:
+            return matches[:0]
+
+        universe = self.universe
+        caps = np.nan_to_num(universe.market_cap[matches], nan=-np.inf)
+        if k < len(matches):
+            # O(n) selection of the top k before sorting only those
+            partition = np.argpartition(-caps, k - 1)[:k]
+            threshold = caps[partition].min()
+            # Keep every row tied at the threshold so ticker tie-breaks stay exact
+            matches = matches[caps >= threshold]
+            caps = caps[caps >= threshold]
+
+        order = np.lexsort((universe.tickers[matches], -caps))
+        return matches[order[:k]]
+
+    def group(self, matches: np.ndarray, group_by: ScreenGroupBy) -> List[ScreenGroup]:
+        """Count / selected / market cap aggregates per category"""
+        universe = self.universe
+        if group_by == ScreenGroupBy.SECTOR:
+            codes, categories = universe.sector_codes[matches], universe.sectors
+        else:
+            codes, categories = universe.exchange_codes[matches], universe.exchanges
+
+        # Shift by one so MISSING_CODE (-1) lands in bucket 0
+        buckets = codes.astype(np.int64) + 1
+        width = len(categories.values) + 1
+        caps = universe.market_cap[matches]
+        has_cap = ~np.isnan(caps)
+        caps_or_zero = np.where(has_cap, caps, 0.0)
+
+        counts = np.bincount(buckets, minlength=width)
+        selected = np.bincount(buckets, weights=universe.is_selected[matches], minlength=width)
+        cap_counts = np.bincount(buckets, weights=has_cap, minlength=width)
+        cap_sums = np.bincount(buckets, weights=caps_or_zero, minlength=width)
+        cap_max = np.full(width, -np.inf)
+        np.maximum.at(cap_max, buckets[has_cap], caps[has_cap])
+
+        groups = []
+        for bucket in np.flatnonzero(counts):
+            groups.append(ScreenGroup(
+                key=categories.decode(int(bucket) - 1),
+                count=int(counts[bucket]),
+                selected_count=int(selected[bucket]),
+                total_market_cap=float(cap_sums[bucket]),
+                mean_market_cap=float(cap_sums[bucket] / cap_counts[bucket]) if cap_counts[bucket] else None,
+                max_market_cap=float(cap_max[bucket]) if cap_counts[bucket] else None,
+            ))
+        groups.sort(key=lambda g: g.total_market_cap, reverse=True)
+        return groups
+
+    def screen(self, params: ScreenParams) -> ScreenResponse:
+        """Run a screen against the current snapshot"""
+        matches = np.flatnonzero(self.mask(params))
+        top = self.top_k(matches, params.limit)
+
+        return ScreenResponse(
+            companies=[self.universe.row(int(index)) for index in top],
+            total=int(len(matches)),
+            groups=self.group(matches, params.group_by) if params.group_by else None,
+            universe_size=self.universe.size,
+            refreshed_at=self.refreshed_at,
+        )
+
+
+def read_warm_start(path: str) -> Optional[Tuple[CompanyUniverse, Optional[datetime], dict]]:
+    """Copy a snapshot file into a writable universe with its watermark and origin, or None if missing or unreadable"""
+    try:
+        snapshot = UniverseSnapshot(path)
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, OSError) as e:
+        logger.warning(f"⚠️ Ignoring screening warm-start snapshot {path}: {e}")
+        return None
+    return CompanyUniverse.from_snapshot(snapshot.columns), snapshot.watermark, snapshot.origin
+
+
+def save_warm_start(path: str, columns: SnapshotColumns, watermark: Optional[datetime], origin: Optional[dict] = None) -> int:
+    """Write a warm-start snapshot as the next generation of the file at `path`"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return write_snapshot(path, columns, read_generation(path) + 1, watermark, origin)
+
+
+# Process-wide engine shared by all requests in this worker
+screening_engine = ScreeningEngine(
+    snapshot_path=UNIVERSE_SNAPSHOT_PATH,
+    warm_start_path=UNIVERSE_WARM_START_PATH
+)
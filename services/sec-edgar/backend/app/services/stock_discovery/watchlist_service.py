@@ -0,0 +1,106 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List
+from uuid import UUID
+
+from app.infrastructure.repositories.stock_discovery import CompanyRepository, WatchlistRepository
+from app.infrastructure.roaring import RoaringBitmap
+from app.infrastructure.tracing import traced_methods
+from app.services.stock_discovery.facet_index import facet_index
+from app.shared.models.stock_discovery import (
+    CompanyResponse, WatchlistCreate, WatchlistMembersRequest, WatchlistResponse,
+    WatchlistCompaniesParams, WatchlistCompaniesResponse, WatchlistFacets
+)
+from app.shared.exceptions import WatchlistNotFoundError, WatchlistAlreadyExistsError, ValidationError
+
+
+@traced_methods("service")
+class WatchlistService:
+    """Per-client watchlists stored as Roaring bitmaps of company ordinals"""
+
+    def __init__(self, db: AsyncSession, owner: str):
+        self.owner = owner
+        self.company_repo = CompanyRepository(db)
+        self.watchlist_repo = WatchlistRepository(db)
+
+    async def get_watchlists(self) -> List[WatchlistResponse]:
+        """Get the client's watchlists"""
+        return [WatchlistResponse.from_orm(watchlist) for watchlist in await self.watchlist_repo.get_for_owner(self.owner)]
+
+    async def create_watchlist(self, data: WatchlistCreate) -> WatchlistResponse:
+        """Create a watchlist, optionally with initial members"""
+        if await self.watchlist_repo.get_by_name(self.owner, data.name):
+            raise WatchlistAlreadyExistsError(f"Watchlist '{data.name}' already exists")
+
+        members = RoaringBitmap(list((await self.resolve_ordinals(data.company_ids)).values()))
+        watchlist = await self.watchlist_repo.create(self.owner, data.name, members.serialize(), len(members))
+        return WatchlistResponse.from_orm(watchlist)
+
+    async def update_members(self, watchlist_id: UUID, request: WatchlistMembersRequest) -> WatchlistResponse:
+        """Add and remove companies; the row is locked so concurrent edits do not overwrite each other"""
+        ordinals = await self.resolve_ordinals(request.add + request.remove)
+        watchlist = await self.watchlist_repo.get(self.owner, watchlist_id, for_update=True)
+        if not watchlist:
+            raise WatchlistNotFoundError(f"Watchlist with ID {watchlist_id} not found")
+
+        members = RoaringBitmap.deserialize(watchlist.members)
+        members = members | RoaringBitmap([ordinals[company_id] for company_id in request.add])
+        members = members - RoaringBitmap([ordinals[company_id] for company_id in request.remove])
+        watchlist = await self.watchlist_repo.save_members(watchlist, members.serialize(), len(members))
+        return WatchlistResponse.from_orm(watchlist)
+
+    async def delete_watchlist(self, watchlist_id: UUID):
+        """Delete a watchlist"""
+        watchlist = await self.watchlist_repo.get(self.owner, watchlist_id)
+        if not watchlist:
+            raise WatchlistNotFoundError(f"Watchlist with ID {watchlist_id} not found")
+        await self.watchlist_repo.delete(watchlist)
+
+    async def get_watchlist_companies(
+        self, watchlist_id: UUID, params: WatchlistCompaniesParams
+    ) -> WatchlistCompaniesResponse:
+        """Filter a watchlist by facets, market cap and other watchlists, with per-facet counts"""
+        if (params.min_market_cap is not None and params.max_market_cap is not None
+                and params.min_market_cap > params.max_market_cap):
+            raise ValidationError("min_market_cap must not be greater than max_market_cap")
+
+        others = (params.intersect or []) + (params.exclude or [])
+        watchlists = {
+            watchlist.id: watchlist
+            for watchlist in await self.watchlist_repo.get_many(self.owner, [watchlist_id] + others)
+        }
+        missing = [str(key) for key in [watchlist_id] + others if key not in watchlists]
+        if missing:
+            raise WatchlistNotFoundError(f"Watchlists not found: {', '.join(missing)}")
+
+        members = RoaringBitmap.deserialize(watchlists[watchlist_id].members)
+        for other in params.intersect or []:
+            members = members & RoaringBitmap.deserialize(watchlists[other].members)
+        for other in params.exclude or []:
+            members = members - RoaringBitmap.deserialize(watchlists[other].members)
+
+        await facet_index.ensure_fresh(self.company_repo)
+        members = facet_index.filter(
+            members,
+            exchanges=params.exchanges,
+            sectors=params.sectors,
+            min_market_cap=params.min_market_cap,
+            max_market_cap=params.max_market_cap
+        )
+        exchanges, sectors = facet_index.facet_counts(members)
+
+        companies = await self.company_repo.get_page_by_ordinals(members.to_array().tolist(), params.page, params.size)
+        return WatchlistCompaniesResponse(
+            companies=[CompanyResponse.from_orm(company) for company in companies],
+            total=len(members),
+            page=params.page,
+            size=params.size,
+            facets=WatchlistFacets(exchanges=exchanges, sectors=sectors)
+        )
+
+    async def resolve_ordinals(self, company_ids: List[UUID]) -> Dict[UUID, int]:
+        """Ordinals for company IDs, rejecting unknown companies"""
+        ordinals = await self.company_repo.get_ordinals(company_ids)
+        unknown = sorted({str(company_id) for company_id in company_ids if company_id not in ordinals})
+        if unknown:
+            raise ValidationError(f"Unknown company IDs: {', '.join(unknown[:10])}" + (" ..." if len(unknown) > 10 else ""))
+        return ordinals
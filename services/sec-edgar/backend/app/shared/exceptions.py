@@ -15,6 +15,16 @@ class CompanyAlreadyExistsError(BaseAPIException):
     def __init__(self, detail: str = "Company already exists"):
         super().__init__(detail=detail, status_code=409)
 
+class WatchlistNotFoundError(BaseAPIException):
+    """Raised when a watchlist does not exist or belongs to another client"""
+    def __init__(self, detail: str = "Watchlist not found"):
+        super().__init__(detail=detail, status_code=404)
+
+class WatchlistAlreadyExistsError(BaseAPIException):
+    """Raised when a client already has a watchlist with the same name"""
+    def __init__(self, detail: str = "Watchlist already exists"):
+        super().__init__(detail=detail, status_code=409)
+
 class ValidationError(BaseAPIException):
     """Raised when validation fails"""
     def __init__(self, detail: str = "Validation failed"):
@@ -23,4 +33,21 @@ class ValidationError(BaseAPIException):
 class ExternalAPIError(BaseAPIException):
     """Raised when external API calls fail"""
     def __init__(self, detail: str = "External API error"):
-        super().__init__(detail=detail, status_code=502)
\ No newline at end of file
+        super().__init__(detail=detail, status_code=502)
+
+class CIKNotFoundError(BaseAPIException):
+    """Raised when a company's SEC CIK cannot be resolved"""
+    def __init__(self, detail: str = "CIK not found"):
+        super().__init__(detail=detail, status_code=404)
+
+class RateLimitExceededError(BaseAPIException):
+    """Raised when an API key has used up its request quota"""
+    def __init__(self, detail: str = "Rate limit exceeded", retry_after: int = 1):
+        super().__init__(detail=detail, status_code=429)
+        self.headers = {"Retry-After": str(retry_after)}
+
+class ServiceOverloadedError(BaseAPIException):
+    """Raised when the database has no capacity left for another request"""
+    def __init__(self, detail: str = "Service overloaded", retry_after: int = 1):
+        super().__init__(detail=detail, status_code=503)
+        self.headers = {"Retry-After": str(retry_after)}
@@ -0,0 +1,92 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from datetime import date, datetime
+
+class CollectionEnqueueResponse(BaseModel):
+    enqueued: int
+    message: str
+
+class CollectionJobStats(BaseModel):
+    pending: int
+    leased: int
+    completed: int
+    failed: int
+    expired_leases: int
+
+class CollectionWorkerStats(BaseModel):
+    worker_id: str
+    hostname: Optional[str]
+    started_at: datetime
+    heartbeat_at: datetime
+    jobs_completed: int
+    jobs_failed: int
+    requests_made: int
+    jobs_per_second: float
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+class FeedDayResult(BaseModel):
+    day: date
+    published: bool
+    entries: int = 0
+    matched: int = 0
+    enqueued: int = 0
+
+class FrameIngestResult(BaseModel):
+    taxonomy: str
+    concept: str
+    unit: str
+    period: str
+    filers: int
+    matched: int
+    upserted: int
+    # Derived metric rows recomputed from the changed facts
+    derived: int = 0
+
+class ReportCalendarEntryResponse(BaseModel):
+    company_id: UUID
+    ticker_symbol: str
+    company_name: str
+    form_type: str
+    period_end: date
+    expected_filing_date: date
+    actual_filing_date: Optional[date] = None
+    is_filed: bool
+    days_until_due: int
+
+class ReportCalendarResponse(BaseModel):
+    from_date: date
+    to_date: date
+    entries: List[ReportCalendarEntryResponse]
+    total: int
+
+class CalendarRefreshResponse(BaseModel):
+    companies: int
+    entries: int
+
+class DerivedMetricsResponse(BaseModel):
+    period: str
+    period_end: date
+    revenue: Optional[float]
+    revenue_ttm: Optional[float]
+    revenue_yoy: Optional[float]
+    gross_profit: Optional[float]
+    gross_margin: Optional[float]
+    operating_income: Optional[float]
+    operating_margin: Optional[float]
+    net_income: Optional[float]
+    net_income_ttm: Optional[float]
+    net_income_yoy: Optional[float]
+    net_margin: Optional[float]
+    eps_diluted: Optional[float]
+    eps_diluted_ttm: Optional[float]
+    assets: Optional[float]
+    stockholders_equity: Optional[float]
+    return_on_equity_ttm: Optional[float]
+    computed_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
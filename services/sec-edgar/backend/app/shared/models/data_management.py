@@ -0,0 +1,92 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from datetime import date, datetime
+
+class FactResponse(BaseModel):
+    taxonomy: str
+    concept: str
+    unit: str
+    period: str
+    period_start: Optional[date] = None
+    period_end: date
+    value: float
+    accession_number: Optional[str] = None
+    source: str
+    collected_at: Optional[datetime] = None
+    # "hot" (Postgres) or "cold" (Parquet tier)
+    tier: str = "hot"
+
+    class Config:
+        from_attributes = True
+
+class FactRangeResponse(BaseModel):
+    company_id: UUID
+    start: Optional[date] = None
+    end: Optional[date] = None
+    facts: List[FactResponse]
+    hot_rows: int
+    cold_rows: int
+    cold_row_groups: int
+
+class TierMonthResult(BaseModel):
+    month: str
+    rows: int
+    # Rows held in the month's file after merging
+    archived_rows: int = 0
+    row_groups: int = 0
+    seconds: float = 0.0
+
+class ColdStorageSummary(BaseModel):
+    dataset: str
+    months: List[str]
+    rows: int
+    row_groups: int
+    bytes: int
+
+class ImportJobResponse(BaseModel):
+    id: UUID
+    filename: Optional[str] = None
+    # receiving -> processing -> completed | failed
+    status: str
+    exchange: str
+    as_of: date
+    bytes_received: int
+    rows_parsed: int
+    rows_skipped: int
+    rows_written: int
+    companies_created: int
+    companies_updated: int
+    companies_unchanged: int
+    companies_delisted: int
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
+    rows_per_second: float
+
+class FilingSearchHit(BaseModel):
+    company_id: UUID
+    ticker_symbol: Optional[str] = None
+    accession_number: str
+    filing_type: str
+    filing_date: date
+    section_no: int
+    heading: Optional[str] = None
+    rank: float
+    # Matching fragments with terms wrapped in <mark></mark>
+    snippet: str
+    url: Optional[str] = None
+
+class FilingSearchResponse(BaseModel):
+    query: str
+    hits: List[FilingSearchHit]
+    # True when more hits exist beyond `limit`
+    has_more: bool
+
+class FilingIndexResult(BaseModel):
+    accession_number: str
+    sections: int
+    characters: int
+    bytes: int
+    error: Optional[str] = None
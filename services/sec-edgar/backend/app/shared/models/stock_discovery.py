@@ -1,7 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Optional, List
+from datetime import date, datetime
 from uuid import UUID
+from enum import Enum
+
+from app.shared.models.data_collection import DerivedMetricsResponse
+
+class CompanySort(str, Enum):
+    TICKER = "ticker"
+    NAME = "name"
+    MARKET_CAP_DESC = "market_cap_desc"
 
 class CompanyBase(BaseModel):
     ticker_symbol: str = Field(..., min_length=1, max_length=10, pattern="^[A-Z]+$")
@@ -9,6 +17,7 @@ class CompanyBase(BaseModel):
     exchange: str = Field(..., min_length=1, max_length=50)
     sector: Optional[str] = Field(None, max_length=100)
     market_cap: Optional[float] = Field(None, ge=0)
+    cik: Optional[str] = Field(None, max_length=10, pattern="^[0-9]{10}$")
 
 class CompanyCreate(CompanyBase):
     pass
@@ -18,6 +27,7 @@ class CompanyUpdate(BaseModel):
     exchange: Optional[str] = Field(None, min_length=1, max_length=50)
     sector: Optional[str] = Field(None, max_length=100)
     market_cap: Optional[float] = Field(None, ge=0)
+    cik: Optional[str] = Field(None, max_length=10, pattern="^[0-9]{10}$")
 
 class CompanyResponse(CompanyBase):
     id: UUID
@@ -30,11 +40,42 @@ class CompanyResponse(CompanyBase):
         from_attributes = True
         populate_by_name = True
 
+# Fields a client may request with `fields=` on the list, search and selected endpoints
+COMPANY_FIELDS = tuple(CompanyResponse.model_fields)
+
+class CompanyDetailResponse(CompanyResponse):
+    # Latest derived quarterly metrics, newest first
+    metrics: List[DerivedMetricsResponse] = []
+
 class CompanyListResponse(BaseModel):
     companies: List[CompanyResponse]
     total: int
     page: int
     size: int
+    # Set when the listing was resolved from history for a past date
+    as_of: Optional[date] = None
+
+MAX_BATCH_SIZE = 5000
+
+class CompanyBatchRequest(BaseModel):
+    ids: Optional[List[UUID]] = Field(None, max_length=MAX_BATCH_SIZE)
+    tickers: Optional[List[str]] = Field(None, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode="after")
+    def check_exactly_one_key_list(self):
+        if (self.ids is None) == (self.tickers is None):
+            raise ValueError("Provide exactly one of 'ids' or 'tickers'")
+        return self
+
+class CompanyBatchItem(BaseModel):
+    key: str
+    found: bool
+    company: Optional[CompanyResponse] = None
+
+class CompanyBatchResponse(BaseModel):
+    results: List[CompanyBatchItem]
+    found: int
+    missing: int
 
 class CompanySelectionRequest(BaseModel):
     selected: bool
@@ -51,5 +92,87 @@ class CompanySearchParams(BaseModel):
     exchange: Optional[str] = None
     sector: Optional[str] = None
     is_selected: Optional[bool] = None
+    min_market_cap: Optional[float] = Field(None, ge=0)
+    max_market_cap: Optional[float] = Field(None, ge=0)
+    sort: CompanySort = CompanySort.TICKER
+    page: int = Field(1, ge=1)
+    size: int = Field(50, ge=1, le=100)
+    as_of: Optional[date] = None
+    fields: Optional[str] = None
+class ScreenGroupBy(str, Enum):
+    SECTOR = "sector"
+    EXCHANGE = "exchange"
+
+class ScreenParams(BaseModel):
+    exchanges: Optional[List[str]] = None
+    sectors: Optional[List[str]] = None
+    min_market_cap: Optional[float] = Field(None, ge=0)
+    max_market_cap: Optional[float] = Field(None, ge=0)
+    is_selected: Optional[bool] = None
+    limit: int = Field(50, ge=0, le=1000)
+    group_by: Optional[ScreenGroupBy] = None
+
+class ScreenedCompany(BaseModel):
+    id: UUID
+    ticker_symbol: str
+    company_name: str
+    exchange: str
+    sector: Optional[str]
+    market_cap: Optional[float]
+    is_selected: bool
+
+class ScreenGroup(BaseModel):
+    key: Optional[str]
+    count: int
+    selected_count: int
+    total_market_cap: float
+    mean_market_cap: Optional[float]
+    max_market_cap: Optional[float]
+
+class ScreenResponse(BaseModel):
+    companies: List[ScreenedCompany]
+    total: int
+    groups: Optional[List[ScreenGroup]] = None
+    universe_size: int
+    refreshed_at: Optional[datetime]
+
+class WatchlistCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    company_ids: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+class WatchlistMembersRequest(BaseModel):
+    add: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    remove: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+class WatchlistResponse(BaseModel):
+    id: UUID
+    name: str
+    member_count: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class WatchlistCompaniesParams(BaseModel):
+    exchanges: Optional[List[str]] = None
+    sectors: Optional[List[str]] = None
+    min_market_cap: Optional[float] = Field(None, ge=0)
+    max_market_cap: Optional[float] = Field(None, ge=0)
+    # Other watchlists of the same owner to intersect with / subtract
+    intersect: Optional[List[UUID]] = None
+    exclude: Optional[List[UUID]] = None
     page: int = Field(1, ge=1)
-    size: int = Field(50, ge=1, le=100)
\ No newline at end of file
+    size: int = Field(50, ge=1, le=100)
+
+class WatchlistFacets(BaseModel):
+    # Matching companies per exchange and sector
+    exchanges: Dict[str, int]
+    sectors: Dict[str, int]
+
+class WatchlistCompaniesResponse(BaseModel):
+    companies: List[CompanyResponse]
+    total: int
+    page: int
+    size: int
+    facets: WatchlistFacets
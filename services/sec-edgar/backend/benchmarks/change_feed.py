@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Measure change-feed fan-out to many idle SSE connections
+
+Opens N concurrent /companies/changes streams against a running server,
+then toggles company selections through the API and records how long each
+event takes to reach every connected client. Compares the request load
+with the alternative of every client polling /companies/selected.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.change_feed --base-url http://localhost:8000 --clients 1000 5000 --events 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.harness import percentile
+
+
+class FeedClient:
+    """One idle SSE connection recording when each event seq arrives"""
+
+    def __init__(self):
+        self.connected = asyncio.Event()
+        self.arrivals = {}
+
+    async def run(self, client: httpx.AsyncClient):
+        async with client.stream("GET", "/api/v1/companies/changes") as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("retry:"):
+                    self.connected.set()
+                elif line.startswith("data:"):
+                    event = json.loads(line[5:])
+                    self.arrivals[event["seq"]] = time.perf_counter()
+
+
+async def toggle_selections(client: httpx.AsyncClient, company_ids: list, events: int, interval: float) -> list:
+    """Select/deselect companies, returning the send time of each change"""
+    sent = []
+    for i in range(events):
+        company_id = company_ids[i % len(company_ids)]
+        selected = (i // len(company_ids)) % 2 == 0
+        started = time.perf_counter()
+        response = await client.post(f"/api/v1/companies/{company_id}/select", json={"selected": selected})
+        response.raise_for_status()
+        sent.append(started)
+        await asyncio.sleep(interval)
+    return sent
+
+
+async def run_round(args, clients: int) -> dict:
+    headers = {"X-API-Key": os.getenv("API_KEY", "dev-api-key-12345")}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(30.0, read=None)
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=timeout) as stream_client, \
+            httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=30.0) as api_client:
+        response = await api_client.get("/api/v1/companies", params={"size": 20, "sort": "ticker"})
+        response.raise_for_status()
+        company_ids = [company["id"] for company in response.json()["companies"]]
+        original = {company["id"]: company["is_selected"] for company in response.json()["companies"]}
+
+        feeds = [FeedClient() for _ in range(clients)]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(feed.run(stream_client)) for feed in feeds]
+        await asyncio.wait_for(asyncio.gather(*(feed.connected.wait() for feed in feeds)), args.connect_timeout)
+        connect_s = time.perf_counter() - started
+
+        # Idle period: no events, only heartbeats
+        await asyncio.sleep(args.idle)
+
+        sent = await toggle_selections(api_client, company_ids, args.events, args.interval)
+        await asyncio.sleep(args.settle)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Restore the original selection flags
+        for company_id, selected in original.items():
+            await api_client.post(f"/api/v1/companies/{company_id}/select", json={"selected": selected})
+
+    # Events arrive in send order, so the k-th new seq matches the k-th toggle
+    seqs = sorted({seq for feed in feeds for seq in feed.arrivals})[:len(sent)]
+    latencies = sorted(
+        (feed.arrivals[seq] - sent_at) * 1000
+        for seq, sent_at in zip(seqs, sent)
+        for feed in feeds
+        if seq in feed.arrivals
+    )
+    delivered = len(latencies)
+    return {
+        "clients": clients,
+        "connect_s": round(connect_s, 2),
+        "delivered": delivered,
+        "missed": len(sent) * clients - delivered,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "max_ms": round(latencies[-1], 1) if latencies else None,
+    }
+
+
+async def run(args) -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = max(args.clients) + 256
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    print(f"{'clients':>8} {'connect s':>10} {'delivered':>10} {'missed':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'poll rps':>9}")
+    for clients in args.clients:
+        result = await run_round(args, clients)
+        # Request load if every client polled /companies/selected instead
+        polling_rps = clients / args.poll_interval
+        print(f"{result['clients']:>8} {result['connect_s']:>10} {result['delivered']:>10} {result['missed']:>7} "
+              f"{result['p50_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8} {polling_rps:>9.0f}")
+    print(f"\npoll rps: load the same clients would generate polling every {args.poll_interval:g}s; "
+          f"the feed costs one query per event batch per server process")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SSE change-feed fan-out')
+    parser.add_argument('--base-url', default='http://localhost:8000', help='Running API server')
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 1000, 5000], help='Concurrent SSE connections per round')
+    parser.add_argument('--events', type=int, default=20, help='Selection changes per round')
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between changes')
+    parser.add_argument('--idle', type=float, default=5, help='Seconds connections sit idle before changes start')
+    parser.add_argument('--settle', type=float, default=3, help='Seconds to wait for the last deliveries')
+    parser.add_argument('--connect-timeout', type=float, default=120, help='Seconds allowed to open every connection')
+    parser.add_argument('--poll-interval', type=float, default=5, help='Polling interval used for comparison')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
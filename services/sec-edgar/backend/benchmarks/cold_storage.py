@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Time company range reads from the cold Parquet tier
+
+Writes a synthetic fact history (companies x concepts x quarters, one
+file per period_end month) through ColdStore, then reads random
+company / period ranges the way /data/facts does and reports latency
+percentiles plus how many row groups the manifest let each read skip.
+The first pass per file maps it; later passes hit the page cache.
+
+Runs without a database: the facts are synthetic.
+
+Usage:
+    python -m benchmarks.cold_storage --companies 10000 --years 10 --queries 500
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+
+from app.infrastructure.cold_storage import FINANCIAL_FACTS, ROW_GROUP_SIZE, ColdStore, month_key
+from app.services.data_collection.derived_metrics import SOURCE_CONCEPTS
+from benchmarks.harness import percentile
+
+QUARTER_ENDS = [(3, 31), (6, 30), (9, 30), (12, 31)]
+
+
+def synthetic_month(company_ids, concepts, year: int, quarter: int, rng: random.Random) -> pa.Table:
+    """One quarter of facts for every company, as a cold storage table"""
+    month, day = QUARTER_ENDS[quarter - 1]
+    period_end = date(year, month, day)
+    collected_at = datetime.now(timezone.utc)
+    count = len(company_ids) * len(concepts)
+    return pa.table({
+        "company_id": [company_id for company_id in company_ids for _ in concepts],
+        "cik": [f"{index:010d}" for index in range(len(company_ids)) for _ in concepts],
+        "taxonomy": ["us-gaap"] * count,
+        "concept": list(concepts) * len(company_ids),
+        "unit": ["USD"] * count,
+        "period": [f"CY{year}Q{quarter}"] * count,
+        "period_start": [None] * count,
+        "period_end": [period_end] * count,
+        "value": [rng.uniform(1e6, 1e10) for _ in range(count)],
+        "accession_number": [None] * count,
+        "source": ["frames"] * count,
+        "collected_at": [collected_at] * count,
+    }, schema=FINANCIAL_FACTS.schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time range reads from cold Parquet storage')
+    parser.add_argument('--companies', type=int, default=5000, help='Synthetic companies')
+    parser.add_argument('--years', type=int, default=10, help='Years of quarterly facts')
+    parser.add_argument('--queries', type=int, default=500, help='Random range reads to time')
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE, help='Rows per Parquet row group')
+    parser.add_argument('--path', default=None, help='Cold storage root (defaults to a temp directory)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    root = args.path or tempfile.mkdtemp(prefix="cold-storage-")
+    store = ColdStore(FINANCIAL_FACTS, root=root, row_group_size=args.row_group_size)
+    company_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(args.companies)]
+    concepts = sorted(SOURCE_CONCEPTS)
+    first_year = date.today().year - args.years
+
+    try:
+        started = time.perf_counter()
+        for year in range(first_year, first_year + args.years):
+            for quarter in range(1, 5):
+                month, day = QUARTER_ENDS[quarter - 1]
+                store.write_month(month_key(date(year, month, day)), synthetic_month(company_ids, concepts, year, quarter, rng))
+        summary = store.summary()
+        print(f"📦 {summary['rows']} facts in {len(summary['months'])} files, {summary['row_groups']} row groups, "
+              f"{summary['bytes'] / 1024 / 1024:.1f} MiB written in {time.perf_counter() - started:.1f}s\n")
+
+        latencies = []
+        groups_read = []
+        rows_read = 0
+        for _ in range(args.queries):
+            company_id = rng.choice(company_ids)
+            start_year = rng.randint(first_year, first_year + args.years - 1)
+            end_year = rng.randint(start_year, first_year + args.years - 1)
+            start, end = date(start_year, 1, 1), date(end_year, 12, 31)
+            query_started = time.perf_counter()
+            plan = store.plan([company_id], start, end)
+            table = store.read([company_id], start, end)
+            latencies.append((time.perf_counter() - query_started) * 1000.0)
+            groups_read.append(sum(len(groups) for groups in plan.values()))
+            rows_read += table.num_rows
+
+        latencies.sort()
+        print(f"{'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'groups/read':>12} {'total groups':>13}")
+        print(f"{args.queries:>8} {percentile(latencies, 50):>8.2f} {percentile(latencies, 95):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f} {latencies[-1]:>8.2f} "
+              f"{sum(groups_read) / len(groups_read):>12.1f} {summary['row_groups']:>13}")
+        print(f"\n{rows_read / args.queries:.0f} facts returned per read")
+    finally:
+        if not args.path:
+            shutil.rmtree(root)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Measure collection throughput as workers are added
+
+For each worker count the queue is reset, a fixed set of selected
+companies is enqueued, and N collection_worker.py processes are started
+in drain mode against a stub EDGAR server. Throughput should grow roughly
+linearly with workers until the EDGAR request ceiling is reached.
+
+Usage:
+    python -m benchmarks.stub_edgar --latency-ms 100 --max-rps 50 &
+    python -m benchmarks.collection --edgar-url http://127.0.0.1:8900 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.seed import get_sync_database_url
+
+
+def reset_queue(engine, companies: int) -> int:
+    """Clear collection state and enqueue the first `companies` selected companies"""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM dc_collection_jobs"))
+        conn.execute(text("DELETE FROM dc_collection_workers"))
+        conn.execute(text("DELETE FROM dc_sec_data"))
+        # Forget resolved CIKs so every run does the same ticker lookups
+        conn.execute(text("UPDATE sd_companies SET cik = NULL WHERE is_selected"))
+        result = conn.execute(text(
+            "INSERT INTO dc_collection_jobs (id, company_id) "
+            "SELECT gen_random_uuid(), id FROM sd_companies "
+            "WHERE is_selected ORDER BY ticker_symbol LIMIT :limit"
+        ), {"limit": companies})
+        return result.rowcount
+
+
+def worker_stats(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT worker_id, jobs_completed, jobs_failed, requests_made, "
+            "EXTRACT(EPOCH FROM heartbeat_at - started_at) "
+            "FROM dc_collection_workers ORDER BY worker_id"
+        )).all()
+
+
+def run_workers(count: int, args) -> float:
+    env = dict(
+        os.environ,
+        SEC_DATA_BASE_URL=args.edgar_url,
+        SEC_WWW_BASE_URL=args.edgar_url,
+        EDGAR_MAX_RPS=str(args.max_rps),
+    )
+    command = [
+        sys.executable, os.path.join(BACKEND_DIR, "collection_worker.py"),
+        "--drain", "--concurrency", str(args.concurrency), "--lease-seconds", str(args.lease_seconds),
+    ]
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(command + ["--worker-id", f"bench-{count}-{i}"], env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for i in range(count)
+    ]
+    for process in processes:
+        process.wait()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark collection throughput by worker count')
+    parser.add_argument('--edgar-url', default='http://127.0.0.1:8900', help='Stub EDGAR base URL')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to test')
+    parser.add_argument('--companies', type=int, default=500, help='Selected companies to collect per run')
+    parser.add_argument('--concurrency', type=int, default=32, help='Jobs in flight per worker')
+    parser.add_argument('--lease-seconds', type=int, default=30, help='Worker lease length')
+    parser.add_argument('--max-rps', type=float, default=1000, help='EDGAR_MAX_RPS shared by all workers')
+    args = parser.parse_args()
+
+    engine = create_engine(get_sync_database_url())
+    print(f"🚀 Collecting {args.companies} companies from {args.edgar_url}\n")
+    print(f"{'workers':>7} {'jobs':>6} {'seconds':>8} {'jobs/s':>8} {'speedup':>8} {'failed':>7}")
+
+    base_rate = None
+    for count in args.workers:
+        jobs = reset_queue(engine, args.companies)
+        elapsed = run_workers(count, args)
+        stats = worker_stats(engine)
+        completed = sum(row[1] for row in stats)
+        failed = sum(row[2] for row in stats)
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        base_rate = base_rate or rate
+        print(f"{count:>7} {jobs:>6} {elapsed:>8.1f} {rate:>8.1f} {rate / base_rate if base_rate else 0:>7.2f}x {failed:>7}")
+        for worker_id, worker_completed, _, requests, seconds in stats:
+            per_second = worker_completed / float(seconds) if seconds else 0.0
+            print(f"{'':>9}{worker_id}: {worker_completed} jobs, {requests} requests, {per_second:.1f} jobs/s")
+
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
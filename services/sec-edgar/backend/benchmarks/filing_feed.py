@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare EDGAR request volume of feed-driven vs interval polling collection
+
+Replays the daily filing index for a date range through FilingFeedService
+against the stub EDGAR server and counts the requests it needs (one index
+per business day plus one collection per actual filer), versus interval
+polling that fetches every selected company's submissions every day.
+
+Usage:
+    python -m benchmarks.stub_edgar &
+    python -m benchmarks.filing_feed --edgar-url http://127.0.0.1:8900 --days 90
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def replay(args) -> int:
+    from app.infrastructure.database import AsyncSessionLocal
+    from app.infrastructure.external.edgar import EdgarClient
+    from app.services.data_collection.filing_feed import FilingFeedService
+
+    until = date.today() - timedelta(days=1)
+    start = until - timedelta(days=args.days - 1)
+    edgar = EdgarClient(
+        max_rps=args.max_rps,
+        data_base_url=args.edgar_url,
+        www_base_url=args.edgar_url,
+        archives_base_url=f"{args.edgar_url}/Archives/edgar",
+    )
+
+    async with edgar, AsyncSessionLocal() as session:
+        service = FilingFeedService(session)
+        watchlist = await service.load_watchlist(edgar)
+        lookup_requests = edgar.requests_made
+
+        matched = enqueued = business_days = 0
+        day = start
+        while day <= until:
+            if day.weekday() < 5:
+                business_days += 1
+                result = await service.process_day(day, edgar, watchlist)
+                matched += result.matched
+                enqueued += result.enqueued
+            day += timedelta(days=1)
+
+        index_requests = edgar.requests_made - lookup_requests
+
+    feed_requests = index_requests + matched
+    watched = sum(len(company_ids) for company_ids in watchlist.values())
+    polling_requests = watched * business_days
+    print(f"📅 {start} .. {until}: {business_days} business days, {watched} watched companies\n")
+    print(f"{'strategy':<16} {'requests':>10}")
+    print(f"{'daily polling':<16} {polling_requests:>10}")
+    print(f"{'filing feed':<16} {feed_requests:>10}   ({index_requests} index + {matched} filer collections)")
+    if feed_requests:
+        print(f"\n✅ {polling_requests / feed_requests:.1f}x fewer requests ({enqueued} jobs enqueued)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare feed-driven vs polling EDGAR request volume')
+    parser.add_argument('--edgar-url', default='http://127.0.0.1:8900', help='Stub EDGAR base URL')
+    parser.add_argument('--days', type=int, default=90, help='Days of daily indexes to replay')
+    parser.add_argument('--max-rps', type=float, default=1000, help='Request ceiling for the replay')
+    args = parser.parse_args()
+    return asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Time /data/filings/search over a large synthetic filing section index
+
+--filings seeds that many synthetic 10-K/10-Q filings (the same section
+text the stub EDGAR serves) for companies in sd_companies, spread over
+--years yearly partitions of dm_filing_sections, with COPY. Seeded
+accession numbers start with BENCH- and --cleanup removes them again.
+Queries then run through FilingTextService the way the route does and
+report latency percentiles per query shape.
+
+Usage:
+    python -m benchmarks.filing_search --filings 200000 --years 10
+    python -m benchmarks.filing_search --queries 200
+    python -m benchmarks.filing_search --cleanup
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.domain.data_management.models import FilingSection
+from app.infrastructure.database import AsyncSessionLocal, Base
+from app.infrastructure.repositories.data_management import filing_partition
+from app.services.data_management.filing_text import FilingTextService
+from benchmarks.harness import percentile
+from benchmarks.seed import get_sync_database_url
+from benchmarks.stub_edgar import synthetic_sections
+
+COPY_BATCH_SIZE = 50000
+ACCESSION_PREFIX = "BENCH-"
+
+SECTION_COLUMNS = ("filing_date", "accession_number", "section_no", "company_id", "filing_type", "heading", "content")
+DOCUMENT_COLUMNS = ("accession_number", "company_id", "filing_type", "filing_date", "document", "sections", "characters", "bytes")
+
+
+def copy_rows(cursor, table: str, columns, buffer: io.StringIO):
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    buffer.seek(0)
+    buffer.truncate()
+
+
+def seed_sections(filings: int, years: int, seed: int) -> int:
+    """COPY synthetic filings into dm_filing_sections / dm_filing_documents; returns sections loaded"""
+    rng = random.Random(seed)
+    engine = create_engine(get_sync_database_url(), echo=False)
+    Base.metadata.create_all(engine)
+    today = date.today()
+
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        cursor.execute("SELECT id FROM sd_companies ORDER BY ticker_symbol")
+        company_ids = [str(row[0]) for row in cursor.fetchall()]
+        if not company_ids:
+            raise RuntimeError("sd_companies is empty; run python -m benchmarks.seed first")
+        for year in range(today.year - years + 1, today.year + 1):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {filing_partition(year)} PARTITION OF {FilingSection.__tablename__} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+        cursor.execute("SELECT count(*) FROM dm_filing_documents WHERE accession_number LIKE %s", (ACCESSION_PREFIX + "%",))
+        offset = cursor.fetchone()[0]
+
+        sections_buffer, documents_buffer = io.StringIO(), io.StringIO()
+        sections_writer, documents_writer = csv.writer(sections_buffer), csv.writer(documents_buffer)
+        pending = total = 0
+        for number in range(offset, offset + filings):
+            accession_number = f"{ACCESSION_PREFIX}{number:012d}"
+            form = "10-K" if number % 4 == 0 else "10-Q"
+            company_id = rng.choice(company_ids)
+            filed = today - timedelta(days=rng.randrange(years * 365))
+
+            section_no = characters = 0
+            for heading, body in synthetic_sections(accession_number, form):
+                if not body:
+                    continue
+                section_no += 1
+                content = "\n".join(body)
+                characters += len(content)
+                sections_writer.writerow([filed, accession_number, section_no, company_id, form, heading, content])
+            documents_writer.writerow([accession_number, company_id, form, filed, f"{form.lower()}.htm", section_no, characters, characters])
+            pending += section_no
+            total += section_no
+
+            if pending >= COPY_BATCH_SIZE:
+                copy_rows(cursor, "dm_filing_sections", SECTION_COLUMNS, sections_buffer)
+                copy_rows(cursor, "dm_filing_documents", DOCUMENT_COLUMNS, documents_buffer)
+                raw_connection.commit()
+                pending = 0
+                print(f"   ... {total} sections loaded")
+        if pending:
+            copy_rows(cursor, "dm_filing_sections", SECTION_COLUMNS, sections_buffer)
+            copy_rows(cursor, "dm_filing_documents", DOCUMENT_COLUMNS, documents_buffer)
+            raw_connection.commit()
+        cursor.execute("ANALYZE dm_filing_sections")
+        cursor.execute("ANALYZE dm_filing_documents")
+        raw_connection.commit()
+        cursor.close()
+    finally:
+        raw_connection.close()
+        engine.dispose()
+    return total
+
+
+def cleanup():
+    """Delete the seeded benchmark filings"""
+    engine = create_engine(get_sync_database_url(), echo=False)
+    with engine.begin() as connection:
+        pattern = {"pattern": ACCESSION_PREFIX + "%"}
+        sections = connection.execute(text("DELETE FROM dm_filing_sections WHERE accession_number LIKE :pattern"), pattern)
+        connection.execute(text("DELETE FROM dm_filing_documents WHERE accession_number LIKE :pattern"), pattern)
+    engine.dispose()
+    print(f"🧹 Removed {sections.rowcount} benchmark sections")
+
+
+def query_shapes(company_ids, today: date):
+    """(name, search kwargs factory) pairs covering common, rare, filtered and paged queries"""
+    return [
+        ("common_term", lambda rng: {"query": "revenue"}),
+        ("rare_phrase", lambda rng: {"query": '"going concern"'}),
+        ("phrase_10k", lambda rng: {"query": '"material weakness"', "forms": ["10-K"]}),
+        ("last_year", lambda rng: {"query": "impairment", "start": today - timedelta(days=365)}),
+        ("company", lambda rng: {"query": "supply chain", "company_ids": [rng.choice(company_ids)]}),
+        ("deep_page", lambda rng: {"query": "tariffs OR inflation", "offset": 200}),
+    ]
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    async with AsyncSessionLocal() as session:
+        count = (await session.execute(text("SELECT count(*) FROM dm_filing_sections"))).scalar()
+        company_ids = [row[0] for row in await session.execute(
+            text("SELECT DISTINCT company_id FROM dm_filing_documents LIMIT 1000")
+        )]
+        if not count:
+            print("❌ dm_filing_sections is empty; seed it with --filings")
+            return 1
+        print(f"📦 {count} sections indexed\n")
+
+        service = FilingTextService(session)
+        print(f"{'query':<14} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'hits':>6}")
+        for name, make in query_shapes(company_ids, date.today()):
+            times, hits = [], 0
+            for _ in range(args.queries):
+                kwargs = make(rng)
+                started = time.perf_counter()
+                response = await service.search(kwargs.pop("query"), limit=20, **kwargs)
+                times.append(time.perf_counter() - started)
+                hits = len(response.hits)
+            times.sort()
+            print(f"{name:<14} {percentile(times, 50) * 1000:>8.1f} {percentile(times, 95) * 1000:>8.1f} "
+                  f"{times[-1] * 1000:>8.1f} {hits:>6}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time full-text search over filing sections')
+    parser.add_argument('--filings', type=int, default=0, help='Synthetic filings to seed before querying')
+    parser.add_argument('--years', type=int, default=10, help='Years of filing dates to spread seeded filings over')
+    parser.add_argument('--queries', type=int, default=50, help='Queries per query shape')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--cleanup', action='store_true', help='Remove seeded benchmark filings and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return 0
+    if args.filings:
+        print(f"🌱 Seeding {args.filings} synthetic filings over {args.years} years")
+        started = time.perf_counter()
+        loaded = seed_sections(args.filings, args.years, args.seed)
+        print(f"✅ {loaded} sections loaded in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"🏁 Timing filing search ({args.queries} queries per shape)")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Load generation, measurement and baseline comparison for API benchmarks
+"""
+
+import asyncio
+import json
+import math
+import random
+import string
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event
+
+
+@dataclass
+class Scenario:
+    """A single benchmarked route with a request factory"""
+    name: str
+    method: str
+    build: Callable[["BenchmarkContext"], Dict[str, Any]]
+    writes: bool = False
+
+
+@dataclass
+class BenchmarkContext:
+    """Sample data shared by scenario request factories"""
+    company_ids: List[str]
+    tickers: List[str]
+    sectors: List[str]
+    exchanges: List[str]
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+
+    def company_id(self) -> str:
+        return self.rng.choice(self.company_ids)
+
+    def ticker(self) -> str:
+        return self.rng.choice(self.tickers)
+
+    def sector(self) -> str:
+        return self.rng.choice(self.sectors)
+
+    def new_ticker(self) -> str:
+        return "BN" + "".join(self.rng.choice(string.ascii_uppercase) for _ in range(8))
+
+
+@dataclass
+class ScenarioResult:
+    """Aggregated measurements for one scenario run"""
+    name: str
+    requests: int
+    errors: int
+    duration_s: float
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: Optional[float]
+    shed: int = 0
+
+
+class QueryCounter:
+    """Count SQL statements executed by an in-process SQLAlchemy engine"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def default_scenarios() -> List[Scenario]:
+    """Scenarios covering every /api/v1/companies route"""
+    return [
+        Scenario("list_first_page", "GET", lambda ctx: {
+            "url": "/api/v1/companies/", "params": {"page": 1, "size": 50}}),
+        Scenario("list_deep_page", "GET", lambda ctx: {
+            "url": "/api/v1/companies/", "params": {"page": ctx.rng.randint(10, 100), "size": 50}}),
+        Scenario("list_by_sector", "GET", lambda ctx: {
+            "url": "/api/v1/companies/", "params": {"sector": ctx.sector(), "size": 50}}),
+        Scenario("list_sector_by_cap", "GET", lambda ctx: {
+            "url": "/api/v1/companies/",
+            "params": {"sector": ctx.sector(), "min_market_cap": 1e10, "sort": "market_cap_desc", "size": 50}}),
+        Scenario("list_as_of", "GET", lambda ctx: {
+            "url": "/api/v1/companies/",
+            "params": {"as_of": (date.today() - timedelta(days=ctx.rng.randint(1, 360))).isoformat(), "size": 50}}),
+        Scenario("list_sector_as_of", "GET", lambda ctx: {
+            "url": "/api/v1/companies/",
+            "params": {"sector": ctx.sector(), "sort": "market_cap_desc", "size": 50,
+                       "as_of": (date.today() - timedelta(days=ctx.rng.randint(1, 360))).isoformat()}}),
+        Scenario("list_query", "GET", lambda ctx: {
+            "url": "/api/v1/companies/", "params": {"query": ctx.ticker()[:2], "size": 50}}),
+        Scenario("list_fields", "GET", lambda ctx: {
+            "url": "/api/v1/companies/",
+            "params": {"page": ctx.rng.randint(1, 100), "size": 100, "fields": "ticker_symbol,company_name"}}),
+        Scenario("search", "GET", lambda ctx: {
+            "url": "/api/v1/companies/search", "params": {"q": ctx.ticker()[:3], "limit": 10}}),
+        Scenario("search_fields", "GET", lambda ctx: {
+            "url": "/api/v1/companies/search",
+            "params": {"q": ctx.ticker()[:3], "limit": 10, "fields": "ticker_symbol,company_name"}}),
+        Scenario("screen", "GET", lambda ctx: {
+            "url": "/api/v1/companies/screen",
+            "params": {"sector": ctx.sector(), "min_market_cap": 2e9, "limit": 50, "group_by": "exchange"}}),
+        Scenario("selected", "GET", lambda ctx: {
+            "url": "/api/v1/companies/selected"}),
+        Scenario("filters", "GET", lambda ctx: {
+            "url": "/api/v1/companies/filters"}),
+        Scenario("get_by_id", "GET", lambda ctx: {
+            "url": f"/api/v1/companies/{ctx.company_id()}"}),
+        Scenario("batch_ids", "POST", lambda ctx: {
+            "url": "/api/v1/companies/batch",
+            "json": {"ids": ctx.rng.sample(ctx.company_ids, min(100, len(ctx.company_ids)))}}),
+        Scenario("create", "POST", lambda ctx: {
+            "url": "/api/v1/companies/",
+            "json": {
+                "ticker_symbol": ctx.new_ticker(),
+                "company_name": "Benchmark Company",
+                "exchange": "NASDAQ",
+                "sector": ctx.sector(),
+                "market_cap": float(ctx.rng.randint(1, 10**6)) * 1e6,
+            }}, writes=True),
+        Scenario("update", "PUT", lambda ctx: {
+            "url": f"/api/v1/companies/{ctx.company_id()}",
+            "json": {"market_cap": float(ctx.rng.randint(1, 10**6)) * 1e6}}, writes=True),
+        Scenario("select", "POST", lambda ctx: {
+            "url": f"/api/v1/companies/{ctx.company_id()}/select",
+            "json": {"selected": ctx.rng.random() < 0.5}}, writes=True),
+    ]
+
+
+async def load_context(client: httpx.AsyncClient, sample_size: int = 500) -> BenchmarkContext:
+    """Collect sample ids, tickers and facets from the API itself"""
+    response = await client.get("/api/v1/companies/", params={"page": 1, "size": 100})
+    response.raise_for_status()
+    companies = response.json()["companies"]
+    total = response.json()["total"]
+
+    # Sample a handful of pages spread over the universe
+    pages = max(1, total // 100)
+    extra_pages = max(0, min(sample_size // 100 - 1, pages - 1))
+    rng = random.Random(7)
+    for page in rng.sample(range(2, pages + 1), extra_pages):
+        response = await client.get("/api/v1/companies/", params={"page": page, "size": 100})
+        response.raise_for_status()
+        companies.extend(response.json()["companies"])
+
+    if not companies:
+        raise RuntimeError("No companies found; seed the database with `python -m benchmarks.seed` first")
+
+    filters = (await client.get("/api/v1/companies/filters")).json()
+
+    return BenchmarkContext(
+        company_ids=[c["id"] for c in companies],
+        tickers=[c["ticker_symbol"] for c in companies],
+        sectors=filters.get("sectors") or [None],
+        exchanges=filters.get("exchanges") or [None],
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: BenchmarkContext,
+    requests: int,
+    concurrency: int,
+    query_counter: Optional[QueryCounter] = None
+) -> ScenarioResult:
+    """Drive one scenario with a fixed number of requests at a fixed concurrency"""
+    latencies: List[float] = []
+    errors = 0
+    shed = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, shed, remaining
+        while remaining > 0:
+            remaining -= 1
+            request = scenario.build(context)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, **request)
+                if response.status_code in (429, 503):
+                    shed += 1
+                elif response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    if query_counter is not None:
+        with query_counter:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        queries = query_counter.count
+    else:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        queries = None
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors,
+        duration_s=round(duration, 3),
+        throughput_rps=round(len(latencies) / duration, 1) if duration else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        queries_per_request=round(queries / len(latencies), 2) if queries is not None and latencies else None,
+        shed=shed,
+    )
+
+
+def compare_to_baseline(
+    results: List[ScenarioResult],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float
+) -> List[str]:
+    """Return a list of human-readable regressions against a stored baseline"""
+    regressions = []
+
+    for result in results:
+        expected = baseline.get(result.name)
+        if not expected:
+            continue
+
+        if result.errors > expected.get("errors", 0):
+            regressions.append(f"{result.name}: errors {result.errors} > baseline {expected.get('errors', 0)}")
+
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = expected[metric] * (1 + tolerance)
+            if getattr(result, metric) > limit:
+                regressions.append(
+                    f"{result.name}: {metric} {getattr(result, metric)} > {limit:.2f} (baseline {expected[metric]})"
+                )
+
+        floor = expected["throughput_rps"] * (1 - tolerance)
+        if result.throughput_rps < floor:
+            regressions.append(
+                f"{result.name}: throughput {result.throughput_rps} < {floor:.1f} rps "
+                f"(baseline {expected['throughput_rps']})"
+            )
+
+        # Query counts are deterministic, so any increase is a regression
+        expected_queries = expected.get("queries_per_request")
+        if (expected_queries is not None and result.queries_per_request is not None
+                and result.queries_per_request > expected_queries + 0.01):
+            regressions.append(
+                f"{result.name}: queries/request {result.queries_per_request} > baseline {expected_queries}"
+            )
+
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Load a stored baseline, or None when it does not exist yet"""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)["scenarios"]
+    except FileNotFoundError:
+        return None
+
+
+def save_results(path: str, results: List[ScenarioResult], metadata: Dict[str, Any]):
+    """Write results in the baseline file format"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"metadata": metadata, "scenarios": {r.name: asdict(r) for r in results}},
+            file,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def format_results(results: List[ScenarioResult]) -> str:
+    """Render results as a plain-text table"""
+    header = f"{'scenario':<18} {'reqs':>6} {'err':>4} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6} {'shed':>5}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        qpr = "-" if r.queries_per_request is None else f"{r.queries_per_request:.2f}"
+        lines.append(
+            f"{r.name:<18} {r.requests:>6} {r.errors:>4} {r.throughput_rps:>9.1f} "
+            f"{r.p50_ms:>8.2f} {r.p95_ms:>8.2f} {r.p99_ms:>8.2f} {qpr:>6} {r.shed:>5}"
+        )
+    return "\n".join(lines)
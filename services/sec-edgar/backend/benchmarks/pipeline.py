@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Measure end-to-end collection throughput of the staged pipeline
+
+Collects the same selected companies from the stub EDGAR server three
+ways, resetting their filings and CIKs before each run:
+
+  sequential  fetch, parse and insert one company at a time
+  concurrent  --concurrency companies at a time, each fetched, parsed and
+              inserted on its own (the pre-pipeline worker)
+  pipeline    CollectionPipeline: fetch tasks, parser processes and a
+              batching writer connected by bounded queues
+
+and reports companies/s and filings/s per mode, plus the pipeline's
+per-stage throughput, busy/starved/stalled time and queue depths.
+
+Usage:
+    python -m benchmarks.stub_edgar --latency-ms 50 &
+    python -m benchmarks.pipeline --edgar-url http://127.0.0.1:8900 --companies 500
+    python -m benchmarks.pipeline --modes pipeline --parse-workers 0 2 4 --write-batch-rows 500 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.external.edgar import EdgarClient
+from app.services.data_collection.collection_service import CollectionService
+from app.services.data_collection.pipeline import PIPELINE_FETCH_CONCURRENCY, CollectionPipeline
+from benchmarks.seed import get_sync_database_url
+
+
+def reset_companies(engine, companies: int) -> list:
+    """Forget the filings and CIKs of the first `companies` selected companies; returns their IDs"""
+    with engine.begin() as conn:
+        company_ids = conn.execute(text(
+            "SELECT id FROM sd_companies WHERE is_selected ORDER BY ticker_symbol LIMIT :limit"
+        ), {"limit": companies}).scalars().all()
+        conn.execute(text("DELETE FROM dc_sec_data WHERE company_id = ANY(:ids)"), {"ids": list(company_ids)})
+        conn.execute(text("UPDATE sd_companies SET cik = NULL WHERE id = ANY(:ids)"), {"ids": list(company_ids)})
+    return list(company_ids)
+
+
+def count_filings(engine, company_ids: list) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT count(*) FROM dc_sec_data WHERE company_id = ANY(:ids)"
+        ), {"ids": company_ids}).scalar()
+
+
+def edgar_client(args) -> EdgarClient:
+    return EdgarClient(max_rps=args.max_rps, data_base_url=args.edgar_url, www_base_url=args.edgar_url)
+
+
+async def collect_one(company_id, edgar: EdgarClient):
+    async with AsyncSessionLocal() as session:
+        await CollectionService(session).collect_company(company_id, edgar)
+
+
+async def run_sequential(company_ids: list, args) -> int:
+    failed = 0
+    async with edgar_client(args) as edgar:
+        for company_id in company_ids:
+            try:
+                await collect_one(company_id, edgar)
+            except Exception:
+                failed += 1
+    return failed
+
+
+async def run_concurrent(company_ids: list, args) -> int:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def guarded(company_id, edgar):
+        async with semaphore:
+            await collect_one(company_id, edgar)
+
+    async with edgar_client(args) as edgar:
+        results = await asyncio.gather(*(guarded(company_id, edgar) for company_id in company_ids), return_exceptions=True)
+    return sum(isinstance(result, Exception) for result in results)
+
+
+async def run_pipeline(company_ids: list, args, parse_workers: int, write_batch_rows: int) -> tuple:
+    async with edgar_client(args) as edgar:
+        pipeline = CollectionPipeline(
+            edgar,
+            fetch_concurrency=args.fetch_concurrency,
+            parse_workers=parse_workers,
+            queue_size=args.queue_size,
+            write_batch_rows=write_batch_rows,
+        )
+        async with pipeline:
+            # Submit through a bounded number of in-flight jobs, like a worker's claimed leases
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def guarded(company_id):
+                async with semaphore:
+                    await pipeline.collect(company_id)
+
+            results = await asyncio.gather(*(guarded(company_id) for company_id in company_ids), return_exceptions=True)
+            stats = pipeline.stats()
+    return sum(isinstance(result, Exception) for result in results), stats
+
+
+def print_stages(stats: dict):
+    print(f"{'':>4}{'stage':<7} {'workers':>7} {'items/s':>8} {'util':>6} {'busy s':>8} {'starved s':>10} "
+          f"{'stalled s':>10} {'queue max':>10} {'mean':>6}")
+    for name in ("fetch", "parse", "write"):
+        stage, queue = stats["stages"][name], stats["queues"][name]
+        print(f"{'':>4}{name:<7} {stage['workers']:>7} {stage['items_per_second']:>8.1f} {stage['utilization']:>6.0%} "
+              f"{stage['busy_seconds']:>8.2f} {stage['starved_seconds']:>10.2f} {stage['stalled_seconds']:>10.2f} "
+              f"{queue['max_depth']:>6}/{queue['size']:<3} {queue['mean_depth']:>6.1f}")
+    write = stats["stages"]["write"]
+    if write["batches"]:
+        print(f"{'':>4}writer: {write['batches']} batches, {write['rows'] / write['batches']:.0f} rows/batch")
+
+
+async def run(args) -> int:
+    engine = create_engine(get_sync_database_url())
+    runs = []
+    for mode in args.modes:
+        if mode == "pipeline":
+            runs.extend(
+                (f"pipeline p={parse_workers} b={batch_rows}", parse_workers, batch_rows)
+                for parse_workers in args.parse_workers
+                for batch_rows in args.write_batch_rows
+            )
+        else:
+            runs.append((mode, None, None))
+
+    print(f"🚀 Collecting {args.companies} selected companies from {args.edgar_url}\n")
+    print(f"{'mode':<28} {'seconds':>8} {'companies/s':>12} {'filings/s':>10} {'failed':>7}")
+    for label, parse_workers, batch_rows in runs:
+        company_ids = reset_companies(engine, args.companies)
+        stats = None
+        started = time.perf_counter()
+        if label == "sequential":
+            failed = await run_sequential(company_ids, args)
+        elif label == "concurrent":
+            failed = await run_concurrent(company_ids, args)
+        else:
+            failed, stats = await run_pipeline(company_ids, args, parse_workers, batch_rows)
+        elapsed = time.perf_counter() - started
+
+        filings = count_filings(engine, company_ids)
+        completed = len(company_ids) - failed
+        print(f"{label:<28} {elapsed:>8.2f} {completed / elapsed:>12.1f} {filings / elapsed:>10.0f} {failed:>7}")
+        if stats:
+            print_stages(stats)
+
+    engine.dispose()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the staged collection pipeline against a stub EDGAR')
+    parser.add_argument('--edgar-url', default='http://127.0.0.1:8900', help='Stub EDGAR base URL')
+    parser.add_argument('--companies', type=int, default=500, help='Selected companies to collect per run')
+    parser.add_argument('--modes', nargs='+', default=['sequential', 'concurrent', 'pipeline'],
+                        choices=['sequential', 'concurrent', 'pipeline'], help='Collection modes to run')
+    parser.add_argument('--concurrency', type=int, default=32, help='Companies in flight (concurrent and pipeline)')
+    parser.add_argument('--fetch-concurrency', type=int, default=PIPELINE_FETCH_CONCURRENCY, help='Pipeline fetch tasks')
+    parser.add_argument('--parse-workers', type=int, nargs='+', default=[2], help='Pipeline parser processes to test')
+    parser.add_argument('--write-batch-rows', type=int, nargs='+', default=[5000], help='Pipeline write batch sizes to test')
+    parser.add_argument('--queue-size', type=int, default=16, help='Pipeline queue bound between stages')
+    parser.add_argument('--max-rps', type=float, default=1000, help='EDGAR client request ceiling')
+    args = parser.parse_args()
+
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
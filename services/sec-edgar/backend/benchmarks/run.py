@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Run the /api/v1/companies benchmark suite
+
+By default the app is driven in-process through httpx's ASGI transport, which
+also lets the harness count SQL statements per request. Pass --base-url to
+benchmark a running server instead (queries per request are then unavailable).
+In-process runs turn per-key rate limiting off unless --rate-limits is given;
+requests shed with 429/503 are reported in the `shed` column. --no-response-cache
+turns off the precompressed list cache to time the full query path.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --concurrency 32 --requests 2000
+    python -m benchmarks.run --include-writes --save-baseline
+    python -m benchmarks.run --base-url http://localhost:8000
+    python -m benchmarks.run --rate-limits --concurrency 200 --only list_by_sector
+    python -m benchmarks.run --no-response-cache --only list_first_page list_by_sector selected
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from datetime import datetime
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.harness import (
+    QueryCounter, compare_to_baseline, default_scenarios, format_results,
+    load_baseline, load_context, run_scenario, save_results
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def build_client(base_url: str = None, rate_limits: bool = False, response_cache: bool = True) -> tuple:
+    """Create an HTTP client and (for in-process runs) a query counter"""
+    api_key = os.getenv("API_KEY", "dev-api-key-12345")
+    headers = {"X-API-Key": api_key}
+
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30.0), None
+
+    # One benchmark key would otherwise hit its own quota; admission control stays measurable with --rate-limits
+    if not rate_limits:
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if not response_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    from app.main import app
+    from app.infrastructure.database import engine
+
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://benchmark", headers=headers, timeout=30.0)
+    return client, QueryCounter(engine)
+
+
+async def run_benchmarks(args) -> int:
+    """Run all selected scenarios and compare them against the baseline"""
+    client, query_counter = build_client(args.base_url, args.rate_limits, not args.no_response_cache)
+    scenarios = [
+        s for s in default_scenarios()
+        if (args.include_writes or not s.writes) and (not args.only or s.name in args.only)
+    ]
+
+    async with client:
+        context = await load_context(client)
+
+        results = []
+        for scenario in scenarios:
+            # Warm up connections and caches before measuring
+            await run_scenario(client, scenario, context, args.warmup, args.concurrency)
+            result = await run_scenario(
+                client, scenario, context, args.requests, args.concurrency, query_counter
+            )
+            results.append(result)
+            print(f"   ✓ {scenario.name}: {result.throughput_rps} rps, p95 {result.p95_ms} ms")
+
+    print()
+    print(format_results(results))
+
+    metadata = {
+        "recorded_at": datetime.utcnow().isoformat(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "target": args.base_url or "in-process",
+        "rate_limits": args.rate_limits,
+        "response_cache": not args.no_response_cache,
+        "python": platform.python_version(),
+        "companies": len(context.company_ids),
+    }
+
+    if args.output:
+        save_results(args.output, results, metadata)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        save_results(args.baseline, results, metadata)
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against baseline (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print(f"\n✅ No regressions against baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+def main():
+    """Main benchmark entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the companies API')
+    parser.add_argument('--base-url', default=None, help='Benchmark a running server instead of in-process')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent in-flight requests')
+    parser.add_argument('--requests', type=int, default=1000, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=50, help='Unmeasured warm-up requests per scenario')
+    parser.add_argument('--only', nargs='*', help='Run only the named scenarios')
+    parser.add_argument('--include-writes', action='store_true',
+                        help='Also run create/update/select scenarios (mutates the database)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Record this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative slowdown before a metric counts as a regression')
+    parser.add_argument('--rate-limits', action='store_true',
+                        help='Keep rate limiting and admission control on for in-process runs')
+    parser.add_argument('--no-response-cache', action='store_true',
+                        help='Turn off the precompressed list response cache for in-process runs')
+    parser.add_argument('--output', default=None, help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    print(f"🏁 Benchmarking {args.base_url or 'in-process app'} "
+          f"(concurrency={args.concurrency}, requests={args.requests})")
+    return asyncio.run(run_benchmarks(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
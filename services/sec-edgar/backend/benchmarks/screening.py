@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compare the in-memory screening engine against the equivalent SQL
+
+Each randomly generated screen (sectors x exchanges x market cap band x
+selection, top-k plus an optional group-by) is answered twice: once by
+ScreeningEngine.screen and once by the count / top-k / GROUP BY queries
+Postgres would need, and results are checked for agreement.
+
+Usage:
+    python -m benchmarks.screening --screens 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, func, select
+
+from app.domain.stock_discovery.models import Company
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.stock_discovery.screening_engine import ScreeningEngine
+from app.shared.models.stock_discovery import ScreenGroupBy, ScreenParams
+from benchmarks.harness import percentile
+
+MARKET_CAP_BANDS = [(None, 3e8), (3e8, 2e9), (2e9, 1e10), (1e10, 2e11), (2e11, None), (None, None)]
+
+
+def random_screens(count: int, sectors: List[str], exchanges: List[str], seed: int) -> List[ScreenParams]:
+    """Generate a reproducible mix of multi-criteria screens"""
+    rng = random.Random(seed)
+    screens = []
+    for _ in range(count):
+        low, high = rng.choice(MARKET_CAP_BANDS)
+        screens.append(ScreenParams(
+            sectors=rng.sample(sectors, rng.randint(1, min(3, len(sectors)))) if sectors and rng.random() < 0.8 else None,
+            exchanges=[rng.choice(exchanges)] if exchanges and rng.random() < 0.3 else None,
+            min_market_cap=low,
+            max_market_cap=high,
+            is_selected=rng.choice([None, None, True]),
+            limit=rng.choice([10, 50, 100]),
+            group_by=rng.choice([None, ScreenGroupBy.SECTOR, ScreenGroupBy.EXCHANGE]),
+        ))
+    return screens
+
+
+def sql_filters(params: ScreenParams) -> list:
+    filters = []
+    if params.sectors:
+        filters.append(Company.sector.in_(params.sectors))
+    if params.exchanges:
+        filters.append(Company.exchange.in_(params.exchanges))
+    if params.min_market_cap is not None:
+        filters.append(Company.market_cap >= params.min_market_cap)
+    if params.max_market_cap is not None:
+        filters.append(Company.market_cap <= params.max_market_cap)
+    if params.is_selected is not None:
+        filters.append(Company.is_selected == params.is_selected)
+    return filters
+
+
+async def screen_sql(session, params: ScreenParams):
+    """Answer a screen with the equivalent SQL queries"""
+    filters = sql_filters(params)
+    where = and_(*filters) if filters else True
+
+    total = (await session.execute(select(func.count(Company.id)).where(where))).scalar()
+    top = (await session.execute(
+        select(Company.ticker_symbol)
+        .where(where)
+        .order_by(Company.market_cap.desc().nulls_last(), Company.ticker_symbol)
+        .limit(params.limit)
+    )).scalars().all()
+
+    groups = None
+    if params.group_by:
+        column = Company.sector if params.group_by == ScreenGroupBy.SECTOR else Company.exchange
+        groups = (await session.execute(
+            select(column, func.count(), func.sum(Company.market_cap), func.avg(Company.market_cap))
+            .where(where)
+            .group_by(column)
+        )).all()
+
+    return total, top, groups
+
+
+async def run(args) -> int:
+    async with AsyncSessionLocal() as session:
+        repo = CompanyRepository(session)
+        engine = ScreeningEngine()
+
+        started = time.perf_counter()
+        await engine.ensure_fresh(repo)
+        load_ms = (time.perf_counter() - started) * 1000.0
+        print(f"📊 Snapshot of {engine.universe.size} companies loaded in {load_ms:.0f} ms")
+
+        screens = random_screens(
+            args.screens,
+            await repo.get_unique_sectors(),
+            await repo.get_unique_exchanges(),
+            args.seed,
+        )
+
+        engine_ms, sql_ms, mismatches = [], [], 0
+        for params in screens:
+            started = time.perf_counter()
+            result = engine.screen(params)
+            engine_ms.append((time.perf_counter() - started) * 1000.0)
+
+            started = time.perf_counter()
+            total, top, _ = await screen_sql(session, params)
+            sql_ms.append((time.perf_counter() - started) * 1000.0)
+
+            if total != result.total or list(top) != [c.ticker_symbol for c in result.companies]:
+                mismatches += 1
+
+    engine_ms.sort()
+    sql_ms.sort()
+    print(f"\n{'':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'total s':>8}")
+    for name, values in (("engine", engine_ms), ("sql", sql_ms)):
+        print(f"{name:<8} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} "
+              f"{percentile(values, 99):>8.2f} {sum(values) / 1000.0:>8.2f}")
+    print(f"\n⚡ Speedup (p50): {percentile(sql_ms, 50) / max(percentile(engine_ms, 50), 1e-6):.1f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} screen(s) disagreed with SQL")
+        return 1
+    print("✅ All screens matched SQL results")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark in-memory screening against SQL')
+    parser.add_argument('--screens', type=int, default=200, help='Number of random screens')
+    parser.add_argument('--seed', type=int, default=11, help='Random seed for screen generation')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
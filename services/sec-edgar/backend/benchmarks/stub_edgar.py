@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Stub SEC EDGAR server for collection tests and benchmarks
+
+Serves deterministic synthetic versions of the EDGAR endpoints the
+collectors use, for every ticker in sd_companies, with configurable
+latency and an optional requests/second ceiling that answers 429 like
+SEC fair-access throttling. Point the workers at it with:
+
+    SEC_DATA_BASE_URL=http://127.0.0.1:8900
+    SEC_WWW_BASE_URL=http://127.0.0.1:8900
+    SEC_API_BASE_URL=http://127.0.0.1:8900/Archives/edgar
+
+Daily form indexes are generated from the same synthetic filings, unless
+a matching form.YYYYMMDD.idx exists in --fixtures. Primary documents are
+synthetic inline XBRL 10-K/10-Q pages (see synthetic_document).
+
+Usage:
+    python -m benchmarks.stub_edgar --port 8900 --latency-ms 80 --max-rps 10
+    python -m benchmarks.stub_edgar --fixtures benchmarks/fixtures
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import zlib
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from sqlalchemy import create_engine, text
+
+from benchmarks.seed import get_sync_database_url
+
+FILING_YEARS = 10
+
+INDEX_HEADER = (
+    "Description:           Daily Index of EDGAR Dissemination Feed by Form Type\n"
+    "Last Data Received:    {received}\n"
+    "Comments:              webmaster@sec.gov\n"
+    "Anonymous FTP:         ftp://ftp.sec.gov/edgar/\n"
+    " \n \n \n \n"
+    "Form Type   Company Name                                                  CIK         Date Filed  File Name\n"
+    + "-" * 141 + "\n"
+)
+
+
+def cik_for_ticker(ticker: str) -> int:
+    """Deterministic synthetic CIK for a ticker"""
+    return zlib.crc32(ticker.encode("ascii")) % 9_000_000_000 + 1_000_000
+
+
+def load_tickers(database_url: str) -> Dict[int, str]:
+    """Map synthetic CIKs to the tickers stored in sd_companies"""
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        tickers = [row[0] for row in conn.execute(text("SELECT ticker_symbol FROM sd_companies"))]
+    engine.dispose()
+    return {cik_for_ticker(ticker): ticker for ticker in tickers}
+
+
+def synthetic_filings(cik: int, today: Optional[date] = None) -> List[dict]:
+    """Quarterly 10-Qs and annual 10-Ks for the last FILING_YEARS years, newest first"""
+    today = today or date.today()
+    filings = []
+    sequence = 0
+    for year in range(today.year - FILING_YEARS, today.year + 1):
+        for quarter in range(1, 5):
+            period_end = date(year, quarter * 3, 28)
+            form = "10-K" if quarter == 4 else "10-Q"
+            # Spread companies over a filing window instead of one shared day
+            filed = period_end + timedelta(days=(60 if form == "10-K" else 35) + cik % 15)
+            while filed.weekday() >= 5:
+                filed += timedelta(days=1)
+            if filed > today:
+                continue
+            sequence += 1
+            filings.append({
+                "accessionNumber": f"{cik:010d}-{filed.year % 100:02d}-{sequence:06d}",
+                "form": form,
+                "filingDate": filed.isoformat(),
+                "reportDate": period_end.isoformat(),
+                "primaryDocument": f"{form.lower().replace('-', '')}-{period_end:%Y%m%d}.htm",
+            })
+    filings.reverse()
+    return filings
+
+
+FILING_ITEMS = {
+    "10-K": [
+        ("PART I", None), ("Item 1. Business", "business"), ("Item 1A. Risk Factors", "risk"),
+        ("PART II", None), ("Item 7. Management's Discussion and Analysis", "mdna"),
+        ("Item 8. Financial Statements", "financial"), ("Item 9A. Controls and Procedures", "controls"),
+    ],
+    "10-Q": [
+        ("PART I", None), ("Item 1. Financial Statements", "financial"),
+        ("Item 2. Management's Discussion and Analysis", "mdna"), ("Item 4. Controls and Procedures", "controls"),
+        ("PART II", None), ("Item 1A. Risk Factors", "risk"),
+    ],
+}
+
+FILING_SENTENCES = {
+    "business": [
+        "We design, manufacture and sell products to customers in more than forty countries.",
+        "Our strategy focuses on recurring revenue from subscription services and long-term contracts.",
+        "We compete on the basis of price, product quality, customer service and brand recognition.",
+        "Research and development spending supports new product introductions across our segments.",
+        "Our supply chain relies on a limited number of suppliers for certain key components.",
+    ],
+    "risk": [
+        "Changes in interest rates and inflation could adversely affect demand for our products.",
+        "A cybersecurity incident could disrupt our operations and harm our reputation.",
+        "We depend on key personnel and may be unable to attract and retain qualified employees.",
+        "Supply chain disruptions may increase our costs and delay deliveries to customers.",
+        "Fluctuations in foreign currency exchange rates may reduce our reported revenue.",
+        "New tariffs or trade restrictions could increase the cost of imported materials.",
+    ],
+    "mdna": [
+        "Revenue increased compared with the prior year period, driven by higher volumes and pricing.",
+        "Gross margin declined due to higher freight and raw material costs.",
+        "Operating expenses increased as we invested in sales and marketing headcount.",
+        "Cash provided by operating activities was sufficient to fund capital expenditures.",
+        "We repurchased shares under our existing share repurchase program during the period.",
+    ],
+    "financial": [
+        "The consolidated financial statements include the accounts of the Company and its subsidiaries.",
+        "Revenue is recognized when control of the promised goods or services transfers to the customer.",
+        "Goodwill is tested for impairment annually or more frequently if indicators exist.",
+        "Inventories are stated at the lower of cost or net realizable value.",
+    ],
+    "controls": [
+        "Our disclosure controls and procedures were effective as of the end of the period.",
+        "There were no changes in internal control over financial reporting during the quarter.",
+        "Management assessed the effectiveness of internal control over financial reporting.",
+    ],
+}
+
+# Rarer disclosures, included in a deterministic subset of filings
+FILING_RARE_SENTENCES = {
+    "risk": "These conditions raise substantial doubt about our ability to continue as a going concern.",
+    "controls": "Management identified a material weakness in internal control over financial reporting.",
+    "mdna": "We recorded a goodwill impairment charge related to our legacy hardware reporting unit.",
+}
+
+
+def synthetic_sections(accession_number: str, form: str, paragraphs: int = 6) -> List[tuple]:
+    """(heading, [paragraph, ...]) for a synthetic filing, deterministic per accession number"""
+    seed = zlib.crc32(accession_number.encode("ascii"))
+    sections = []
+    for heading, topic in FILING_ITEMS.get(form, FILING_ITEMS["10-Q"]):
+        if topic is None:
+            sections.append((heading, []))
+            continue
+        sentences = FILING_SENTENCES[topic]
+        body = []
+        for paragraph in range(paragraphs):
+            start = (seed + paragraph * 7) % len(sentences)
+            body.append(" ".join(sentences[(start + i) % len(sentences)] for i in range(3)))
+        if topic in FILING_RARE_SENTENCES and (seed >> 8) % 20 == len(sections):
+            body.insert(seed % len(body), FILING_RARE_SENTENCES[topic])
+        sections.append((heading, body))
+    return sections
+
+
+def synthetic_document(ticker: str, accession_number: str, form: str, paragraphs: int = 6) -> str:
+    """Inline XBRL style primary document with hidden facts, styles and Item headings"""
+    parts = [
+        "<html xmlns:ix=\"http://www.xbrl.org/2013/inlineXBRL\"><head><title>", form, "</title>",
+        "<style>p { margin: 0 }</style></head><body>",
+        "<div style=\"display:none\"><ix:header><ix:hidden>",
+        f"<ix:nonNumeric name=\"dei:EntityRegistrantName\">{ticker} Inc</ix:nonNumeric>",
+        "</ix:hidden></ix:header></div>",
+        f"<p><b>{ticker} INC</b></p><p>FORM {form}</p>",
+    ]
+    for heading, body in synthetic_sections(accession_number, form, paragraphs):
+        parts.append(f"<p><b>{heading}</b></p>")
+        for paragraph in body:
+            parts.append(f"<p><span>{paragraph}</span></p>")
+        if body:
+            parts.append("<table><tr><td>Revenue</td><td><ix:nonFraction name=\"us-gaap:Revenues\">1,234</ix:nonFraction></td></tr></table>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def synthetic_frame(tickers: Dict[int, str], taxonomy: str, concept: str, unit: str, period: str) -> dict:
+    """Deterministic frames document: one value per company for a concept / period"""
+    year = int(period[2:6])
+    quarter = int(period[7]) if len(period) > 6 and period[6] == "Q" else None
+    instant = period.endswith("I")
+    if quarter:
+        start, end = date(year, quarter * 3 - 2, 1), date(year, quarter * 3, 28)
+    else:
+        start, end = date(year, 1, 1), date(year, 12, 31)
+
+    data = []
+    for cik, ticker in sorted(tickers.items()):
+        seed = zlib.crc32(f"{concept}:{ticker}".encode("ascii"))
+        value = round((seed % 100_000) * 10_000 * (1 + (year - 2000) * 0.05))
+        if unit != "USD":
+            value = round((seed % 2_000) / 100 - 2, 2)
+        point = {
+            "accn": f"{cik:010d}-{(end.year + 1) % 100:02d}-{seed % 1_000_000:06d}",
+            "cik": cik,
+            "entityName": f"{ticker} Inc",
+            "loc": "US-NY",
+            "end": end.isoformat(),
+            "val": value,
+        }
+        if not instant:
+            point["start"] = start.isoformat()
+        data.append(point)
+
+    return {
+        "taxonomy": taxonomy,
+        "tag": concept,
+        "ccp": period,
+        "uom": unit,
+        "label": concept,
+        "description": f"Synthetic {concept}",
+        "pts": len(data),
+        "data": data,
+    }
+
+
+def format_form_index(day: date, rows: List[tuple]) -> str:
+    """Render (form, company name, cik, accession number) rows as a form.idx file"""
+    lines = [INDEX_HEADER.format(received=f"{day:%B} {day.day}, {day.year}")]
+    for form, name, cik, accession_number in sorted(rows):
+        lines.append(
+            f"{form:<12}{name:<62}{cik:<12}{day:%Y%m%d}    edgar/data/{cik}/{accession_number}.txt\n"
+        )
+    return "".join(lines)
+
+
+def create_app(
+    tickers: Dict[int, str],
+    latency_ms: float = 0.0,
+    max_rps: Optional[float] = None,
+    fixtures_dir: Optional[str] = None
+) -> FastAPI:
+    app = FastAPI(title="Stub SEC EDGAR")
+    stats = {"requests": 0, "throttled": 0, "not_found": 0}
+    window = deque()
+    daily_filings: Dict[date, List[tuple]] = {}
+
+    def filings_on(day: date) -> List[tuple]:
+        if not daily_filings:
+            for cik, ticker in tickers.items():
+                for filing in synthetic_filings(cik):
+                    daily_filings.setdefault(date.fromisoformat(filing["filingDate"]), []).append(
+                        (filing["form"], f"{ticker} Inc", cik, filing["accessionNumber"])
+                    )
+        return daily_filings.get(day, [])
+
+    @app.middleware("http")
+    async def throttle(request: Request, call_next):
+        stats["requests"] += 1
+        if request.url.path.startswith("/stub/"):
+            return await call_next(request)
+
+        now = time.monotonic()
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if max_rps is not None and len(window) >= max_rps:
+            stats["throttled"] += 1
+            return JSONResponse(status_code=429, content={"message": "Request rate threshold exceeded"})
+        window.append(now)
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000.0)
+        return await call_next(request)
+
+    @app.get("/files/company_tickers.json")
+    async def company_tickers():
+        return {
+            str(i): {"cik_str": cik, "ticker": ticker, "title": f"{ticker} Inc"}
+            for i, (cik, ticker) in enumerate(sorted(tickers.items(), key=lambda item: item[1]))
+        }
+
+    @app.get("/submissions/CIK{cik}.json")
+    async def submissions(cik: str):
+        ticker = tickers.get(int(cik))
+        if ticker is None:
+            stats["not_found"] += 1
+            raise HTTPException(status_code=404, detail="Not found")
+
+        filings = synthetic_filings(int(cik))
+        return {
+            "cik": str(int(cik)),
+            "name": f"{ticker} Inc",
+            "tickers": [ticker],
+            "filings": {
+                "recent": {
+                    key: [filing[key] for filing in filings]
+                    for key in ("accessionNumber", "form", "filingDate", "reportDate", "primaryDocument")
+                },
+                "files": [],
+            },
+        }
+
+    @app.get("/api/xbrl/frames/{taxonomy}/{concept}/{unit}/{period}.json")
+    async def frame(taxonomy: str, concept: str, unit: str, period: str):
+        return synthetic_frame(tickers, taxonomy, concept, unit, period)
+
+    @app.get("/Archives/edgar/daily-index/{year}/{quarter}/form.{day}.idx")
+    async def daily_index(year: int, quarter: str, day: str):
+        if fixtures_dir:
+            path = os.path.join(fixtures_dir, f"form.{day}.idx")
+            if os.path.exists(path):
+                with open(path, "r", encoding="latin-1") as file:
+                    return PlainTextResponse(file.read())
+        try:
+            filed = date(int(day[:4]), int(day[4:6]), int(day[6:8]))
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Not found")
+        if filed.weekday() >= 5 or filed >= date.today():
+            # EDGAR publishes no index for weekends, and today's only after hours
+            stats["not_found"] += 1
+            raise HTTPException(status_code=404, detail="Not found")
+        return PlainTextResponse(format_form_index(filed, filings_on(filed)))
+
+    @app.get("/Archives/edgar/data/{cik}/{folder}/{document}")
+    async def filing_document(cik: int, folder: str, document: str):
+        ticker = tickers.get(cik)
+        if ticker is None or len(folder) != 18:
+            stats["not_found"] += 1
+            raise HTTPException(status_code=404, detail="Not found")
+        form = "10-K" if document.startswith("10k") else "10-Q"
+        accession_number = f"{folder[:10]}-{folder[10:12]}-{folder[12:]}"
+        return HTMLResponse(synthetic_document(ticker, accession_number, form))
+
+    @app.get("/stub/stats")
+    async def get_stats():
+        return {**stats, "companies": len(tickers)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a stub SEC EDGAR API from sd_companies')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=8900, help='Bind port')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Added latency per request')
+    parser.add_argument('--max-rps', type=float, default=None, help='Answer 429 above this many requests/second')
+    parser.add_argument('--fixtures', default=None, help='Directory of form.YYYYMMDD.idx files served as-is')
+    args = parser.parse_args()
+
+    import uvicorn
+
+    tickers = load_tickers(get_sync_database_url())
+    print(f"🚀 Stub EDGAR serving {len(tickers)} companies on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(tickers, args.latency_ms, args.max_rps, args.fixtures), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
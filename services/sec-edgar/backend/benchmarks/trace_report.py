@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Summarize sampled request traces per route and phase
+
+Reads the JSON lines file written by the tracing exporter
+(TRACE_EXPORT_PATH, plus its rotated `.1` file) and prints, per
+request name, p50/p95 of the total and of each phase's self time (the same
+breakdown as the Server-Timing header), so a latency spike can be pinned on
+connection checkout, SQL, ORM conversion or encoding.
+
+Usage:
+    TRACE_SAMPLE_RATE=0.05 TRACE_EXPORT_PATH=/tmp/traces.jsonl python -m benchmarks.run --only list_by_sector selected
+    TRACE_EXPORT_PATH=/tmp/traces.jsonl python -m benchmarks.trace_report
+    python -m benchmarks.trace_report --path /var/log/us-stock/traces.jsonl --slowest 5
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.tracing import PHASES, TRACE_EXPORT_PATH
+from benchmarks.harness import percentile
+
+
+def load_traces(path: str) -> dict:
+    """Spans grouped by trace id, from the rotated file and then the current one"""
+    traces = defaultdict(list)
+    for file_path in (f"{path}.1", path):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    span = json.loads(line)
+                    traces[span["traceId"]].append(span)
+    return traces
+
+
+def phase_of(span: dict) -> str:
+    for attribute in span.get("attributes", []):
+        if attribute["key"] == "app.phase":
+            return attribute["value"]["stringValue"]
+    return "request"
+
+
+def duration_ms(span: dict) -> float:
+    return max(0, int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def breakdown(spans: list) -> tuple:
+    """(root span, total ms, {phase: self ms}, sql statement count) for one trace"""
+    ids = {span["spanId"] for span in spans}
+    root = next((span for span in spans if span.get("parentSpanId") not in ids), spans[0])
+    child_ms = defaultdict(float)
+    for span in spans:
+        if span.get("parentSpanId") in ids:
+            child_ms[span["parentSpanId"]] += duration_ms(span)
+    phases = defaultdict(float)
+    for span in spans:
+        phases[phase_of(span)] += max(0.0, duration_ms(span) - child_ms[span["spanId"]])
+    statements = sum(1 for span in spans if phase_of(span) == "sql")
+    return root, duration_ms(root), phases, statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize sampled request traces')
+    parser.add_argument('--path', default=TRACE_EXPORT_PATH, help='Traces JSON lines file (defaults to TRACE_EXPORT_PATH)')
+    parser.add_argument('--slowest', type=int, default=0, help='Also list the N slowest traces')
+    args = parser.parse_args()
+
+    if not args.path or not os.path.exists(args.path):
+        print(f"❌ No traces at {args.path or '(no path)'}; set TRACE_EXPORT_PATH and TRACE_SAMPLE_RATE on the server")
+        return 1
+
+    by_request = defaultdict(list)
+    for trace_id, spans in load_traces(args.path).items():
+        root, total, phases, statements = breakdown(spans)
+        by_request[root["name"]].append((total, phases, statements, trace_id))
+
+    for name, traces in sorted(by_request.items(), key=lambda item: -len(item[1])):
+        totals = sorted(total for total, _, _, _ in traces)
+        print(f"\n📋 {name}: {len(traces)} traces, total p50 {percentile(totals, 50):.1f} ms, p95 {percentile(totals, 95):.1f} ms, "
+              f"{sum(statements for _, _, statements, _ in traces) / len(traces):.1f} queries/request")
+        print(f"   {'phase':<12} {'p50 ms':>8} {'p95 ms':>8} {'share':>7}")
+        overall = sum(totals) or 1.0
+        for phase in PHASES:
+            values = sorted(phases.get(phase, 0.0) for _, phases, _, _ in traces)
+            if not any(values):
+                continue
+            print(f"   {phase:<12} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} {sum(values) / overall:>7.0%}")
+
+        for total, phases, statements, trace_id in sorted(traces, reverse=True)[:args.slowest]:
+            slowest_phase = max(phases, key=phases.get)
+            print(f"   🐢 {trace_id}: {total:.1f} ms, mostly {slowest_phase} ({phases[slowest_phase]:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
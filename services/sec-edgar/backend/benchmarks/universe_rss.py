@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Measure per-worker memory of private vs shared (mapped) universe snapshots
+
+Spawns N worker processes that each either build a private CompanyUniverse
+(what every uvicorn worker does without a publisher) or map the shared
+snapshot file, run a screen so every column page is touched, and report
+their memory from /proc/self/smaps_rollup. With the shared snapshot the
+private (unshared) memory per worker should stay flat as workers are added.
+
+Runs without a database: the universe is synthetic.
+
+Usage:
+    python -m benchmarks.universe_rss --rows 1000000 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Industrials", "Energy", None]
+EXCHANGES = ["NASDAQ", "NYSE", "AMEX"]
+
+
+def synthetic_rows(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        (
+            uuid.UUID(int=rng.getrandbits(128)),
+            f"X{i:07d}"[:10],
+            f"Synthetic Company {i}",
+            rng.choice(EXCHANGES),
+            rng.choice(SECTORS),
+            rng.lognormvariate(21, 2),
+            rng.random() < 0.02,
+            now,
+        )
+        for i in range(count)
+    ]
+
+
+def memory_kib() -> dict:
+    """Rss / Pss / private memory of the current process"""
+    values = {}
+    with open("/proc/self/smaps_rollup", "r") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def worker(mode: str, path: str, rows: int, barrier, results):
+    import asyncio
+    from app.services.stock_discovery.screening_engine import CompanyUniverse, ScreeningEngine
+    from app.shared.models.stock_discovery import ScreenGroupBy, ScreenParams
+
+    baseline = memory_kib()
+    if mode == "shared":
+        engine = ScreeningEngine(snapshot_path=path)
+        asyncio.run(engine.ensure_fresh(None))
+    else:
+        engine = ScreeningEngine()
+        engine.universe = CompanyUniverse(capacity=rows)
+        engine.universe.load(synthetic_rows(rows))
+        engine.refreshed_at = datetime.utcnow()
+
+    engine.screen(ScreenParams(min_market_cap=1e9, limit=100, group_by=ScreenGroupBy.SECTOR))
+    # Measure while all workers hold their snapshot so shared pages are split across them
+    barrier.wait()
+    usage = memory_kib()
+    results.put({key: usage[key] - baseline[key] for key in usage})
+    barrier.wait()
+
+
+def measure(mode: str, path: str, rows: int, workers: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, path, rows, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(s[key] for s in samples) / len(samples) / 1024.0 for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-worker memory of private vs shared snapshots')
+    parser.add_argument('--rows', type=int, default=500000, help='Synthetic universe size')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to test')
+    parser.add_argument('--path', default=None, help='Snapshot file (defaults to a temp file on /dev/shm)')
+    args = parser.parse_args()
+
+    from app.infrastructure.universe_snapshot import write_snapshot
+    from app.services.stock_discovery.screening_engine import CompanyUniverse
+
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    path = args.path or os.path.join(directory, f"universe-rss-{os.getpid()}.bin")
+
+    universe = CompanyUniverse(capacity=args.rows)
+    universe.load(synthetic_rows(args.rows))
+    size = write_snapshot(path, universe.to_snapshot_columns(), generation=1)
+    print(f"📦 Snapshot: {args.rows} companies, {size / 1024 / 1024:.1f} MiB at {path}\n")
+
+    print(f"{'mode':<8} {'workers':>7} {'rss MiB':>9} {'pss MiB':>9} {'private MiB':>12}")
+    try:
+        for mode in ("private", "shared"):
+            for workers in args.workers:
+                usage = measure(mode, path, args.rows, workers)
+                print(f"{mode:<8} {workers:>7} {usage['rss']:>9.1f} {usage['pss']:>9.1f} {usage['private']:>12.1f}")
+    finally:
+        if not args.path:
+            os.unlink(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
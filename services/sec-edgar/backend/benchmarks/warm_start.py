@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Time restart-to-warm for the screening universe, cold vs warm start
+
+A cold start builds the universe from a full sd_companies scan, the way a
+fresh worker without a warm-start file does. A warm start loads the local
+snapshot file the previous worker saved and catches up only the rows
+changed since its watermark (served by ix_sd_companies_changed_at).
+--touch bumps updated_at on that many random companies between saving and
+restarting, to time a catch-up with real changes (this writes to the
+database).
+
+Usage:
+    python -m benchmarks.warm_start --runs 5
+    python -m benchmarks.warm_start --runs 5 --touch 1000
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, update
+
+from app.domain.stock_discovery.models import Company
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.services.stock_discovery.screening_engine import ScreeningEngine, read_warm_start
+
+
+async def touch_companies(count: int):
+    """Bump updated_at on `count` random companies"""
+    async with AsyncSessionLocal() as session:
+        ids = select(Company.id).order_by(func.random()).limit(count).scalar_subquery()
+        await session.execute(update(Company).where(Company.id.in_(ids)).values(updated_at=func.now()))
+        await session.commit()
+
+
+async def cold_start() -> tuple:
+    """Build a universe from a full scan; returns (engine, seconds)"""
+    engine = ScreeningEngine()
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        repo = CompanyRepository(session)
+        await engine.ensure_fresh(repo)
+        elapsed = time.perf_counter() - started
+        # Warm-start files are only saved for a known database
+        engine.source, _ = await repo.get_universe_source()
+    return engine, elapsed
+
+
+async def warm_start(path: str) -> tuple:
+    """Load the warm-start file and catch up; returns (engine, load seconds, catch-up seconds, rows caught up)"""
+    started = time.perf_counter()
+    _, since, _ = read_warm_start(path)
+    load = time.perf_counter() - started
+
+    engine = ScreeningEngine(warm_start_path=path)
+    async with AsyncSessionLocal() as session:
+        repo = CompanyRepository(session)
+        started = time.perf_counter()
+        if not await engine.warm_start(path, repo):
+            raise RuntimeError(f"Warm-start snapshot at {path} was not usable")
+        total = time.perf_counter() - started
+        rows = await repo.get_screening_rows(changed_since=since)
+    # warm_start reads the file again; its catch-up (source check, changed rows, count) is the rest
+    return engine, load, max(total - load, 0.0), len(rows)
+
+
+async def run(args) -> int:
+    root = tempfile.mkdtemp(prefix="warm-start-")
+    path = os.path.join(root, "universe-warm.bin")
+    cold_times, load_times, catch_up_times, total_times = [], [], [], []
+
+    try:
+        for run_number in range(1, args.runs + 1):
+            engine, cold = await cold_start()
+            cold_times.append(cold)
+
+            engine.warm_start_path = path
+            await engine.save_warm_start()
+
+            if args.touch:
+                await touch_companies(args.touch)
+
+            warm, load, catch_up, changed = await warm_start(path)
+            load_times.append(load)
+            catch_up_times.append(catch_up)
+            total_times.append(load + catch_up)
+            if warm.universe.size != engine.universe.size:
+                print(f"❌ Warm universe has {warm.universe.size} companies, cold has {engine.universe.size}")
+                return 1
+
+            print(f"   run {run_number}: cold {cold * 1000:.0f} ms, warm {(load + catch_up) * 1000:.0f} ms "
+                  f"(load {load * 1000:.0f} + catch-up {catch_up * 1000:.0f} ms, {changed} rows)")
+
+        size = os.path.getsize(path)
+        print(f"\n📦 {engine.universe.size} companies, warm-start file {size / 1024 / 1024:.1f} MiB\n")
+        print(f"{'start':<10} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+        for name, times in (("cold", cold_times), ("warm", total_times),
+                            ("  load", load_times), ("  catch-up", catch_up_times)):
+            print(f"{name:<10} {statistics.median(times) * 1000:>10.0f} {min(times) * 1000:>8.0f} {max(times) * 1000:>8.0f}")
+        print(f"\n⚡ Warm start is {statistics.median(cold_times) / statistics.median(total_times):.1f}x faster")
+    finally:
+        shutil.rmtree(root)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time restart-to-warm for the screening universe')
+    parser.add_argument('--runs', type=int, default=3, help='Cold/warm restarts to time')
+    parser.add_argument('--touch', type=int, default=0,
+                        help='Companies whose updated_at is bumped before each warm start (writes to the database)')
+    args = parser.parse_args()
+
+    print(f"🏁 Timing cold vs warm start of the screening universe ({args.runs} runs)")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
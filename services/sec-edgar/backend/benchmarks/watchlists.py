@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Time watchlist set algebra on Roaring bitmaps against plain Python sets
+
+Builds a FacetIndex over --companies synthetic companies and --watchlists
+random watchlists (sizes between --min-size and --max-size, some of them
+clustered in one sector), then runs a reproducible mix of "watchlist ∩
+sectors ∩ exchanges ∩ market cap band", "watchlist ∩ other − third"
+and per-facet count queries through the bitmaps and through Python sets,
+checks they agree, and reports p50/p95 per query shape plus storage per
+watchlist. No database needed.
+
+Usage:
+    python -m benchmarks.watchlists --companies 20000 --watchlists 5000
+    python -m benchmarks.watchlists --companies 1000000 --watchlists 1000 --max-size 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.infrastructure.roaring import RoaringBitmap
+from app.services.stock_discovery.facet_index import FacetIndex
+from benchmarks.harness import percentile
+from benchmarks.seed import SYNTHETIC_EXCHANGES
+
+SECTORS = [
+    "Technology", "Health Care", "Finance", "Consumer Discretionary", "Industrials", "Energy",
+    "Real Estate", "Utilities", "Basic Materials", "Telecommunications", "Consumer Staples", None,
+]
+MARKET_CAP_BANDS = [(None, 3e8), (3e8, 2e9), (2e9, 1e10), (1e10, None), (None, None)]
+
+
+def synthetic_universe(companies: int, rng: random.Random) -> list:
+    """(ordinal, exchange, sector, market_cap, changed_at) rows"""
+    return [
+        (ordinal, rng.choice(SYNTHETIC_EXCHANGES), rng.choice(SECTORS),
+         None if rng.random() < 0.05 else 10 ** rng.uniform(7, 12), None)
+        for ordinal in range(1, companies + 1)
+    ]
+
+
+def synthetic_watchlists(rows: list, count: int, min_size: int, max_size: int, rng: random.Random) -> list:
+    """Ordinal sets; a third are drawn from a single sector, like a sector analyst's list"""
+    by_sector = {}
+    for ordinal, _, sector, _, _ in rows:
+        by_sector.setdefault(sector, []).append(ordinal)
+    watchlists = []
+    for _ in range(count):
+        pool = by_sector[rng.choice(SECTORS)] if rng.random() < 0.33 else None
+        size = rng.randint(min_size, max_size)
+        if pool is not None:
+            watchlists.append(set(rng.sample(pool, min(size, len(pool)))))
+        else:
+            watchlists.append({rng.randint(1, len(rows)) for _ in range(size)})
+    return watchlists
+
+
+def timed(function, times: list):
+    started = time.perf_counter()
+    result = function()
+    times.append(time.perf_counter() - started)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time watchlist bitmap set algebra')
+    parser.add_argument('--companies', type=int, default=20000, help='Companies in the synthetic universe')
+    parser.add_argument('--watchlists', type=int, default=5000, help='Watchlists to generate')
+    parser.add_argument('--min-size', type=int, default=10, help='Smallest watchlist')
+    parser.add_argument('--max-size', type=int, default=500, help='Largest watchlist')
+    parser.add_argument('--queries', type=int, default=2000, help='Queries per query shape')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"🌱 Generating {args.companies} companies and {args.watchlists} watchlists")
+    rows = synthetic_universe(args.companies, rng)
+    sets = synthetic_watchlists(rows, args.watchlists, args.min_size, args.max_size, rng)
+
+    index = FacetIndex()
+    started = time.perf_counter()
+    index.load(rows)
+    print(f"📊 Facet index built in {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"({len(index.exchanges)} exchanges, {len(index.sectors)} sectors)")
+
+    blobs = [RoaringBitmap(members).serialize() for members in sets]
+    members_total = sum(len(members) for members in sets)
+    print(f"💾 {sum(len(blob) for blob in blobs) / len(blobs):.0f} bytes per watchlist "
+          f"({sum(len(blob) for blob in blobs) / members_total:.2f} per member; a join table row is ~50)\n")
+
+    facts = {ordinal: (exchange, sector, market_cap) for ordinal, exchange, sector, market_cap, _ in rows}
+
+    def set_filter(members, exchanges, sectors, low, high):
+        result = set()
+        for ordinal in members:
+            exchange, sector, cap = facts[ordinal]
+            if exchanges and exchange not in exchanges or sectors and sector not in sectors:
+                continue
+            if (low is not None or high is not None) and (
+                    cap is None or (low is not None and cap < low) or (high is not None and cap > high)):
+                continue
+            result.add(ordinal)
+        return result
+
+    shapes = {name: ([], []) for name in ("deserialize", "facet_filter", "combine", "facet_counts")}
+    mismatches = 0
+    for _ in range(args.queries):
+        a, b, c = rng.sample(range(len(sets)), 3)
+        exchanges = rng.sample(SYNTHETIC_EXCHANGES, rng.randint(0, 2))
+        sectors = rng.sample([sector for sector in SECTORS if sector], rng.randint(0, 3))
+        low, high = rng.choice(MARKET_CAP_BANDS)
+
+        bitmap_times, set_times = shapes["deserialize"]
+        members = timed(lambda: RoaringBitmap.deserialize(blobs[a]), bitmap_times)
+        timed(lambda: set(np.frombuffer(np.array(sorted(sets[a]), dtype=np.uint32).tobytes(), dtype=np.uint32).tolist()), set_times)
+
+        bitmap_times, set_times = shapes["facet_filter"]
+        filtered = timed(lambda: index.filter(members, exchanges, sectors, low, high), bitmap_times)
+        expected = timed(lambda: set_filter(sets[a], exchanges, sectors, low, high), set_times)
+        mismatches += set(filtered.to_array().tolist()) != expected
+
+        bitmap_times, set_times = shapes["combine"]
+        other, third = RoaringBitmap.deserialize(blobs[b]), RoaringBitmap.deserialize(blobs[c])
+        combined = timed(lambda: (members & other) - third, bitmap_times)
+        expected = timed(lambda: (sets[a] & sets[b]) - sets[c], set_times)
+        mismatches += set(combined.to_array().tolist()) != expected
+
+        bitmap_times, set_times = shapes["facet_counts"]
+        timed(lambda: index.facet_counts(members), bitmap_times)
+        timed(lambda: (
+            {name: sum(1 for o in sets[a] if facts[o][0] == name) for name in SYNTHETIC_EXCHANGES},
+            {name: sum(1 for o in sets[a] if facts[o][1] == name) for name in SECTORS if name},
+        ), set_times)
+
+    print(f"{'query':<14} {'bitmap p50 µs':>14} {'p95 µs':>8} {'set p50 µs':>11} {'p95 µs':>8}")
+    for name, (bitmap_times, set_times) in shapes.items():
+        bitmap_times.sort()
+        set_times.sort()
+        print(f"{name:<14} {percentile(bitmap_times, 50) * 1e6:>14.1f} {percentile(bitmap_times, 95) * 1e6:>8.1f} "
+              f"{percentile(set_times, 50) * 1e6:>11.1f} {percentile(set_times, 95) * 1e6:>8.1f}")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} queries disagreed with the set implementation")
+        return 1
+    print("\n✅ Bitmap and set results agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
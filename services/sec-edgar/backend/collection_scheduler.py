@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Schedule collection around financial report filing windows
+
+Instead of queueing every selected company on a fixed interval, reads the
+report calendar (dc_report_calendar) and only queues companies with an
+unfiled report expected within the filing window, re-checking each at most
+every --recheck-hours until the report lands. Workers started with
+collection_worker.py pick the jobs up.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.services.data_collection.collection_service import CollectionService
+from app.services.data_collection.report_calendar import ReportCalendarService
+
+
+async def schedule(args):
+    await init_db()
+
+    if args.refresh_calendar:
+        async with AsyncSessionLocal() as session:
+            result = await ReportCalendarService(session).refresh_selected()
+        print(f"📅 Calendar rebuilt: {result.entries} entries for {result.companies} companies")
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await CollectionService(session).enqueue_due_companies(
+                days_ahead=args.days_ahead,
+                days_overdue=args.days_overdue,
+                recheck_hours=args.recheck_hours,
+            )
+        print(f"📋 {result.message}")
+
+        if args.once:
+            return 0
+        await asyncio.sleep(args.interval)
+
+
+def main():
+    """Main scheduler function"""
+    parser = argparse.ArgumentParser(description='Queue collection for companies inside report filing windows')
+    parser.add_argument('--days-ahead', type=int, default=3, help='Queue reports expected up to this many days ahead')
+    parser.add_argument('--days-overdue', type=int, default=14, help='Keep checking reports this many days overdue')
+    parser.add_argument('--recheck-hours', type=int, default=12, help='Minimum hours between checks of one company')
+    parser.add_argument('--interval', type=float, default=900, help='Seconds between scheduling passes')
+    parser.add_argument('--refresh-calendar', action='store_true', help='Rebuild the calendar from filing history first')
+    parser.add_argument('--once', action='store_true', help='Run a single scheduling pass and exit')
+    args = parser.parse_args()
+
+    print("🚀 Starting collection scheduler...")
+    try:
+        return asyncio.run(schedule(args))
+    except KeyboardInterrupt:
+        print("\n👋 Scheduler stopped")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
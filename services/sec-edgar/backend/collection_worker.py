@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Run a data collection worker
+
+Workers share the dc_collection_jobs queue in Postgres: each claims a batch
+of due jobs with a lease, renews the lease while working, and steals jobs
+whose lease expired because another worker died. Start as many workers as
+needed, on one host or many; they split EDGAR_MAX_RPS between them.
+Within a worker, jobs flow through a fetch → parse → write pipeline
+(see app/services/data_collection/pipeline.py).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.infrastructure.external.edgar import EdgarClient
+from app.services.data_collection.collection_service import CollectionService
+from app.services.data_collection.pipeline import (
+    PIPELINE_FETCH_CONCURRENCY, PIPELINE_PARSE_WORKERS, PIPELINE_WRITE_BATCH_ROWS, CollectionPipeline
+)
+from app.services.data_collection.worker import CollectionRunner
+
+
+async def run(args):
+    await init_db()
+
+    if args.enqueue_selected:
+        async with AsyncSessionLocal() as session:
+            result = await CollectionService(session).enqueue_selected_companies()
+        print(f"📋 {result.message}")
+
+    edgar = EdgarClient()
+    runner = CollectionRunner(
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+        drain=args.drain,
+        edgar=edgar,
+        pipeline=CollectionPipeline(
+            edgar,
+            fetch_concurrency=args.fetch_concurrency,
+            parse_workers=args.parse_workers,
+            write_batch_rows=args.write_batch_rows,
+        ),
+    )
+    print(f"🚀 Collection worker {runner.worker_id} started "
+          f"(concurrency {args.concurrency}, {args.fetch_concurrency} fetchers, "
+          f"{args.parse_workers} parsers, lease {args.lease_seconds}s)")
+    await runner.run()
+    print(f"✅ Worker {runner.worker_id} finished: {runner.completed} completed, {runner.failed} failed")
+    print(f"📊 {runner.pipeline.summary()}")
+
+
+def main():
+    """Main worker function"""
+    parser = argparse.ArgumentParser(description='Run a lease-based data collection worker')
+    parser.add_argument('--worker-id', default=None, help='Stable worker name (defaults to hostname-based id)')
+    parser.add_argument('--concurrency', type=int, default=32, help='Jobs in flight in this worker\'s pipeline')
+    parser.add_argument('--fetch-concurrency', type=int, default=PIPELINE_FETCH_CONCURRENCY, help='Concurrent EDGAR fetches')
+    parser.add_argument('--parse-workers', type=int, default=PIPELINE_PARSE_WORKERS, help='Parser processes (0 parses in-process)')
+    parser.add_argument('--write-batch-rows', type=int, default=PIPELINE_WRITE_BATCH_ROWS, help='Filing rows per write transaction')
+    parser.add_argument('--lease-seconds', type=int, default=60, help='Lease length; renewed every third of it')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before a job is marked failed')
+    parser.add_argument('--drain', action='store_true', help='Exit once no job is due instead of polling')
+    parser.add_argument('--enqueue-selected', action='store_true', help='Queue all selected companies before starting')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Watch the EDGAR daily filing index and enqueue collection for filers
+
+Instead of polling every selected company, reads one form.idx per business
+day, intersects it with the selected companies' CIKs and enqueues
+collection jobs only for companies that actually filed a periodic report.
+Also records each company's next expected report date.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+from datetime import date, timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.infrastructure.external.edgar import EdgarClient
+from app.infrastructure.repositories.data_collection import FeedCursorRepository
+from app.services.data_collection.filing_feed import (
+    DAILY_INDEX_FEED, FilingFeedService, parse_form_index
+)
+
+
+def print_result(result):
+    if not result.published:
+        print(f"   {result.day}: no index published")
+    else:
+        print(f"   {result.day}: {result.entries} filings, {result.matched} watched filers, {result.enqueued} jobs enqueued")
+
+
+async def process_file(path: str, day: date):
+    """Process a local form.idx file (fixtures, backfills)"""
+    async with EdgarClient() as edgar, AsyncSessionLocal() as session:
+        service = FilingFeedService(session)
+        watchlist = await service.load_watchlist(edgar)
+        with open(path, "r", encoding="latin-1") as file:
+            result = await service.process_entries(day, parse_form_index(file), watchlist)
+    print_result(result)
+
+
+async def watch(args):
+    await init_db()
+
+    if args.index_file:
+        match = re.search(r"(\d{8})", os.path.basename(args.index_file))
+        day = date.fromisoformat(args.date) if args.date else None
+        if day is None and match:
+            value = match.group(1)
+            day = date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        if day is None:
+            print("❌ --date is required when the file name has no YYYYMMDD date")
+            return 1
+        await process_file(args.index_file, day)
+        return 0
+
+    if args.since:
+        async with AsyncSessionLocal() as session:
+            # Rewind (or start) the cursor to the day before --since
+            await FeedCursorRepository(session).reset(
+                DAILY_INDEX_FEED, date.fromisoformat(args.since) - timedelta(days=1)
+            )
+
+    async with EdgarClient() as edgar:
+        while True:
+            async with AsyncSessionLocal() as session:
+                results = await FilingFeedService(session).catch_up(edgar)
+            for result in results:
+                print_result(result)
+            print(f"📊 {edgar.requests_made} EDGAR requests so far")
+
+            if not args.follow:
+                return 0
+            await asyncio.sleep(args.interval)
+
+
+def main():
+    """Main watcher function"""
+    parser = argparse.ArgumentParser(description='Enqueue collection from the EDGAR daily filing index')
+    parser.add_argument('--since', default=None, help='Process daily indexes from this date (YYYY-MM-DD)')
+    parser.add_argument('--follow', action='store_true', help='Keep polling for newly published indexes')
+    parser.add_argument('--interval', type=float, default=1800, help='Seconds between polls with --follow')
+    parser.add_argument('--index-file', default=None, help='Process a local form.idx file instead of fetching')
+    parser.add_argument('--date', default=None, help='Filing date of --index-file (defaults to the date in its name)')
+    args = parser.parse_args()
+
+    print("🚀 Starting EDGAR filing feed watcher...")
+    try:
+        return asyncio.run(watch(args))
+    except KeyboardInterrupt:
+        print("\n👋 Watcher stopped")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Extract collected filings' primary documents into the full-text index
+
+For selected companies' filings in dc_sec_data whose primary document has
+not been indexed yet (newest first), the document is streamed from SEC
+EDGAR, stripped of HTML/iXBRL markup and split into sections in
+dm_filing_sections, which /api/v1/data/filings/search queries. The yearly
+partition a filing belongs to is created when first needed.
+
+Safe to re-run: a document is committed together with its sections, so a
+failed or interrupted document is simply fetched again on the next run.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.infrastructure.external.edgar import EdgarClient
+from app.services.data_management.filing_text import FILING_TEXT_FORMS, FilingTextService
+
+
+async def index(args):
+    await init_db()
+
+    forms = args.form or list(FILING_TEXT_FORMS)
+    print(f"📋 Indexing up to {args.limit} filings ({', '.join(forms)})")
+    started = time.perf_counter()
+    async with EdgarClient() as edgar, AsyncSessionLocal() as session:
+        results = await FilingTextService(session, edgar).index_pending(args.limit, forms)
+
+    for result in results:
+        if result.error:
+            print(f"   ❌ {result.accession_number}: {result.error}")
+        else:
+            print(f"   {result.accession_number}: {result.sections} sections, "
+                  f"{result.characters} characters from {result.bytes / 1024:.0f} KiB")
+
+    elapsed = time.perf_counter() - started
+    indexed = [result for result in results if not result.error]
+    total_bytes = sum(result.bytes for result in indexed)
+    print(f"✅ {len(indexed)} filings, {sum(result.sections for result in indexed)} sections indexed "
+          f"in {elapsed:.1f}s ({total_bytes / 1024 / 1024 / max(elapsed, 1e-9):.1f} MiB/s)")
+    return 1 if len(indexed) < len(results) else 0
+
+
+def main():
+    """Main filing indexing function"""
+    parser = argparse.ArgumentParser(description='Index collected filing documents for full-text search')
+    parser.add_argument('--limit', type=int, default=100, help='Maximum filings to index')
+    parser.add_argument('--form', action='append', help='Filing type to index (repeatable, default: 10-K and 10-Q with amendments)')
+    args = parser.parse_args()
+
+    print("🚀 Starting filing text indexing...")
+    return asyncio.run(index(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Refresh universe-wide XBRL metrics from the EDGAR frames API
+
+Each frames document holds one concept / unit / calendar period for every
+filer, so refreshing a metric across all companies costs one request per
+period instead of one companyfacts request per company. Documents are
+joined to sd_companies by CIK and upserted into dc_financial_facts.
+
+Derived quarterly metrics (TTM, YoY growth, margins) in dc_derived_metrics
+are recomputed once at the end, only for the companies and quarters whose
+facts changed. --rebuild-metrics recomputes them for every company.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.infrastructure.external.edgar import EdgarClient
+from app.infrastructure.repositories.data_collection import FinancialFactRepository
+from app.services.data_collection.derived_metrics import DerivedMetricsService
+from app.services.data_collection.frames_service import (
+    DEFAULT_FRAME_CONCEPTS, FrameConcept, FramesIngestionService, recent_quarters
+)
+
+
+async def rebuild_metrics():
+    async with AsyncSessionLocal() as session:
+        company_ids = await FinancialFactRepository(session).get_company_ids()
+        started = time.perf_counter()
+        rows = await DerivedMetricsService(session).recompute_companies(company_ids)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {rows} derived metric rows rebuilt for {len(company_ids)} companies in {elapsed:.1f}s")
+    return 0
+
+
+async def ingest(args):
+    await init_db()
+
+    if args.rebuild_metrics:
+        return await rebuild_metrics()
+
+    if args.concept:
+        concepts = [FrameConcept(args.taxonomy, args.concept, args.unit, args.instant)]
+    else:
+        concepts = DEFAULT_FRAME_CONCEPTS
+    periods = args.periods or recent_quarters(args.quarters)
+
+    print(f"📋 {len(concepts)} concepts x {len(periods)} periods: {', '.join(periods)}")
+    started = time.perf_counter()
+    async with EdgarClient() as edgar, AsyncSessionLocal() as session:
+        service = FramesIngestionService(session)
+        results = []
+        for concept in concepts:
+            for period in periods:
+                result = await service.ingest_frame(edgar, concept, period, derive=False)
+                results.append(result)
+                print(f"   {result.concept} {result.unit} {result.period}: "
+                      f"{result.filers} filers, {result.matched} matched, {result.upserted} upserted")
+        requests = edgar.requests_made
+        derived = await service.derive_pending()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {sum(r.upserted for r in results)} facts upserted with {requests} EDGAR requests in {elapsed:.1f}s")
+    print(f"📈 {derived} derived metric rows recomputed")
+    return 0
+
+
+def main():
+    """Main ingestion function"""
+    parser = argparse.ArgumentParser(description='Ingest XBRL frames for all companies')
+    parser.add_argument('--concept', default=None, help='Single concept (defaults to the standard metric set)')
+    parser.add_argument('--unit', default='USD', help='Unit for --concept')
+    parser.add_argument('--taxonomy', default='us-gaap', help='Taxonomy for --concept')
+    parser.add_argument('--instant', action='store_true', help='--concept is point-in-time (balance sheet)')
+    parser.add_argument('--periods', nargs='+', default=None, help='Frame periods, e.g. CY2024Q1 CY2024')
+    parser.add_argument('--quarters', type=int, default=4, help='Completed calendar quarters when --periods is omitted')
+    parser.add_argument('--rebuild-metrics', action='store_true', help='Only recompute derived metrics for every company')
+    args = parser.parse_args()
+
+    print("🚀 Starting XBRL frames ingestion...")
+    return asyncio.run(ingest(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Idempotent schema operations for revisions
+
+The API's init_db still runs Base.metadata.create_all on startup, so a
+database the new code has started against already has every new table
+(with its indexes and constraints) before `alembic upgrade` runs. Revisions
+create tables, columns and indexes through these helpers so they skip
+what is already there instead of failing.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def has_table(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    return any(column["name"] == column_name for column in sa.inspect(op.get_bind()).get_columns(table_name))
+
+
+def create_table(table_name: str, *columns, **kw) -> bool:
+    """Create a table unless it exists; returns whether it was created"""
+    if has_table(table_name):
+        return False
+    op.create_table(table_name, *columns, **kw)
+    return True
+
+
+def add_column(table_name: str, column: sa.Column) -> bool:
+    """Add a column unless it exists; returns whether it was added"""
+    if has_column(table_name, column.name):
+        return False
+    op.add_column(table_name, column)
+    return True
+
+
+def create_index(index_name: str, table_name: str, columns, **kw):
+    op.create_index(index_name, table_name, columns, if_not_exists=True, **kw)
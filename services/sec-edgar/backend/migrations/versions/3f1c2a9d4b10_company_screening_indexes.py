@@ -0,0 +1,55 @@
+"""company screening indexes
+
+Composite indexes backing market-cap range filters and the
+ticker / name / market_cap_desc sort orders on sd_companies.
+
+Revision ID: 3f1c2a9d4b10
+Revises:
+Create Date: 2025-11-02 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d4b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MARKET_CAP_DESC = sa.text('market_cap DESC NULLS LAST')
+
+INDEXES = {
+    'ix_sd_companies_market_cap': [MARKET_CAP_DESC, 'ticker_symbol'],
+    'ix_sd_companies_sector_market_cap': ['sector', MARKET_CAP_DESC, 'ticker_symbol'],
+    'ix_sd_companies_exchange_market_cap': ['exchange', MARKET_CAP_DESC, 'ticker_symbol'],
+    'ix_sd_companies_company_name': ['company_name', 'ticker_symbol'],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking sd_companies against writes while building,
+    # and IF NOT EXISTS tolerates tables created by init_db's create_all
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                'sd_companies',
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name='sd_companies',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
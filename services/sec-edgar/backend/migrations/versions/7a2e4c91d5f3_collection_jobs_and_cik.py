@@ -0,0 +1,93 @@
+"""collection jobs and cik
+
+Adds sd_companies.cik plus the data collection tables: the lease-based
+job queue shared by collection workers, worker heartbeats, and the
+collected filing index.
+
+Revision ID: 7a2e4c91d5f3
+Revises: 3f1c2a9d4b10
+Create Date: 2025-11-09 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import add_column, create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2e4c91d5f3'
+down_revision: Union[str, None] = '3f1c2a9d4b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_JOBS = sa.text("status IN ('pending', 'leased')")
+
+
+def upgrade() -> None:
+    add_column('sd_companies', sa.Column('cik', sa.String(length=10), nullable=True))
+    create_index('ix_sd_companies_cik', 'sd_companies', ['cik'])
+
+    create_table(
+        'dc_collection_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lease_owner', sa.String(length=100)),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True)),
+        sa.Column('scheduled_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True)),
+        sa.Column('last_error', sa.String(length=500)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index('ix_dc_collection_jobs_company_id', 'dc_collection_jobs', ['company_id'])
+    create_index(
+        'uq_dc_collection_jobs_open_company',
+        'dc_collection_jobs',
+        ['company_id'],
+        unique=True,
+        postgresql_where=OPEN_JOBS,
+    )
+    create_index(
+        'ix_dc_collection_jobs_claimable',
+        'dc_collection_jobs',
+        [sa.text('priority DESC'), 'scheduled_at'],
+        postgresql_where=OPEN_JOBS,
+    )
+
+    create_table(
+        'dc_collection_workers',
+        sa.Column('worker_id', sa.String(length=100), primary_key=True),
+        sa.Column('hostname', sa.String(length=255)),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('jobs_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('jobs_failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('requests_made', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    create_table(
+        'dc_sec_data',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('accession_number', sa.String(length=25), nullable=False, unique=True),
+        sa.Column('filing_type', sa.String(length=20), nullable=False),
+        sa.Column('filing_date', sa.Date(), nullable=False),
+        sa.Column('report_date', sa.Date()),
+        sa.Column('primary_document', sa.String(length=255)),
+        sa.Column('collected_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index('ix_dc_sec_data_company_filing_date', 'dc_sec_data', ['company_id', 'filing_date'])
+
+
+def downgrade() -> None:
+    op.drop_table('dc_sec_data')
+    op.drop_table('dc_collection_workers')
+    op.drop_table('dc_collection_jobs')
+    op.drop_index('ix_sd_companies_cik', table_name='sd_companies')
+    op.drop_column('sd_companies', 'cik')
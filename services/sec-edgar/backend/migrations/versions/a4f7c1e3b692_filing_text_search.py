@@ -0,0 +1,72 @@
+"""filing text search
+
+Sections of filing primary documents with a weighted tsvector and GIN
+index for /data/filings/search, plus one row per indexed document.
+dm_filing_sections is range-partitioned by filing_date; the yearly
+partitions (dm_filing_sections_YYYY) are created by the indexer as needed.
+
+Revision ID: a4f7c1e3b692
+Revises: e9c4a6b2d815
+Create Date: 2025-12-01 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f7c1e3b692'
+down_revision: Union[str, None] = 'e9c4a6b2d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'dm_filing_documents',
+        sa.Column('accession_number', sa.String(length=25), primary_key=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filing_type', sa.String(length=20), nullable=False),
+        sa.Column('filing_date', sa.Date(), nullable=False),
+        sa.Column('document', sa.String(length=255), nullable=False),
+        sa.Column('sections', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('characters', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('indexed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index('ix_dm_filing_documents_company_filing_date', 'dm_filing_documents', ['company_id', 'filing_date'])
+
+    create_table(
+        'dm_filing_sections',
+        sa.Column('filing_date', sa.Date(), nullable=False),
+        sa.Column('accession_number', sa.String(length=25), nullable=False),
+        sa.Column('section_no', sa.Integer(), nullable=False),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filing_type', sa.String(length=20), nullable=False),
+        sa.Column('heading', sa.String(length=255)),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(heading, '')), 'A') || "
+                "setweight(to_tsvector('english', content), 'B')",
+                persisted=True
+            )
+        ),
+        sa.PrimaryKeyConstraint('filing_date', 'accession_number', 'section_no'),
+        postgresql_partition_by='RANGE (filing_date)',
+    )
+    # Indexes on the partitioned parent cascade to every yearly partition
+    create_index('ix_dm_filing_sections_search', 'dm_filing_sections', ['search_vector'], postgresql_using='gin')
+    create_index('ix_dm_filing_sections_company_filing_date', 'dm_filing_sections', ['company_id', 'filing_date'])
+
+
+def downgrade() -> None:
+    op.drop_table('dm_filing_sections')
+    op.drop_table('dm_filing_documents')
@@ -0,0 +1,77 @@
+"""company history
+
+Versioned company attributes valid over [valid_from, valid_to) for as-of
+universe queries. A GiST index on the validity range serves `@> date`
+lookups and an exclusion constraint keeps a company's versions from
+overlapping. Existing companies are backfilled with one open version.
+
+Revision ID: a9d4e2f7c318
+Revises: f3c6d9a2b471
+Create Date: 2025-11-22 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2f7c318'
+down_revision: Union[str, None] = 'f3c6d9a2b471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    create_table(
+        'sd_company_history',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ticker_symbol', sa.String(length=10), nullable=False),
+        sa.Column('company_name', sa.String(length=255), nullable=False),
+        sa.Column('exchange', sa.String(length=50), nullable=False),
+        sa.Column('sector', sa.String(length=100)),
+        sa.Column('market_cap', sa.Float()),
+        sa.Column('cik', sa.String(length=10)),
+        sa.Column('valid_from', sa.Date(), nullable=False),
+        sa.Column('valid_to', sa.Date()),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        postgresql.ExcludeConstraint(
+            (sa.column('company_id'), '='),
+            (sa.text("daterange(valid_from, valid_to, '[)')"), '&&'),
+            name='ex_sd_company_history_overlap',
+            using='gist',
+        ),
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_sd_company_history_validity ON sd_company_history "
+        "USING gist (daterange(valid_from, valid_to, '[)'))"
+    )
+    create_index('ix_sd_company_history_ticker', 'sd_company_history', ['ticker_symbol', 'company_id'])
+    create_index(
+        'ix_sd_company_history_market_cap',
+        'sd_company_history',
+        [sa.text('market_cap DESC NULLS LAST'), 'ticker_symbol', 'company_id'],
+    )
+    create_index(
+        'ix_sd_company_history_sector_market_cap',
+        'sd_company_history',
+        ['sector', sa.text('market_cap DESC NULLS LAST'), 'ticker_symbol', 'company_id'],
+    )
+    op.execute(
+        "INSERT INTO sd_company_history "
+        "(company_id, ticker_symbol, company_name, exchange, sector, market_cap, cik, valid_from) "
+        "SELECT id, ticker_symbol, company_name, exchange, sector, market_cap, cik, "
+        "COALESCE(created_at::date, CURRENT_DATE) FROM sd_companies "
+        # Companies written since create_all made the table already have a version
+        "WHERE NOT EXISTS (SELECT 1 FROM sd_company_history WHERE company_id = sd_companies.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sd_company_history')
@@ -0,0 +1,30 @@
+"""financial facts period_end index
+
+Lets the cold storage tiering job find and lock one period_end month of
+dc_financial_facts without a sequential scan.
+
+Revision ID: b6e1f8a3c925
+Revises: a9d4e2f7c318
+Create Date: 2025-11-24 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.helpers import create_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f8a3c925'
+down_revision: Union[str, None] = 'a9d4e2f7c318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index('ix_dc_financial_facts_period_end', 'dc_financial_facts', ['period_end'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dc_financial_facts_period_end', table_name='dc_financial_facts')
@@ -0,0 +1,57 @@
+"""filing feed status
+
+Per-company filing status (last periodic report, next expected report)
+maintained by the EDGAR daily-index watcher, and the feed cursor that
+records which daily indexes have been processed.
+
+Revision ID: b81d3e05a7c2
+Revises: 7a2e4c91d5f3
+Create Date: 2025-11-12 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d3e05a7c2'
+down_revision: Union[str, None] = '7a2e4c91d5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'dc_company_filing_status',
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('cik', sa.String(length=10), nullable=False),
+        sa.Column('last_form', sa.String(length=20)),
+        sa.Column('last_filing_date', sa.Date()),
+        sa.Column('last_accession_number', sa.String(length=25)),
+        sa.Column('last_annual_filing_date', sa.Date()),
+        sa.Column('next_expected_form', sa.String(length=20)),
+        sa.Column('next_expected_date', sa.Date()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index(
+        'ix_dc_company_filing_status_next_expected',
+        'dc_company_filing_status',
+        ['next_expected_date'],
+    )
+
+    create_table(
+        'dc_feed_cursors',
+        sa.Column('feed', sa.String(length=50), primary_key=True),
+        sa.Column('last_processed_date', sa.Date(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dc_feed_cursors')
+    op.drop_table('dc_company_filing_status')
@@ -0,0 +1,61 @@
+"""watchlists
+
+Dense company ordinals (sd_companies.ordinal, from sd_company_ordinal_seq)
+and per-client watchlists stored as Roaring bitmaps of those ordinals.
+Existing companies are numbered in creation order, then new rows take the
+next value from the sequence by default.
+
+Revision ID: b8d2f5a9c314
+Revises: a4f7c1e3b692
+Create Date: 2025-12-02 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import add_column, create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f5a9c314'
+down_revision: Union[str, None] = 'a4f7c1e3b692'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_all also creates the sequence, since it is declared in Base.metadata
+    op.execute("CREATE SEQUENCE IF NOT EXISTS sd_company_ordinal_seq")
+    add_column('sd_companies', sa.Column('ordinal', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE sd_companies SET ordinal = numbered.ordinal "
+        "FROM (SELECT id, (SELECT coalesce(max(ordinal), 0) FROM sd_companies) "
+        "+ row_number() OVER (ORDER BY created_at, ticker_symbol) AS ordinal "
+        "FROM sd_companies WHERE ordinal IS NULL) AS numbered "
+        "WHERE sd_companies.id = numbered.id"
+    )
+    op.execute("SELECT setval('sd_company_ordinal_seq', (SELECT coalesce(max(ordinal), 0) + 1 FROM sd_companies), false)")
+    op.alter_column('sd_companies', 'ordinal', server_default=sa.text("nextval('sd_company_ordinal_seq')"))
+    create_index('ix_sd_companies_ordinal', 'sd_companies', ['ordinal'], unique=True)
+
+    create_table(
+        'sd_watchlists',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('owner', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('members', sa.LargeBinary(), nullable=False),
+        sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+        sa.UniqueConstraint('owner', 'name', name='uq_sd_watchlists_owner_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sd_watchlists')
+    op.drop_index('ix_sd_companies_ordinal', table_name='sd_companies')
+    op.drop_column('sd_companies', 'ordinal')
+    op.execute("DROP SEQUENCE IF EXISTS sd_company_ordinal_seq")
@@ -0,0 +1,56 @@
+"""financial facts
+
+XBRL fact store keyed by company / taxonomy / concept / unit / calendar
+frame, loaded from the EDGAR frames API.
+
+Revision ID: c4f9a1e6b2d8
+Revises: b81d3e05a7c2
+Create Date: 2025-11-14 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f9a1e6b2d8'
+down_revision: Union[str, None] = 'b81d3e05a7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'dc_financial_facts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cik', sa.String(length=10), nullable=False),
+        sa.Column('taxonomy', sa.String(length=20), nullable=False),
+        sa.Column('concept', sa.String(length=255), nullable=False),
+        sa.Column('unit', sa.String(length=50), nullable=False),
+        sa.Column('period', sa.String(length=12), nullable=False),
+        sa.Column('period_start', sa.Date()),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('accession_number', sa.String(length=25)),
+        sa.Column('source', sa.String(length=20), nullable=False, server_default='frames'),
+        sa.Column('collected_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            'company_id', 'taxonomy', 'concept', 'unit', 'period',
+            name='uq_dc_financial_facts_frame'
+        ),
+    )
+    create_index(
+        'ix_dc_financial_facts_concept_period',
+        'dc_financial_facts',
+        ['concept', 'unit', 'period'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dc_financial_facts')
@@ -0,0 +1,50 @@
+"""import jobs
+
+Progress of streaming screener CSV imports (POST /data/imports), updated
+by the import writer once per committed batch.
+
+Revision ID: c8a5d2e7f146
+Revises: b6e1f8a3c925
+Create Date: 2025-11-26 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a5d2e7f146'
+down_revision: Union[str, None] = 'b6e1f8a3c925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'dm_import_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('filename', sa.String(length=255)),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='receiving'),
+        sa.Column('exchange', sa.String(length=50), nullable=False),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('bytes_received', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('rows_parsed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_written', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('companies_created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('companies_updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('companies_delisted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text()),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+    )
+    create_index('ix_dm_import_jobs_started_at', 'dm_import_jobs', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('dm_import_jobs')
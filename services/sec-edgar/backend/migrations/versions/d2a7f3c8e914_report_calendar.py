@@ -0,0 +1,52 @@
+"""report calendar
+
+Expected and actual periodic report dates per company, with a partial
+index over unfiled reports for "due soon" range queries.
+
+Revision ID: d2a7f3c8e914
+Revises: c4f9a1e6b2d8
+Create Date: 2025-11-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f3c8e914'
+down_revision: Union[str, None] = 'c4f9a1e6b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'dc_report_calendar',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('form_type', sa.String(length=20), nullable=False),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('expected_filing_date', sa.Date(), nullable=False),
+        sa.Column('actual_filing_date', sa.Date()),
+        sa.Column('accession_number', sa.String(length=25)),
+        sa.Column('is_filed', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('company_id', 'form_type', 'period_end', name='uq_dc_report_calendar_period'),
+    )
+    create_index('ix_dc_report_calendar_company_id', 'dc_report_calendar', ['company_id'])
+    create_index(
+        'ix_dc_report_calendar_upcoming',
+        'dc_report_calendar',
+        ['expected_filing_date'],
+        postgresql_where=sa.text('NOT is_filed'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dc_report_calendar')
@@ -0,0 +1,42 @@
+"""company ticker covering index
+
+Covering index on sd_companies(ticker_symbol) INCLUDE (company_name, exchange)
+so sparse `fields=` listings in ticker order can use index-only scans.
+
+Revision ID: d7b3e9f1a204
+Revises: c8a5d2e7f146
+Create Date: 2025-11-28 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e9f1a204'
+down_revision: Union[str, None] = 'c8a5d2e7f146'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sd_companies_ticker_cover',
+            'sd_companies',
+            ['ticker_symbol'],
+            postgresql_include=['company_name', 'exchange'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_sd_companies_ticker_cover',
+            table_name='sd_companies',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,48 @@
+"""derived metrics
+
+Per-company quarterly TTM, YoY growth and margin metrics materialized
+from dc_financial_facts on ingest.
+
+Revision ID: e5b81c2f6a07
+Revises: d2a7f3c8e914
+Create Date: 2025-11-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b81c2f6a07'
+down_revision: Union[str, None] = 'd2a7f3c8e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_COLUMNS = [
+    'revenue', 'revenue_ttm', 'revenue_yoy',
+    'gross_profit', 'gross_margin',
+    'operating_income', 'operating_margin',
+    'net_income', 'net_income_ttm', 'net_income_yoy', 'net_margin',
+    'eps_diluted', 'eps_diluted_ttm',
+    'assets', 'stockholders_equity', 'return_on_equity_ttm',
+]
+
+
+def upgrade() -> None:
+    create_table(
+        'dc_derived_metrics',
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('period', sa.String(length=8), primary_key=True),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        *[sa.Column(name, sa.Float()) for name in METRIC_COLUMNS],
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dc_derived_metrics')
@@ -0,0 +1,43 @@
+"""company changed_at index
+
+Expression index on coalesce(updated_at, created_at) for sd_companies, so
+the screening engine's warm start and periodic catch-up read only the rows
+changed since its watermark instead of scanning the table.
+
+Revision ID: e9c4a6b2d815
+Revises: d7b3e9f1a204
+Create Date: 2025-11-30 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4a6b2d815'
+down_revision: Union[str, None] = 'd7b3e9f1a204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sd_companies_changed_at',
+            'sd_companies',
+            [sa.text('coalesce(updated_at, created_at)')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_sd_companies_changed_at',
+            table_name='sd_companies',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
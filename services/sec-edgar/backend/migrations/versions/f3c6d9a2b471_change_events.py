@@ -0,0 +1,42 @@
+"""change events
+
+Append-only log of company changes (create / update / select) backing the
+/companies/changes Server-Sent Events feed. Writers NOTIFY the latest seq
+on sd_company_changes in the same transaction.
+
+Revision ID: f3c6d9a2b471
+Revises: e5b81c2f6a07
+Create Date: 2025-11-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c6d9a2b471'
+down_revision: Union[str, None] = 'e5b81c2f6a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        'sd_change_events',
+        sa.Column('seq', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('event_type', sa.String(length=20), nullable=False),
+        sa.Column('changes', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column('source', sa.String(length=20), nullable=False, server_default='api'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index('ix_sd_change_events_created_at', 'sd_change_events', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('sd_change_events')
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Publish the shared company universe snapshot for API workers
+
+Builds the columnar screening snapshot once, keeps it current from
+sd_companies changes, and writes a new generation to UNIVERSE_SNAPSHOT_PATH
+whenever something changed. On restart it resumes from the last published
+generation and reads only the rows changed since. Workers started with the same
+UNIVERSE_SNAPSHOT_PATH map the file read-only instead of each holding
+their own copy.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import timedelta
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.infrastructure.universe_snapshot import (
+    UNIVERSE_SNAPSHOT_PATH, read_generation, write_snapshot
+)
+from app.services.stock_discovery.screening_engine import ScreeningEngine
+
+DEFAULT_SNAPSHOT_PATH = "/dev/shm/us-stock-universe.bin"
+
+
+async def publish(path: str, interval: float, once: bool):
+    """Publish a new snapshot generation whenever the universe changes"""
+    # A private (non-mapped) engine that catches up on every cycle
+    engine = ScreeningEngine(refresh_interval=timedelta(0))
+    generation = read_generation(path)
+    published_version = None
+
+    # Resume from the last published generation and catch up, instead of a full scan
+    async with AsyncSessionLocal() as session:
+        resumed = await engine.warm_start(path, CompanyRepository(session))
+    if resumed:
+        published_version = engine.universe.version
+        print(f"♻️  Resumed from generation {generation}: {engine.universe.size} companies")
+
+    while True:
+        async with AsyncSessionLocal() as session:
+            await engine.ensure_fresh(CompanyRepository(session))
+
+        if engine.universe.version != published_version:
+            started = time.perf_counter()
+            generation += 1
+            size = write_snapshot(
+                path,
+                engine.universe.to_snapshot_columns(),
+                generation,
+                engine.watermark,
+                engine.origin(),
+            )
+            published_version = engine.universe.version
+            elapsed = (time.perf_counter() - started) * 1000.0
+            print(f"📦 Published generation {generation}: {engine.universe.size} companies, "
+                  f"{size / 1024 / 1024:.1f} MiB in {elapsed:.0f} ms")
+
+        if once:
+            return
+        await asyncio.sleep(interval)
+
+
+def main():
+    """Main publisher function"""
+    parser = argparse.ArgumentParser(description='Publish the shared universe snapshot')
+    parser.add_argument('--path', default=UNIVERSE_SNAPSHOT_PATH or DEFAULT_SNAPSHOT_PATH,
+                        help='Snapshot file (use a tmpfs such as /dev/shm for pure shared memory)')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between change checks')
+    parser.add_argument('--once', action='store_true', help='Publish one generation and exit')
+    args = parser.parse_args()
+
+    print(f"🚀 Publishing universe snapshot to {args.path}")
+    try:
+        asyncio.run(publish(args.path, args.interval, args.once))
+    except KeyboardInterrupt:
+        print("\n👋 Publisher stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
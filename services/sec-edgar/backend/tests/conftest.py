@@ -0,0 +1,10 @@
+"""Shared fixtures"""
+
+import pytest
+
+from tests.fakes import RecordingSession
+
+
+@pytest.fixture
+def session():
+    return RecordingSession()
@@ -0,0 +1,93 @@
+"""Test doubles for database sessions"""
+
+from typing import Any, List, Optional
+
+from sqlalchemy.dialects import postgresql
+
+
+def compile_sql(statement) -> str:
+    """Render a statement as Postgres SQL (bind parameters stay as placeholders)"""
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class FakeResult:
+    """The slice of SQLAlchemy's Result API the repositories use"""
+
+    def __init__(self, rows: Optional[List[Any]] = None):
+        self.rows = list(rows or [])
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+    scalar_one = scalar
+    scalar_one_or_none = scalar
+
+    def scalars(self):
+        return self
+
+    def one(self):
+        return self.rows[0]
+
+    def all(self):
+        return list(self.rows)
+
+    def mappings(self):
+        return iter(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    @property
+    def rowcount(self):
+        return len(self.rows)
+
+
+class RecordingSession:
+    """Stands in for an AsyncSession: records executed statements and replays queued results"""
+
+    def __init__(self, results: Optional[List[List[Any]]] = None):
+        self.results = [FakeResult(rows) for rows in results or []]
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return self.results.pop(0) if self.results else FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def refresh(self, instance):
+        pass
+
+    @property
+    def sql(self) -> List[str]:
+        return [compile_sql(statement) for statement, _ in self.statements]
+
+
+class SessionFactory:
+    """Stands in for async_sessionmaker: hands out RecordingSessions built from `results` per session"""
+
+    def __init__(self, *session_results: List[List[Any]]):
+        self.pending = list(session_results)
+        self.sessions: List[RecordingSession] = []
+
+    def __call__(self):
+        session = RecordingSession(self.pending.pop(0) if self.pending else None)
+        self.sessions.append(session)
+        return _SessionContext(session)
+
+
+class _SessionContext:
+    def __init__(self, session: RecordingSession):
+        self.session = session
+
+    async def __aenter__(self) -> RecordingSession:
+        return self.session
+
+    async def __aexit__(self, *exc):
+        return False
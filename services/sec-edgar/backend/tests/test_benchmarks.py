@@ -0,0 +1,87 @@
+"""Tests for the benchmark harness and seed data generation"""
+
+from benchmarks.harness import (
+    ScenarioResult,
+    compare_to_baseline,
+    default_scenarios,
+    load_baseline,
+    percentile,
+    save_results,
+)
+from benchmarks.seed import generate_companies, ticker_for_index
+
+
+def make_result(name="list", **overrides) -> ScenarioResult:
+    values = dict(
+        name=name, requests=100, errors=0, duration_s=1.0, throughput_rps=100.0,
+        p50_ms=10.0, p95_ms=20.0, p99_ms=30.0, queries_per_request=2.0,
+    )
+    values.update(overrides)
+    return ScenarioResult(**values)
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_to_baseline_within_tolerance():
+    baseline = {"list": {"errors": 0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0,
+                         "throughput_rps": 100.0, "queries_per_request": 2.0}}
+    result = make_result(p99_ms=32.0, throughput_rps=95.0)
+    assert compare_to_baseline([result], baseline, tolerance=0.1) == []
+
+
+def test_compare_to_baseline_reports_regressions():
+    baseline = {"list": {"errors": 0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0,
+                         "throughput_rps": 100.0, "queries_per_request": 2.0}}
+    result = make_result(errors=1, p95_ms=40.0, throughput_rps=50.0, queries_per_request=3.0)
+    regressions = compare_to_baseline([result], baseline, tolerance=0.1)
+    assert len(regressions) == 4
+    assert any("errors" in r for r in regressions)
+    assert any("p95_ms" in r for r in regressions)
+    assert any("throughput" in r for r in regressions)
+    assert any("queries/request" in r for r in regressions)
+
+
+def test_compare_to_baseline_skips_new_scenarios():
+    assert compare_to_baseline([make_result(name="new", p99_ms=1e6)], {}, tolerance=0.1) == []
+
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    assert load_baseline(path) is None
+    save_results(path, [make_result()], {"rows": 1000})
+    assert load_baseline(path)["list"]["p95_ms"] == 20.0
+
+
+def test_default_scenarios_have_unique_names():
+    names = [scenario.name for scenario in default_scenarios()]
+    assert len(names) == len(set(names))
+
+
+def test_ticker_for_index():
+    assert [ticker_for_index(i) for i in (0, 1, 25, 26, 27, 701, 702)] == ["A", "B", "Z", "AA", "AB", "ZZ", "AAA"]
+
+
+def test_generate_companies_is_deterministic_and_unique():
+    base = [
+        {"ticker_symbol": "AAPL", "company_name": "Apple", "exchange": "NASDAQ", "sector": "Technology",
+         "market_cap": 3e12},
+        {"ticker_symbol": "XOM", "company_name": "Exxon", "exchange": "NYSE", "sector": "Energy",
+         "market_cap": 4e11},
+        {"ticker_symbol": "AAPL", "company_name": "Apple", "exchange": "NASDAQ", "sector": "Technology",
+         "market_cap": 3e12},
+    ]
+    first = list(generate_companies(base, scale=50, selected_ratio=0.5, seed=7))
+    second = list(generate_companies(base, scale=50, selected_ratio=0.5, seed=7))
+
+    assert first == second
+    assert len(first) == 50
+    assert len({c["ticker_symbol"] for c in first}) == 50
+    assert [c["ticker_symbol"] for c in first[:2]] == ["AAPL", "XOM"]
@@ -0,0 +1,133 @@
+"""Tests for the live company change feed"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.repositories.stock_discovery import (
+    CHANGE_CHANNEL, CHANGE_FEED_LOCK_KEY, ChangeEventRepository, change_payload
+)
+from app.services.stock_discovery import change_feed
+from app.services.stock_discovery.change_feed import ChangeFeedHub, Subscription, format_event, format_reset
+from tests.fakes import RecordingSession, SessionFactory
+
+
+def make_event(seq: int, event_type: str = "updated"):
+    return SimpleNamespace(
+        seq=seq, company_id=uuid.UUID(int=seq), event_type=event_type,
+        changes={"market_cap": 1.5e9}, source="api", created_at=datetime(2024, 1, 1, 12, 0, seq % 60),
+    )
+
+
+def frame_data(frame: str) -> dict:
+    return json.loads(next(line[len("data: "):] for line in frame.splitlines() if line.startswith("data: ")))
+
+
+def test_format_event():
+    frame = format_event(make_event(7, "selected"))
+    assert frame.startswith("id: 7\nevent: selected\n")
+    assert frame.endswith("\n\n")
+    assert frame_data(frame) == {
+        "seq": 7, "company_id": str(uuid.UUID(int=7)), "type": "selected", "changes": {"market_cap": 1.5e9},
+        "source": "api", "at": "2024-01-01T12:00:07",
+    }
+    assert frame_data(format_reset(9)) == {"seq": 9}
+
+
+def test_change_payload_keeps_published_fields_only():
+    assert change_payload({"cik": "0000320193", "updated_at": datetime(2024, 1, 1), "notes": "x"}) == {"cik": "0000320193"}
+    assert change_payload({"selection_date": datetime(2024, 1, 1)}) == {"selection_date": "2024-01-01T00:00:00"}
+
+
+@pytest.mark.asyncio
+async def test_record_serializes_appends_before_insert():
+    session = RecordingSession(results=[[], [5, 6], []])
+
+    seq = await ChangeEventRepository(session).record([{"company_id": uuid.uuid4(), "event_type": "updated", "changes": {}}] * 2)
+
+    assert seq == 6
+    lock, _, notify = session.statements
+    assert "pg_advisory_xact_lock" in session.sql[0]
+    assert list(lock[0].compile().params.values()) == [CHANGE_FEED_LOCK_KEY]
+    assert session.sql[1].startswith("INSERT INTO sd_change_events")
+    assert list(notify[0].compile().params.values()) == [CHANGE_CHANNEL, "6"]
+    assert await ChangeEventRepository(RecordingSession()).record([]) is None
+
+
+@pytest.mark.asyncio
+async def test_subscription_overflow(monkeypatch):
+    monkeypatch.setattr(change_feed, "SUBSCRIBER_QUEUE_SIZE", 2)
+    subscription = Subscription()
+    subscription.push([(1, "a"), (2, "b")])
+    assert not subscription.overflowed
+    subscription.push([(3, "c")])
+    assert subscription.overflowed
+
+
+def started_hub(*session_results) -> ChangeFeedHub:
+    hub = ChangeFeedHub(session_factory=SessionFactory(*session_results))
+    # Pretend the LISTEN task is running; tests drive dispatch() directly
+    hub._task = asyncio.get_running_loop().create_future()
+    return hub
+
+
+@pytest.mark.asyncio
+async def test_dispatch_fans_out_and_advances():
+    hub = started_hub([[make_event(1), make_event(2)]])
+    seen = []
+    hub.listeners.append(lambda events: seen.extend(event.seq for event in events))
+    subscription, cursor = await hub.subscribe()
+
+    await hub.dispatch()
+
+    assert cursor == 0 and hub.last_seq == 2 and seen == [1, 2]
+    assert [subscription.queue.get_nowait()[0] for _ in range(2)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_then_skips_duplicate_live_events(monkeypatch):
+    monkeypatch.setattr(change_feed, "HEARTBEAT_SECONDS", 0.01)
+    # Replay session: oldest retained seq, then the events after `since`
+    hub = started_hub([[1], [make_event(4), make_event(5)]])
+    hub.last_seq = 5
+
+    stream = hub.stream(since=3)
+    frames = [await stream.__anext__() for _ in range(3)]
+    assert frames[0].startswith("retry:")
+    assert [frame_data(frame)["seq"] for frame in frames[1:]] == [4, 5]
+
+    subscription = next(iter(hub.subscribers))
+    subscription.push([(5, format_event(make_event(5))), (6, format_event(make_event(6)))])
+    assert frame_data(await stream.__anext__())["seq"] == 6
+    assert await stream.__anext__() == ": keepalive\n\n"
+    await stream.aclose()
+    assert hub.client_count == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_when_resume_point_was_pruned():
+    hub = started_hub([[50], [make_event(50)]])
+    hub.last_seq = 60
+
+    stream = hub.stream(since=10)
+    await stream.__anext__()
+    assert (await stream.__anext__()).startswith("id: 60\nevent: reset\n")
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_drops_overflowed_clients():
+    hub = started_hub()
+    stream = hub.stream()
+    await stream.__anext__()
+
+    subscription = next(iter(hub.subscribers))
+    subscription.push([(1, "frame")])
+    subscription.overflowed = True
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert hub.client_count == 0
@@ -0,0 +1,137 @@
+"""Tests for tiered cold storage of financial facts"""
+
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.cold_storage import FINANCIAL_FACTS, ColdStore, month_key, month_range
+from app.services.data_management.cold_storage import ColdStorageService, facts_to_table, tier_cutoff
+from tests.fakes import RecordingSession
+
+COMPANIES = sorted(str(uuid.UUID(int=i)) for i in range(1, 9))
+
+
+def make_fact(company_id: str, period_end: date, value: float = 1.0, concept: str = "Revenues"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), company_id=uuid.UUID(company_id), cik="0000000001", taxonomy="us-gaap", concept=concept,
+        unit="USD", period=f"CY{period_end.year}Q{(period_end.month - 1) // 3 + 1}", period_start=None,
+        period_end=period_end, value=value, accession_number=None, source="frames",
+        collected_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def month_facts(month_end: date, value: float = 1.0) -> list:
+    return [make_fact(company_id, month_end, value) for company_id in COMPANIES]
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Two companies per row group, so pruning is observable
+    return ColdStore(FINANCIAL_FACTS, root=str(tmp_path), row_group_size=2)
+
+
+def test_month_helpers():
+    assert month_key(date(2021, 3, 31)) == "2021-03"
+    assert month_range("2021-12") == (date(2021, 12, 1), date(2022, 1, 1))
+    assert tier_cutoff(30, today=date(2024, 3, 15)) == date(2024, 2, 1)
+
+
+def test_write_and_read_round_trip(store):
+    entry = store.write_month("2021-03", facts_to_table(month_facts(date(2021, 3, 31))))
+
+    assert entry["rows"] == 8 and len(entry["row_groups"]) == 4
+    table = store.read()
+    assert sorted(table["company_id"].to_pylist()) == COMPANIES
+    assert store.summary()["months"] == ["2021-03"]
+
+
+def test_rewriting_a_month_merges_with_new_rows_winning(store):
+    store.write_month("2021-03", facts_to_table(month_facts(date(2021, 3, 31), value=1.0)))
+    updated = [make_fact(COMPANIES[0], date(2021, 3, 31), value=2.0), make_fact(COMPANIES[0], date(2021, 3, 31), concept="Assets")]
+    entry = store.write_month("2021-03", facts_to_table(updated))
+
+    assert entry["rows"] == 9
+    rows = store.read([COMPANIES[0]]).to_pylist()
+    assert sorted((row["concept"], row["value"]) for row in rows) == [("Assets", 1.0), ("Revenues", 2.0)]
+
+
+def test_plan_prunes_row_groups_and_months(store):
+    store.write_month("2021-03", facts_to_table(month_facts(date(2021, 3, 31))))
+    store.write_month("2021-06", facts_to_table(month_facts(date(2021, 6, 30))))
+
+    assert store.plan([COMPANIES[0]]) == {"2021-03": [0], "2021-06": [0]}
+    assert store.plan([COMPANIES[5]], start=date(2021, 4, 1)) == {"2021-06": [2]}
+    assert store.plan(["not-a-company"]) == {}
+    table = store.read([COMPANIES[5]], start=date(2021, 4, 1), filters={"concept": ["Revenues"]}, columns=["value"])
+    assert table.column_names == ["value"] and table.num_rows == 1
+    assert store.read([COMPANIES[5]], end=date(2020, 1, 1)).num_rows == 0
+
+
+class FakeFactRepository:
+    def __init__(self, months, facts, hot=()):
+        self.months = months
+        self.facts = facts
+        self.hot = list(hot)
+        self.deleted = []
+
+    async def get_months_before(self, cutoff):
+        return self.months
+
+    async def lock_period_range(self, start, end):
+        return [fact for fact in self.facts if start <= fact.period_end < end]
+
+    async def delete_facts(self, fact_ids):
+        self.deleted.extend(fact_ids)
+        return len(fact_ids)
+
+    async def get_company_range(self, company_id, start, end, concepts):
+        return self.hot
+
+
+@pytest.mark.asyncio
+async def test_tier_facts_deletes_only_after_the_file_is_written(store):
+    facts = month_facts(date(2021, 3, 31))
+    session = RecordingSession()
+    service = ColdStorageService(session, store=store)
+    service.fact_repo = FakeFactRepository([(date(2021, 3, 1), 8)], facts)
+
+    assert (await service.tier_facts(dry_run=True))[0].rows == 8
+    assert store.months() == [] and service.fact_repo.deleted == []
+
+    results = await service.tier_facts()
+    assert (results[0].month, results[0].rows, results[0].archived_rows) == ("2021-03", 8, 8)
+    assert service.fact_repo.deleted == [fact.id for fact in facts]
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_tier_facts_rolls_back_when_the_write_fails(store):
+    session = RecordingSession()
+    service = ColdStorageService(session, store=store)
+    service.fact_repo = FakeFactRepository([(date(2021, 3, 1), 8)], month_facts(date(2021, 3, 31)))
+
+    def fail(month, rows):
+        raise OSError("disk full")
+    store.write_month = fail
+
+    with pytest.raises(OSError):
+        await service.tier_facts()
+    assert service.fact_repo.deleted == [] and session.rollbacks == 1 and session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_get_facts_prefers_hot_rows(store):
+    company_id = COMPANIES[0]
+    store.write_month("2021-03", facts_to_table([make_fact(company_id, date(2021, 3, 31), value=1.0)]))
+    store.write_month("2020-12", facts_to_table([make_fact(company_id, date(2020, 12, 31), value=3.0)]))
+    service = ColdStorageService(RecordingSession(), store=store)
+    service.fact_repo = FakeFactRepository([], [], hot=[make_fact(company_id, date(2021, 3, 31), value=2.0)])
+
+    response = await service.get_facts(uuid.UUID(company_id))
+
+    assert [(fact.period, fact.value, fact.tier) for fact in response.facts] == [
+        ("CY2020Q4", 3.0, "cold"), ("CY2021Q1", 2.0, "hot"),
+    ]
+    assert (response.hot_rows, response.cold_rows, response.cold_row_groups) == (1, 2, 2)
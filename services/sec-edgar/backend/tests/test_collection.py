@@ -0,0 +1,126 @@
+"""Tests for lease-based collection: filing parsing, CIK resolution, job claims and the EDGAR client"""
+
+import uuid
+from datetime import date
+
+import httpx
+import pytest
+
+from app.infrastructure.external import edgar as edgar_module
+from app.infrastructure.external.edgar import EdgarClient, filing_document_url, format_cik
+from app.infrastructure.repositories.data_collection import CollectionJobRepository
+from app.services.data_collection.collection_service import parse_recent_filings, resolve_ciks
+from app.shared.exceptions import ExternalAPIError
+from tests.fakes import RecordingSession, compile_sql
+
+
+def test_parse_recent_filings_handles_ragged_columns():
+    company_id = uuid.uuid4()
+    submissions = {"filings": {"recent": {
+        "accessionNumber": ["0000320193-24-000001", "0000320193-24-000002", "0000320193-24-000003", "orphan"],
+        "form": ["10-K", "8-K", "10-Q/A" + "X" * 30],
+        "filingDate": ["2024-02-01", "", "2024-05-03"],
+        "reportDate": ["2023-12-31", "2024-01-15"],
+        "primaryDocument": ["aapl-10k.htm"],
+    }}}
+
+    filings = parse_recent_filings(company_id, submissions)
+
+    assert [f["accession_number"] for f in filings] == ["0000320193-24-000001", "0000320193-24-000003"]
+    assert filings[0] == {
+        "company_id": company_id,
+        "accession_number": "0000320193-24-000001",
+        "filing_type": "10-K",
+        "filing_date": date(2024, 2, 1),
+        "report_date": date(2023, 12, 31),
+        "primary_document": "aapl-10k.htm",
+    }
+    assert len(filings[1]["filing_type"]) == 20
+    assert filings[1]["report_date"] is None and filings[1]["primary_document"] is None
+    assert parse_recent_filings(company_id, {}) == []
+
+
+class FakeEdgar:
+    async def get_ticker_ciks(self):
+        return {"AAPL": "0000320193", "MSFT": "0000789019"}
+
+
+class FakeCompanyRepository:
+    def __init__(self):
+        self.stored = None
+
+    async def set_ciks(self, ciks):
+        self.stored = ciks
+
+
+@pytest.mark.asyncio
+async def test_resolve_ciks_stores_known_tickers_only():
+    apple, unknown = uuid.uuid4(), uuid.uuid4()
+    repo = FakeCompanyRepository()
+
+    resolved = await resolve_ciks(repo, FakeEdgar(), [(apple, "AAPL"), (unknown, "ZZZZ")])
+
+    assert resolved == {apple: "0000320193"}
+    assert repo.stored == resolved
+    assert await resolve_ciks(repo, FakeEdgar(), []) == {}
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_locked_jobs_and_steals_expired_leases():
+    session = RecordingSession()
+    await CollectionJobRepository(session).claim("worker-1", 10, 60)
+
+    sql = session.sql[0]
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "dc_collection_jobs.lease_expires_at < now()" in sql
+    assert "ORDER BY dc_collection_jobs.priority DESC, dc_collection_jobs.scheduled_at" in sql
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_complete_requires_the_lease():
+    session = RecordingSession(results=[[]])
+    assert await CollectionJobRepository(session).complete(uuid.uuid4(), "worker-1") is False
+    assert "dc_collection_jobs.lease_owner = %(lease_owner_1)s" in session.sql[0]
+
+
+def test_edgar_urls():
+    assert format_cik(320193) == "0000320193"
+    assert filing_document_url("0000320193", "0000320193-24-000001", "a.htm", "https://example/Archives/edgar/") == \
+        "https://example/Archives/edgar/data/320193/000032019324000001/a.htm"
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    async def sleep(_):
+        pass
+    monkeypatch.setattr(edgar_module.asyncio, "sleep", sleep)
+
+
+def edgar_with(handler) -> EdgarClient:
+    client = EdgarClient(max_rps=1000, max_retries=2)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_edgar_retries_throttling_then_succeeds(no_backoff):
+    statuses = iter([429, 503, 200])
+
+    async with edgar_with(lambda request: httpx.Response(next(statuses), json={"ok": True})) as client:
+        assert await client.get_json("https://data.sec.gov/x.json") == {"ok": True}
+        assert client.requests_made == 3
+
+
+@pytest.mark.asyncio
+async def test_edgar_gives_up_after_max_retries(no_backoff):
+    async with edgar_with(lambda request: httpx.Response(503)) as client:
+        with pytest.raises(ExternalAPIError):
+            await client.get_json("https://data.sec.gov/x.json")
+        assert client.requests_made == 3
+
+
+@pytest.mark.asyncio
+async def test_edgar_missing_documents_are_none():
+    async with edgar_with(lambda request: httpx.Response(404)) as client:
+        assert await client.get_submissions("320193") is None
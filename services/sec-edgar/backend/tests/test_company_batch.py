@@ -0,0 +1,65 @@
+"""Tests for batch company lookup by ID or ticker"""
+
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.api.router_modules.stock_discovery import stream_batch_response
+from app.services.stock_discovery.company_service import CompanyService
+from app.shared.models.stock_discovery import MAX_BATCH_SIZE, CompanyBatchRequest, CompanyBatchResponse
+from tests.fakes import RecordingSession
+
+
+def make_company(ticker: str):
+    return SimpleNamespace(
+        id=uuid.uuid4(), ticker_symbol=ticker, company_name=f"{ticker} Inc.", exchange="NASDAQ",
+        sector=None, market_cap=None, cik=None, is_selected=False, selection_date=None,
+        created_at=datetime(2024, 1, 1), updated_at=None,
+    )
+
+
+@pytest.mark.parametrize("body", [{}, {"ids": [], "tickers": []}, {"tickers": ["A"] * (MAX_BATCH_SIZE + 1)}])
+def test_batch_request_validation(body):
+    with pytest.raises(ValidationError):
+        CompanyBatchRequest(**body)
+
+
+@pytest.mark.asyncio
+async def test_batch_by_ticker_keeps_input_order_and_misses():
+    apple, msft = make_company("AAPL"), make_company("MSFT")
+    session = RecordingSession(results=[[msft, apple]])
+
+    items = await CompanyService(session).get_companies_batch(CompanyBatchRequest(tickers=["msft", "NOPE", "AAPL", "MSFT"]))
+
+    assert [(item.key, item.found) for item in items] == [("msft", True), ("NOPE", False), ("AAPL", True), ("MSFT", True)]
+    assert items[0].company.id == msft.id
+    # One query, with the de-duplicated upper-cased tickers bound as a single array
+    (statement, _), = session.statements
+    assert sorted(statement.compile().params["tickers"]) == ["AAPL", "MSFT", "NOPE"]
+
+
+@pytest.mark.asyncio
+async def test_batch_by_id_reports_unknown_ids():
+    company = make_company("AAPL")
+    unknown = uuid.uuid4()
+    session = RecordingSession(results=[[company]])
+
+    items = await CompanyService(session).get_companies_batch(CompanyBatchRequest(ids=[unknown, company.id]))
+
+    assert [(item.key, item.found) for item in items] == [(str(unknown), False), (str(company.id), True)]
+
+
+@pytest.mark.asyncio
+async def test_streamed_batch_matches_response_model():
+    companies = [make_company(f"T{chr(65 + i % 26)}{chr(65 + i // 26)}") for i in range(450)]
+    session = RecordingSession(results=[companies])
+    tickers = [c.ticker_symbol for c in companies] + ["MISSING"] * 60
+    items = await CompanyService(session).get_companies_batch(CompanyBatchRequest(tickers=tickers))
+
+    streamed = json.loads(b"".join(stream_batch_response(items)))
+    encoded = json.loads(CompanyBatchResponse(results=items, found=450, missing=60).model_dump_json())
+    assert streamed == encoded
@@ -0,0 +1,78 @@
+"""Tests for point-in-time (as-of) universe queries"""
+
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.repositories.stock_discovery import CompanyRepository, company_history_statements
+from app.services.stock_discovery.company_service import CompanyService
+from app.shared.models.stock_discovery import CompanySearchParams, CompanySort
+from tests.fakes import RecordingSession, compile_sql
+
+
+def test_history_statements_close_and_open_versions():
+    correct, close_changed, close_delisted, open_versions = (
+        compile_sql(statement) for statement in company_history_statements(date(2024, 6, 1), [uuid.uuid4()], [uuid.uuid4()])
+    )
+
+    # Same-day changes are corrected in place, older versions are closed at the as-of date
+    assert "sd_company_history.valid_from = %(valid_from_1)s" in correct
+    assert "sd_company_history.valid_from < %(valid_from_1)s" in close_changed
+    for sql in (correct, close_changed):
+        assert "sd_company_history.ticker_symbol IS DISTINCT FROM sd_companies.ticker_symbol" in sql
+        assert "sd_company_history.valid_to IS NULL" in sql
+    assert "sd_company_history.company_id = ANY (%(delisted_ids)s" in close_delisted
+    assert open_versions.startswith("INSERT INTO sd_company_history")
+    assert "NOT (EXISTS (SELECT sd_company_history.id" in open_versions
+
+
+@pytest.mark.asyncio
+async def test_get_all_as_of_reads_versions_valid_on_the_date():
+    session = RecordingSession(results=[[0], []])
+    await CompanyRepository(session).get_all_as_of(date(2023, 3, 31), sector="Energy", sort=CompanySort.MARKET_CAP_DESC)
+
+    count_sql, data_sql = session.sql
+    for sql in (count_sql, data_sql):
+        assert "daterange(sd_company_history.valid_from, sd_company_history.valid_to, '[)') @> CAST(%(as_of)s AS DATE)" in sql
+        assert "WHERE sd_company_history.sector = %(sector_" in sql
+        assert "JOIN sd_companies ON sd_companies.id = sd_company_history.company_id" in sql
+    assert ("ORDER BY sd_company_history.market_cap DESC NULLS LAST, sd_company_history.ticker_symbol ASC, "
+            "sd_company_history.company_id ASC") in data_sql
+
+
+@pytest.mark.asyncio
+async def test_as_of_listing_uses_historical_attributes_and_current_selection():
+    company_id = uuid.uuid4()
+    version = SimpleNamespace(
+        ticker_symbol="FB", company_name="Facebook, Inc.", exchange="NASDAQ", sector="Technology",
+        market_cap=5e11, cik="0001326801",
+    )
+    company = SimpleNamespace(
+        id=company_id, is_selected=True, selection_date=datetime(2024, 1, 1),
+        created_at=datetime(2020, 1, 1), updated_at=None,
+    )
+    session = RecordingSession(results=[[1], [(version, company)]])
+
+    response = await CompanyService(session).get_companies(CompanySearchParams(as_of=date(2021, 6, 30)))
+
+    assert response.as_of == date(2021, 6, 30) and response.total == 1
+    listed = response.companies[0]
+    assert (listed.id, listed.ticker_symbol, listed.company_name, listed.is_selected) == \
+        (company_id, "FB", "Facebook, Inc.", True)
+
+
+@pytest.mark.asyncio
+async def test_update_versions_history_only_for_versioned_fields():
+    company = SimpleNamespace(ticker_symbol="AAPL")
+    # UPDATE ... RETURNING, then the change event: append lock, INSERT ... RETURNING seq, NOTIFY
+    versioned = RecordingSession(results=[[company], [], [1], []])
+    await CompanyRepository(versioned).update(uuid.uuid4(), {"market_cap": 3e12})
+
+    unversioned = RecordingSession(results=[[company], [], [2], []])
+    await CompanyRepository(unversioned).update(uuid.uuid4(), {"is_selected": True})
+
+    assert sum("sd_company_history" in sql for sql in versioned.sql) == 4
+    assert not any("sd_company_history" in sql for sql in unversioned.sql)
+    assert versioned.commits == unversioned.commits == 1
@@ -0,0 +1,45 @@
+"""Tests for market-cap range filters and sort orders on the company listing"""
+
+import pytest
+
+from app.infrastructure.repositories.stock_discovery import COMPANY_SORT_ORDERS, HISTORY_SORT_ORDERS, CompanyRepository
+from app.services.stock_discovery.company_service import CompanyService
+from app.shared.exceptions import ValidationError
+from app.shared.models.stock_discovery import CompanySearchParams, CompanySort
+from tests.fakes import RecordingSession, compile_sql
+
+
+@pytest.mark.parametrize("orders", [COMPANY_SORT_ORDERS, HISTORY_SORT_ORDERS])
+def test_every_sort_order_is_total(orders):
+    assert set(orders) == set(CompanySort)
+    for sort, columns in orders.items():
+        # The unique ticker (plus company_id across history) always breaks ties
+        assert "ticker_symbol" in compile_sql(columns[-1]) or "company_id" in compile_sql(columns[-1]), sort
+
+
+@pytest.mark.asyncio
+async def test_get_all_filters_and_sorts_by_market_cap():
+    session = RecordingSession(results=[[2], []])
+    await CompanyRepository(session).get_all(
+        sector="Technology", min_market_cap=1e9, max_market_cap=5e9, sort=CompanySort.MARKET_CAP_DESC
+    )
+
+    count_sql, data_sql = session.sql
+    for sql in (count_sql, data_sql):
+        assert "sd_companies.market_cap >= %(market_cap_1)s" in sql
+        assert "sd_companies.market_cap <= %(market_cap_2)s" in sql
+    assert "ORDER BY sd_companies.market_cap DESC NULLS LAST, sd_companies.ticker_symbol ASC" in data_sql
+
+
+@pytest.mark.asyncio
+async def test_get_all_defaults_to_ticker_order():
+    session = RecordingSession(results=[[0], []])
+    await CompanyRepository(session).get_all()
+    assert "ORDER BY sd_companies.ticker_symbol ASC \n LIMIT" in session.sql[1]
+
+
+@pytest.mark.asyncio
+async def test_inverted_market_cap_range_is_rejected(session):
+    with pytest.raises(ValidationError):
+        await CompanyService(session).get_companies(CompanySearchParams(min_market_cap=2e9, max_market_cap=1e9))
+    assert session.statements == []
@@ -0,0 +1,136 @@
+"""Tests for derived financial metrics (TTM, growth, margins)"""
+
+import uuid
+from datetime import date
+
+import pytest
+
+from app.services.data_collection.derived_metrics import (
+    DERIVATION_HORIZON, DerivedMetricsService, affected_quarters, derive_company_metrics,
+    parse_period, quarter_end, quarter_name
+)
+from tests.fakes import RecordingSession
+
+
+def quarterly(concept: str, values: dict, unit: str = "USD") -> list:
+    return [(concept, unit, period, value) for period, value in values.items()]
+
+
+def by_period(rows: list) -> dict:
+    return {row["period"]: row for row in rows}
+
+
+def test_parse_period():
+    assert parse_period("CY2024") == ("annual", 2024)
+    assert parse_period("CY2024Q1") == ("quarter", 2024 * 4)
+    assert parse_period("CY2024Q4I") == ("instant", 2024 * 4 + 3)
+    assert parse_period("CY2024Q5") is None
+    assert parse_period("FY2024") is None
+
+
+def test_quarter_names_and_ends():
+    index = 2024 * 4 + 1
+    assert quarter_name(index) == "CY2024Q2"
+    assert quarter_end(index) == date(2024, 6, 30)
+    assert quarter_end(2024 * 4) == date(2024, 3, 31)
+
+
+def test_affected_quarters():
+    q1 = 2024 * 4
+    assert affected_quarters("CY2024Q1") == set(range(q1, q1 + DERIVATION_HORIZON + 1))
+    assert min(affected_quarters("CY2024")) == q1 + 3
+    assert affected_quarters("bogus") == set()
+
+
+def test_missing_fourth_quarter_is_annual_minus_first_three():
+    facts = quarterly("Revenues", {"CY2023Q1": 10.0, "CY2023Q2": 20.0, "CY2023Q3": 30.0, "CY2023": 100.0})
+    rows = by_period(derive_company_metrics(uuid.uuid4(), facts))
+
+    assert rows["CY2023Q4"]["revenue"] == 40.0
+    assert rows["CY2023Q4"]["revenue_ttm"] == 100.0
+    assert rows["CY2023Q3"]["revenue_ttm"] is None
+
+
+def test_ttm_growth_and_margins():
+    revenue = {f"CY{year}Q{q}": 100.0 * (year - 2022) + q for year in (2023, 2024) for q in range(1, 5)}
+    net_income = {period: value / 10 for period, value in revenue.items()}
+    facts = (
+        quarterly("Revenues", revenue)
+        + quarterly("NetIncomeLoss", net_income)
+        + quarterly("GrossProfit", {"CY2024Q4": 202.0})
+        + [("StockholdersEquity", "USD", "CY2024Q4I", 500.0)]
+    )
+    rows = by_period(derive_company_metrics(uuid.uuid4(), facts))
+
+    latest = rows["CY2024Q4"]
+    assert latest["revenue_ttm"] == pytest.approx(201 + 202 + 203 + 204)
+    assert latest["revenue_yoy"] == pytest.approx(204 / 104 - 1)
+    assert latest["gross_margin"] == pytest.approx(202 / 204)
+    assert latest["net_margin"] == pytest.approx(0.1)
+    assert latest["return_on_equity_ttm"] == pytest.approx(81.0 / 500)
+    assert rows["CY2023Q4"]["revenue_yoy"] is None
+
+
+def test_preferred_concept_wins_and_quarters_filter():
+    facts = quarterly("RevenueFromContractWithCustomerExcludingAssessedTax", {"CY2024Q1": 1.0, "CY2024Q2": 2.0}) \
+        + quarterly("Revenues", {"CY2024Q1": 5.0})
+    rows = derive_company_metrics(uuid.uuid4(), facts, quarters={2024 * 4})
+
+    assert [(row["period"], row["revenue"]) for row in rows] == [("CY2024Q1", 5.0)]
+
+
+def test_facts_in_other_units_are_ignored():
+    assert derive_company_metrics(uuid.uuid4(), quarterly("Revenues", {"CY2024Q1": 5.0}, unit="EUR")) == []
+
+
+class FakeColdTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def to_pylist(self):
+        return self.rows
+
+
+class FakeColdStore:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def read(self, partitions, filters=None, columns=None):
+        return FakeColdTable([row for row in self.rows if row["company_id"] in partitions])
+
+
+class FakeFactRepository:
+    def __init__(self, facts):
+        self.facts = facts
+
+    async def get_company_facts(self, company_ids, concepts):
+        return [fact for fact in self.facts if fact[0] in company_ids]
+
+
+class FakeMetricsRepository:
+    def __init__(self):
+        self.rows = []
+
+    async def upsert_metrics(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+
+@pytest.mark.asyncio
+async def test_recompute_merges_cold_history_with_hot_facts_first():
+    company_id = uuid.uuid4()
+    hot = [(company_id, "Revenues", "USD", f"CY2024Q{q}", 10.0) for q in (1, 2, 3, 4)]
+    cold = [
+        {"company_id": str(company_id), "concept": "Revenues", "unit": "USD", "period": period, "value": value}
+        for period, value in (("CY2023Q4", 8.0), ("CY2024Q4", 999.0))
+    ]
+    service = DerivedMetricsService(RecordingSession(), cold_store=FakeColdStore(cold))
+    service.fact_repo = FakeFactRepository(hot)
+    service.metrics_repo = FakeMetricsRepository()
+
+    written = await service.recompute([(company_id, "CY2024Q4")])
+
+    rows = by_period(service.metrics_repo.rows)
+    assert written == len(rows) == 1
+    assert rows["CY2024Q4"]["revenue"] == 10.0
+    assert rows["CY2024Q4"]["revenue_yoy"] == pytest.approx(10.0 / 8.0 - 1)
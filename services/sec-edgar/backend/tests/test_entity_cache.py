@@ -0,0 +1,259 @@
+"""Tests for the read-through company entity cache"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.domain.stock_discovery.models import Company
+from app.infrastructure.entity_cache import EntityCache
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from tests.fakes import RecordingSession
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeHub:
+    def __init__(self):
+        self.listening = True
+        self.listeners = []
+
+
+class FakeSession:
+    """merge/is_modified, the slice of AsyncSession the cache uses"""
+
+    def __init__(self, modified=()):
+        self.modified = set(modified)
+        self.merged = []
+
+    def is_modified(self, company):
+        return company.id in self.modified
+
+    async def merge(self, company, load=True):
+        assert load is False
+        self.merged.append(company)
+        return company
+
+
+class Loader:
+    """A repository query stand-in that counts calls and can be held open"""
+
+    def __init__(self, company=None, error=None):
+        self.company = company
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.company
+
+
+def make_company(ticker: str = "AAPL", **kw) -> Company:
+    return Company(id=uuid.uuid4(), ticker_symbol=ticker, company_name=f"{ticker} Inc.", exchange="NASDAQ", **kw)
+
+
+def make_cache(max_entries: int = 100) -> EntityCache:
+    cache = EntityCache(max_entries=max_entries, ttl=60, negative_ttl=10, enabled=True, clock=FakeClock())
+    cache.attach(FakeHub())
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_bypassed_until_the_change_feed_listens():
+    cache = make_cache()
+    cache.hub.listening = False
+    load = Loader(make_company())
+
+    for _ in range(2):
+        assert await cache.get_by_id(FakeSession(), load.company.id, load) is load.company
+    assert load.calls == 2 and cache.bypassed == 2 and cache.entries == {}
+
+
+@pytest.mark.asyncio
+async def test_hits_are_merged_without_a_query():
+    cache = make_cache()
+    company = make_company()
+    load = Loader(company)
+    session = FakeSession()
+
+    assert await cache.get_by_id(session, company.id, load) is company
+    by_id = await cache.get_by_id(session, company.id, load)
+    # The ID lookup also cached the ticker
+    by_ticker = await cache.get_by_ticker(session, "aapl", Loader())
+
+    assert load.calls == 1
+    assert session.merged == [by_id, by_ticker]
+    assert by_id is not company and by_id.id == company.id and by_id.company_name == "AAPL Inc."
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    cache = make_cache()
+    company = make_company()
+    load = Loader(company)
+
+    await cache.get_by_id(FakeSession(), company.id, load)
+    cache.clock.now += 59.9
+    await cache.get_by_id(FakeSession(), company.id, load)
+    assert load.calls == 1
+
+    cache.clock.now += 0.1
+    await cache.get_by_id(FakeSession(), company.id, load)
+    assert load.calls == 2 and cache.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_misses_are_cached_for_the_negative_ttl():
+    cache = make_cache()
+    load = Loader(None)
+
+    assert await cache.get_by_ticker(FakeSession(), "NEW", load) is None
+    cache.clock.now += 9
+    assert await cache.get_by_ticker(FakeSession(), "new", load) is None
+    assert load.calls == 1 and cache.negative_hits == 1
+
+    cache.clock.now += 1
+    await cache.get_by_ticker(FakeSession(), "NEW", load)
+    assert load.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_creating_a_ticker_drops_its_cached_miss():
+    cache = make_cache()
+    await cache.get_by_ticker(FakeSession(), "NEW", Loader(None))
+
+    company = make_company("NEW")
+    cache.invalidate(company.id, [company.ticker_symbol])
+
+    assert await cache.get_by_ticker(FakeSession(), "NEW", Loader(company)) is company
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = make_cache()
+    company = make_company()
+    load = Loader(company)
+    load.release.clear()
+    sessions = [FakeSession() for _ in range(3)]
+
+    lookups = [asyncio.create_task(cache.get_by_id(session, company.id, load)) for session in sessions]
+    await asyncio.sleep(0)
+    load.release.set()
+    results = await asyncio.gather(*lookups)
+
+    assert load.calls == 1 and cache.coalesced == 2
+    assert results[0] is company
+    # Waiters get their own merged instance, not the leader's
+    assert [session.merged for session in sessions[1:]] == [[results[1]], [results[2]]]
+    assert all(result.id == company.id for result in results)
+
+
+@pytest.mark.asyncio
+async def test_waiters_query_themselves_when_the_shared_load_fails():
+    cache = make_cache()
+    company = make_company()
+    failing = Loader(error=ConnectionError("lost"))
+    failing.release.clear()
+    fallback = Loader(company)
+
+    leader = asyncio.create_task(cache.get_by_id(FakeSession(), company.id, failing))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_by_id(FakeSession(), company.id, fallback))
+    await asyncio.sleep(0)
+    failing.release.set()
+
+    with pytest.raises(ConnectionError):
+        await leader
+    assert await waiter is company
+    assert fallback.calls == 1 and cache._loading == {}
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_stored():
+    cache = make_cache()
+    stale = make_company()
+    load = Loader(stale)
+    load.release.clear()
+
+    lookup = asyncio.create_task(cache.get_by_id(FakeSession(), stale.id, load))
+    await asyncio.sleep(0)
+    # A write commits (and invalidates) after the SELECT read the old row
+    cache.invalidate(stale.id, [stale.ticker_symbol])
+    load.release.set()
+
+    assert await lookup is stale
+    assert cache.entries == {}
+    fresh = Loader(stale)
+    await cache.get_by_id(FakeSession(), stale.id, fresh)
+    assert fresh.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_changes_are_never_cached():
+    cache = make_cache()
+    company = make_company()
+
+    await cache.get_by_id(FakeSession(modified=[company.id]), company.id, Loader(company))
+
+    assert cache.entries == {}
+
+
+@pytest.mark.asyncio
+async def test_renamed_company_is_not_found_under_its_old_ticker():
+    cache = make_cache()
+    company = make_company("FB")
+    await cache.get_by_ticker(FakeSession(), "FB", Loader(company))
+
+    renamed = make_company("META")
+    renamed.id = company.id
+    # The change event of another process names the company and its new ticker
+    cache.on_events([SimpleNamespace(company_id=company.id, changes={"ticker_symbol": "META"})])
+    await cache.get_by_id(FakeSession(), company.id, Loader(renamed))
+
+    load = Loader(None)
+    assert await cache.get_by_ticker(FakeSession(), "FB", load) is None
+    assert load.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_keys_are_evicted():
+    cache = make_cache(max_entries=4)
+    companies = [make_company(f"T{index}") for index in range(3)]
+    for company in companies:
+        await cache.get_by_id(FakeSession(), company.id, Loader(company))
+
+    assert len(cache.entries) == 4 and cache.evictions == 2
+    assert ("id", companies[0].id) not in cache.entries
+
+
+@pytest.mark.asyncio
+async def test_set_ciks_records_change_events_before_invalidating(monkeypatch):
+    cache = make_cache()
+    monkeypatch.setattr("app.infrastructure.repositories.stock_discovery.entity_cache", cache)
+    company = make_company()
+    await cache.get_by_id(FakeSession(), company.id, Loader(company))
+    session = RecordingSession(results=[[], [], [8], []])
+
+    await CompanyRepository(session).set_ciks({company.id: "0000320193"})
+
+    update_sql, _, insert_sql, _ = session.sql
+    assert update_sql.startswith("UPDATE sd_companies SET")
+    assert insert_sql.startswith("INSERT INTO sd_change_events")
+    params = session.statements[2][0].compile().params
+    assert (params["company_id_m0"], params["event_type_m0"]) == (company.id, "updated")
+    assert params["changes_m0"] == {"cik": "0000320193"}
+    assert session.commits == 1
+    assert ("id", company.id) not in cache.entries
@@ -0,0 +1,149 @@
+"""Tests for event-driven collection from the EDGAR daily form index"""
+
+import os
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.data_collection.filing_feed import (
+    FEED_JOB_PRIORITY, FilingFeedService, expected_next_filing, parse_form_index
+)
+from tests.fakes import RecordingSession
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures", "form.20251031.idx")
+
+
+def fixture_lines():
+    with open(FIXTURE, encoding="utf-8") as file:
+        return file.read().splitlines()
+
+
+def test_parse_form_index():
+    entries = list(parse_form_index(fixture_lines()))
+
+    assert len(entries) == 8
+    apple = entries[0]
+    assert (apple.form_type, apple.company_name, apple.cik, apple.date_filed) == \
+        ("10-K", "Apple Inc.", 320193, date(2025, 10, 31))
+    assert apple.accession_number == "0000320193-25-000079"
+    assert entries[3].form_type == "10-Q/A"
+    assert entries[7].form_type == "SC 13G"
+
+
+def test_parse_form_index_takes_cik_from_path_when_name_overflows():
+    overflow = next(e for e in parse_form_index(fixture_lines()) if e.form_type == "S-1")
+    assert overflow.cik == 2001234
+    assert overflow.company_name == "ACME EXTRAORDINARILY LONG NAME FOR A HOLDING COMPANY ACQUISITION CORP III"
+
+
+def test_parse_form_index_without_header_yields_nothing():
+    assert list(parse_form_index(["garbage", "10-K  X  1  20250101  edgar/data/1/a.txt"])) == []
+
+
+def test_expected_next_filing():
+    assert expected_next_filing("10-K", date(2025, 2, 1), date(2025, 2, 1)) == ("10-Q", date(2025, 5, 3))
+    # Three quarters after the annual report, the next one is the annual report again
+    assert expected_next_filing("10-Q", date(2025, 11, 1), date(2025, 2, 1)) == ("10-K", date(2026, 2, 1))
+    assert expected_next_filing("10-Q", date(2025, 5, 3), date(2025, 2, 1)) == ("10-Q", date(2025, 8, 2))
+    assert expected_next_filing("10-Q", date(2025, 5, 3), None) == ("10-Q", date(2025, 8, 2))
+
+
+class FakeJobRepository:
+    def __init__(self):
+        self.enqueued = []
+
+    async def enqueue_companies(self, company_ids, priority=0):
+        self.enqueued.append((sorted(company_ids), priority))
+        return len(company_ids)
+
+
+class FakeStatusRepository:
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.upserted = []
+
+    async def get_by_company_ids(self, company_ids):
+        return [status for status in self.existing if status.company_id in company_ids]
+
+    async def upsert_statuses(self, statuses):
+        self.upserted.extend(statuses)
+
+
+def feed_service(statuses=()) -> FilingFeedService:
+    service = FilingFeedService(RecordingSession())
+    service.job_repo = FakeJobRepository()
+    service.status_repo = FakeStatusRepository(statuses)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_process_entries_enqueues_watched_periodic_filers():
+    apple, msft_a, msft_b, insider = (uuid.uuid4() for _ in range(4))
+    watchlist = {320193: [apple], 789019: [msft_a, msft_b], 1214156: [insider]}
+    service = feed_service()
+
+    result = await service.process_entries(date(2025, 10, 31), parse_form_index(fixture_lines()), watchlist)
+
+    assert (result.entries, result.matched, result.enqueued) == (8, 3, 3)
+    assert service.job_repo.enqueued == [(sorted([apple, msft_a, msft_b]), FEED_JOB_PRIORITY)]
+    statuses = {status["company_id"]: status for status in service.status_repo.upserted}
+    # Apple's 8-K the same day does not replace its 10-K
+    assert statuses[apple]["last_form"] == "10-K"
+    assert statuses[apple]["last_annual_filing_date"] == date(2025, 10, 31)
+    assert statuses[msft_b]["cik"] == "0000789019"
+
+
+@pytest.mark.asyncio
+async def test_replaying_an_older_index_keeps_newer_status():
+    apple = uuid.uuid4()
+    newer = SimpleNamespace(company_id=apple, last_filing_date=date(2026, 1, 30), last_annual_filing_date=None)
+    service = feed_service([newer])
+
+    result = await service.process_entries(date(2025, 10, 31), parse_form_index(fixture_lines()), {320193: [apple]})
+
+    assert result.enqueued == 1
+    assert service.status_repo.upserted == []
+
+
+class FakeCursorRepository:
+    def __init__(self, last):
+        self.last = last
+
+    async def get(self, feed):
+        return self.last
+
+    async def advance(self, feed, day):
+        self.last = day
+
+
+class FakeEdgar:
+    def __init__(self, published):
+        self.published = published
+        self.requested = []
+
+    async def get_daily_index(self, day):
+        self.requested.append(day)
+        return "" if day in self.published else None
+
+
+@pytest.mark.asyncio
+async def test_catch_up_skips_weekends_and_waits_for_unpublished_days():
+    friday = date(2025, 10, 31)
+    service = feed_service()
+    service.cursor_repo = FakeCursorRepository(friday - timedelta(days=7))
+
+    async def load_watchlist(edgar=None):
+        return {}
+    service.load_watchlist = load_watchlist
+
+    # Thursday (a holiday, long past) was never published; Tuesday is not out yet
+    published = {date(2025, 10, 27), date(2025, 10, 28), date(2025, 10, 29), friday, date(2025, 11, 3)}
+    edgar = FakeEdgar(published - {date(2025, 10, 30)})
+    results = await service.catch_up(edgar, until=date(2025, 11, 4))
+
+    assert all(day.weekday() < 5 for day in edgar.requested)
+    assert [r.day for r in results] == [date(2025, 10, d) for d in (27, 28, 29, 30, 31)] + [date(2025, 11, 3)]
+    assert not results[3].published
+    assert service.cursor_repo.last == date(2025, 11, 3)
@@ -0,0 +1,245 @@
+"""Tests for filing text extraction and full-text search"""
+
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.filing_text import FilingTextExtractor
+from app.infrastructure.repositories.data_management import FilingTextRepository
+from app.services.data_management.filing_text import FilingTextService
+from app.shared.exceptions import ValidationError
+from tests.fakes import RecordingSession
+
+DOCUMENT = """<html><head><title>10-K</title><style>p { color: red }</style></head><body>
+<ix:header><ix:hidden><ix:nonNumeric name="dei:EntityRegistrantName">Hidden Corp</ix:nonNumeric></ix:hidden></ix:header>
+<script>var tracking = "ignore me";</script>
+<p>Cover page of Acme Corp&nbsp;&amp; subsidiaries</p>
+<div><b>PART I</b></div>
+<div>Item 1A. Risk Factors</div>
+<p>Our   business is
+   subject to risks.</p>
+<div style="display: none">Hidden text<br>still hidden<p>nested</p></div>
+<table><tr><td>Revenue</td><td>1,000</td></tr></table>
+<p>Item 7. Management's Discussion and Analysis</p>
+<p>Revenue grew — 12% year over year.</p>
+</body></html>"""
+
+
+def extract(document: bytes, chunk_size: int, **kw) -> list:
+    extractor = FilingTextExtractor(**kw)
+    sections = []
+    for start in range(0, len(document), chunk_size):
+        sections.extend(extractor.feed_bytes(document[start:start + chunk_size]))
+    return sections + extractor.finish()
+
+
+def test_extracts_visible_text_into_sections():
+    sections = extract(DOCUMENT.encode("utf-8"), 1 << 20)
+
+    assert [(section.section_no, section.heading, section.content) for section in sections] == [
+        (1, None, "Cover page of Acme Corp & subsidiaries"),
+        (2, "Item 1A. Risk Factors", "Our business is subject to risks.\nRevenue 1,000"),
+        (3, "Item 7. Management's Discussion and Analysis", "Revenue grew — 12% year over year."),
+    ]
+
+
+def test_byte_chunking_does_not_change_the_output():
+    document = DOCUMENT.encode("utf-8")
+    whole = extract(document, 1 << 20)
+    # Single bytes split the multi-byte dash and every tag
+    assert extract(document, 1) == whole
+    assert extract(document, 7) == whole
+
+
+def test_long_sections_split_at_paragraphs_and_keep_their_heading():
+    paragraphs = "".join(f"<p>{'word ' * 30}{index}</p>" for index in range(10))
+    document = f"<p>Item 8. Financial Statements</p>{paragraphs}<p>{'x' * 450}</p>".encode()
+
+    sections = extract(document, 64, max_section_chars=400)
+
+    assert all(section.heading == "Item 8. Financial Statements" for section in sections)
+    assert all(len(section.content) <= 400 for section in sections)
+    assert [section.section_no for section in sections] == list(range(1, len(sections) + 1))
+    # Paragraphs fit whole; the oversized one is cut on its own
+    assert sections[0].content.count("\n") == 1
+    assert "".join(section.content for section in sections[-2:]) == "x" * 450
+
+
+def test_extractor_counts_bytes_and_characters():
+    extractor = FilingTextExtractor()
+    extractor.feed_bytes(b"<p>abc</p>")
+    sections = extractor.finish()
+    assert extractor.bytes_read == 10
+    assert extractor.characters == sum(len(section.content) for section in sections) == 3
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_from_index_before_headlines():
+    session = RecordingSession()
+    company_id = uuid.uuid4()
+
+    await FilingTextRepository(session).search(
+        "going concern", company_ids=[company_id], forms=["10-K"], start=date(2023, 1, 1), end=date(2023, 12, 31),
+        limit=11, offset=20
+    )
+
+    sql = session.sql[0]
+    inner = sql[sql.index("FROM (SELECT"):sql.index(") AS anon_1")]
+    assert "websearch_to_tsquery('english'::regconfig" in inner
+    assert "dm_filing_sections.search_vector @@ websearch_to_tsquery" in inner
+    assert "dm_filing_sections.filing_date >= %(filing_date_1)s" in inner
+    assert "dm_filing_sections.filing_date <= %(filing_date_2)s" in inner
+    assert "LIMIT %(param_1)s OFFSET %(param_2)s" in inner
+    assert "ts_headline" not in inner
+    assert sql.count("ts_headline(") == 1
+    params = session.statements[0][0].compile().params
+    assert params["company_ids"] == [company_id] and params["forms"] == ["10-K"]
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_each_year_once(monkeypatch):
+    monkeypatch.setattr(FilingTextRepository, "_partitions", set())
+    session = RecordingSession()
+    repo = FilingTextRepository(session)
+
+    await repo.ensure_partitions([2024, 2023, 2024])
+    await repo.ensure_partitions([2023])
+
+    assert [str(statement) for statement, _ in session.statements] == [
+        "CREATE TABLE IF NOT EXISTS dm_filing_sections_2023 PARTITION OF dm_filing_sections "
+        "FOR VALUES FROM ('2023-01-01') TO ('2024-01-01')",
+        "CREATE TABLE IF NOT EXISTS dm_filing_sections_2024 PARTITION OF dm_filing_sections "
+        "FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')",
+    ]
+    assert session.commits == 1
+
+
+class FakeFilingTextRepository:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.searches = []
+        self.section_batches = []
+        self.documents = []
+
+    async def search(self, query, **kw):
+        self.searches.append((query, kw))
+        return self.rows[:kw["limit"]]
+
+    async def add_sections(self, sections):
+        if sections:
+            self.section_batches.append(sections)
+
+    async def add_document(self, document):
+        self.documents.append(document)
+
+
+class FakeCompanyRepository:
+    def __init__(self, companies=()):
+        self.companies = list(companies)
+
+    async def get_by_tickers(self, tickers):
+        return [company for company in self.companies if company.ticker_symbol in tickers]
+
+
+def search_row(section_no: int, **kw):
+    row = dict(
+        company_id=uuid.UUID(int=1), ticker_symbol="ACME", cik="0000320193", accession_number="0000320193-24-000001",
+        filing_type="10-K", filing_date=date(2024, 2, 1), section_no=section_no, heading=None, rank=0.5,
+        snippet="<mark>going</mark> <mark>concern</mark>", document="acme-10k.htm",
+    )
+    row.update(kw)
+    return SimpleNamespace(**row)
+
+
+def search_service(rows=(), companies=()) -> FilingTextService:
+    service = FilingTextService(RecordingSession())
+    service.repo = FakeFilingTextRepository(rows)
+    service.company_repo = FakeCompanyRepository(companies)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_service_search_pages_with_one_extra_row():
+    service = search_service([search_row(1), search_row(2, document=None), search_row(3)])
+
+    response = await service.search("  going concern ", tickers=None, forms=["10-k"], limit=2)
+
+    assert response.query == "going concern"
+    assert response.has_more
+    assert [hit.section_no for hit in response.hits] == [1, 2]
+    assert response.hits[0].url.endswith("/data/320193/000032019324000001/acme-10k.htm")
+    assert response.hits[1].url is None
+    query, kw = service.repo.searches[0]
+    assert kw["limit"] == 3 and kw["forms"] == ["10-K"]
+
+
+@pytest.mark.asyncio
+async def test_service_search_resolves_tickers():
+    company = SimpleNamespace(id=uuid.UUID(int=7), ticker_symbol="ACME")
+    service = search_service(companies=[company])
+
+    assert (await service.search("fraud", tickers=["NONE"])).hits == []
+    assert service.repo.searches == []
+
+    await service.search("fraud", tickers=["ACME"])
+    assert service.repo.searches[0][1]["company_ids"] == [company.id]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["   ", "x" * 201])
+async def test_service_search_rejects_bad_queries(query):
+    with pytest.raises(ValidationError):
+        await search_service().search(query)
+
+
+class FakeEdgar:
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    async def iter_document(self, cik, accession_number, document):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+
+def pending_filing():
+    return SimpleNamespace(
+        company_id=uuid.UUID(int=3), accession_number="0000320193-24-000002", filing_type="10-Q",
+        filing_date=date(2024, 5, 2), primary_document="acme-10q.htm",
+    )
+
+
+@pytest.mark.asyncio
+async def test_index_filing_streams_sections_in_batches(monkeypatch):
+    monkeypatch.setattr("app.services.data_management.filing_text.SECTION_BATCH_SIZE", 2)
+    document = "".join(f"<p>Item {index}. Heading</p><p>Body {index}</p>" for index in range(1, 6)).encode()
+    service = FilingTextService(RecordingSession(), FakeEdgar([document[:40], document[40:]]))
+    service.repo = FakeFilingTextRepository()
+
+    result = await service.index_filing(pending_filing(), "320193")
+
+    assert result.sections == 5 and result.error is None
+    assert result.bytes == len(document)
+    rows = [row for batch in service.repo.section_batches for row in batch]
+    assert [row["section_no"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["heading"] == "Item 1. Heading" and rows[0]["content"] == "Body 1"
+    assert rows[0]["filing_date"] == date(2024, 5, 2) and rows[0]["company_id"] == uuid.UUID(int=3)
+    assert service.repo.documents[0]["sections"] == 5
+    assert service.repo.documents[0]["characters"] == result.characters
+
+
+@pytest.mark.asyncio
+async def test_failed_download_rolls_back_the_document():
+    session = RecordingSession()
+    service = FilingTextService(session, FakeEdgar([b"<p>partial</p>"], error=ConnectionError("reset")))
+    service.repo = FakeFilingTextRepository()
+
+    result = await service.index_filing(pending_filing(), "320193")
+
+    assert result.error == "reset" and result.sections == 0
+    assert service.repo.documents == []
+    assert session.rollbacks == 1
@@ -0,0 +1,101 @@
+"""Tests for cross-sectional XBRL frames ingestion"""
+
+import uuid
+from datetime import date
+
+import pytest
+
+from app.infrastructure.repositories.data_collection import FinancialFactRepository
+from app.services.data_collection.frames_service import (
+    FrameConcept, FramesIngestionService, frame_period, parse_frame, recent_quarters
+)
+from tests.fakes import RecordingSession
+
+DOCUMENT = {
+    "taxonomy": "us-gaap", "tag": "Revenues", "uom": "USD", "ccp": "CY2024Q1",
+    "data": [
+        {"accn": "0000320193-24-000069", "cik": 320193, "start": "2024-01-01", "end": "2024-03-30", "val": 90753000000},
+        {"accn": "0001652044-24-000050", "cik": 1652044, "start": "2024-01-01", "end": "2024-03-31", "val": 80539000000},
+        {"accn": "0000789019-24-000001", "cik": 789019, "end": "2024-03-31", "val": None},
+    ],
+}
+
+
+def test_recent_quarters():
+    assert recent_quarters(3, date(2024, 5, 15)) == ["CY2023Q3", "CY2023Q4", "CY2024Q1"]
+    assert recent_quarters(1, date(2024, 1, 1)) == ["CY2023Q4"]
+
+
+def test_frame_period():
+    assert frame_period("CY2024Q1", instant=True) == "CY2024Q1I"
+    assert frame_period("CY2024Q1I", instant=True) == "CY2024Q1I"
+    assert frame_period("CY2024Q1", instant=False) == "CY2024Q1"
+
+
+def test_parse_frame_joins_by_cik_and_fans_out_share_classes():
+    apple, class_a, class_c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cik_map = {"0000320193": [apple], "0001652044": [class_a, class_c], "0000789019": [uuid.uuid4()]}
+
+    facts = parse_frame(DOCUMENT, cik_map)
+
+    assert [fact["company_id"] for fact in facts] == [apple, class_a, class_c]
+    assert facts[0] == {
+        "company_id": apple, "cik": "0000320193", "taxonomy": "us-gaap", "concept": "Revenues", "unit": "USD",
+        "period": "CY2024Q1", "period_start": date(2024, 1, 1), "period_end": date(2024, 3, 30),
+        "value": 90753000000.0, "accession_number": "0000320193-24-000069", "source": "frames",
+    }
+    assert parse_frame(DOCUMENT, {}) == []
+
+
+class FakeEdgar:
+    def __init__(self):
+        self.frames = []
+
+    async def get_frame(self, taxonomy, concept, unit, period):
+        self.frames.append(period)
+        return DOCUMENT if concept == "Revenues" else None
+
+
+class FakeFactRepository:
+    async def upsert_facts(self, facts):
+        return [(fact["company_id"], fact["period"]) for fact in facts]
+
+
+class FakeMetricsService:
+    def __init__(self):
+        self.batches = []
+
+    async def recompute(self, changes):
+        self.batches.append(changes)
+        return len(changes)
+
+
+@pytest.mark.asyncio
+async def test_ingest_derives_metrics_once_for_all_frames():
+    apple = uuid.uuid4()
+    service = FramesIngestionService(RecordingSession())
+    service._cik_map = {"0000320193": [apple]}
+    service.fact_repo = FakeFactRepository()
+    service.metrics_service = FakeMetricsService()
+    edgar = FakeEdgar()
+
+    results = await service.ingest(
+        edgar, [FrameConcept("us-gaap", "Revenues", "USD"), FrameConcept("us-gaap", "Assets", "USD", instant=True)],
+        ["CY2024Q1"]
+    )
+
+    assert edgar.frames == ["CY2024Q1", "CY2024Q1I"]
+    assert [(r.filers, r.matched, r.upserted) for r in results] == [(3, 1, 1), (0, 0, 0)]
+    assert service.metrics_service.batches == [[(apple, "CY2024Q1")]]
+    assert service.pending_changes == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_facts_batches_and_skips_unchanged_rows():
+    facts = parse_frame(DOCUMENT, {"0000320193": [uuid.uuid4()], "0001652044": [uuid.uuid4()]})
+    session = RecordingSession()
+    await FinancialFactRepository(session).upsert_facts(facts, batch_size=1)
+
+    assert len(session.statements) == 2 and session.commits == 1
+    assert "ON CONFLICT ON CONSTRAINT uq_dc_financial_facts_frame DO UPDATE" in session.sql[0]
+    assert "dc_financial_facts.value IS DISTINCT FROM excluded.value" in session.sql[0]
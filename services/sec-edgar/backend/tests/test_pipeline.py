@@ -0,0 +1,194 @@
+"""Tests for the staged fetch/parse/write collection pipeline"""
+
+import asyncio
+import json
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.data_collection import pipeline
+from app.services.data_collection.pipeline import CollectionPipeline, parse_submissions
+from app.shared.exceptions import CIKNotFoundError
+
+
+def submissions(count: int, prefix: str = "0000320193-24") -> bytes:
+    return json.dumps({"filings": {"recent": {
+        "accessionNumber": [f"{prefix}-{index:06d}" for index in range(count)],
+        "form": ["10-Q"] * count,
+        "filingDate": ["2024-05-02"] * count,
+        "reportDate": ["2024-03-31"] * count,
+        "primaryDocument": [f"doc{index}.htm" for index in range(count)],
+    }}}).encode()
+
+
+class Journal:
+    """Records the writer's calls across the fake repositories, in order"""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+        # Companies the fake CompanyRepository finds by ID
+        self.companies = {}
+
+    def log(self, name, *args):
+        self.calls.append((name, *args))
+        if name == self.fail_on:
+            raise RuntimeError(f"{name} failed")
+
+
+class FakeSession:
+    def __init__(self, journal: Journal):
+        self.journal = journal
+
+    async def commit(self):
+        self.journal.log("commit")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+@pytest.fixture
+def journal(monkeypatch):
+    journal = Journal()
+
+    class FakeSECDataRepository:
+        def __init__(self, session):
+            pass
+
+        async def insert_filing_rows(self, rows):
+            journal.log("insert", len(rows))
+            return [row[1] for row in rows]
+
+        async def copy_filing_rows(self, rows):
+            journal.log("copy", len(rows))
+            return [row[1] for row in rows]
+
+    class FakeReportCalendarService:
+        def __init__(self, session):
+            pass
+
+        async def refresh(self, company_ids, commit=True):
+            journal.log("calendar", list(company_ids), commit)
+
+    class FakeCompanyRepository:
+        def __init__(self, session):
+            pass
+
+        async def record_ciks(self, ciks):
+            journal.log("record_ciks", dict(ciks))
+
+        async def get_by_id(self, company_id):
+            return journal.companies.get(company_id)
+
+    monkeypatch.setattr(pipeline, "SECDataRepository", FakeSECDataRepository)
+    monkeypatch.setattr(pipeline, "ReportCalendarService", FakeReportCalendarService)
+    monkeypatch.setattr(pipeline, "CompanyRepository", FakeCompanyRepository)
+    monkeypatch.setattr(pipeline, "entity_cache", SimpleNamespace(invalidate=lambda company_id: journal.log("invalidate", company_id)))
+    return journal
+
+
+def make_pipeline(journal: Journal, edgar=None, **kw) -> CollectionPipeline:
+    kw.setdefault("parse_workers", 0)
+    return CollectionPipeline(edgar, session_factory=lambda: FakeSession(journal), **kw)
+
+
+def parsed_work(loop, filings: int, new_cik=None):
+    work = pipeline.CollectionWork(uuid.uuid4(), loop.create_future())
+    work.filings = parse_submissions(work.company_id, submissions(filings, prefix=str(work.company_id)[:10]))
+    work.new_cik = new_cik
+    return work
+
+
+def test_parse_submissions_returns_plain_rows():
+    company_id = uuid.uuid4()
+    rows = parse_submissions(company_id, submissions(2))
+    assert rows[0] == ("0000320193-24-000000", "10-Q", date(2024, 5, 2), date(2024, 3, 31), "doc0.htm")
+    assert len(rows) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_commits_once_then_invalidates(journal):
+    loop = asyncio.get_running_loop()
+    collector = make_pipeline(journal, copy_min_rows=100)
+    first, second = parsed_work(loop, 3, new_cik="0000320193"), parsed_work(loop, 0)
+
+    await collector._write_batch([first, second])
+
+    assert journal.calls == [
+        ("insert", 3),
+        ("calendar", [first.company_id, second.company_id], False),
+        ("record_ciks", {first.company_id: "0000320193"}),
+        ("commit",),
+        ("invalidate", first.company_id),
+    ]
+    assert (await first.future, await second.future) == (3, 0)
+    write = collector.metrics["write"]
+    assert (write.items, write.rows, write.batches, write.errors) == (2, 3, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_large_batches_use_copy(journal):
+    collector = make_pipeline(journal, copy_min_rows=5)
+    work = parsed_work(asyncio.get_running_loop(), 5)
+
+    await collector._write_batch([work])
+
+    assert journal.calls[0] == ("copy", 5)
+    assert await work.future == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("step", ["insert", "calendar", "record_ciks", "commit"])
+async def test_failed_batch_stores_nothing_and_fails_every_company(journal, step):
+    loop = asyncio.get_running_loop()
+    journal.fail_on = step
+    collector = make_pipeline(journal)
+    batch = [parsed_work(loop, 2, new_cik="0000000001"), parsed_work(loop, 1)]
+
+    await collector._write_batch(batch)
+
+    assert [call[0] for call in journal.calls][-1] == step
+    assert "invalidate" not in [call[0] for call in journal.calls]
+    for work in batch:
+        with pytest.raises(RuntimeError):
+            await work.future
+    assert collector.metrics["write"].errors == 2 and collector.metrics["write"].batches == 0
+
+
+class FakeEdgar:
+    def __init__(self, documents: dict, ticker_ciks: dict):
+        self.documents = documents
+        self.ticker_ciks = ticker_ciks
+
+    async def get_ticker_ciks(self):
+        return self.ticker_ciks
+
+    async def get_submissions_content(self, cik):
+        return self.documents.get(cik)
+
+
+@pytest.mark.asyncio
+async def test_companies_flow_through_every_stage(journal):
+    known, resolved, unknown = (SimpleNamespace(id=uuid.uuid4(), ticker_symbol=ticker, cik=cik)
+                                for ticker, cik in (("AAPL", "0000320193"), ("MSFT", None), ("NOPE", None)))
+    for company in (known, resolved, unknown):
+        journal.companies[company.id] = company
+    edgar = FakeEdgar({"0000320193": submissions(4), "0000789019": submissions(2, "0000789019-24")},
+                      {"MSFT": "0000789019"})
+
+    async with make_pipeline(journal, edgar, fetch_concurrency=2, write_linger_ms=0) as collector:
+        assert await collector.collect(known.id) == 4
+        assert await collector.collect(resolved.id) == 2
+        with pytest.raises(CIKNotFoundError):
+            await collector.collect(unknown.id)
+        stats = collector.stats()
+
+    assert ("record_ciks", {resolved.id: "0000789019"}) in journal.calls
+    assert ("invalidate", resolved.id) in journal.calls
+    assert stats["stages"]["fetch"]["items"] == 2 and stats["stages"]["fetch"]["errors"] == 1
+    assert stats["stages"]["write"]["rows"] == 6
@@ -0,0 +1,271 @@
+"""Tests for per-key rate limits and admission control"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api import middleware
+from app.api.rate_limit import (
+    AdmissionController, ApiKey, MemoryBucketStore, Quota, RateLimiter, RedisBucketStore, parse_quotas,
+    retry_seconds, route_class
+)
+from app.shared.exceptions import RateLimitExceededError, ServiceOverloadedError
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_parse_quotas():
+    assert parse_quotas("search=10/20, list=5") == {"search": Quota(10, 20), "list": Quota(5, 5)}
+    assert parse_quotas("write=1/2;list=3/4", ";") == {"write": Quota(1, 2), "list": Quota(3, 4)}
+    assert parse_quotas("") == {}
+    with pytest.raises(ValueError):
+        parse_quotas("export=1/2")
+
+
+def test_route_class():
+    assert route_class("GET", "/api/v1/companies/search", {}) == "search"
+    assert route_class("GET", "/api/v1/companies", {"query": "apple"}) == "search"
+    assert route_class("GET", "/api/v1/companies", {}) == "list"
+    assert route_class("POST", "/api/v1/companies/batch", {}) == "list"
+    assert route_class("PUT", "/api/v1/companies/1", {}) == "write"
+    assert route_class("GET", "/api/v1/companies/changes", {}) is None
+    assert route_class("OPTIONS", "/api/v1/companies", {}) is None
+
+
+def test_retry_seconds_rounds_up_to_at_least_one():
+    assert retry_seconds(0.01) == 1
+    assert retry_seconds(1.0) == 1
+    assert retry_seconds(1.2) == 2
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_waits():
+    store = MemoryBucketStore(clock=FakeClock())
+    quota = Quota(rate=2, burst=3)
+
+    assert [await store.take("alpha:list", quota) for _ in range(3)] == [0, 0, 0]
+    assert await store.take("alpha:list", quota) == pytest.approx(0.5)
+    # Buckets are independent per key and route class
+    assert await store.take("beta:list", quota) == 0
+    assert await store.take("alpha:search", quota) == 0
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_at_rate_up_to_burst():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+    quota = Quota(rate=2, burst=3)
+    for _ in range(3):
+        await store.take("alpha:list", quota)
+
+    clock.advance(0.25)
+    assert await store.take("alpha:list", quota) == pytest.approx(0.25)
+    clock.advance(0.5)
+    assert await store.take("alpha:list", quota) == 0
+    assert await store.take("alpha:list", quota) > 0
+
+    # A long idle period refills to the burst, no further
+    clock.advance(3600)
+    assert [await store.take("alpha:list", quota) for _ in range(3)] == [0, 0, 0]
+    assert await store.take("alpha:list", quota) > 0
+
+
+@pytest.mark.asyncio
+async def test_bucket_prunes_idle_buckets(monkeypatch):
+    monkeypatch.setattr("app.api.rate_limit.MAX_MEMORY_BUCKETS", 2)
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+    quota = Quota(rate=1, burst=1)
+    await store.take("alpha:list", quota)
+    await store.take("beta:list", quota)
+    clock.advance(120)
+
+    await store.take("gamma:list", quota)
+
+    assert list(store._buckets) == ["gamma:list"]
+
+
+@pytest.mark.asyncio
+async def test_check_raises_429_with_retry_after():
+    limiter = RateLimiter(MemoryBucketStore(clock=FakeClock()), AdmissionController(4, 2, 50, 4))
+    client = ApiKey(name="alpha", key="secret", quotas={"write": Quota(rate=0.25, burst=1)})
+
+    await limiter.check(client, "write")
+    with pytest.raises(RateLimitExceededError) as raised:
+        await limiter.check(client, "write")
+
+    assert raised.value.status_code == 429
+    assert raised.value.headers == {"Retry-After": "4"}
+    # Route classes without a quota are not limited
+    await limiter.check(client, "search")
+
+
+class FakeScript:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeRedis:
+    def __init__(self, script: FakeScript):
+        self.script = script
+        self.source = None
+
+    def register_script(self, source: str):
+        self.source = source
+        return self.script
+
+
+def redis_store(monkeypatch, result) -> RedisBucketStore:
+    import redis.asyncio
+
+    monkeypatch.setattr(redis.asyncio, "from_url", lambda url: FakeRedis(FakeScript(result)))
+    return RedisBucketStore("redis://localhost:6379/0")
+
+
+@pytest.mark.asyncio
+async def test_redis_store_runs_take_script(monkeypatch):
+    store = redis_store(monkeypatch, b"0.25")
+
+    assert await store.take("alpha:list", Quota(rate=4, burst=8)) == 0.25
+    assert "redis.call('TIME')" in store._redis.source
+    assert store._take.calls == [(["rate_limit:alpha:list"], [4, 8])]
+
+
+@pytest.mark.asyncio
+async def test_redis_store_fails_open(monkeypatch):
+    store = redis_store(monkeypatch, ConnectionError("connection refused"))
+
+    assert await store.take("alpha:list", Quota(rate=4, burst=8)) == 0.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("RATE_LIMIT_TEST_REDIS_URL"), reason="RATE_LIMIT_TEST_REDIS_URL is not set")
+async def test_redis_take_script_against_server():
+    store = RedisBucketStore(os.environ["RATE_LIMIT_TEST_REDIS_URL"])
+    bucket, quota = f"test:{uuid.uuid4().hex}", Quota(rate=1, burst=2)
+    try:
+        assert [await store.take(bucket, quota) for _ in range(2)] == [0, 0]
+        assert 0 < await store.take(bucket, quota) <= 1
+        assert 0 < await store._redis.ttl(f"rate_limit:{bucket}") <= 3
+    finally:
+        await store._redis.delete(f"rate_limit:{bucket}")
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_admission_limits_slots_per_key():
+    admission = AdmissionController(capacity=4, per_key=2, max_wait_ms=50, max_queue=4)
+    await admission.acquire("alpha")
+    await admission.acquire("alpha")
+
+    with pytest.raises(RateLimitExceededError) as raised:
+        await admission.acquire("alpha")
+    assert raised.value.status_code == 429
+
+    await admission.acquire("beta")
+    admission.release("alpha")
+    await admission.acquire("alpha")
+    assert admission._in_flight == {"alpha": 2, "beta": 1}
+    assert admission.shed == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_when_queue_is_full():
+    admission = AdmissionController(capacity=1, per_key=2, max_wait_ms=1000, max_queue=1)
+    await admission.acquire("alpha")
+    queued = asyncio.create_task(admission.acquire("beta"))
+    await asyncio.sleep(0)
+    assert admission.waiting == 1
+
+    with pytest.raises(ServiceOverloadedError) as raised:
+        await admission.acquire("gamma")
+    assert raised.value.status_code == 503
+    assert raised.value.headers == {"Retry-After": "1"}
+    assert "gamma" not in admission._in_flight
+
+    # The queued request gets the slot once it is released
+    admission.release("alpha")
+    await queued
+    assert admission._in_flight == {"beta": 1}
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_after_max_wait():
+    admission = AdmissionController(capacity=1, per_key=2, max_wait_ms=10, max_queue=4)
+    await admission.acquire("alpha")
+
+    with pytest.raises(ServiceOverloadedError) as raised:
+        await admission.acquire("beta")
+
+    assert raised.value.status_code == 503
+    assert admission.waiting == 0
+    assert admission._in_flight == {"alpha": 1}
+    assert admission.shed == 1
+
+
+def streaming_app(monkeypatch, limiter: RateLimiter, seen: list) -> TestClient:
+    monkeypatch.setattr(middleware, "rate_limiter", limiter)
+    monkeypatch.setattr(middleware, "api_keys", {"secret": ApiKey(name="alpha", key="secret", quotas={})})
+    monkeypatch.setattr(middleware, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(middleware, "RESPONSE_CACHE_ENABLED", False)
+
+    app = FastAPI()
+    app.middleware("http")(middleware.auth_middleware)
+
+    @app.post("/api/v1/companies/batch")
+    async def batch():
+        async def chunks():
+            for chunk in (b"[", b"1,2", b"]"):
+                seen.append(dict(limiter.admission._in_flight))
+                yield chunk
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    return TestClient(app)
+
+
+def test_streamed_response_holds_admission_slot_until_sent(monkeypatch):
+    limiter = RateLimiter(MemoryBucketStore(), AdmissionController(capacity=1, per_key=1, max_wait_ms=10, max_queue=0))
+    seen = []
+    client = streaming_app(monkeypatch, limiter, seen)
+
+    for _ in range(2):
+        response = client.post("/api/v1/companies/batch", headers={"X-API-Key": "secret"})
+        assert response.status_code == 200
+        assert response.content == b"[1,2]"
+
+    assert seen == [{"alpha": 1}] * 6
+    assert limiter.admission._in_flight == {}
+    assert not limiter.admission._slots.locked()
+
+
+def test_middleware_sheds_with_retry_after(monkeypatch):
+    limiter = RateLimiter(MemoryBucketStore(), AdmissionController(capacity=1, per_key=1, max_wait_ms=10, max_queue=0))
+    client = streaming_app(monkeypatch, limiter, [])
+    asyncio.run(limiter.admission.acquire("alpha"))
+
+    response = client.post("/api/v1/companies/batch", headers={"X-API-Key": "secret"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert client.post("/api/v1/companies/batch").status_code == 401
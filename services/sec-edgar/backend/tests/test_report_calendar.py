@@ -0,0 +1,83 @@
+"""Tests for the upcoming report calendar projection"""
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.data_collection.report_calendar import (
+    DEFAULT_FILING_LAG, PROJECTED_REPORTS, ReportCalendarService, add_months, filing_lags, project_calendar
+)
+from app.shared.exceptions import ValidationError
+from tests.fakes import RecordingSession
+
+# A calendar-year filer: 10-Qs ~40 days after quarter end, the 10-K ~60 days after year end
+APPLE_LIKE = [
+    ("10-K", date(2023, 12, 31), date(2024, 2, 29), "a-1"),
+    ("10-Q", date(2024, 3, 31), date(2024, 5, 10), "a-2"),
+    ("10-Q", date(2024, 6, 30), date(2024, 8, 9), "a-3"),
+    ("10-Q", date(2024, 9, 30), date(2024, 11, 8), "a-4"),
+]
+
+
+def test_add_months_keeps_month_ends():
+    assert add_months(date(2024, 9, 30), 3) == date(2024, 12, 31)
+    assert add_months(date(2024, 11, 30), 3) == date(2025, 2, 28)
+    assert add_months(date(2024, 2, 29), 12) == date(2025, 2, 28)
+    assert add_months(date(2024, 1, 15), -2) == date(2023, 11, 15)
+
+
+def test_filing_lags_use_medians_with_defaults():
+    assert filing_lags(APPLE_LIKE) == {"annual": 60, "quarterly": 40}
+    assert filing_lags([]) == DEFAULT_FILING_LAG
+
+
+def test_project_calendar_for_quarterly_filer():
+    company_id = uuid.uuid4()
+    entries = project_calendar(company_id, APPLE_LIKE, today=date(2024, 11, 20))
+
+    filed = [e for e in entries if e["is_filed"]]
+    projected = [e for e in entries if not e["is_filed"]]
+    assert len(filed) == 4 and len(projected) == PROJECTED_REPORTS
+    assert [(e["form_type"], e["period_end"], e["expected_filing_date"]) for e in projected] == [
+        ("10-K", date(2024, 12, 31), date(2025, 3, 1)),
+        ("10-Q", date(2025, 3, 31), date(2025, 5, 10)),
+        ("10-Q", date(2025, 6, 30), date(2025, 8, 9)),
+        ("10-Q", date(2025, 9, 30), date(2025, 11, 9)),
+    ]
+    assert all(e["company_id"] == company_id for e in entries)
+
+
+def test_project_calendar_for_annual_only_filer():
+    filings = [("20-F", date(2022, 12, 31), date(2023, 4, 20), "b-1"), ("20-F", date(2023, 12, 31), date(2024, 4, 18), "b-2")]
+    projected = [e for e in project_calendar(uuid.uuid4(), filings, today=date(2024, 5, 1)) if not e["is_filed"]]
+    assert [(e["form_type"], e["period_end"]) for e in projected] == [("20-F", date(y, 12, 31)) for y in range(2024, 2028)]
+
+
+def test_project_calendar_drops_old_history():
+    old = [("10-Q", date(2019, 3, 31), date(2019, 5, 1), "c-1")] + APPLE_LIKE
+    entries = project_calendar(uuid.uuid4(), old, today=date(2024, 11, 20))
+    assert date(2019, 3, 31) not in {e["period_end"] for e in entries}
+    assert project_calendar(uuid.uuid4(), [], today=date(2024, 11, 20)) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("commit", [True, False])
+async def test_refresh_commits_only_when_asked(commit):
+    company_id = uuid.uuid4()
+    session = RecordingSession(results=[[(company_id, *filing) for filing in APPLE_LIKE]])
+
+    result = await ReportCalendarService(session).refresh([company_id], commit=commit)
+
+    assert result.companies == 1 and result.entries > 0
+    assert session.commits == (1 if commit else 0)
+    # Unfiled entries are replaced, filed ones upserted on their period
+    assert session.sql[1].startswith("DELETE FROM dc_report_calendar")
+    assert "ON CONFLICT ON CONSTRAINT uq_dc_report_calendar_period" in session.sql[2]
+
+
+@pytest.mark.asyncio
+async def test_get_calendar_rejects_inverted_range():
+    today = date.today()
+    with pytest.raises(ValidationError):
+        await ReportCalendarService(RecordingSession()).get_calendar(today, today - timedelta(days=1))
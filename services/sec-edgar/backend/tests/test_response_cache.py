@@ -0,0 +1,189 @@
+"""Tests for the precompressed company list response cache"""
+
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from app.api import response_cache as response_cache_module
+from app.api.response_cache import ResponseCache, accepted_encodings, cache_key
+
+
+class FakeHub:
+    def __init__(self):
+        self.listening = True
+        self.last_seq = 10
+        self.starts = 0
+
+    async def start(self):
+        self.starts += 1
+
+
+def make_request(path: str = "/api/v1/companies/", query: str = "", method: str = "GET", **headers) -> Request:
+    return Request({
+        "type": "http", "method": method, "path": path, "query_string": query.encode(),
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def route_response(payload) -> StreamingResponse:
+    body = json.dumps(payload).encode()
+
+    async def chunks():
+        yield body[:10]
+        yield body[10:]
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+def listing(count: int) -> dict:
+    return {"companies": [{"ticker_symbol": f"T{index:04d}", "company_name": f"Company {index}"} for index in range(count)]}
+
+
+async def fill(cache: ResponseCache, request: Request, payload):
+    pending, cached = await cache.lookup(request)
+    assert cached is None and pending is not None
+    return await cache.store(request, pending, route_response(payload))
+
+
+def test_cache_key_drops_defaults_and_normalizes():
+    assert cache_key(make_request()) == ("/api/v1/companies/", ())
+    assert cache_key(make_request(query="page=1&size=50&sort=ticker")) == ("/api/v1/companies/", ())
+    assert cache_key(make_request(query="sector=Energy&is_selected=TRUE&page=2")) == (
+        "/api/v1/companies/", (("is_selected", "true"), ("page", "2"), ("sector", "Energy"))
+    )
+    assert cache_key(make_request(query="fields=company_name, ticker_symbol")) == \
+        cache_key(make_request(query="fields=ticker_symbol,company_name,company_name"))
+    assert cache_key(make_request("/api/v1/companies/selected")) == ("/api/v1/companies/selected", ())
+
+
+@pytest.mark.parametrize("path,query,method", [
+    ("/api/v1/companies/", "query=apple", "GET"),
+    ("/api/v1/companies/", "sector=Energy&sector=Utilities", "GET"),
+    ("/api/v1/companies/", "page=4", "GET"),
+    ("/api/v1/companies/", "page=x", "GET"),
+    ("/api/v1/companies/", "", "POST"),
+    ("/api/v1/companies/selected", "page=1", "GET"),
+    ("/api/v1/companies/search", "q=a", "GET"),
+])
+def test_uncacheable_requests(path, query, method):
+    assert cache_key(make_request(path, query, method)) is None
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert accepted_encodings("*") == {"*", "br", "gzip"}
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit_in_accepted_encoding():
+    hub = FakeHub()
+    cache = ResponseCache(hub=hub)
+    payload = listing(50)
+
+    miss = await fill(cache, make_request(), payload)
+    assert miss.headers["X-Cache"] == "MISS"
+    assert json.loads(miss.body) == payload
+
+    _, hit = await cache.lookup(make_request(accept_encoding="gzip"))
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.headers["Content-Encoding"] == "gzip"
+    assert hit.headers["Vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(hit.body)) == payload
+
+    _, plain = await cache.lookup(make_request(accept_encoding="gzip;q=0"))
+    assert "Content-Encoding" not in plain.headers
+    assert plain.body == miss.body
+
+    _, not_modified = await cache.lookup(make_request(if_none_match=hit.headers["ETag"]))
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert cache.stats() == {"entries": 1, "bytes": cache.bytes, "hits": 3, "misses": 1}
+    assert hub.starts == 4
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_are_not_compressed():
+    cache = ResponseCache(hub=FakeHub())
+    await fill(cache, make_request(), {"companies": []})
+
+    _, hit = await cache.lookup(make_request(accept_encoding="gzip, br"))
+    assert "Content-Encoding" not in hit.headers
+    entry = next(iter(cache.entries.values()))
+    assert entry.gzip is None and entry.br is None
+
+
+@pytest.mark.asyncio
+async def test_new_change_seq_or_local_write_clears_entries():
+    hub = FakeHub()
+    cache = ResponseCache(hub=hub)
+    await fill(cache, make_request(), listing(5))
+
+    hub.last_seq += 1
+    pending, cached = await cache.lookup(make_request())
+    assert cached is None and pending is not None
+    assert cache.entries == {}
+
+    await cache.store(make_request(), pending, route_response(listing(5)))
+    cache.invalidate()
+    assert cache.entries == {} and cache.bytes == 0
+    assert (await cache.lookup(make_request()))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_body_built_across_a_write_is_not_kept():
+    hub = FakeHub()
+    cache = ResponseCache(hub=hub)
+    pending, _ = await cache.lookup(make_request())
+
+    hub.last_seq += 1
+    response = await cache.store(make_request(), pending, route_response(listing(5)))
+
+    assert response.status_code == 200 and json.loads(response.body) == listing(5)
+    assert cache.entries == {}
+
+
+@pytest.mark.asyncio
+async def test_bypassed_while_not_listening():
+    hub = FakeHub()
+    hub.listening = False
+    cache = ResponseCache(hub=hub)
+
+    assert await cache.lookup(make_request()) == (None, None)
+    assert cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_max_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = ResponseCache(max_age=60, hub=FakeHub())
+    await fill(cache, make_request(), listing(5))
+
+    now[0] += 60
+    assert (await cache.lookup(make_request()))[1] is not None
+    now[0] += 1
+    assert (await cache.lookup(make_request()))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted():
+    payload = {"companies": ["x" * 300]}
+    entry_size = len(json.dumps(payload).encode())
+    cache = ResponseCache(max_bytes=4 * entry_size, hub=FakeHub())
+    requests = [make_request(query=f"sector=S{index}") for index in range(5)]
+    for request in requests[:4]:
+        await fill(cache, request, payload)
+    await cache.lookup(requests[0])
+
+    await fill(cache, requests[4], payload)
+
+    assert [params for _, params in cache.entries] == [(("sector", f"S{index}"),) for index in (2, 3, 0, 4)]
+    assert cache.bytes == 4 * entry_size
+
+    # Bodies over a quarter of the budget are served but never cached
+    response = await fill(cache, make_request(query="sector=Big"), {"companies": ["x" * 400]})
+    assert response.status_code == 200
+    assert len(cache.entries) == 4 and cache.bytes == 4 * entry_size
@@ -0,0 +1,265 @@
+"""Tests for Roaring bitmaps and the watchlist facet index"""
+
+import random
+import struct
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.infrastructure.roaring import ARRAY_MAX, SERIAL_COOKIE_NO_RUNCONTAINER, RoaringBitmap, is_bitmap
+from app.services.stock_discovery.facet_index import FacetIndex
+
+CHUNK = 1 << 16
+
+
+def chunk_values(key: int, count: int, rng: random.Random) -> set:
+    """`count` distinct values whose high 16 bits are `key`"""
+    lows = range(CHUNK) if count == CHUNK else rng.sample(range(CHUNK), count)
+    return {(key << 16) | low for low in lows}
+
+
+# Per chunk cardinalities around the array/bitmap threshold, plus full and absent chunks
+SHAPES = {
+    "empty": {},
+    "sparse": {0: 50, 3: 1},
+    "array_max": {0: ARRAY_MAX - 1, 1: ARRAY_MAX, 2: ARRAY_MAX + 1},
+    "dense": {0: 30000, 1: CHUNK, 7: 5000},
+    "full": {0: CHUNK, 1: CHUNK},
+    "mixed": {0: ARRAY_MAX, 2: CHUNK, 5: 10, 65535: ARRAY_MAX + 1},
+}
+
+
+def make_set(shape: str, seed: int) -> set:
+    rng = random.Random(seed)
+    values = set()
+    for key, count in SHAPES[shape].items():
+        values |= chunk_values(key, count, rng)
+    return values
+
+
+def assert_matches(bitmap: RoaringBitmap, expected: set):
+    assert len(bitmap) == len(expected)
+    assert bitmap.to_array().tolist() == sorted(expected)
+    for key, container in bitmap.containers.items():
+        # Containers are never empty and always in their smaller representation
+        count = len(container) if not is_bitmap(container) else int(np.unpackbits(container.view(np.uint8)).sum())
+        assert count > 0, key
+        assert is_bitmap(container) == (count > ARRAY_MAX), key
+
+
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_construction_and_membership(shape):
+    values = make_set(shape, 1)
+    bitmap = RoaringBitmap(values)
+
+    assert_matches(bitmap, values)
+    assert bool(bitmap) == bool(values)
+    rng = random.Random(2)
+    for value in rng.sample(sorted(values), min(200, len(values))) + [rng.randrange(1 << 32) for _ in range(200)]:
+        assert (value in bitmap) == (value in values)
+    assert RoaringBitmap(np.array(sorted(values), dtype=np.uint32)) == bitmap
+
+
+@pytest.mark.parametrize("left", list(SHAPES))
+@pytest.mark.parametrize("right", list(SHAPES))
+def test_set_operations_match_python_sets(left, right):
+    a_values, b_values = make_set(left, 3), make_set(right, 4)
+    a, b = RoaringBitmap(a_values), RoaringBitmap(b_values)
+
+    assert_matches(a & b, a_values & b_values)
+    assert_matches(a | b, a_values | b_values)
+    assert_matches(a - b, a_values - b_values)
+    assert a.intersection_len(b) == len(a_values & b_values)
+    # Operands are left untouched
+    assert_matches(a, a_values)
+    assert_matches(b, b_values)
+
+
+def test_operations_on_identical_full_chunks():
+    full = set(range(CHUNK, 3 * CHUNK))
+    a, b = RoaringBitmap(full), RoaringBitmap(full)
+
+    assert_matches(a & b, full)
+    assert_matches(a | b, full)
+    assert (a - b).containers == {}
+    assert not (a - b)
+
+
+def test_union_of_many():
+    sets = [make_set(shape, seed) for seed, shape in enumerate(["sparse", "array_max", "mixed"])]
+    assert_matches(RoaringBitmap.union(RoaringBitmap(values) for values in sets), set().union(*sets))
+    assert_matches(RoaringBitmap.union([]), set())
+
+
+def test_add_and_discard_convert_containers_at_the_threshold():
+    values = set(range(ARRAY_MAX))
+    bitmap = RoaringBitmap(values)
+    assert not is_bitmap(bitmap.containers[0])
+
+    bitmap.add(ARRAY_MAX)
+    bitmap.add(ARRAY_MAX)
+    values.add(ARRAY_MAX)
+    assert is_bitmap(bitmap.containers[0])
+    assert_matches(bitmap, values)
+
+    bitmap.discard(0)
+    bitmap.discard(0)
+    values.discard(0)
+    assert not is_bitmap(bitmap.containers[0])
+    assert_matches(bitmap, values)
+
+    bitmap.add(5 << 16)
+    bitmap.discard(5 << 16)
+    bitmap.discard(9 << 16)
+    assert 5 not in bitmap.containers and 9 not in bitmap.containers
+
+
+def test_add_does_not_modify_shared_containers():
+    dense = RoaringBitmap(range(ARRAY_MAX + 10))
+    union = dense | RoaringBitmap([1 << 16])
+    union.add(CHUNK - 1)
+    union.discard(1)
+
+    assert CHUNK - 1 not in dense and 1 in dense
+    assert CHUNK - 1 in union and 1 not in union
+
+
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_serialization_round_trip(shape):
+    values = make_set(shape, 5)
+    bitmap = RoaringBitmap(values)
+
+    data = bitmap.serialize()
+    restored = RoaringBitmap.deserialize(data)
+
+    assert restored == bitmap
+    assert_matches(restored, values)
+    keys = sorted(SHAPES[shape])
+    cookie, size = struct.unpack_from("<II", data)
+    assert (cookie, size) == (SERIAL_COOKIE_NO_RUNCONTAINER, len(keys))
+    expected_payload = sum(2 * count if count <= ARRAY_MAX else 8192 for count in SHAPES[shape].values())
+    assert len(data) == 8 + 8 * len(keys) + expected_payload
+    # The restored containers own their memory and can be modified
+    restored.add(12345)
+    assert RoaringBitmap.deserialize(data) == bitmap
+
+
+def test_serialized_layout():
+    data = RoaringBitmap([1, 2, (3 << 16) | 7]).serialize()
+    assert data == (
+        struct.pack("<II", SERIAL_COOKIE_NO_RUNCONTAINER, 2)
+        + struct.pack("<HHHH", 0, 1, 3, 0)
+        + struct.pack("<II", 24, 28)
+        + struct.pack("<HHH", 1, 2, 7)
+    )
+
+
+def test_deserialize_rejects_run_containers():
+    with pytest.raises(ValueError):
+        RoaringBitmap.deserialize(struct.pack("<II", 12347, 0))
+
+
+def test_serialization_is_compatible_with_pyroaring():
+    pyroaring = pytest.importorskip("pyroaring")
+    values = make_set("mixed", 6)
+
+    theirs = pyroaring.BitMap(values)
+    assert RoaringBitmap.deserialize(theirs.serialize()).to_array().tolist() == sorted(values)
+    assert set(pyroaring.BitMap.deserialize(RoaringBitmap(values).serialize())) == values
+
+
+EXCHANGES = ["NASDAQ", "NYSE", "AMEX"]
+SECTORS = ["Technology", "Energy", None]
+
+
+def facet_rows(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    return [
+        (ordinal, rng.choice(EXCHANGES), rng.choice(SECTORS), None if rng.random() < 0.1 else float(rng.randint(1, 100)) * 1e9,
+         started + timedelta(minutes=ordinal))
+        for ordinal in rng.sample(range(1, 200000), count)
+    ]
+
+
+def reference_filter(rows, members, exchanges=None, sectors=None, min_market_cap=None, max_market_cap=None) -> set:
+    if not exchanges and not sectors and min_market_cap is None and max_market_cap is None:
+        # Unfiltered, members the index has not caught up with yet are kept
+        return set(members)
+    return {
+        row[0] for row in rows
+        if row[0] in members
+        and (not exchanges or row[1] in exchanges)
+        and (not sectors or row[2] in sectors)
+        and (min_market_cap is None or (row[3] is not None and row[3] >= min_market_cap))
+        and (max_market_cap is None or (row[3] is not None and row[3] <= max_market_cap))
+    }
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"exchanges": ["NYSE"]},
+    {"exchanges": ["NYSE", "AMEX", "LSE"], "sectors": ["Energy"]},
+    {"sectors": ["Technology"], "min_market_cap": 20e9, "max_market_cap": 60e9},
+    {"max_market_cap": 5e9},
+])
+def test_facet_filter_matches_reference(params):
+    rows = facet_rows(6000)
+    index = FacetIndex()
+    index.load(rows)
+    members = {row[0] for row in random.Random(7).sample(rows, 3000)} | {300000}
+
+    result = index.filter(RoaringBitmap(members), **params)
+
+    assert result.to_array().tolist() == sorted(reference_filter(rows, members, **params))
+
+
+def test_facet_counts_and_upserts():
+    rows = facet_rows(500)
+    index = FacetIndex()
+    index.load(rows)
+    members = RoaringBitmap([row[0] for row in rows])
+
+    exchanges, sectors = index.facet_counts(members)
+    assert exchanges == {name: sum(row[1] == name for row in rows) for name in EXCHANGES if any(row[1] == name for row in rows)}
+    assert sum(sectors.values()) == sum(row[2] is not None for row in rows)
+
+    moved = rows[0]
+    index.upsert((moved[0], "LSE", None, 1e12))
+    exchanges, sectors = index.facet_counts(members)
+    assert exchanges["LSE"] == 1
+    assert moved[0] not in index.exchanges[moved[1]]
+    assert all(moved[0] not in bitmap for bitmap in index.sectors.values())
+    assert index.filter(members, min_market_cap=1e12).to_array().tolist() == [moved[0]]
+
+    index.upsert((400000, "NYSE", "Energy", None))
+    assert 400000 in index.companies and 400000 in index.sectors["Energy"]
+
+
+class FakeCompanyRepository:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.calls = []
+
+    async def get_facet_rows(self, changed_since=None):
+        self.calls.append(changed_since)
+        return [row for row in self.rows if changed_since is None or row[4] > changed_since]
+
+
+@pytest.mark.asyncio
+async def test_ensure_fresh_catches_up_from_watermark():
+    rows = facet_rows(50)
+    repo = FakeCompanyRepository(rows)
+    index = FacetIndex(refresh_interval=timedelta(0))
+
+    await index.ensure_fresh(repo)
+    latest = max(row[4] for row in rows)
+    assert len(index.companies) == 50 and index.watermark == latest
+
+    repo.rows.append((250000, "NYSE", "Energy", 3e9, latest + timedelta(seconds=1)))
+    await index.ensure_fresh(repo)
+
+    assert repo.calls[0] is None and repo.calls[1] < latest
+    assert 250000 in index.exchanges["NYSE"]
+    assert index.watermark == latest + timedelta(seconds=1)
@@ -0,0 +1,196 @@
+"""Tests for streaming screener CSV imports"""
+
+import asyncio
+import csv
+import io
+import uuid
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.data_management import screener_import
+from app.services.data_management.screener_import import (
+    IncrementalCsvReader, MultipartCsvReader, ScreenerImportService, clean_company_name, parse_market_cap,
+    screener_company, screener_date
+)
+from app.shared.exceptions import ValidationError
+from tests.fakes import RecordingSession, SessionFactory
+
+HEADER = "Symbol,Name,Last Sale,Net Change,% Change,Market Cap,Country,IPO Year,Volume,Sector,Industry\n"
+CSV = HEADER + (
+    'AAPL,Apple Inc. Common Stock,$189.84,0.35,0.18%,"2,936,000,000,000.00",United States,1980,1,Technology,Computers\n'
+    'ASML,ASML Holding N.V. New York Registry Shares,$700,1,0.1%,280000000000.00,Netherlands,,1,Technology,Chips\n'
+    'ABCP,"ABC Capital 6.25% Series B",$25,0,0%,,United States,,1,,\n'
+    'NEST,"Nested ""Quotes""\nAcross Lines Corporation",$1,0,0%,0.00,United States,,1,Health Care,Drugs\n'
+    'CAFE,Café Société Inc.,$1,0,0%,1000000.00,USA,,1,Finance,Banks\n'
+)
+
+
+def expected_rows(text: str) -> list:
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_row_mapping():
+    rows = {row["Symbol"]: screener_company(row) for row in expected_rows(CSV)}
+
+    assert rows["AAPL"] == {
+        "ticker_symbol": "AAPL", "company_name": "Apple", "exchange": "NASDAQ", "sector": "Technology",
+        "market_cap": 2.936e12,
+    }
+    assert rows["ASML"] is None and rows["ABCP"] is None
+    assert rows["NEST"]["company_name"] == 'Nested "Quotes"\nAcross Lines'
+    assert rows["NEST"]["sector"] == "Healthcare" and rows["NEST"]["market_cap"] is None
+    assert rows["CAFE"]["sector"] == "Financial Services"
+
+
+def test_field_cleaning():
+    assert parse_market_cap("$1,234.50") == 1234.5
+    assert parse_market_cap("n/a") is None
+    assert clean_company_name("Acme Holdings Corporation Common Stock") == "Acme Holdings"
+    assert screener_date("nasdaq_screener_1751274683779.csv") == date(2025, 6, 30)
+    assert screener_date("upload.csv") is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 100000])
+def test_incremental_reader_matches_csv_module_for_any_chunking(chunk_size):
+    data = ("﻿" + CSV).encode("utf-8")
+    reader = IncrementalCsvReader()
+    rows = []
+    for start in range(0, len(data), chunk_size):
+        rows.extend(reader.feed(data[start:start + chunk_size]))
+    rows.extend(reader.feed(b"", final=True))
+
+    assert rows == expected_rows(CSV)
+
+
+def test_incremental_reader_keeps_a_last_line_without_newline():
+    reader = IncrementalCsvReader()
+    assert reader.feed(b"a,b\n1,2") == []
+    assert reader.feed(b"", final=True) == [{"a": "1", "b": "2"}]
+
+
+def multipart_body(boundary: str, field: str = "file") -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "ignored\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="nasdaq_screener_1751274683779.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+        f"{CSV}\r\n"
+        f"--{boundary}--\r\n"
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_size", [3, 50, 100000])
+def test_multipart_reader_extracts_the_file_part(chunk_size):
+    body = multipart_body("XyZ")
+    reader = MultipartCsvReader("multipart/form-data; boundary=XyZ")
+    rows = []
+    for start in range(0, len(body), chunk_size):
+        rows.extend(reader.feed(body[start:start + chunk_size]))
+    rows.extend(reader.feed(b"", final=True))
+
+    assert reader.filename == "nasdaq_screener_1751274683779.csv"
+    assert rows == expected_rows(CSV)
+
+
+def test_multipart_reader_requires_the_file_field():
+    with pytest.raises(ValidationError):
+        MultipartCsvReader("multipart/form-data")
+    reader = MultipartCsvReader("multipart/form-data; boundary=XyZ")
+    reader.feed(multipart_body("XyZ", field="other"))
+    with pytest.raises(ValidationError):
+        reader.feed(b"", final=True)
+
+
+class FakeJobs:
+    """ImportJobRepository stand-in shared by the request and the writer session"""
+    jobs = {}
+    progress = []
+    finished = []
+
+    def __init__(self, db):
+        pass
+
+    async def create(self, filename, exchange, as_of):
+        job = SimpleNamespace(
+            id=uuid.uuid4(), filename=filename, exchange=exchange, as_of=as_of, status="receiving",
+            bytes_received=0, rows_parsed=0, rows_skipped=0, rows_written=0, companies_created=0,
+            companies_updated=0, companies_delisted=0, error=None, started_at=datetime.now(timezone.utc),
+            finished_at=None,
+        )
+        self.jobs[job.id] = job
+        return job
+
+    async def record_progress(self, job_id, status, counters, written):
+        self.progress.append((status, counters, written))
+
+    async def finish(self, job_id, error=None, delisted=0):
+        self.finished.append((error, delisted))
+
+
+class FakeCompanies:
+    batches = []
+    fail = False
+
+    def __init__(self, db):
+        pass
+
+    async def upsert_batch(self, rows, as_of=None, source="import"):
+        if self.fail:
+            raise RuntimeError("deadlock detected")
+        self.batches.append([row["ticker_symbol"] for row in rows])
+        return len(rows), 0
+
+    async def record_delisted(self, exchange, tickers, as_of):
+        return 0
+
+
+@pytest.fixture
+def import_service(monkeypatch):
+    monkeypatch.setattr(screener_import, "ImportJobRepository", FakeJobs)
+    monkeypatch.setattr(screener_import, "CompanyRepository", FakeCompanies)
+    monkeypatch.setattr(screener_import, "IMPORT_BATCH_SIZE", 2)
+    FakeJobs.progress, FakeJobs.finished, FakeCompanies.batches, FakeCompanies.fail = [], [], [], False
+    return ScreenerImportService(RecordingSession(), session_factory=SessionFactory())
+
+
+async def chunks(data: bytes, size: int = 16):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def finish_writers():
+    await asyncio.gather(*list(screener_import._running_imports))
+
+
+@pytest.mark.asyncio
+async def test_import_streams_batches_to_the_writer(import_service):
+    data = (CSV + 'AAPL,Apple Inc.,$1,0,0%,1.00,United States,,1,Technology,X\n').encode("utf-8")
+    job = await import_service.start_import(chunks(data), "text/csv", as_of=date(2024, 1, 2))
+    await finish_writers()
+
+    assert job.as_of == date(2024, 1, 2)
+    assert [ticker for batch in FakeCompanies.batches for ticker in batch] == ["AAPL", "NEST", "CAFE", "AAPL"]
+    assert max(len(batch) for batch in FakeCompanies.batches) <= 2
+    status, counters, _ = FakeJobs.progress[-1]
+    assert status == "processing"
+    assert (counters["rows_parsed"], counters["rows_skipped"], counters["bytes_received"]) == (6, 2, len(data))
+    assert FakeJobs.finished == [(None, 0)]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_the_job(import_service):
+    FakeCompanies.fail = True
+    await import_service.start_import(chunks(CSV.encode("utf-8")), "text/csv")
+    await finish_writers()
+
+    assert FakeJobs.finished == [("deadlock detected", 0)]
+
+
+@pytest.mark.asyncio
+async def test_unsupported_uploads_are_rejected(import_service):
+    with pytest.raises(ValidationError):
+        await import_service.start_import(chunks(b"{}"), "application/json")
@@ -0,0 +1,132 @@
+"""Tests for the vectorized screening engine against a plain Python reference"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.stock_discovery.screening_engine import CompanyUniverse, ScreeningEngine
+from app.shared.models.stock_discovery import ScreenGroupBy, ScreenParams
+
+EXCHANGES = ["NASDAQ", "NYSE", "AMEX"]
+SECTORS = ["Technology", "Energy", "Health Care", None]
+
+
+def make_rows(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    rows = []
+    for index in range(count):
+        market_cap = None if rng.random() < 0.1 else float(rng.choice([1e9, 2e9, 5e9]) * rng.randint(1, 20))
+        rows.append((
+            uuid.uuid4(), f"T{index:04d}", f"Company {index}", rng.choice(EXCHANGES), rng.choice(SECTORS),
+            market_cap, rng.random() < 0.3, started + timedelta(minutes=index),
+        ))
+    return rows
+
+
+def reference_screen(rows: list, params: ScreenParams) -> list:
+    matches = [
+        row for row in rows
+        if (not params.exchanges or row[3] in params.exchanges)
+        and (not params.sectors or row[4] in params.sectors)
+        and (params.min_market_cap is None or (row[5] is not None and row[5] >= params.min_market_cap))
+        and (params.max_market_cap is None or (row[5] is not None and row[5] <= params.max_market_cap))
+        and (params.is_selected is None or row[6] == params.is_selected)
+    ]
+    matches.sort(key=lambda row: (-(row[5] if row[5] is not None else float("-inf")), row[1]))
+    return matches
+
+
+def loaded_engine(rows: list) -> ScreeningEngine:
+    engine = ScreeningEngine()
+    universe = CompanyUniverse(capacity=4)
+    universe.load(rows)
+    engine.universe = universe
+    return engine
+
+
+@pytest.mark.parametrize("params", [
+    ScreenParams(),
+    ScreenParams(exchanges=["NYSE"], limit=10),
+    ScreenParams(sectors=["Technology", "Energy"], min_market_cap=5e9, max_market_cap=4e10),
+    ScreenParams(is_selected=False, limit=0),
+    ScreenParams(is_selected=True, sectors=["Unknown sector"]),
+    ScreenParams(min_market_cap=1e9, limit=1000),
+])
+def test_screen_matches_reference(params):
+    rows = make_rows(500)
+    response = loaded_engine(rows).screen(params)
+    expected = reference_screen(rows, params)
+
+    assert response.total == len(expected)
+    assert response.universe_size == 500
+    assert [c.ticker_symbol for c in response.companies] == [row[1] for row in expected[:params.limit]]
+
+
+def test_group_by_sector_matches_reference():
+    rows = make_rows(300)
+    response = loaded_engine(rows).screen(ScreenParams(exchanges=["NASDAQ"], group_by=ScreenGroupBy.SECTOR))
+
+    matching = [row for row in rows if row[3] == "NASDAQ"]
+    groups = {group.key: group for group in response.groups}
+    assert set(groups) == {row[4] for row in matching}
+    for sector, group in groups.items():
+        members = [row for row in matching if row[4] == sector]
+        caps = [row[5] for row in members if row[5] is not None]
+        assert group.count == len(members)
+        assert group.selected_count == sum(row[6] for row in members)
+        assert group.total_market_cap == pytest.approx(sum(caps))
+        assert group.max_market_cap == (max(caps) if caps else None)
+    totals = [group.total_market_cap for group in response.groups]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_upsert_only_counts_real_changes():
+    rows = make_rows(3)
+    universe = CompanyUniverse(capacity=1)
+    universe.load(rows)
+    version = universe.version
+
+    assert universe.size == 3 and universe.capacity >= 3
+    assert universe.upsert(rows[0]) is False
+    assert universe.version == version
+
+    changed = list(rows[1])
+    changed[5] = None
+    assert universe.upsert(changed) is False
+    assert universe.version == version + 1
+    assert universe.row(1).market_cap is None
+    assert universe.row(1).id == rows[1][0]
+
+
+class FakeCompanyRepository:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.calls = []
+
+    async def get_screening_rows(self, changed_since=None):
+        self.calls.append(changed_since)
+        return [row for row in self.rows if changed_since is None or row[7] > changed_since]
+
+
+@pytest.mark.asyncio
+async def test_ensure_fresh_loads_then_catches_up_from_watermark():
+    rows = make_rows(20)
+    repo = FakeCompanyRepository(rows)
+    engine = ScreeningEngine(refresh_interval=timedelta(0))
+
+    await engine.ensure_fresh(repo)
+    assert engine.universe.size == 20
+    assert engine.watermark == rows[-1][7]
+
+    late = list(make_rows(1, seed=2)[0])
+    late[7] = engine.watermark + timedelta(seconds=1)
+    repo.rows.append(tuple(late))
+    await engine.ensure_fresh(repo)
+
+    assert repo.calls[0] is None
+    assert repo.calls[1] < rows[-1][7]  # re-reads the overlap window
+    assert engine.universe.size == 21
+    assert engine.watermark == late[7]
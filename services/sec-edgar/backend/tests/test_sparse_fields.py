@@ -0,0 +1,98 @@
+"""Tests for sparse fieldsets on the company list, search and selected endpoints"""
+
+import json
+import uuid
+from datetime import date
+
+import pytest
+
+from app.api.router_modules.stock_discovery import sparse_response
+from app.infrastructure.repositories.stock_discovery import CompanyRepository, company_columns
+from app.services.stock_discovery.company_service import CompanyService, parse_fields
+from app.shared.exceptions import ValidationError
+from app.shared.models.stock_discovery import COMPANY_FIELDS, CompanySearchParams
+from tests.fakes import RecordingSession, compile_sql
+
+
+def test_parse_fields_keeps_schema_order_and_drops_duplicates():
+    assert parse_fields(None) is None
+    assert parse_fields(" company_name,ticker_symbol ,company_name") == ["ticker_symbol", "company_name"]
+    assert set(parse_fields(",".join(COMPANY_FIELDS))) == set(COMPANY_FIELDS)
+
+
+@pytest.mark.parametrize("fields", ["ticker_symbol,password", "", " , "])
+def test_parse_fields_rejects_unknown_or_empty(fields):
+    with pytest.raises(ValidationError) as raised:
+        parse_fields(fields)
+    assert "available: " in raised.value.detail
+
+
+def test_company_columns_read_versioned_attributes_from_history():
+    current = company_columns(["ticker_symbol", "is_selected"])
+    historical = company_columns(["ticker_symbol", "is_selected"], historical=True)
+    assert [column.name for column in historical] == ["ticker_symbol", "is_selected"]
+    assert [compile_sql(column) for column in current] == ["sd_companies.ticker_symbol", "sd_companies.is_selected"]
+    assert [compile_sql(column) for column in historical] == ["sd_company_history.ticker_symbol", "sd_companies.is_selected"]
+
+
+@pytest.mark.asyncio
+async def test_get_all_selects_only_requested_columns():
+    row = {"ticker_symbol": "AAPL", "company_name": "Apple Inc."}
+    session = RecordingSession(results=[[1], [row]])
+
+    rows, total = await CompanyRepository(session).get_all(fields=["ticker_symbol", "company_name"])
+
+    assert (rows, total) == ([row], 1)
+    assert session.sql[1].startswith(
+        "SELECT sd_companies.ticker_symbol AS ticker_symbol, sd_companies.company_name AS company_name \nFROM sd_companies"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_all_as_of_selects_from_history():
+    session = RecordingSession(results=[[0], []])
+
+    await CompanyRepository(session).get_all_as_of(date(2024, 1, 31), fields=["ticker_symbol", "is_selected"])
+
+    data_sql = session.sql[1]
+    assert data_sql.startswith(
+        "SELECT sd_company_history.ticker_symbol AS ticker_symbol, sd_companies.is_selected AS is_selected \n"
+        "FROM sd_company_history JOIN sd_companies"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_selected_companies_with_fields():
+    session = RecordingSession(results=[[{"ticker_symbol": "MSFT"}]])
+
+    assert await CompanyRepository(session).get_selected_companies(["ticker_symbol"]) == [{"ticker_symbol": "MSFT"}]
+    assert session.sql[0].startswith("SELECT sd_companies.ticker_symbol AS ticker_symbol \nFROM sd_companies")
+
+
+@pytest.mark.asyncio
+async def test_service_returns_plain_dicts_for_fields():
+    row = {"ticker_symbol": "AAPL"}
+    service = CompanyService(RecordingSession(results=[[1], [row], [1], [row]]))
+
+    listing = await service.get_companies(CompanySearchParams(size=10, fields="ticker_symbol"))
+    assert listing == {"companies": [row], "total": 1, "page": 1, "size": 10, "as_of": None}
+    assert await service.search_companies("AA", fields="ticker_symbol") == [row]
+
+
+@pytest.mark.asyncio
+async def test_service_validates_fields_before_querying(session):
+    with pytest.raises(ValidationError):
+        await CompanyService(session).search_companies("AA", fields="nope")
+    assert session.statements == []
+
+
+def test_sparse_response_encodes_uuids_and_dates():
+    company_id = uuid.UUID(int=1)
+    response = sparse_response({"companies": [{"id": company_id, "selection_date": date(2024, 3, 1)}], "total": 1})
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {
+        "companies": [{"id": str(company_id), "selection_date": "2024-03-01"}], "total": 1
+    }
+    with pytest.raises(TypeError):
+        sparse_response({"value": object()})
@@ -0,0 +1,259 @@
+"""Tests for sampled request tracing"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.api import middleware
+from app.infrastructure import tracing
+from app.api.tracing import TracedRoute
+from app.infrastructure.tracing import (
+    JsonLinesExporter, Trace, Tracer, current_trace, instrument_engine, otlp_span, parse_traceparent,
+    server_timing, span, traced_methods
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+        self.closed = False
+
+    async def export(self, trace):
+        self.traces.append(trace)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    for header in (None, "", "garbage", f"00-{TRACE_ID}-{PARENT_ID}", f"00-{'0' * 32}-{PARENT_ID}-01",
+                   f"00-{TRACE_ID}-{'0' * 16}-01", f"00-{'z' * 32}-{PARENT_ID}-01", f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01"):
+        assert parse_traceparent(header) is None, header
+
+
+def test_sampling_follows_a_trusted_caller_then_the_rate():
+    never = Tracer(sample_rate=0, exporters=[CollectingExporter()], trust_traceparent=True)
+    always = Tracer(sample_rate=1, exporters=[CollectingExporter()], trust_traceparent=True)
+
+    assert never.sample() is None
+    trace = never.sample(f"00-{TRACE_ID}-{PARENT_ID}-01")
+    assert (trace.trace_id, trace.remote_parent_id) == (TRACE_ID, PARENT_ID)
+    assert always.sample(f"00-{TRACE_ID}-{PARENT_ID}-00") is None
+    assert len(always.sample().trace_id) == 32
+    # Nothing is sampled without somewhere to export to
+    assert Tracer(sample_rate=1, exporters=[], trust_traceparent=True).sample(f"00-{TRACE_ID}-{PARENT_ID}-01") is None
+
+
+def test_untrusted_traceparent_only_links_the_trace():
+    never = Tracer(sample_rate=0, exporters=[CollectingExporter()])
+    always = Tracer(sample_rate=1, exporters=[CollectingExporter()])
+
+    assert never.sample(f"00-{TRACE_ID}-{PARENT_ID}-01") is None
+    trace = always.sample(f"00-{TRACE_ID}-{PARENT_ID}-00")
+    assert (trace.trace_id, trace.remote_parent_id) == (TRACE_ID, PARENT_ID)
+
+
+def test_no_exporters_without_configuration(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_EXPORT_PATH", "")
+    monkeypatch.setattr(tracing, "TRACE_OTLP_ENDPOINT", "")
+    assert tracing.default_exporters() == []
+
+    monkeypatch.setattr(tracing, "TRACE_EXPORT_PATH", "/var/log/us-stock/traces.jsonl")
+    exporter, = tracing.default_exporters()
+    assert isinstance(exporter, JsonLinesExporter) and exporter.path == "/var/log/us-stock/traces.jsonl"
+
+
+def test_spans_nest_under_the_active_trace():
+    tracer = Tracer(exporters=[CollectingExporter()])
+    trace = Trace(TRACE_ID, PARENT_ID)
+
+    with span("outside", "service") as outside:
+        assert outside is None and current_trace() is None
+
+    with tracer.activate(trace, "GET /api/v1/companies/", **{"http.method": "GET"}) as root:
+        assert current_trace() is trace
+        with span("service", "service") as service:
+            with pytest.raises(KeyError):
+                with span("repository", "repository"):
+                    raise KeyError("boom")
+    assert current_trace() is None
+
+    root_span, service_span, repository_span = trace.spans
+    assert root_span is root and root.parent_id == PARENT_ID
+    assert service_span is service and service.parent_id == root.span_id
+    assert repository_span.parent_id == service.span_id and repository_span.error == "KeyError"
+    assert all(item.end_ns >= item.start_ns > 0 for item in trace.spans)
+
+
+@pytest.mark.asyncio
+async def test_traced_methods_wraps_public_async_methods():
+    @traced_methods("repository")
+    class Repository:
+        async def get(self, value):
+            return value
+
+        async def _private(self):
+            return None
+
+        def sync(self):
+            return None
+
+    repo = Repository()
+    assert await repo.get(1) == 1
+
+    trace = Trace()
+    with Tracer(exporters=[]).activate(trace, "request"):
+        await repo.get(2)
+        await repo._private()
+        repo.sync()
+    assert [(item.name, item.phase) for item in trace.spans] == [
+        ("request", "request"), ("test_traced_methods_wraps_public_async_methods.<locals>.Repository.get", "repository")
+    ]
+
+
+def timed_trace() -> Trace:
+    """request 10 ms > route 9 ms > router 6 ms > (sql 2 ms, sql 1 ms), plus encode 2 ms under route"""
+    trace = Trace()
+    ms = 1_000_000
+    request = trace.start_span("request", "request", None, start_ns=1 * ms)
+    route = trace.start_span("route", "route", request, start_ns=1 * ms)
+    router = trace.start_span("router", "router", route, start_ns=2 * ms)
+    first = trace.start_span("sql SELECT", "sql", router, start_ns=3 * ms)
+    second = trace.start_span("sql SELECT", "sql", router, start_ns=6 * ms)
+    encode = trace.start_span("encode", "encode", route, start_ns=8 * ms)
+    for item, end in ((request, 11), (route, 10), (router, 8), (first, 5), (second, 7), (encode, 10)):
+        item.end_ns = end * ms
+    return trace
+
+
+def test_server_timing_reports_self_time_per_phase():
+    assert server_timing(Trace()) == ""
+    assert server_timing(timed_trace()) == (
+        'total;dur=10.00, request;dur=1.00;desc="middleware", route;dur=1.00;desc="parameters and dependencies", '
+        'router;dur=3.00;desc="endpoint", sql;dur=3.00;desc="2 queries", encode;dur=2.00;desc="response validation and encoding"'
+    )
+
+
+def test_otlp_span_format():
+    trace = timed_trace()
+    request, _, _, sql, *_ = trace.spans
+    sql.attributes.update({"db.rows": 3, "db.executemany": False, "db.statement": None})
+    sql.error = "OperationalError"
+
+    root = otlp_span(trace, request)
+    assert root["kind"] == 2 and "parentSpanId" not in root and "status" not in root
+    record = otlp_span(trace, sql)
+    assert record["kind"] == 3 and record["parentSpanId"] == trace.spans[2].span_id
+    assert record["startTimeUnixNano"] == "3000000" and record["endTimeUnixNano"] == "5000000"
+    assert record["attributes"] == [
+        {"key": "app.phase", "value": {"stringValue": "sql"}},
+        {"key": "db.rows", "value": {"intValue": "3"}},
+        {"key": "db.executemany", "value": {"boolValue": False}},
+    ]
+    assert record["status"] == {"code": 2, "message": "OperationalError"}
+
+
+@pytest.mark.asyncio
+async def test_json_lines_exporter_appends_one_span_per_line(tmp_path):
+    path = tmp_path / "data" / "traces.jsonl"
+    tracer = Tracer(exporters=[JsonLinesExporter(str(path))])
+
+    tracer.submit(timed_trace())
+    tracer.submit(timed_trace())
+    await tracer.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 12
+    assert {record["name"] for record in records} == {"request", "route", "router", "sql SELECT", "encode"}
+
+
+@pytest.mark.asyncio
+async def test_json_lines_exporter_rotates_at_max_bytes(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    one_trace = JsonLinesExporter(str(tmp_path / "sizing.jsonl"))
+    await one_trace.export(timed_trace())
+    trace_bytes = (tmp_path / "sizing.jsonl").stat().st_size
+    exporter = JsonLinesExporter(str(path), max_bytes=2 * trace_bytes)
+
+    for _ in range(5):
+        await exporter.export(timed_trace())
+
+    # Two traces per file: the 5th write rotated the 3rd and 4th away, dropping the 1st and 2nd
+    assert path.stat().st_size == trace_bytes
+    assert (tmp_path / "traces.jsonl.1").stat().st_size == 2 * trace_bytes
+    assert not (tmp_path / "traces.jsonl.2").exists()
+
+
+def test_engine_events_record_connect_and_sql():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    trace = Trace()
+
+    with Session(engine) as session:
+        with Tracer(exporters=[]).activate(trace, "request"):
+            session.execute(text("SELECT 1"))
+            session.execute(text("SELECT 2"))
+        session.execute(text("SELECT 3"))
+
+    assert [(item.name, item.phase) for item in trace.spans] == [
+        ("request", "request"), ("db connect", "db-connect"), ("sql SELECT", "sql"), ("sql SELECT", "sql")
+    ]
+    root, connect, first, _ = trace.spans
+    assert connect.parent_id == root.span_id and connect.end_ns > 0
+    assert first.attributes["db.statement"] == "SELECT 1"
+    assert first.end_ns >= first.start_ns
+    engine.dispose()
+
+
+def traced_app(monkeypatch, tracer: Tracer) -> TestClient:
+    monkeypatch.setattr(middleware, "tracer", tracer)
+    router = APIRouter(route_class=TracedRoute)
+
+    @router.get("/api/v1/ping")
+    async def ping():
+        with span("service", "service"):
+            await asyncio.sleep(0)
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.middleware("http")(middleware.tracing_middleware)
+    return TestClient(app)
+
+
+def test_sampled_request_gets_server_timing(monkeypatch):
+    exporter = CollectingExporter()
+    client = traced_app(monkeypatch, Tracer(sample_rate=0, exporters=[exporter], trust_traceparent=True))
+
+    response = client.get("/api/v1/ping", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    assert response.json() == {"ok": True}
+    assert response.headers["X-Trace-Id"] == TRACE_ID
+    phases = [metric.split(";")[0] for metric in response.headers["Server-Timing"].split(", ")]
+    assert phases == ["total", "request", "route", "router", "service", "encode"]
+    trace, = exporter.traces
+    assert trace.spans[0].name == "GET /api/v1/ping"
+    assert trace.spans[0].attributes == {"http.method": "GET", "http.status_code": 200}
+    assert [item.name for item in trace.spans[1:3]] == ["route /api/v1/ping", "router.ping"]
+
+
+def test_unsampled_request_is_not_traced(monkeypatch):
+    exporter = CollectingExporter()
+    client = traced_app(monkeypatch, Tracer(sample_rate=0, exporters=[exporter]))
+
+    response = client.get("/api/v1/ping")
+    forced = client.get("/api/v1/ping", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    assert response.json() == forced.json() == {"ok": True}
+    assert "Server-Timing" not in response.headers and "Server-Timing" not in forced.headers
+    assert exporter.traces == []
@@ -0,0 +1,96 @@
+"""Tests for the shared-memory universe snapshot"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.infrastructure.universe_snapshot import (
+    UniverseSnapshot, decode_names, encode_names, read_generation, write_snapshot
+)
+from app.services.stock_discovery.screening_engine import CompanyUniverse, MappedUniverse, ScreeningEngine
+from app.shared.models.stock_discovery import ScreenGroupBy, ScreenParams
+from tests.test_screening_engine import make_rows
+
+
+def build_universe(rows: list) -> CompanyUniverse:
+    universe = CompanyUniverse()
+    universe.load(rows)
+    return universe
+
+
+def test_names_round_trip():
+    names = ["Apple Inc.", "", "Société Générale", "日本"]
+    offsets, blob = encode_names(names)
+    assert decode_names(offsets, blob) == names
+    assert decode_names(*encode_names([])) == []
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "universe.bin")
+    universe = build_universe(make_rows(200))
+    watermark = datetime(2024, 5, 1, 12, 30)
+
+    assert read_generation(path) == 0
+    write_snapshot(path, universe.to_snapshot_columns(), 7, watermark)
+    snapshot = UniverseSnapshot(path)
+
+    assert read_generation(path) == 7
+    assert snapshot.generation == 7 and snapshot.rows == 200
+    assert snapshot.watermark == watermark
+    columns = snapshot.columns
+    assert columns.ids.tobytes() == universe.ids[:200].tobytes()
+    np.testing.assert_array_equal(columns.market_cap, universe.market_cap[:200])
+    np.testing.assert_array_equal(columns.sector_codes, universe.sector_codes[:200])
+    assert columns.sectors == universe.sectors.values
+    assert decode_names(columns.name_offsets, columns.name_blob) == list(universe.names[:200])
+    for name in columns.COLUMN_NAMES:
+        assert getattr(columns, name).ctypes.data % 64 == 0, name
+
+
+def test_read_generation_ignores_foreign_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a snapshot at all, but long enough for a header")
+    assert read_generation(str(path)) == 0
+    with pytest.raises(ValueError):
+        UniverseSnapshot(str(path))
+
+
+def test_mapped_universe_screens_like_private_universe(tmp_path):
+    path = str(tmp_path / "universe.bin")
+    rows = make_rows(300)
+    private = ScreeningEngine()
+    private.universe = build_universe(rows)
+    write_snapshot(path, private.universe.to_snapshot_columns(), 1)
+
+    mapped = ScreeningEngine()
+    mapped.universe = MappedUniverse(UniverseSnapshot(path))
+
+    params = ScreenParams(sectors=["Technology"], min_market_cap=2e9, group_by=ScreenGroupBy.EXCHANGE)
+    assert mapped.screen(params).dict(exclude={"refreshed_at"}) == private.screen(params).dict(exclude={"refreshed_at"})
+    with pytest.raises(TypeError):
+        mapped.universe.upsert(rows[0])
+
+
+class NoDatabase:
+    async def get_screening_rows(self, changed_since=None):
+        raise AssertionError("a published snapshot should be used instead of the database")
+
+
+@pytest.mark.asyncio
+async def test_engine_remaps_new_generations(tmp_path):
+    path = str(tmp_path / "universe.bin")
+    write_snapshot(path, build_universe(make_rows(10)).to_snapshot_columns(), 1)
+    engine = ScreeningEngine(snapshot_path=path)
+
+    await engine.ensure_fresh(NoDatabase())
+    first = engine.universe
+    assert first.size == 10 and first.version == 1
+
+    await engine.ensure_fresh(NoDatabase())
+    assert engine.universe is first
+
+    write_snapshot(path, build_universe(make_rows(12)).to_snapshot_columns(), 2)
+    await engine.ensure_fresh(NoDatabase())
+    assert engine.universe is not first
+    assert engine.universe.size == 12 and engine.universe.version == 2
@@ -0,0 +1,195 @@
+"""Tests for warm-starting the screening universe from a local snapshot"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.infrastructure.repositories.stock_discovery import CompanyRepository
+from app.infrastructure.universe_snapshot import read_generation
+from app.services.stock_discovery.screening_engine import (
+    WATERMARK_OVERLAP, CompanyUniverse, ScreeningEngine, read_warm_start, save_warm_start
+)
+from app.shared.models.stock_discovery import ScreenGroupBy, ScreenParams
+from tests.fakes import RecordingSession, compile_sql
+from tests.test_screening_engine import FakeCompanyRepository, make_rows
+
+SOURCE = {"system_identifier": "7301234567890123456", "database": "us_stock_data", "table_oid": 16384}
+
+
+class SourceRepository(FakeCompanyRepository):
+    def __init__(self, rows: list, source: dict = SOURCE, companies: int = None):
+        super().__init__(rows)
+        self.source = source
+        self.companies = len(rows) if companies is None else companies
+
+    async def get_universe_source(self):
+        return dict(self.source), self.companies
+
+
+def screened(universe: CompanyUniverse, params: ScreenParams) -> dict:
+    engine = ScreeningEngine()
+    engine.universe = universe
+    return engine.screen(params).dict(exclude={"refreshed_at"})
+
+
+def test_snapshot_columns_are_copies():
+    rows = make_rows(10)
+    universe = CompanyUniverse()
+    universe.load(rows)
+    columns = universe.to_snapshot_columns()
+    before = columns.market_cap.copy()
+
+    universe.upsert(rows[0][:5] + (123.0,) + rows[0][6:])
+
+    assert not np.shares_memory(columns.market_cap, universe.market_cap)
+    np.testing.assert_array_equal(columns.market_cap, before)
+
+
+def test_warm_start_round_trip_is_writable(tmp_path):
+    path = str(tmp_path / "data" / "universe-warm.bin")
+    rows = make_rows(50)
+    universe = CompanyUniverse()
+    universe.load(rows)
+
+    assert read_warm_start(path) is None
+    save_warm_start(path, universe.to_snapshot_columns(), rows[-1][7])
+    assert read_generation(path) == 1
+    save_warm_start(path, universe.to_snapshot_columns(), rows[-1][7], {"source": SOURCE})
+    assert read_generation(path) == 2
+
+    loaded, watermark, origin = read_warm_start(path)
+    assert watermark == rows[-1][7] and origin == {"source": SOURCE}
+    assert loaded.size == 50 and not loaded.read_only
+    params = ScreenParams(group_by=ScreenGroupBy.SECTOR, limit=100)
+    assert screened(loaded, params) == screened(universe, params)
+
+    # Known ids update in place, new ids append
+    assert not loaded.upsert(rows[3])
+    assert loaded.upsert(rows[3][:5] + (1.0,) + rows[3][6:]) is False
+    assert loaded.row(3).market_cap == 1.0
+    assert loaded.upsert(make_rows(1, seed=9)[0])
+    assert loaded.size == 51
+
+
+def test_unreadable_warm_start_is_ignored(tmp_path):
+    path = tmp_path / "universe-warm.bin"
+    for content in (b"", b"not a snapshot", b"x" * 64):
+        path.write_bytes(content)
+        assert read_warm_start(str(path)) is None
+
+
+@pytest.mark.asyncio
+async def test_restarted_engine_catches_up_from_saved_watermark(tmp_path):
+    path = str(tmp_path / "universe-warm.bin")
+    rows = make_rows(30)
+    first = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path)
+    await first.ensure_fresh(SourceRepository(rows))
+    assert read_generation(path) == 1
+    assert read_warm_start(path)[2] == {"source": SOURCE, "built_at": first.built_at.isoformat()}
+
+    # No changes since the last save, so nothing is written
+    await first.save_warm_start()
+    assert read_generation(path) == 1
+
+    repo = SourceRepository(rows)
+    restarted = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path)
+    await restarted.ensure_fresh(repo)
+
+    assert repo.calls == [rows[-1][7] - WATERMARK_OVERLAP]
+    assert restarted.universe.size == 30
+    assert restarted.watermark == rows[-1][7]
+    # The full scan time carries over, so the file still ages out
+    assert restarted.built_at == first.built_at
+    params = ScreenParams(limit=100)
+    assert restarted.screen(params).dict(exclude={"refreshed_at"}) == first.screen(params).dict(exclude={"refreshed_at"})
+
+
+async def saved_engine(path: str, rows: list) -> ScreeningEngine:
+    engine = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path)
+    await engine.ensure_fresh(SourceRepository(rows))
+    return engine
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("change", ["system_identifier", "database", "table_oid"])
+async def test_warm_start_from_another_database_is_refused(tmp_path, change):
+    path = str(tmp_path / "universe-warm.bin")
+    rows = make_rows(30)
+    await saved_engine(path, rows)
+
+    repo = SourceRepository(rows, source={**SOURCE, change: "other"})
+    restarted = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path)
+    await restarted.ensure_fresh(repo)
+
+    # Full scan, and the next save records the new database
+    assert repo.calls == [None]
+    assert restarted.source == repo.source
+    assert read_warm_start(path)[2]["source"] == repo.source
+
+
+@pytest.mark.asyncio
+async def test_warm_start_without_origin_is_refused(tmp_path):
+    path = str(tmp_path / "universe-warm.bin")
+    universe = CompanyUniverse()
+    rows = make_rows(5)
+    universe.load(rows)
+    save_warm_start(path, universe.to_snapshot_columns(), rows[-1][7])
+
+    engine = ScreeningEngine(warm_start_path=path)
+    assert not await engine.warm_start(path, SourceRepository(rows))
+    assert engine.universe is None
+
+
+@pytest.mark.asyncio
+async def test_warm_start_older_than_max_age_is_refused(tmp_path):
+    path = str(tmp_path / "universe-warm.bin")
+    rows = make_rows(30)
+    first = await saved_engine(path, rows)
+    built_at = first.built_at
+
+    # Later saves keep the original full scan time
+    first.universe.upsert(rows[0][:5] + (1.0,) + rows[0][6:])
+    await first.save_warm_start()
+    assert read_warm_start(path)[2]["built_at"] == built_at.isoformat()
+
+    fresh = ScreeningEngine(warm_start_path=path, warm_start_max_age=timedelta(hours=1))
+    assert await fresh.warm_start(path, SourceRepository(rows))
+
+    save_warm_start(path, first.universe.to_snapshot_columns(), first.watermark,
+                    {"source": SOURCE, "built_at": (datetime.utcnow() - timedelta(hours=2)).isoformat()})
+    repo = SourceRepository(rows)
+    expired = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path, warm_start_max_age=timedelta(hours=1))
+    await expired.ensure_fresh(repo)
+
+    assert repo.calls == [None]
+    assert datetime.utcnow() - expired.built_at < timedelta(minutes=1)
+
+
+@pytest.mark.asyncio
+async def test_warm_start_is_refused_when_companies_were_deleted(tmp_path):
+    path = str(tmp_path / "universe-warm.bin")
+    rows = make_rows(30)
+    await saved_engine(path, rows)
+
+    # Catch-up cannot see the deleted rows, so the sizes disagree
+    repo = SourceRepository(rows[:25])
+    restarted = ScreeningEngine(refresh_interval=timedelta(0), warm_start_path=path)
+    await restarted.ensure_fresh(repo)
+
+    assert repo.calls == [rows[-1][7] - WATERMARK_OVERLAP, None]
+    assert restarted.universe.size == 25
+
+
+@pytest.mark.asyncio
+async def test_get_universe_source_identifies_the_database():
+    session = RecordingSession(results=[[(7301234567890123456, "us_stock_data", 16384, 42)]])
+
+    source, companies = await CompanyRepository(session).get_universe_source()
+
+    assert source == SOURCE and companies == 42
+    sql = compile_sql(session.statements[0][0])
+    assert "FROM pg_control_system()" in sql
+    assert "current_database()" in sql
+    assert "'sd_companies'::regclass::oid" in sql
+    assert "count(*)" in sql
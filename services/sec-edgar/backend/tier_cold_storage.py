@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Move old financial facts from Postgres to cold Parquet storage
+
+Every whole period_end month of dc_financial_facts older than
+--min-age-days is merged into COLD_STORAGE_PATH/financial_facts/YYYY-MM.parquet
+and deleted from Postgres, one transaction per month. The manifest next to
+the files records per-row-group company and period_end statistics that
+/api/v1/data/facts uses to read only the row groups a range needs.
+
+Safe to re-run: a month interrupted after its file was written is simply
+merged again on the next run.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.infrastructure.database import AsyncSessionLocal, init_db
+from app.services.data_management.cold_storage import MIN_AGE_DAYS, ColdStorageService, tier_cutoff
+
+
+async def tier(args):
+    await init_db()
+
+    print(f"📋 Tiering facts with period_end before {tier_cutoff(args.min_age_days)}")
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        service = ColdStorageService(session)
+        results = await service.tier_facts(args.min_age_days, dry_run=args.dry_run)
+        for result in results:
+            if args.dry_run:
+                print(f"   {result.month}: {result.rows} facts would be tiered")
+            else:
+                print(f"   {result.month}: {result.rows} facts tiered, {result.archived_rows} archived "
+                      f"in {result.row_groups} row groups ({result.seconds:.2f}s)")
+        summary = service.summary()
+
+    elapsed = time.perf_counter() - started
+    moved = sum(result.rows for result in results)
+    if args.dry_run:
+        print(f"✅ Dry run: {moved} facts in {len(results)} months would be tiered")
+    else:
+        print(f"✅ {moved} facts in {len(results)} months tiered in {elapsed:.1f}s")
+    print(f"🧊 Cold storage: {summary['rows']} facts, {len(summary['months'])} months, "
+          f"{summary['row_groups']} row groups, {summary['bytes'] / 1024 / 1024:.1f} MiB")
+    return 0
+
+
+def main():
+    """Main tiering function"""
+    parser = argparse.ArgumentParser(description='Move old financial facts to cold Parquet storage')
+    parser.add_argument('--min-age-days', type=int, default=MIN_AGE_DAYS,
+                        help='Tier months whose period ended more than this many days ago')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the months that would be tiered')
+    args = parser.parse_args()
+
+    print("🚀 Starting cold storage tiering...")
+    return asyncio.run(tier(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
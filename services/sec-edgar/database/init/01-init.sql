@@ -4,6 +4,8 @@
 -- Create extensions if needed
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+-- Exclusion constraint on sd_company_history (uuid = with daterange &&)
+CREATE EXTENSION IF NOT EXISTS "btree_gist";
 
 -- Set timezone
 SET timezone = 'UTC';
@@ -92,6 +92,20 @@ const CompanyListPage: React.FC = () => {
     loadCompanies();
   }, [searchQuery, exchange, sector, selectedOnly, page]);
 
+  // Apply changes made elsewhere (other users, imports) to the visible rows
+  useEffect(() => {
+    return apiService.subscribeToChanges(
+      (event) => {
+        setCompanies((current) =>
+          current.map((company) =>
+            company.id === event.company_id ? { ...company, ...event.changes } : company
+          )
+        );
+      },
+      () => loadCompanies()
+    );
+  }, []);
+
   // Handle search
   const handleSearch = (event: React.FormEvent) => {
     event.preventDefault();
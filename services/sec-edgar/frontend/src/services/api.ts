@@ -25,6 +25,18 @@ export interface CompanyListResponse {
   size: number;
 }
 
+export interface CompanyBatchItem {
+  key: string;
+  found: boolean;
+  company?: Company;
+}
+
+export interface CompanyBatchResponse {
+  results: CompanyBatchItem[];
+  found: number;
+  missing: number;
+}
+
 export interface CompanySelectionRequest {
   selected: boolean;
   notes?: string;
@@ -46,6 +58,15 @@ export interface CompanySearchParams {
   size?: number;
 }
 
+export interface CompanyChangeEvent {
+  seq: number;
+  company_id: string;
+  type: 'created' | 'updated' | 'selected' | 'deselected';
+  changes: Partial<Company>;
+  source: string;
+  at?: string;
+}
+
 // Create axios instance with default configuration
 const apiClient: AxiosInstance = axios.create({
   baseURL: `${API_BASE_URL}/api/v1`,
@@ -94,6 +115,11 @@ class ApiService {
     return response.data;
   }
 
+  async getCompaniesBatch(keys: { ids?: string[]; tickers?: string[] }): Promise<CompanyBatchResponse> {
+    const response = await apiClient.post<CompanyBatchResponse>('/companies/batch', keys);
+    return response.data;
+  }
+
   async createCompany(companyData: Partial<Company>): Promise<Company> {
     const response = await apiClient.post<Company>('/companies', companyData);
     return response.data;
@@ -109,6 +135,22 @@ class ApiService {
     return response.data;
   }
 
+  // Live company changes (Server-Sent Events). The browser resumes from the last
+  // event id on reconnect; `onReset` fires when the client fell too far behind
+  // and should reload its data. Returns a function that closes the stream.
+  subscribeToChanges(onChange: (event: CompanyChangeEvent) => void, onReset?: () => void): () => void {
+    const url = `${API_BASE_URL}/api/v1/companies/changes?api_key=${encodeURIComponent(API_KEY)}`;
+    const source = new EventSource(url);
+    const handle = (message: MessageEvent) => onChange(JSON.parse(message.data));
+    ['created', 'updated', 'selected', 'deselected'].forEach((type) =>
+      source.addEventListener(type, handle as EventListener)
+    );
+    if (onReset) {
+      source.addEventListener('reset', () => onReset());
+    }
+    return () => source.close();
+  }
+
   // Health check
   async healthCheck(): Promise<{ status: string }> {
     const response = await apiClient.get<{ status: string }>('/health');